@@ -0,0 +1,137 @@
+"""
+orchestrator/admission.py
+
+Admission control for the ingest endpoints: bound the work the server takes
+on so an upstream outage produces fast 503s instead of an unbounded backlog.
+
+  limit        requests allowed in flight at once
+  max_queue    requests allowed to wait for a slot; beyond it, shed at once
+  queue_timeout  longest a request waits for a slot before it is shed
+
+With ``adaptive`` the limit follows observed latency, AIMD style: every
+request that finishes within ``target_latency`` while the limit is fully used
+adds ``1 / limit`` (about +1 per limit's worth of requests), and a slow or
+failed request multiplies the limit by ``backoff_ratio`` - at most once per
+``target_latency`` so one burst of slow responses counts as one signal.  The
+limit stays within ``[min_limit, max_limit]``.
+
+Everything runs on the event loop thread; no locks are taken.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict
+
+
+class AdmissionRejected(Exception):
+    """The request was shed; ``retry_after`` is the suggested wait in seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"request shed ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, max_inflight: int, max_queue: int = 128, queue_timeout: float = 1.0,
+                 retry_after: float = 1.0, adaptive: bool = False, target_latency: float = 0.25,
+                 min_limit: int = 1, backoff_ratio: float = 0.9):
+        self.max_limit = max(1, max_inflight)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.max_queue = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.adaptive = adaptive
+        self.target_latency = target_latency
+        self.backoff_ratio = backoff_ratio
+        self.limit = float(self.max_limit)
+        self.inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+        # metrics
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "timeout": 0}
+
+    def capacity(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    def queued(self) -> int:
+        return sum(1 for f in self._waiters if not f.done())
+
+    def _reject(self, reason: str):
+        self.rejected[reason] += 1
+        raise AdmissionRejected(reason, self.retry_after)
+
+    async def acquire(self):
+        """Take a slot, waiting in FIFO order; raise ``AdmissionRejected`` when shedding."""
+        if self.inflight < self.capacity() and not self.queued():
+            self.inflight += 1
+            self.admitted += 1
+            return
+        if self.queued() >= self.max_queue:
+            self._reject("queue_full")
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await asyncio.wait_for(fut, self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._reject("timeout")
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release()  # granted a slot just as the caller went away
+            raise
+        finally:
+            with contextlib.suppress(ValueError):
+                self._waiters.remove(fut)
+
+    def release(self, latency: float = 0.0, error: bool = False):
+        saturated = self.inflight >= self.capacity() or self.queued() > 0
+        self.inflight -= 1
+        if self.adaptive and latency:
+            self._adjust(latency, error, saturated)
+        self._wake()
+
+    def _adjust(self, latency: float, error: bool, saturated: bool):
+        if error or latency > self.target_latency:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.target_latency:
+                self.limit = max(float(self.min_limit), self.limit * self.backoff_ratio)
+                self._last_decrease = now
+        elif saturated:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+
+    def _wake(self):
+        while self._waiters and self.inflight < self.capacity():
+            fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            self.inflight += 1
+            self.admitted += 1
+            fut.set_result(None)
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """``async with controller.slot():`` around the admitted work."""
+        await self.acquire()
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.release(time.perf_counter() - start, error)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "limit": self.capacity(),
+            "inflight": self.inflight,
+            "queued": self.queued(),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+        }
@@ -0,0 +1,168 @@
+"""
+orchestrator/analysis_cache.py
+
+Content-addressed cache for Mind Nexus analyses.
+
+Entries are keyed by a SHA-256 of the scroll's ``raw`` text plus a chosen
+subset of ``meta`` fields, evicted LRU-first once the entry or byte budget is
+exceeded, and expire after a TTL.  Concurrent lookups of the same key share a
+single in-flight computation (single-flight), on both the sync and async
+paths.  Fallback analyses are never stored.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+# Rough per-entry bookkeeping cost (key string, tuple, OrderedDict node).
+_ENTRY_OVERHEAD = 200
+
+
+def is_fallback(analysis: Dict[str, Any]) -> bool:
+    """True for the degraded-mode analyses produced when Mind Nexus fails."""
+    return str(analysis.get("notes", "")).startswith(("fallback", "analysis error"))
+
+
+class AnalysisCache:
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 300,
+                 max_bytes: int = 32 * 1024 * 1024, meta_keys: Iterable[str] = ()):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.meta_keys = tuple(meta_keys)
+        # key -> (expires_at, size, analysis); most recently used last
+        self._entries: "OrderedDict[str, Tuple[float, int, Dict[str, Any]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight_async: Dict[str, asyncio.Future] = {}
+        self._inflight_sync: Dict[str, list] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def key(self, raw: str, meta: Optional[Dict[str, Any]] = None) -> str:
+        h = hashlib.sha256(raw.encode("utf-8"))
+        if self.meta_keys and meta:
+            selected = {k: meta[k] for k in self.meta_keys if k in meta}
+            h.update(b"\0")
+            h.update(json.dumps(selected, sort_keys=True, default=str).encode("utf-8"))
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, size, analysis = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(analysis)
+
+    def put(self, key: str, analysis: Dict[str, Any]):
+        if not isinstance(analysis, dict) or is_fallback(analysis):
+            return
+        size = len(key) + len(json.dumps(analysis, default=str)) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, size, dict(analysis))
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, raw: str, meta: Optional[Dict[str, Any]],
+                       compute: Callable[[str, Optional[Dict[str, Any]]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Sync lookup; threads asking for the same key wait on one ``compute`` call."""
+        key = self.key(raw, meta)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            waiter = self._inflight_sync.get(key)
+            if waiter is None:
+                waiter = self._inflight_sync[key] = [threading.Event(), None]
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        if not leader:
+            waiter[0].wait()
+            if waiter[1] is not None:
+                return dict(waiter[1])
+            return compute(raw, meta)  # leader raised; compute on our own
+        try:
+            result = compute(raw, meta)
+            waiter[1] = result
+            self.put(key, result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight_sync.pop(key, None)
+            waiter[0].set()
+
+    async def get_or_compute_async(self, raw: str, meta: Optional[Dict[str, Any]],
+                                   compute: Callable[[str, Optional[Dict[str, Any]]], Awaitable[Dict[str, Any]]]
+                                   ) -> Dict[str, Any]:
+        """Async lookup; concurrent calls for the same key share one ``compute`` task."""
+        key = self.key(raw, meta)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        fut = self._inflight_async.get(key)
+        if fut is not None and fut.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+            try:
+                return dict(await asyncio.shield(fut))
+            except asyncio.CancelledError:
+                if not fut.cancelled():
+                    raise  # we were cancelled ourselves
+            return await compute(raw, meta)  # leader was cancelled
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight_async[key] = fut
+        try:
+            result = await compute(raw, meta)
+            self.put(key, result)
+            fut.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            if self._inflight_async.get(key) is fut:
+                del self._inflight_async[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
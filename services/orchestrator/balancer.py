@@ -0,0 +1,230 @@
+"""
+orchestrator/balancer.py
+
+Client-side load balancing over several replicas of a downstream service.
+
+  EndpointPool   picks a replica per call by power-of-two-choices (two random
+                 healthy replicas, the one with fewer requests outstanding
+                 wins) or strict least-outstanding, and passively ejects a
+                 replica after ``eject_failures`` consecutive failures for
+                 ``eject_seconds`` (doubling on repeat ejections).  At most
+                 ``max_ejected_ratio`` of the pool is ejected at once, so a
+                 shared outage cannot empty it.  Replicas whose circuit
+                 breaker is open are skipped.
+
+Hedging (``call_async`` with ``hedge=True``): if the first replica has not
+answered after the pool's recent ``hedge_quantile`` latency, the same call
+is sent to a second replica and whichever succeeds first wins; the loser is
+cancelled.  Hedges are capped by a ``RetryBudget`` at ``hedge_budget_ratio``
+of calls so a pool-wide slowdown cannot double the load.  Only hedge calls
+that are safe to repeat (Mind Nexus analyze, not Memory Core store).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from resilience import BreakerRegistry, CircuitBreaker, CircuitOpenError, RetryBudget
+
+STRATEGIES = ("p2c", "least_outstanding")
+
+# successful-call latencies kept for the hedge delay quantile
+_LATENCY_WINDOW = 512
+# below this many samples the quantile is too noisy to hedge on
+_MIN_HEDGE_SAMPLES = 20
+# the quantile is recomputed after this many new samples, not on every call
+_HEDGE_REFRESH = 32
+
+
+class Endpoint:
+    __slots__ = ("url", "breaker", "outstanding", "consecutive_failures", "ejected_until",
+                 "ejections", "requests", "failures")
+
+    def __init__(self, url: str, breaker: Optional[CircuitBreaker] = None):
+        self.url = url.rstrip("/")
+        self.breaker = breaker
+        self.outstanding = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.ejections = 0
+        self.requests = 0
+        self.failures = 0
+
+    def available(self, now: float) -> bool:
+        return self.ejected_until <= now and (self.breaker is None or not self.breaker.rejecting())
+
+
+class EndpointPool:
+    def __init__(self, urls: Sequence[str], strategy: str = "p2c", breakers: Optional[BreakerRegistry] = None,
+                 eject_failures: int = 3, eject_seconds: float = 10.0, max_ejected_ratio: float = 0.5,
+                 hedge: bool = False, hedge_quantile: float = 0.95, hedge_min_delay: float = 0.005,
+                 hedge_budget_ratio: float = 0.1, name: str = ""):
+        if not urls:
+            raise ValueError("EndpointPool needs at least one URL")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown balancer strategy {strategy!r}; expected one of {STRATEGIES}")
+        self.name = name
+        self.endpoints = [Endpoint(u, breakers.for_url(u) if breakers is not None else None) for u in urls]
+        self.strategy = strategy
+        self.eject_failures = max(1, eject_failures)
+        self.eject_seconds = eject_seconds
+        self.max_ejected = int(len(self.endpoints) * max_ejected_ratio)
+        self.hedge = hedge and len(self.endpoints) > 1
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_delay = hedge_min_delay
+        self._hedge_budget = RetryBudget(ratio=hedge_budget_ratio, min_per_second=1.0, max_tokens=10.0)
+        self._latencies: deque = deque(maxlen=_LATENCY_WINDOW)
+        self._new_samples = 0
+        self._hedge_delay: Optional[float] = None
+        self._lock = threading.Lock()
+        self.hedges_sent = 0
+        self.hedges_won = 0
+
+    # -- selection ---------------------------------------------------------
+
+    def pick(self, exclude: Optional[Endpoint] = None) -> Endpoint:
+        """Choose a replica for the next call; raises CircuitOpenError if every circuit is open."""
+        now = time.monotonic()
+        candidates = [e for e in self.endpoints if e is not exclude and e.available(now)]
+        if not candidates:
+            # all ejected: ejection is advisory, an open circuit is not
+            candidates = [e for e in self.endpoints if e is not exclude
+                          and (e.breaker is None or not e.breaker.rejecting())]
+            if not candidates:
+                raise CircuitOpenError(f"no available endpoint for {self.name or 'pool'}")
+        if len(candidates) == 1:
+            return candidates[0]
+        if self.strategy == "p2c":
+            a, b = random.sample(candidates, 2)
+            return a if a.outstanding <= b.outstanding else b
+        fewest = min(e.outstanding for e in candidates)
+        return random.choice([e for e in candidates if e.outstanding == fewest])
+
+    def _start(self, endpoint: Endpoint):
+        with self._lock:
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+
+    def _finish(self, endpoint: Endpoint, latency: Optional[float], failed: bool):
+        with self._lock:
+            endpoint.outstanding -= 1
+            if latency is not None:
+                self._latencies.append(latency)
+                self._new_samples += 1
+            if not failed:
+                endpoint.consecutive_failures = 0
+                return
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures < self.eject_failures:
+                return
+            now = time.monotonic()
+            ejected = sum(1 for e in self.endpoints if e.ejected_until > now)
+            if endpoint.ejected_until <= now and ejected < self.max_ejected:
+                endpoint.ejected_until = now + self.eject_seconds * (2 ** min(endpoint.ejections, 5))
+                endpoint.ejections += 1
+                endpoint.consecutive_failures = 0
+
+    # -- calls -------------------------------------------------------------
+
+    def call(self, fn: Callable[[Endpoint], Any]) -> Any:
+        """Run ``fn(endpoint)`` on a balanced replica (sync; no hedging)."""
+        endpoint = self.pick()
+        self._start(endpoint)
+        t0 = time.perf_counter()
+        try:
+            result = fn(endpoint)
+        except CircuitOpenError:
+            self._finish(endpoint, None, False)
+            raise
+        except Exception:
+            self._finish(endpoint, None, True)
+            raise
+        self._finish(endpoint, time.perf_counter() - t0, False)
+        return result
+
+    async def _attempt(self, endpoint: Endpoint, fn: Callable[[Endpoint], Awaitable[Any]]) -> Any:
+        self._start(endpoint)
+        t0 = time.perf_counter()
+        try:
+            result = await fn(endpoint)
+        except (asyncio.CancelledError, CircuitOpenError):
+            self._finish(endpoint, None, False)  # a cancelled hedge loser is not the replica's fault
+            raise
+        except Exception:
+            self._finish(endpoint, None, True)
+            raise
+        self._finish(endpoint, time.perf_counter() - t0, False)
+        return result
+
+    def hedge_delay(self) -> Optional[float]:
+        """Recent ``hedge_quantile`` latency, or ``None`` while there are too few samples."""
+        with self._lock:
+            if len(self._latencies) < _MIN_HEDGE_SAMPLES:
+                return None
+            if self._hedge_delay is not None and self._new_samples < _HEDGE_REFRESH:
+                return self._hedge_delay
+            ordered = sorted(self._latencies)
+            self._new_samples = 0
+            idx = min(len(ordered) - 1, int(self.hedge_quantile * len(ordered)))
+            self._hedge_delay = max(self.hedge_min_delay, ordered[idx])
+            return self._hedge_delay
+
+    async def call_async(self, fn: Callable[[Endpoint], Awaitable[Any]]) -> Any:
+        """Run ``fn(endpoint)`` on a balanced replica, hedging to a second one if enabled."""
+        first = self.pick()
+        delay = self.hedge_delay() if self.hedge else None
+        if delay is None:
+            return await self._attempt(first, fn)
+        self._hedge_budget.record_request()
+        primary = asyncio.ensure_future(self._attempt(first, fn))
+        backup: Optional[asyncio.Future] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self._hedge_budget.try_spend():
+                return await primary
+            try:
+                second = self.pick(exclude=first)
+            except CircuitOpenError:
+                return await primary
+            self.hedges_sent += 1
+            backup = asyncio.ensure_future(self._attempt(second, fn))
+            pending = {primary, backup}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.hedges_won += 1
+                        return task.result()
+                    error = error or task.exception()
+            raise error
+        finally:
+            for task in (primary, backup):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "endpoints": {e.url: {"outstanding": e.outstanding, "requests": e.requests, "failures": e.failures,
+                                  "ejections": e.ejections, "ejected": e.ejected_until > now}
+                          for e in self.endpoints},
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "hedge_delay_ms": (self.hedge_delay() or 0.0) * 1000.0,
+        }
+
+
+def endpoint_urls(config: Dict[str, Any], service: str) -> List[str]:
+    """Replica URLs for ``service`` ("mind_nexus" / "memory_core"): ``<service>_urls`` or ``<service>_url``."""
+    urls = config.get(f"{service}_urls") or []
+    if isinstance(urls, str):
+        urls = [u.strip() for u in urls.split(",") if u.strip()]
+    return list(urls) or [config[f"{service}_url"]]
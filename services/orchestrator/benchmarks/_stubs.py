@@ -0,0 +1,150 @@
+"""
+Helpers shared by the orchestrator benchmarks.
+
+Starts the Flask Mind Nexus / Memory Core / mint service stubs as subprocesses
+and writes a throwaway SupremeHead config that points at them; ``run_server``
+runs server.py itself for the benchmarks that go through HTTP.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Any, Dict, Iterator
+
+ORCHESTRATOR_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ORCHESTRATOR_DIR not in sys.path:
+    sys.path.insert(0, ORCHESTRATOR_DIR)
+
+MEMORY_CORE_PORT = 3000
+MIND_NEXUS_PORT = 3001
+MINT_SERVICE_PORT = 4000
+
+
+def _wait_for_port(port: int, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError):
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        time.sleep(0.05)
+    raise RuntimeError(f"stub on port {port} did not start within {timeout}s")
+
+
+@contextlib.contextmanager
+def run_stubs(start: bool = True) -> Iterator[None]:
+    """Run memory_core_stub.py and mind_nexus_stub.py for the duration of the block."""
+    if not start:
+        yield
+        return
+    procs = []
+    try:
+        for script, port in (("memory_core_stub.py", MEMORY_CORE_PORT),
+                             ("mind_nexus_stub.py", MIND_NEXUS_PORT)):
+            procs.append(subprocess.Popen(
+                [sys.executable, os.path.join(ORCHESTRATOR_DIR, script)],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            ))
+            _wait_for_port(port)
+        yield
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            with contextlib.suppress(subprocess.TimeoutExpired):
+                proc.wait(timeout=5)
+
+
+@contextlib.contextmanager
+def run_mint_stub(tx_latency_ms: float = 50, item_latency_ms: float = 1) -> Iterator[str]:
+    """Run mint_service_stub.py for the duration of the block; yields its /mint URL."""
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ORCHESTRATOR_DIR, "mint_service_stub.py")],
+        env=dict(os.environ, MINT_TX_LATENCY_MS=str(tx_latency_ms), MINT_ITEM_LATENCY_MS=str(item_latency_ms),
+                 MINT_SERVICE_PORT=str(MINT_SERVICE_PORT)),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_for_port(MINT_SERVICE_PORT)
+        yield f"http://127.0.0.1:{MINT_SERVICE_PORT}/mint"
+    finally:
+        proc.terminate()
+        with contextlib.suppress(subprocess.TimeoutExpired):
+            proc.wait(timeout=5)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_healthy(url: str, workers: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with contextlib.suppress(OSError, ValueError):
+            with urllib.request.urlopen(url + "/health", timeout=1) as resp:
+                body = json.loads(resp.read())
+            if workers == 1 or body.get("workers_healthy") == workers:
+                return
+        time.sleep(0.2)
+    raise RuntimeError(f"server with {workers} workers did not become healthy")
+
+
+@contextlib.contextmanager
+def run_server(config_path: str, workers: int = 1) -> Iterator[subprocess.Popen]:
+    """Run ``server.py --workers N`` on a free port; ``proc.url`` is its base URL."""
+    port = free_port()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ORCHESTRATOR_DIR, "server.py"),
+         "--workers", str(workers), "--port", str(port), "--drain-timeout", "5"],
+        env=dict(os.environ, ORCHESTRATOR_CONFIG=config_path),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    proc.url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_healthy(proc.url, workers)
+        yield proc
+    finally:
+        proc.terminate()
+        with contextlib.suppress(subprocess.TimeoutExpired):
+            proc.wait(timeout=15)
+        if proc.poll() is None:
+            proc.kill()
+
+
+def write_config(tmpdir: str, **overrides: Any) -> str:
+    """Write a SupremeHead config aimed at the local stubs and return its path."""
+    cfg: Dict[str, Any] = {
+        "memory_core_url": f"http://127.0.0.1:{MEMORY_CORE_PORT}",
+        "mind_nexus_url": f"http://127.0.0.1:{MIND_NEXUS_PORT}",
+        "codex_ledger_path": os.path.join(tmpdir, "codex_ledger.log"),
+        "retries": 1,
+        "retry_delay_seconds": 0,
+    }
+    cfg.update(overrides)
+    path = os.path.join(tmpdir, "bench_config.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cfg, f)
+    return path
+
+
+def percentile(samples: list, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def make_tmpdir() -> str:
+    return tempfile.mkdtemp(prefix="orch_bench_")
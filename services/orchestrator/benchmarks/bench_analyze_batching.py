@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+bench_analyze_batching.py
+-------------------------
+Compare ``MindNexusClient.analyze_async`` with and without micro-batching
+against the local Mind Nexus stub (``/analyze`` vs ``/analyze_batch``).
+
+Usage:
+    pip install -r requirements.txt flask
+    python benchmarks/bench_analyze_batching.py --requests 2000 --window-ms 2 --max-size 64
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+
+from _stubs import MIND_NEXUS_PORT, percentile, run_stubs
+
+from supremehead import HTTPClient, MindNexusClient
+
+
+async def run(client: MindNexusClient, total: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            await client.analyze_async(f"scroll {i} of the quiet market", {"source": "bench"})
+            latencies.append(time.perf_counter() - t0)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return time.perf_counter() - start, latencies
+    finally:
+        await HTTPClient.close_session()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=128)
+    parser.add_argument("--window-ms", type=float, default=2.0)
+    parser.add_argument("--max-size", type=int, default=64)
+    parser.add_argument("--no-stubs", action="store_true", help="use already-running stubs")
+    args = parser.parse_args()
+
+    logging.getLogger("supremehead").setLevel(logging.WARNING)
+    url = f"http://127.0.0.1:{MIND_NEXUS_PORT}"
+
+    with run_stubs(start=not args.no_stubs):
+        print(f"{'mode':<10} {'requests':>8} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+        for name, client in (
+            ("single", MindNexusClient(url)),
+            ("batched", MindNexusClient(url, batch_window_ms=args.window_ms, batch_max_size=args.max_size)),
+        ):
+            elapsed, latencies = asyncio.run(run(client, args.requests, args.concurrency))
+            print(f"{name:<10} {len(latencies):>8} {len(latencies) / elapsed:>10.1f} "
+                  f"{percentile(latencies, 50) * 1000:>9.2f} {percentile(latencies, 99) * 1000:>9.2f}")
+            if client.batch_stats():
+                print(f"  batch sizes: {client.batch_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+bench_codec.py
+--------------
+Per-message cost of every available JSON backend (codec.py) on the payloads
+one scroll produces: the /ingest request body (parsed and schema-checked),
+the /analyze request and response, the /store request and a ledger line.
+
+Usage:
+    pip install orjson msgspec   # optional; whichever is installed is measured
+    python benchmarks/bench_codec.py --iterations 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import _stubs  # noqa: F401  (puts the orchestrator on sys.path)
+
+import codec
+from codec import AnalysisResponse, ScrollRequest
+
+RAW = ("The flame remembers the pattern of the market's quiet laughter — ünïcode too. " * 4)[:300]
+ANALYSIS = {"patterns": ["temporal", "cyclical"], "sentiment": "positive", "value_score": 72,
+            "timestamp": "2026-01-01T00:00:00.000001Z"}
+SCROLL = {"id": "3f1c2a9e8b7d4c6f", "raw": RAW, "source": "feed-3", "timestamp": "2026-01-01T00:00:00Z",
+          "meta": {"length": len(RAW)}}
+MESSAGES = {
+    "ingest body": {"raw": RAW, "source": "feed-3", "priority": "high"},
+    "analyze req": {"raw": RAW, "meta": {"source": "feed-3"}},
+    "analyze resp": ANALYSIS,
+    "store req": {"scroll": SCROLL, "analysis": ANALYSIS},
+    "ledger line": {"event_type": "scroll_stored_async", "timestamp": "2026-01-01T00:00:00.000001Z",
+                    "payload": {"source": "feed-3", "score": 72, "result": {"status": "ok", "received": True}}},
+}
+SCHEMAS = {"ingest body": ScrollRequest, "analyze resp": AnalysisResponse}
+
+
+def per_op_us(fn, arg, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(arg)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    totals = {}
+    print(f"{'backend':<8} {'message':<13} {'bytes':>6} {'encode us':>10} {'decode us':>10}")
+    for backend in codec.available():
+        codec.set_backend(backend)
+        total = 0.0
+        for name, message in MESSAGES.items():
+            data = codec.dumps(message)
+            schema = SCHEMAS.get(name)
+            decode = (lambda d, s=schema: codec.decode(d, s)) if schema else codec.loads
+            enc = per_op_us(codec.dumps, message, args.iterations)
+            dec = per_op_us(decode, data, args.iterations)
+            total += enc + dec
+            print(f"{backend:<8} {name + ('*' if schema else ''):<13} {len(data):>6} {enc:>10.2f} {dec:>10.2f}")
+        totals[backend] = total
+    print("* decoded with schema validation")
+    print("per scroll (all five messages, encode + decode): "
+          + ", ".join(f"{b} {t:.1f} us ({totals['json'] / t:.1f}x)" for b, t in totals.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+bench_hedging.py
+----------------
+Tail latency of ``MindNexusClient.analyze_async`` against one replica, a
+balanced pool of replicas, and the same pool with hedging.
+
+The replicas are small aiohttp apps (no Flask needed) with injected latency:
+every request takes ``--base-ms`` plus jitter, and with probability
+``--stall-rate`` it stalls for ``--stall-ms`` (a GC pause, a noisy
+neighbour).  ``--slow-replica`` additionally makes the last replica
+``--slow-ms`` slower across the board.  The analysis cache is off, so every
+call goes over HTTP.
+
+Usage:
+    python benchmarks/bench_hedging.py --replicas 3 --requests 3000 --concurrency 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from typing import List
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from _stubs import percentile
+
+from balancer import EndpointPool
+from supremehead import HTTPClient, MindNexusClient
+
+
+async def start_replica(base: float, stall_rate: float, stall: float) -> TestServer:
+    async def analyze(request: web.Request) -> web.Response:
+        body = await request.json()
+        delay = base * random.uniform(0.5, 1.5)
+        if random.random() < stall_rate:
+            delay += stall
+        await asyncio.sleep(delay)
+        return web.json_response({"patterns": [], "sentiment": "neutral",
+                                  "value_score": 50 + len(body.get("raw", "")) % 50, "timestamp": "bench"})
+
+    app = web.Application()
+    app.router.add_post("/analyze", analyze)
+    server = TestServer(app, host="127.0.0.1")
+    await server.start_server()
+    return server
+
+
+async def drive(client: MindNexusClient, total: int, concurrency: int) -> List[float]:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            await client.analyze_async(f"scroll {i}", {"source": "bench"})
+            latencies.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return latencies
+
+
+async def run(args) -> None:
+    replicas = []
+    for i in range(args.replicas):
+        slow = args.slow_ms / 1000.0 if args.slow_replica and i == args.replicas - 1 else 0.0
+        replicas.append(await start_replica(args.base_ms / 1000.0 + slow, args.stall_rate, args.stall_ms / 1000.0))
+    urls = [str(r.make_url("")).rstrip("/") for r in replicas]
+
+    modes = [("single", urls[:1], False), (args.strategy, urls, False), (f"{args.strategy}+hedge", urls, True)]
+    print(f"{'mode':<22} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'hedged':>7} {'won':>6}")
+    try:
+        for name, mode_urls, hedge in modes:
+            pool = None
+            if len(mode_urls) > 1:
+                pool = EndpointPool(mode_urls, strategy=args.strategy, hedge=hedge,
+                                    hedge_quantile=args.hedge_quantile, hedge_budget_ratio=args.hedge_budget)
+            client = MindNexusClient(mode_urls[0], pool=pool)
+            await drive(client, args.concurrency * 4, args.concurrency)  # warm connections + hedge delay
+            if pool is not None:
+                pool.hedges_sent = pool.hedges_won = 0
+            latencies = await drive(client, args.requests, args.concurrency)
+            sent = pool.hedges_sent if pool else 0
+            won = pool.hedges_won if pool else 0
+            print(f"{name:<22} {percentile(latencies, 50) * 1000:>8.1f} {percentile(latencies, 95) * 1000:>8.1f} "
+                  f"{percentile(latencies, 99) * 1000:>8.1f} {sent / args.requests:>6.1%} {won:>6}")
+    finally:
+        await HTTPClient.close_session()
+        for r in replicas:
+            await r.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--replicas", type=int, default=3)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--strategy", default="p2c", choices=("p2c", "least_outstanding"))
+    parser.add_argument("--base-ms", type=float, default=5.0)
+    parser.add_argument("--stall-rate", type=float, default=0.03)
+    parser.add_argument("--stall-ms", type=float, default=150.0)
+    parser.add_argument("--slow-replica", action="store_true", help="make the last replica uniformly slower")
+    parser.add_argument("--slow-ms", type=float, default=40.0)
+    parser.add_argument("--hedge-quantile", type=float, default=0.95)
+    parser.add_argument("--hedge-budget", type=float, default=0.1, help="hedges as a fraction of calls")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+bench_ingest_load.py
+--------------------
+Load benchmark for SupremeHead ingestion against the local Flask stubs.
+
+Compares the two ways server.py can drive ingestion:
+  - executor : ``loop.run_in_executor(None, head.ingest_scroll, ...)``
+               (one thread held per in-flight scroll)
+  - async    : ``await head.ingest_scroll_async(...)``
+               (all scrolls share the event loop and one aiohttp session)
+  - async-wb : the async path with Memory Core write-behind enabled
+               (stores are queued and posted to /store_batch)
+
+With ``--logging`` the executor and async rows are repeated under INFO
+logging to a file and a stream (stderr is swapped for /dev/null so the
+terminal does not dominate).  These rows use a downstream-light config -
+analysis cache over 16 distinct scrolls plus Memory Core write-behind - so
+the orchestrator itself, not the Flask stubs, is the bottleneck:
+  - blocking : FileHandler + StreamHandler on the root logger, the former
+               import-time ``basicConfig`` setup
+  - queue    : ``logging_setup.configure_logging`` (QueueHandler/Listener)
+  - sampled  : queue, keeping 1% of per-scroll INFO records
+``--sink-latency-ms`` makes every stream write sleep that long, standing in
+for stderr piped to a slow consumer (container log driver, terminal).
+
+Usage:
+    pip install -r requirements.txt flask
+    python benchmarks/bench_ingest_load.py --requests 2000 --concurrency 256
+    python benchmarks/bench_ingest_load.py --logging blocking,queue,sampled
+
+The stubs are started automatically on ports 3000/3001; pass ``--no-stubs``
+if they are already running.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import sys
+import time
+from typing import Awaitable, Callable, List
+
+from _stubs import make_tmpdir, percentile, run_stubs, write_config
+
+from logging_setup import TEXT_FORMAT, configure_logging, shutdown_logging
+from supremehead import SupremeHead
+
+SCROLL = "The flame remembers the pattern of the market's quiet laughter."
+
+
+async def _drive(call: Callable[[str, str], Awaitable[dict]], total: int, concurrency: int,
+                 distinct: int = 0):
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            await call(f"{SCROLL} #{i % distinct if distinct else i}", "bench")
+            latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return time.perf_counter() - start, latencies
+
+
+async def bench_executor(head: SupremeHead, total: int, concurrency: int, distinct: int = 0):
+    loop = asyncio.get_running_loop()
+
+    async def call(raw: str, source: str) -> dict:
+        return await loop.run_in_executor(None, head.ingest_scroll, raw, source)
+
+    try:
+        return await _drive(call, total, concurrency, distinct)
+    finally:
+        await head.cleanup()
+
+
+async def bench_async(head: SupremeHead, total: int, concurrency: int, distinct: int = 0):
+    try:
+        return await _drive(head.ingest_scroll_async, total, concurrency, distinct)
+    finally:
+        await head.cleanup()
+
+
+def report(name: str, elapsed: float, latencies: List[float]) -> None:
+    n = len(latencies)
+    print(f"{name:<10} {n:>8} {n / elapsed:>10.1f} "
+          f"{percentile(latencies, 50) * 1000:>9.2f} {percentile(latencies, 99) * 1000:>9.2f}")
+
+
+class SlowStream:
+    """File-like sink whose writes block for ``delay`` seconds."""
+
+    def __init__(self, target, delay: float):
+        self.target = target
+        self.delay = delay
+
+    def write(self, data: str) -> int:
+        if self.delay:
+            time.sleep(self.delay)
+        return self.target.write(data)
+
+    def flush(self) -> None:
+        self.target.flush()
+
+
+@contextlib.contextmanager
+def log_mode(mode: str, tmpdir: str, sink_latency: float = 0.0):
+    log_file = os.path.join(tmpdir, f"supremehead-{mode}.log")
+    devnull = open(os.devnull, "w")
+    saved_stderr, sys.stderr = sys.stderr, SlowStream(devnull, sink_latency)
+    root = logging.getLogger()
+    handlers: List[logging.Handler] = []
+    try:
+        if mode == "blocking":
+            handlers = [logging.FileHandler(log_file), logging.StreamHandler()]
+            for handler in handlers:
+                handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+                root.addHandler(handler)
+            root.setLevel(logging.INFO)
+        else:
+            rates = {"ingest": 0.01, "decision": 0.01} if mode == "sampled" else {}
+            configure_logging({"log_file": log_file, "log_sample_rates": rates})
+        yield
+    finally:
+        shutdown_logging()
+        for handler in handlers:
+            root.removeHandler(handler)
+            handler.close()
+        sys.stderr = saved_stderr
+        devnull.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=128)
+    parser.add_argument("--logging", default="",
+                        help="comma-separated log modes to compare: blocking,queue,sampled")
+    parser.add_argument("--sink-latency-ms", type=float, default=0.0)
+    parser.add_argument("--no-stubs", action="store_true", help="use already-running stubs")
+    args = parser.parse_args()
+    modes = [m for m in args.logging.split(",") if m]
+
+    if not modes:
+        logging.getLogger("supremehead").setLevel(logging.WARNING)
+    tmpdir = make_tmpdir()
+    cfg = write_config(tmpdir)
+    wb_cfg = write_config(make_tmpdir(), memory_core_write_behind=True,
+                          memory_core_spill_path=f"{tmpdir}/spill.jsonl")
+
+    with run_stubs(start=not args.no_stubs):
+        print(f"{'path':<10} {'requests':>8} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+        if not modes:
+            for name, fn, path in (("executor", bench_executor, cfg),
+                                   ("async", bench_async, cfg),
+                                   ("async-wb", bench_async, wb_cfg)):
+                head = SupremeHead(config_path=path)
+                elapsed, latencies = asyncio.run(fn(head, args.requests, args.concurrency))
+                report(name, elapsed, latencies)
+            return
+        light_cfg = write_config(make_tmpdir(), analysis_cache_enabled=True,
+                                 memory_core_write_behind=True,
+                                 memory_core_spill_path=f"{tmpdir}/spill-light.jsonl")
+        for mode in modes:
+            print(f"-- logging: {mode}")
+            for name, fn in (("executor", bench_executor), ("async", bench_async)):
+                with log_mode(mode, tmpdir, args.sink_latency_ms / 1000.0):
+                    head = SupremeHead(config_path=light_cfg)
+                    elapsed, latencies = asyncio.run(fn(head, args.requests, args.concurrency, 16))
+                report(name, elapsed, latencies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+bench_ledger_codecs.py
+----------------------
+Bytes per event and encode/decode throughput of every ledger codec, with and
+without per-block compression.  Events mirror what SupremeHead records: a
+160-character snippet on receipt and a full result payload on store/mint.
+
+Usage:
+    python benchmarks/bench_ledger_codecs.py --events 20000 --block 256
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import _stubs  # noqa: F401  (puts the orchestrator on sys.path)
+
+from ledger_codecs import CODECS, COMPRESSORS, compress, decompress
+
+SNIPPET = ("The flame remembers the pattern of the market's quiet laughter. " * 3)[:160]
+
+
+def make_events(n: int) -> list:
+    events = []
+    for i in range(n):
+        kind = i % 3
+        if kind == 0:
+            payload = {"source": f"feed-{i % 7}", "snippet": SNIPPET}
+            etype = "scroll_received_async"
+        elif kind == 1:
+            payload = {"source": f"feed-{i % 7}", "score": 40 + i % 60}
+            etype = "scroll_analyzed_async"
+        else:
+            payload = {"source": f"feed-{i % 7}", "score": 40 + i % 60,
+                       "result": {"status": "ok", "received": True}}
+            etype = "scroll_stored_async"
+        events.append({"event_type": etype, "timestamp": f"2026-01-01T00:00:{i % 60:02d}.{i:06d}Z",
+                       "payload": payload})
+    return events
+
+
+def bench(events: list, codec, compression: str, block: int):
+    start = time.perf_counter()
+    blocks = []
+    for i in range(0, len(events), block):
+        blocks.append(compress(b"".join(codec.encode(e) for e in events[i:i + block]), compression))
+    encode_s = time.perf_counter() - start
+    size = sum(len(b) for b in blocks)
+
+    start = time.perf_counter()
+    n = 0
+    for data in blocks:
+        for _ in codec.decode_stream(decompress(data, compression)):
+            n += 1
+    decode_s = time.perf_counter() - start
+    assert n == len(events)
+    return size / len(events), len(events) / encode_s, len(events) / decode_s
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--block", type=int, default=256, help="events per index block")
+    args = parser.parse_args()
+    events = make_events(args.events)
+
+    print(f"{'codec':<9} {'compression':<12} {'bytes/event':>12} {'encode ev/s':>13} {'decode ev/s':>13}")
+    for name, codec in CODECS.items():
+        for compression in COMPRESSORS:
+            per_event, enc, dec = bench(events, codec, compression, args.block)
+            print(f"{name:<9} {compression:<12} {per_event:>12.1f} {enc:>13.0f} {dec:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
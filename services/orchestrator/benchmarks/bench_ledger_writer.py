@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+bench_ledger_writer.py
+----------------------
+Ledger throughput: one open/write/close per event (the old per-scroll flush)
+versus the group-committing LedgerWriter, with several producer threads.
+
+Usage:
+    python benchmarks/bench_ledger_writer.py --events 100000 --threads 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import threading
+import time
+
+from _stubs import make_tmpdir
+
+from ledger import LedgerWriter
+
+EVENT = {
+    "event_type": "scroll_received",
+    "timestamp": "2026-01-01T00:00:00Z",
+    "payload": {"source": "bench", "snippet": "The flame remembers the pattern " * 5},
+}
+
+
+def run_threads(threads: int, per_thread: int, fn) -> float:
+    workers = [threading.Thread(target=lambda: [fn() for _ in range(per_thread)]) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - start
+
+
+def bench_open_close(path: str, threads: int, per_thread: int) -> float:
+    lock = threading.Lock()
+
+    def write():
+        with lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(EVENT, ensure_ascii=False) + "\n")
+
+    return run_threads(threads, per_thread, write)
+
+
+def bench_writer(path: str, threads: int, per_thread: int, fsync: str) -> tuple:
+    writer = LedgerWriter(path, max_batch=256, max_delay=0.005, fsync=fsync)
+    start = time.perf_counter()
+    run_threads(threads, per_thread, lambda: writer.append(EVENT))
+    writer.close()  # the final commit counts towards the elapsed time
+    return time.perf_counter() - start, writer.stats()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+    per_thread = args.events // args.threads
+    total = per_thread * args.threads
+    tmpdir = make_tmpdir()
+
+    print(f"{'mode':<22} {'events/s':>12} {'commits':>8} {'mean flush ms':>14}")
+    elapsed = bench_open_close(os.path.join(tmpdir, "open_close.log"), args.threads, per_thread)
+    print(f"{'open/close per event':<22} {total / elapsed:>12.0f} {total:>8} {'-':>14}")
+    for fsync in ("never", "interval", "batch"):
+        elapsed, stats = bench_writer(os.path.join(tmpdir, f"writer_{fsync}.log"), args.threads, per_thread, fsync)
+        print(f"{'writer fsync=' + fsync:<22} {total / elapsed:>12.0f} {stats['commits']:>8} "
+              f"{stats['mean_flush_latency_ms']:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
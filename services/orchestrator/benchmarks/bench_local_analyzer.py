@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+bench_local_analyzer.py
+-----------------------
+Single-core throughput of the in-process LocalAnalyzer: ``score`` (routing
+decision only) and ``analyze`` (full Mind Nexus-shaped dict), for the
+built-in vocabulary and a large synthetic one (a quarter two-word phrases)
+drawn from the same words as the scrolls, over scrolls of a few sizes.
+
+Usage:
+    python benchmarks/bench_local_analyzer.py --scrolls 20000 --vocab 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import _stubs  # noqa: F401  (puts the orchestrator on sys.path)
+
+from local_analyzer import DEFAULT_TERMS, LocalAnalyzer
+
+COMMON = ("the flame remembers pattern market quiet laughter river stone ledger oracle "
+          "signal bright hollow ember north tide ancient rare spam draft").split()
+# scrolls draw from a few thousand distinct words, like real text
+WORDS = COMMON * 40 + [f"w{i}" for i in range(3000)]
+
+
+def make_scrolls(n: int, chars: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    scrolls = []
+    for _ in range(n):
+        words, size = [], 0
+        while size < chars:
+            w = rng.choice(WORDS)
+            words.append(w)
+            size += len(w) + 1
+        scrolls.append(" ".join(words))
+    return scrolls
+
+
+def synthetic_terms(n: int, seed: int = 11) -> dict:
+    rng = random.Random(seed)
+    terms = dict(DEFAULT_TERMS)
+    for i in range(n):
+        term = rng.choice(WORDS) if i % 4 else f"{rng.choice(WORDS)} {rng.choice(WORDS)}"
+        terms[term] = rng.randint(-20, 20)
+    return terms
+
+
+def rate(fn, scrolls: list) -> float:
+    start = time.perf_counter()
+    for raw in scrolls:
+        fn(raw)
+    return len(scrolls) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--scrolls", type=int, default=20000)
+    parser.add_argument("--vocab", type=int, default=5000, help="terms in the synthetic vocabulary")
+    args = parser.parse_args()
+
+    analyzers = {"built-in": LocalAnalyzer(), f"{args.vocab} terms": LocalAnalyzer(synthetic_terms(args.vocab))}
+    print(f"{'vocabulary':<14} {'chars':>6} {'score/s':>10} {'analyze/s':>10}")
+    for chars in (160, 1000, 4000):
+        scrolls = make_scrolls(args.scrolls, chars)
+        for name, analyzer in analyzers.items():
+            analyzer.score_many(scrolls[:500])  # warm up
+            print(f"{name:<14} {chars:>6} {rate(analyzer.score, scrolls):>10,.0f} "
+                  f"{rate(analyzer.analyze, scrolls):>10,.0f}")
+
+
+if __name__ == "__main__":
+    main()
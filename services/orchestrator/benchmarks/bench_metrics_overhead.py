@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+bench_metrics_overhead.py
+-------------------------
+Cost of the metrics hot path (counter increment, histogram observe, stage
+timer) and of rendering ``/metrics`` for a SupremeHead that has ingested
+traffic.  Per-scroll instrumentation is roughly five timers, two counters and
+two gauge updates, so the last column estimates what metrics add to each
+ingest.
+
+Usage:
+    python benchmarks/bench_metrics_overhead.py --ops 500000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+
+from _stubs import make_tmpdir, write_config
+
+from metrics import MetricsRegistry
+from supremehead import SupremeHead
+
+
+def ns_per_op(fn, ops: int) -> float:
+    start = time.perf_counter()
+    for _ in range(ops):
+        fn()
+    return (time.perf_counter() - start) / ops * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--scrolls", type=int, default=2000)
+    args = parser.parse_args()
+
+    reg = MetricsRegistry()
+    counter = reg.counter("c_total", "c", ["path"])
+    gauge = reg.gauge("g", "g", ["path"])
+    hist = reg.histogram("h_seconds", "h", ["stage"])
+
+    def timed():
+        with hist.time("analyze"):
+            pass
+
+    baseline = ns_per_op(lambda: None, args.ops)
+    rows = [
+        ("counter.inc", ns_per_op(lambda: counter.inc("async"), args.ops) - baseline),
+        ("gauge.inc", ns_per_op(lambda: gauge.inc("async"), args.ops) - baseline),
+        ("histogram.observe", ns_per_op(lambda: hist.observe(0.0042, "analyze"), args.ops) - baseline),
+        ("histogram.time", ns_per_op(timed, args.ops) - baseline),
+    ]
+    print(f"{'operation':<20} {'ns/op':>8}")
+    for name, ns in rows:
+        print(f"{name:<20} {ns:>8.0f}")
+    per_scroll = 5 * rows[3][1] + 2 * rows[0][1] + 2 * rows[1][1]
+    print(f"{'~per scroll':<20} {per_scroll:>8.0f}")
+
+    # render cost with populated series (no live services: fallback paths)
+    logging.getLogger("supremehead").setLevel(logging.CRITICAL)
+    head = SupremeHead(config_path=write_config(make_tmpdir(), retries=1))
+
+    async def ingest():
+        for i in range(args.scrolls):
+            await head.ingest_scroll_async(f"scroll {i}", "bench")
+        await head.cleanup()
+
+    asyncio.run(ingest())
+    start = time.perf_counter()
+    for _ in range(100):
+        text = head.metrics.render()
+    elapsed = (time.perf_counter() - start) / 100
+    print(f"\n/metrics render: {elapsed * 1000:.3f} ms, {len(text.splitlines())} lines")
+
+
+if __name__ == "__main__":
+    main()
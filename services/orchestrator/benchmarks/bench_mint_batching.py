@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+bench_mint_batching.py
+----------------------
+Compare ``SwarmEngine.trigger_nft_mint_async`` with and without mint batching
+against the local mint service stand-in (``/mint`` vs ``/mint_batch``).  The
+stand-in charges one fee and ``--tx-latency-ms`` per call, plus
+``--item-latency-ms`` per scroll, so the table shows both throughput and the
+number of paid transactions.
+
+Usage:
+    pip install -r requirements.txt flask
+    python benchmarks/bench_mint_batching.py --mints 1000 --window-ms 20 --max-size 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import urllib.request
+
+from _stubs import percentile, run_mint_stub
+
+from supremehead import HTTPClient, SwarmEngine
+
+
+async def run(engine: SwarmEngine, total: int, concurrency: int):
+    sem = asyncio.Semaphore(concurrency)
+    latencies = []
+    events = []
+
+    async def on_batch(event_type, payload):
+        events.append(event_type)
+
+    engine.on_batch = on_batch
+
+    async def one(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            await engine.trigger_nft_mint_async(f"legendary scroll {i}", {"value_score": 90, "patterns": []})
+            latencies.append(time.perf_counter() - t0)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return time.perf_counter() - start, latencies, events
+    finally:
+        await HTTPClient.close_session()
+
+
+def stub_stats(mint_url: str) -> dict:
+    with urllib.request.urlopen(mint_url.rsplit("/", 1)[0] + "/stats", timeout=5) as resp:
+        return json.loads(resp.read())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--mints", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--window-ms", type=float, default=20.0)
+    parser.add_argument("--max-size", type=int, default=32)
+    parser.add_argument("--tx-latency-ms", type=float, default=50.0)
+    parser.add_argument("--item-latency-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    logging.getLogger("supremehead").setLevel(logging.WARNING)
+
+    with run_mint_stub(args.tx_latency_ms, args.item_latency_ms) as mint_url:
+        config = {"mint_service_url": mint_url}
+        print(f"{'mode':<10} {'mints':>6} {'mints/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'txns':>6} {'ledger events':>14}")
+        for name, engine in (
+            ("single", SwarmEngine(config, enabled=True)),
+            ("batched", SwarmEngine(config, enabled=True, batch_window_ms=args.window_ms,
+                                    batch_max_size=args.max_size)),
+        ):
+            before = stub_stats(mint_url)["transactions"]
+            elapsed, latencies, events = asyncio.run(run(engine, args.mints, args.concurrency))
+            txns = stub_stats(mint_url)["transactions"] - before
+            print(f"{name:<10} {len(latencies):>6} {len(latencies) / elapsed:>9.1f} "
+                  f"{percentile(latencies, 50) * 1000:>9.1f} {percentile(latencies, 99) * 1000:>9.1f} "
+                  f"{txns:>6} {len(events):>14}")
+            if engine.batch_stats():
+                print(f"  batch sizes: {engine.batch_stats()}")
+
+
+if __name__ == "__main__":
+    main()
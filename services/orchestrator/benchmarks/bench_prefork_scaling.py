@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+bench_prefork_scaling.py
+------------------------
+Throughput of ``server.py`` as the number of prefork workers grows.
+
+For each worker count the server is started as a subprocess
+(``server.py --workers N``; N=1 is the plain single-process server) and
+driven over HTTP with ``POST /ingest`` from ``--clients`` load-generator
+processes.  The config is downstream-light - analysis cache over a few
+distinct scrolls plus Memory Core write-behind - so the orchestrator's own
+CPU work, not the Flask stubs, is what the workers split between them.
+
+Scaling is bounded by the cores available: the load generators, the stubs
+and the workers all share them, so on a machine with C cores expect gains to
+flatten before N reaches C.
+
+Usage:
+    pip install -r requirements.txt flask
+    python benchmarks/bench_prefork_scaling.py --workers 1,2,4 --requests 4000
+
+The stubs are started automatically on ports 3000/3001; pass ``--no-stubs``
+if they are already running.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+from typing import List, Tuple
+
+from _stubs import make_tmpdir, percentile, run_server, run_stubs, write_config
+
+SCROLL = "The flame remembers the pattern of the market's quiet laughter."
+
+
+def _client(url: str, total: int, concurrency: int, distinct: int, offset: int) -> Tuple[float, List[float]]:
+    import aiohttp
+
+    async def run():
+        sem = asyncio.Semaphore(concurrency)
+        latencies: List[float] = []
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            async def one(i: int) -> None:
+                async with sem:
+                    t0 = time.perf_counter()
+                    async with session.post(url + "/ingest", json={
+                            "raw": f"{SCROLL} #{i % distinct}", "source": "bench"}) as resp:
+                        await resp.read()
+                        resp.raise_for_status()
+                    latencies.append(time.perf_counter() - t0)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(one(offset + i) for i in range(total)))
+            return time.perf_counter() - start, latencies
+
+    return asyncio.run(run())
+
+
+def bench(workers: int, config_path: str, total: int, concurrency: int, clients: int,
+          distinct: int) -> Tuple[float, List[float]]:
+    with run_server(config_path, workers) as proc:
+        url = proc.url
+        # warm every worker's analysis cache and connection pools
+        _client(url, distinct * workers * 4, concurrency, distinct, 0)
+        per_client = total // clients
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(clients) as pool:
+            start = time.perf_counter()
+            results = pool.starmap(_client, [(url, per_client, max(1, concurrency // clients), distinct, c)
+                                             for c in range(clients)])
+            elapsed = time.perf_counter() - start
+    latencies = [lat for _, lats in results for lat in lats]
+    return elapsed, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--clients", type=int, default=2, help="load-generator processes")
+    parser.add_argument("--distinct", type=int, default=16, help="distinct scroll texts")
+    parser.add_argument("--no-stubs", action="store_true")
+    args = parser.parse_args()
+
+    tmpdir = make_tmpdir()
+    config_path = write_config(
+        tmpdir,
+        analysis_cache_enabled=True,
+        memory_core_write_behind=True,
+        memory_core_spill_path=None,
+        log_file=None,
+        log_sample_rates={"ingest": 0.0, "decision": 0.0},
+    )
+
+    print(f"cores={os.cpu_count()} requests={args.requests} concurrency={args.concurrency} "
+          f"clients={args.clients}")
+    print(f"{'workers':>7} {'req/s':>9} {'speedup':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    baseline = None
+    with run_stubs(not args.no_stubs):
+        for workers in (int(w) for w in args.workers.split(",")):
+            elapsed, latencies = bench(workers, config_path, args.requests, args.concurrency,
+                                       args.clients, args.distinct)
+            rps = len(latencies) / elapsed
+            baseline = baseline or rps
+            print(f"{workers:>7} {rps:>9.0f} {rps / baseline:>7.2f}x "
+                  f"{percentile(latencies, 50) * 1000:>8.2f} {percentile(latencies, 99) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
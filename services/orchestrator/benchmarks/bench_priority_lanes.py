@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+bench_priority_lanes.py
+-----------------------
+Latency of high-value scrolls under bulk load, with and without the lane
+scheduler.
+
+A flood of ``--bulk`` low-value scrolls (source "bulk", stored in Memory Core)
+is ingested at ``--concurrency`` while ``--priority`` high-value scrolls
+(source "oracle", scoring over ``nft_threshold`` so they mint) arrive spread
+across the run.  Without the scheduler every call goes straight to the stubs
+and the oracle scrolls queue behind the bulk ones there; with it, at most
+``scheduler_max_concurrency`` calls are downstream at once and the oracle
+scrolls are dispatched from the "high" and "mint" lanes ahead of the backlog.
+
+Usage:
+    pip install -r requirements.txt flask
+    python benchmarks/bench_priority_lanes.py --bulk 2000 --concurrency 256
+
+The stubs are started automatically on ports 3000/3001; pass ``--no-stubs``
+if they are already running.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import List, Tuple
+
+from _stubs import make_tmpdir, percentile, run_stubs, write_config
+
+from supremehead import SupremeHead
+
+# mind_nexus_stub scores 50 + len(text) % 50: pad to land below / above 85
+BULK = "routine ledger chatter".ljust(60, ".")      # 60 % 50 = 10 -> 60
+ORACLE = "the oracle speaks of fire".ljust(89, ".")  # 89 % 50 = 39 -> 89
+
+
+async def run(head: SupremeHead, bulk: int, priority: int, concurrency: int
+              ) -> Tuple[float, List[float], List[float]]:
+    sem = asyncio.Semaphore(concurrency)
+    bulk_lat: List[float] = []
+    oracle_lat: List[float] = []
+
+    async def one_bulk(i: int) -> None:
+        async with sem:
+            t0 = time.perf_counter()
+            await head.ingest_scroll_async(f"{BULK}{i:06d}"[-60:], "bulk")
+            bulk_lat.append(time.perf_counter() - t0)
+
+    async def one_oracle(i: int, delay: float) -> None:
+        await asyncio.sleep(delay)
+        t0 = time.perf_counter()
+        result = await head.ingest_scroll_async(f"{ORACLE}{i:06d}"[-89:], "oracle", priority="high")
+        assert result["action"] == "NFT Mint Triggered", result["action"]
+        oracle_lat.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    bulk_task = asyncio.gather(*(one_bulk(i) for i in range(bulk)))
+    # spread the oracle scrolls over the first part of the bulk run
+    await asyncio.sleep(0.2)
+    await asyncio.gather(*(one_oracle(i, i * 0.02) for i in range(priority)))
+    await bulk_task
+    elapsed = time.perf_counter() - start
+    await head.cleanup()
+    return elapsed, bulk_lat, oracle_lat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--bulk", type=int, default=2000)
+    parser.add_argument("--priority", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=256)
+    parser.add_argument("--max-concurrency", type=int, default=16,
+                        help="scheduler_max_concurrency for the scheduled run")
+    parser.add_argument("--no-stubs", action="store_true")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    tmpdir = make_tmpdir()
+    print(f"{'mode':<10} {'bulk/s':>8} {'bulk p50':>9} {'oracle p50':>11} {'oracle p99':>11}  (ms)")
+    with run_stubs(not args.no_stubs):
+        for mode in ("fifo", "lanes"):
+            config = write_config(
+                tmpdir, nft_threshold=85,
+                scheduler_enabled=mode == "lanes",
+                scheduler_max_concurrency=args.max_concurrency,
+            )
+            head = SupremeHead(config_path=config)
+            elapsed, bulk_lat, oracle_lat = asyncio.run(
+                run(head, args.bulk, args.priority, args.concurrency))
+            print(f"{mode:<10} {len(bulk_lat) / elapsed:>8.0f} {percentile(bulk_lat, 50) * 1000:>9.1f} "
+                  f"{percentile(oracle_lat, 50) * 1000:>11.1f} {percentile(oracle_lat, 99) * 1000:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
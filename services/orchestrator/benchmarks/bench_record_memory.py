@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+bench_record_memory.py
+----------------------
+Memory held by a buffer of ledger events (the ``LedgerWriter`` backlog during
+a batch or backfill) as the old dicts vs ``records.LedgerEvent``, measured
+with ``tracemalloc``.  Events are built the way ``SupremeHead`` builds them:
+fresh timestamp and payload per event, cycling through the received /
+analyzed / stored payload shapes.  "envelope" is the event object itself
+(the dict or the slotted record) without its payload and timestamp, which
+is where the saving comes from.  Also shows the cost of building an event,
+reading a field and encoding it with the current JSON backend.
+
+Usage:
+    python benchmarks/bench_record_memory.py --events 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+
+import _stubs  # noqa: F401  (puts the orchestrator on sys.path)
+
+import codec
+from records import IngestResult, LedgerEvent, Scroll
+
+RAW = ("The flame remembers the pattern of the market's quiet laughter. " * 4)[:240]
+
+
+def payload(i: int) -> dict:
+    kind = i % 3
+    if kind == 0:
+        return {"source": "feed-3", "snippet": RAW[:160]}
+    if kind == 1:
+        return {"source": "feed-3", "score": 40 + i % 60}
+    return {"source": "feed-3", "score": 40 + i % 60, "result": {"status": "ok"}}
+
+
+def timestamp(i: int) -> str:
+    return f"2026-01-01T00:{i // 60_000_000 % 60:02d}:{i // 1_000_000 % 60:02d}.{i % 1_000_000:06d}Z"
+
+
+def as_dict(i: int) -> dict:
+    return {"event_type": "scroll_stored_async", "timestamp": timestamp(i), "payload": payload(i)}
+
+
+def as_record(i: int) -> LedgerEvent:
+    return LedgerEvent("scroll_stored_async", timestamp(i), payload(i))
+
+
+def measure(make, n: int):
+    """(bytes per event, build seconds, buffer)."""
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    buffer = [make(i) for i in range(n)]
+    built = time.perf_counter() - start
+    total = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    return total / n, built, buffer
+
+
+def per_event_ns(fn, buffer, limit: int = 200_000) -> float:
+    sample = buffer[:limit]
+    start = time.perf_counter()
+    for e in sample:
+        fn(e)
+    return (time.perf_counter() - start) / len(sample) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    args = parser.parse_args()
+    n = args.events
+
+    print(f"{n} buffered ledger events, JSON backend {codec.BACKEND}")
+    print(f"{'type':<12} {'bytes/event':>12} {'envelope':>9} {'total MB':>9} {'build s':>8} "
+          f"{'read ns':>8} {'encode ns':>10}")
+    rows = {}
+    for name, make in (("dict", as_dict), ("LedgerEvent", as_record)):
+        per_event, built, buffer = measure(make, n)
+        read = per_event_ns(lambda e: e["payload"], buffer) if name == "dict" else \
+            per_event_ns(lambda e: e.payload, buffer)
+        encode = per_event_ns(codec.dumps, buffer, 100_000)
+        rows[name] = per_event
+        print(f"{name:<12} {per_event:>12.0f} {sys.getsizeof(buffer[0]):>9} {per_event * n / 2**20:>9.1f} "
+              f"{built:>8.2f} {read:>8.1f} {encode:>10.0f}")
+        del buffer
+    print(f"saved: {rows['dict'] - rows['LedgerEvent']:.0f} bytes/event "
+          f"({(rows['dict'] - rows['LedgerEvent']) * n / 2**20:.1f} MB for {n} events)")
+
+    scroll = Scroll(RAW, "feed-3", timestamp(0))
+    result = IngestResult("Processed", "Stored in Memory Core", 72, "feed-3", {})
+    print(f"record sizes (bytes, excluding values): Scroll {sys.getsizeof(scroll)} vs dict "
+          f"{sys.getsizeof(scroll.to_dict())}; IngestResult {sys.getsizeof(result)} vs dict "
+          f"{sys.getsizeof(result.to_dict())}")
+
+
+if __name__ == "__main__":
+    main()
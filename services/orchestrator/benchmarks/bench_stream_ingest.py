@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+bench_stream_ingest.py
+----------------------
+One chunked ``POST /ingest/stream`` versus one ``POST /ingest`` per scroll,
+and the server's peak memory as the streamed feed grows.
+
+For each feed size a fresh server.py is started, the feed is sent as a
+generated NDJSON body (never materialised on the client either) and the
+results are read back line by line.  ``VmHWM`` of the server process is its
+peak RSS; with bounded in-flight work it should stay flat as the feed grows.
+The config is downstream-light (analysis cache + Memory Core write-behind) so
+per-request HTTP overhead, not the Flask stubs, dominates.
+
+Usage:
+    pip install -r requirements.txt flask
+    python benchmarks/bench_stream_ingest.py --sizes 10000,50000 --requests 5000
+
+The stubs are started automatically on ports 3000/3001; pass ``--no-stubs``
+if they are already running.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+
+import aiohttp
+
+from _stubs import make_tmpdir, run_server, run_stubs, write_config
+
+SCROLL = "The flame remembers the pattern of the market's quiet laughter."
+
+
+def peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+async def per_request(url: str, total: int, concurrency: int, distinct: int) -> float:
+    sem = asyncio.Semaphore(concurrency)
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        async def one(i: int) -> None:
+            async with sem:
+                async with session.post(url + "/ingest", json={"raw": f"{SCROLL} #{i % distinct}"}) as resp:
+                    await resp.read()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return time.perf_counter() - start
+
+
+async def streamed(url: str, total: int, distinct: int) -> float:
+    async def body():
+        batch = []
+        for i in range(total):
+            batch.append(json.dumps({"raw": f"{SCROLL} #{i % distinct}", "source": "bench"}) + "\n")
+            if len(batch) == 256:
+                yield "".join(batch).encode("utf-8")
+                batch = []
+        if batch:
+            yield "".join(batch).encode("utf-8")
+
+    timeout = aiohttp.ClientTimeout(total=None)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        start = time.perf_counter()
+        async with session.post(url + "/ingest/stream", data=body()) as resp:
+            lines = 0
+            async for _ in resp.content:
+                lines += 1
+        elapsed = time.perf_counter() - start
+    assert lines == total + 1, f"expected {total} results and a summary, got {lines} lines"
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", default="10000,50000", help="comma-separated streamed feed sizes")
+    parser.add_argument("--requests", type=int, default=5000, help="scrolls sent as individual /ingest calls")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--distinct", type=int, default=16)
+    parser.add_argument("--no-stubs", action="store_true")
+    args = parser.parse_args()
+
+    tmpdir = make_tmpdir()
+    config_path = write_config(
+        tmpdir,
+        analysis_cache_enabled=True,
+        memory_core_write_behind=True,
+        memory_core_spill_path=None,
+        log_file=None,
+        log_sample_rates={"ingest": 0.0, "decision": 0.0},
+        stream_concurrency=args.concurrency,
+    )
+
+    print(f"{'mode':<12} {'scrolls':>8} {'scrolls/s':>10} {'peak RSS MB':>12}")
+    with run_stubs(not args.no_stubs):
+        with run_server(config_path) as proc:
+            elapsed = asyncio.run(per_request(proc.url, args.requests, args.concurrency, args.distinct))
+            print(f"{'per-request':<12} {args.requests:>8} {args.requests / elapsed:>10.0f} "
+                  f"{peak_rss_mb(proc.pid):>12.1f}")
+        for size in (int(s) for s in args.sizes.split(",")):
+            with run_server(config_path) as proc:
+                elapsed = asyncio.run(streamed(proc.url, size, args.distinct))
+                print(f"{'stream':<12} {size:>8} {size / elapsed:>10.0f} {peak_rss_mb(proc.pid):>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+bench_sync_http.py
+------------------
+Per-call latency of the synchronous HTTP path against the local Mind Nexus
+stub: one-shot ``requests.post`` / ``urllib.request.urlopen`` (a new TCP
+connection per call) versus the pooled ``HTTPClient.sync_post`` transports.
+
+The Flask stubs run on werkzeug's dev server, which answers every request
+with ``Connection: close`` - no client can keep a connection alive against
+it.  By default the benchmark therefore serves the same ``_score`` handler
+from a threaded HTTP/1.1 ``http.server`` that honours keep-alive; pass
+``--server flask`` to measure against the Flask stub instead.
+
+Usage:
+    pip install -r requirements.txt flask
+    python benchmarks/bench_sync_http.py --requests 2000 --threads 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from _stubs import MIND_NEXUS_PORT, percentile, run_stubs
+
+from mind_nexus_stub import _score
+from supremehead import HTTPClient, requests
+
+PAYLOAD = {"raw": "scroll of the quiet market", "meta": {"source": "bench"}}
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body are written separately
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        out = json.dumps(_score(json.loads(body or b"{}"))).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def run_keepalive_stub():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    try:
+        yield f"http://127.0.0.1:{srv.server_address[1]}/analyze"
+    finally:
+        srv.shutdown()
+        srv.server_close()
+
+
+def unpooled_requests(url, payload):
+    r = requests.post(url, json=payload, timeout=10)
+    r.raise_for_status()
+    return r.json()
+
+
+def unpooled_urllib(url, payload):
+    req = urllib.request.Request(url, data=json.dumps(payload).encode("utf-8"),
+                                 headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=10) as resp:
+        return json.loads(resp.read())
+
+
+def run(post, url: str, total: int, threads: int):
+    latencies = []
+    lock = threading.Lock()
+    per_thread = total // threads
+
+    def worker():
+        local = []
+        for _ in range(per_thread):
+            t0 = time.perf_counter()
+            post(url, PAYLOAD)
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - start, latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--pool-maxsize", type=int, default=32)
+    parser.add_argument("--server", choices=("keepalive", "flask"), default="keepalive")
+    parser.add_argument("--no-stubs", action="store_true", help="use already-running Flask stubs")
+    args = parser.parse_args()
+
+    modes = [("urllib", unpooled_urllib, None), ("pool-stdlib", HTTPClient.sync_post, "stdlib")]
+    if requests is not None:
+        modes[1:1] = [("requests", unpooled_requests, None)]
+        modes.append(("session", HTTPClient.sync_post, "requests"))
+
+    if args.server == "flask":
+        server = run_stubs(start=not args.no_stubs)
+    else:
+        server = run_keepalive_stub()
+    with server as url:
+        url = url or f"http://127.0.0.1:{MIND_NEXUS_PORT}/analyze"
+        print(f"{'mode':<12} {'calls':>7} {'calls/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+        for name, post, transport in modes:
+            if transport:
+                HTTPClient.configure_sync(transport=transport, pool_maxsize=args.pool_maxsize)
+            post(url, PAYLOAD)  # warm up (and open the pooled connection)
+            elapsed, latencies = run(post, url, args.requests, args.threads)
+            print(f"{name:<12} {len(latencies):>7} {len(latencies) / elapsed:>10.1f} "
+                  f"{percentile(latencies, 50) * 1000:>9.3f} {percentile(latencies, 99) * 1000:>9.3f}")
+        HTTPClient.close_sync()
+
+
+if __name__ == "__main__":
+    main()
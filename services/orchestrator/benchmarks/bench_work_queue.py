@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+bench_work_queue.py
+-------------------
+Client-side ``POST /ingest`` latency with and without the durable work queue.
+
+Without the queue a request returns after Mind Nexus and Memory Core have
+answered; with ``work_queue_enabled`` it returns (202) once the scroll is
+committed to SQLite, and the queue workers do the downstream calls
+afterwards.  For the queued run the time until the queue has drained is
+reported as well, so throughput is not traded away unnoticed.
+
+Usage:
+    pip install -r requirements.txt flask
+    python benchmarks/bench_work_queue.py --requests 2000 --concurrency 64
+
+The stubs are started automatically on ports 3000/3001; pass ``--no-stubs``
+if they are already running.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import time
+import urllib.request
+from typing import List, Tuple
+
+import aiohttp
+
+from _stubs import make_tmpdir, percentile, run_server, run_stubs, write_config
+
+SCROLL = "The flame remembers the pattern of the market's quiet laughter."
+
+
+async def drive(url: str, total: int, concurrency: int) -> Tuple[float, List[float]]:
+    sem = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as session:
+        async def one(i: int) -> None:
+            async with sem:
+                t0 = time.perf_counter()
+                async with session.post(url + "/ingest", json={"raw": f"{SCROLL} #{i}", "source": "bench"}) as resp:
+                    await resp.read()
+                    resp.raise_for_status()
+                latencies.append(time.perf_counter() - t0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        return time.perf_counter() - start, latencies
+
+
+def queue_drained(url: str) -> bool:
+    with urllib.request.urlopen(url + "/metrics", timeout=5) as resp:
+        text = resp.read().decode("utf-8")
+    pending = 0.0
+    for line in text.splitlines():
+        if line.startswith("orchestrator_work_queue_jobs{") and 'state="dead"' not in line:
+            pending += float(line.rsplit(" ", 1)[1])
+    return pending == 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=64, help="work_queue_workers")
+    parser.add_argument("--no-stubs", action="store_true")
+    args = parser.parse_args()
+
+    tmpdir = make_tmpdir()
+    print(f"{'mode':<8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'drained s':>10}")
+    with run_stubs(not args.no_stubs):
+        for mode in ("direct", "queued"):
+            config_path = write_config(
+                tmpdir,
+                log_file=None,
+                log_sample_rates={"ingest": 0.0, "decision": 0.0},
+                work_queue_enabled=mode == "queued",
+                work_queue_path=os.path.join(tmpdir, f"queue_{time.time_ns()}.sqlite3"),
+                work_queue_workers=args.workers,
+            )
+            with run_server(config_path) as proc:
+                elapsed, latencies = asyncio.run(drive(proc.url, args.requests, args.concurrency))
+                drained = ""
+                if mode == "queued":
+                    start = time.perf_counter() - elapsed
+                    while not queue_drained(proc.url):
+                        time.sleep(0.05)
+                    drained = f"{time.perf_counter() - start:.2f}"
+            print(f"{mode:<8} {len(latencies) / elapsed:>8.0f} {percentile(latencies, 50) * 1000:>8.2f} "
+                  f"{percentile(latencies, 99) * 1000:>8.2f} {drained:>10}")
+
+
+if __name__ == "__main__":
+    main()
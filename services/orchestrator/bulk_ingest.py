@@ -0,0 +1,335 @@
+"""
+orchestrator/bulk_ingest.py
+
+Offline bulk ingestion for backfills: stream scrolls from files or stdin
+through ``SupremeHead.ingest_stream`` with bounded parallelism, checkpointing
+progress so an interrupted run resumes where it stopped.
+
+Input formats (``--format auto`` picks by extension, directory or stdin):
+
+  jsonl  one scroll per line: {"raw", "source"[, "priority"]} or a bare string
+  csv    header row; text in ``--raw-column``, optional ``--source-column``
+  dir    every regular file under the directory (sorted) is one scroll,
+         its source the relative path
+
+Inputs are read lazily, one record ahead of the ingest window, so memory does
+not grow with input size.
+
+Checkpoint (``--checkpoint``, JSON, rewritten atomically): the input being
+read, the byte offset (file index for directories) just past the last record
+whose ingest *and* ledger commit completed, and running totals.  Results
+arrive in input order, so everything before that offset is done; a crash
+replays at most the records that were in flight (at-least-once).  stdin
+cannot seek, so resuming from stdin skips the recorded number of records.
+
+Usage:
+    python bulk_ingest.py scrolls.jsonl --checkpoint backfill.ckpt
+    python bulk_ingest.py export.csv --raw-column body --source-column channel
+    python bulk_ingest.py notes/ --concurrency 128 --results results.jsonl
+    cat feed.jsonl | python bulk_ingest.py - --format jsonl
+
+SIGINT/SIGTERM stop reading input, finish the scrolls in flight, write the
+checkpoint and exit with status 130.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import csv
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+import codec
+from logging_setup import configure_logging
+from supremehead import SupremeHead, now_iso, safe_write_json
+
+logger = logging.getLogger("supremehead.bulk_ingest")
+
+FORMATS = ("auto", "jsonl", "csv", "dir")
+
+# (item, input index, position after the record)
+_Record = Tuple[Dict[str, Any], int, int]
+
+
+def detect_format(path: str) -> str:
+    if path == "-":
+        return "jsonl"
+    if os.path.isdir(path):
+        return "dir"
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def input_size(path: str, fmt: str) -> Optional[int]:
+    """Total work units for ETA: bytes for files, file count for directories."""
+    if path == "-":
+        return None
+    if fmt == "dir":
+        return len(list_dir(path))
+    return os.path.getsize(path)
+
+
+def list_dir(path: str) -> List[str]:
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs.sort()
+        files.extend(os.path.join(root, n) for n in sorted(names))
+    return [f for f in files if os.path.isfile(f)]
+
+
+def _jsonl_item(line: bytes, source: str) -> Optional[Dict[str, Any]]:
+    if not line.strip():
+        return None
+    try:
+        value = json.loads(line)
+    except ValueError:
+        return {"error": "line is not valid JSON"}
+    if isinstance(value, str):
+        value = {"raw": value}
+    raw = value.get("raw") if isinstance(value, dict) else None
+    if not isinstance(raw, str) or not raw.strip():
+        return {"error": "'raw' field is required and must not be empty"}
+    return {"raw": raw.strip(), "source": value.get("source") or source, "priority": value.get("priority")}
+
+
+def iter_jsonl(f, offset: int, source: str) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """Yield ``(item, offset after its line)`` from a binary file positioned at ``offset``."""
+    for line in f:
+        offset += len(line)
+        item = _jsonl_item(line, source)
+        if item is not None:
+            yield item, offset
+
+
+def iter_csv(f, offset: int, source: str, raw_column: str,
+             source_column: Optional[str]) -> Iterator[Tuple[Dict[str, Any], int]]:
+    """CSV rows as items; ``f`` is binary, ``offset`` 0 or a record boundary."""
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    header_line = f.readline()
+    header = next(csv.reader([decoder.decode(header_line)]), [])
+    if offset > len(header_line):
+        f.seek(offset)
+    else:
+        offset = len(header_line)
+    consumed = offset
+
+    def lines() -> Iterator[str]:
+        nonlocal consumed
+        for line in f:
+            consumed += len(line)
+            yield decoder.decode(line)
+
+    for row in csv.DictReader(lines(), fieldnames=header):
+        raw = (row.get(raw_column) or "").strip()
+        if not raw:
+            item = {"error": f"column {raw_column!r} is missing or empty"}
+        else:
+            item = {"raw": raw, "source": (row.get(source_column) if source_column else None) or source}
+        yield item, consumed
+
+
+def iter_dir(path: str, start: int) -> Iterator[Tuple[Dict[str, Any], int]]:
+    for index, file in enumerate(list_dir(path)[start:], start + 1):
+        with open(file, "r", encoding="utf-8", errors="replace") as f:
+            raw = f.read().strip()
+        rel = os.path.relpath(file, path)
+        yield ({"raw": raw, "source": rel} if raw else {"error": f"{rel} is empty"}), index
+
+
+class Checkpoint:
+    """Resume state, written with ``safe_write_json`` (temp file + rename)."""
+
+    def __init__(self, path: Optional[str], inputs: List[str]):
+        self.path = path
+        self.state: Dict[str, Any] = {"inputs": inputs, "input": 0, "position": 0,
+                                      "records": 0, "failed": 0}
+
+    def load(self, restart: bool = False) -> bool:
+        """Adopt a saved checkpoint for the same inputs; ``False`` if starting fresh."""
+        if not self.path or restart or not os.path.exists(self.path):
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            saved = json.load(f)
+        if saved.get("inputs") != self.state["inputs"]:
+            raise SystemExit(f"checkpoint {self.path} is for inputs {saved.get('inputs')}; "
+                             "pass the same inputs or --restart")
+        self.state.update(saved)
+        return True
+
+    def advance(self, input_index: int, position: int, failed: bool):
+        self.state["input"] = input_index
+        self.state["position"] = position
+        self.state["records"] += 1
+        self.state["failed"] += int(failed)
+
+    def save(self, done: bool = False):
+        if self.path:
+            self.state["updated_at"] = now_iso()
+            self.state["done"] = done
+            safe_write_json(self.path, self.state)
+
+
+class Progress:
+    """Periodic throughput / ETA line on stderr."""
+
+    def __init__(self, total: Optional[int], done_units: int, interval: float, stream=sys.stderr):
+        self.total = total
+        self.start_units = done_units
+        self.units = done_units
+        self.records = 0
+        self.failed = 0
+        self.interval = interval
+        self.stream = stream
+        self.started = time.monotonic()
+        self._last = self.started
+
+    def update(self, units: int, failed: bool):
+        self.units = units
+        self.records += 1
+        self.failed += int(failed)
+        now = time.monotonic()
+        if self.interval > 0 and now - self._last >= self.interval:
+            self._last = now
+            self.report()
+
+    def report(self, final: bool = False):
+        elapsed = max(1e-9, time.monotonic() - self.started)
+        line = f"{self.records} scrolls, {self.failed} failed, {self.records / elapsed:.0f}/s"
+        if self.total:
+            rate = (self.units - self.start_units) / elapsed
+            line += f", {min(100.0, 100.0 * self.units / self.total):.1f}%"
+            if rate > 0 and not final:
+                line += f", ETA {_format_duration((self.total - self.units) / rate)}"
+        if final:
+            line += f" in {_format_duration(elapsed)}"
+        print(line, file=self.stream, flush=True)
+
+
+def _format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h{m:02d}m{s:02d}s" if h else f"{m}m{s:02d}s"
+
+
+async def _records(inputs: List[str], formats: List[str], checkpoint: Checkpoint, args,
+                   stop: asyncio.Event) -> AsyncIterator[Dict[str, Any]]:
+    """Items for ``ingest_stream``, starting at the checkpoint; each carries its position."""
+    first, position = checkpoint.state["input"], checkpoint.state["position"]
+    for index in range(first, len(inputs)):
+        path, fmt = inputs[index], formats[index]
+        start = position if index == first else 0
+        source = args.source or (os.path.basename(path) if path != "-" else "stdin")
+        # stdin cannot seek: read from the top and skip the records already done
+        skip, offset = (start, 0) if path == "-" else (0, start)
+        f = None
+        if fmt == "dir":
+            records = iter_dir(path, offset)
+        else:
+            f = sys.stdin.buffer if path == "-" else open(path, "rb")
+            if fmt == "csv":
+                records = iter_csv(f, offset, source, args.raw_column, args.source_column)
+            else:
+                if offset:
+                    f.seek(offset)
+                records = iter_jsonl(f, offset, source)
+        try:
+            for n, (item, after) in enumerate(records, 1):
+                if stop.is_set():
+                    return
+                if n <= skip:
+                    continue
+                item["position"] = (index, after if path != "-" else n)
+                yield item
+                await asyncio.sleep(0)  # let a pending signal handler run
+        finally:
+            if f is not None and f is not sys.stdin.buffer:
+                f.close()
+
+
+async def run(args) -> int:
+    inputs = list(args.inputs)
+    formats = [detect_format(p) if args.format == "auto" else args.format for p in inputs]
+    checkpoint = Checkpoint(args.checkpoint, inputs)
+    resumed = checkpoint.load(args.restart)
+    if resumed:
+        logger.info("Resuming at input %d position %d (%d scrolls done)", checkpoint.state["input"],
+                    checkpoint.state["position"], checkpoint.state["records"])
+
+    sizes = [input_size(p, f) for p, f in zip(inputs, formats)]
+    total = sum(sizes) if all(s is not None for s in sizes) else None
+    before = sum(sizes[:checkpoint.state["input"]]) if total is not None else 0
+    progress = Progress(total, before + checkpoint.state["position"], args.progress_interval)
+
+    head = SupremeHead(config_path=args.config)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    results_file = open(args.results, "a", encoding="utf-8") if args.results else None
+    last_save = time.monotonic()
+    completed = False
+    try:
+        stream = head.ingest_stream(_records(inputs, formats, checkpoint, args, stop), args.concurrency)
+        async for item, result in stream:
+            index, position = item["position"]
+            failed = result.get("status") != "Processed"
+            if results_file is not None:
+                results_file.write(codec.dumps({"input": inputs[index], "position": position, **result})
+                                   .decode("utf-8") + "\n")
+            checkpoint.advance(index, position, failed)
+            progress.update(sum(sizes[:index]) + position if total is not None else 0, failed)
+            if time.monotonic() - last_save >= args.checkpoint_interval:
+                # the checkpoint may only cover events the ledger has committed
+                await head.flush_ledger()
+                checkpoint.save()
+                last_save = time.monotonic()
+        completed = True
+    finally:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(sig)
+        await head.cleanup()
+        if results_file is not None:
+            results_file.close()
+        checkpoint.save(done=completed and not stop.is_set())
+        progress.report(final=True)
+    return 130 if stop.is_set() else 0
+
+
+def build_parser():
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="bulk_ingest.py", description="Bulk-ingest scrolls into SupremeHead")
+    parser.add_argument("inputs", nargs="+", help="JSONL/CSV files, directories, or - for stdin")
+    parser.add_argument("--format", choices=FORMATS, default="auto")
+    parser.add_argument("--config", default="config.json")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="scrolls in flight (default: config stream_concurrency)")
+    parser.add_argument("--checkpoint", help="resume file; progress is saved here")
+    parser.add_argument("--checkpoint-interval", type=float, default=5.0, help="seconds between saves")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--results", help="append per-scroll results to this JSONL file")
+    parser.add_argument("--source", help="source for records that do not name one (default: file name)")
+    parser.add_argument("--raw-column", default="raw", help="CSV column with the scroll text")
+    parser.add_argument("--source-column", help="CSV column with the source")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="seconds between progress lines")
+    return parser
+
+
+def _main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.inputs.count("-") > 1:
+        parser.error("stdin (-) can be given only once")
+    configure_logging(SupremeHead.load_config(args.config))
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
@@ -0,0 +1,291 @@
+"""
+orchestrator/codec.py
+
+JSON encoding for the orchestrator's hot path (HTTP bodies, ledger lines,
+the write-behind journal, state files).
+
+Backends, fastest available first:
+
+  msgspec  ``msgspec.json`` (only when the ``msgspec`` package is installed)
+  orjson   ``orjson`` (only when installed)
+  json     the standard library
+
+``ORCHESTRATOR_JSON=json|orjson|msgspec`` or ``set_backend`` picks one
+explicitly.  Whatever the backend, output is compact UTF-8 (non-ASCII is not
+escaped), and values the fast encoder rejects (integers beyond 64 bits) are
+encoded by the stdlib instead; NaN and infinities become ``null`` with
+orjson/msgspec.  Call sites use ``codec.dumps`` etc. through the module, so
+``set_backend`` takes effect everywhere.
+
+Any ``Mapping`` encodes as an object, and orjson/msgspec encode dataclasses
+natively, so the slotted records in ``records`` need no conversion first.
+
+Schemas are ``TypedDict`` classes; decoding against one parses, checks the
+declared fields and returns the parsed dict unchanged (the rest of the code
+works with dicts), or raises ``ValidationError``.  Unknown fields are kept
+unchecked, and ``null`` is accepted only where a field is ``Optional`` - the
+same on every backend, so installing a faster library never changes data.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import typing
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypedDict, Union
+
+try:
+    import msgspec  # type: ignore
+except Exception:
+    msgspec = None  # type: ignore
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None  # type: ignore
+
+BACKENDS = ("msgspec", "orjson", "json")
+
+
+class ValidationError(ValueError):
+    """Well-formed JSON that does not match the expected schema."""
+
+
+# ── Schemas ───────────────────────────────────────────────────────────────────
+
+# Functional syntax: with postponed annotations the class syntax would not
+# register ``Required`` fields in ``__required_keys__``.
+
+# One scroll as submitted to /ingest, /ingest/batch, NDJSON or the work queue.
+ScrollRequest = TypedDict("ScrollRequest", {
+    "raw": typing.Required[str],
+    "source": Optional[str],
+    "priority": Optional[str],
+}, total=False)
+
+# A Mind Nexus /analyze response.
+AnalysisResponse = TypedDict("AnalysisResponse", {
+    "patterns": List[Any],
+    "sentiment": str,
+    "value_score": Union[int, float],
+    "notes": Optional[str],
+    "timestamp": Optional[str],
+}, total=False)
+
+
+# ── stdlib / orjson schema checks ─────────────────────────────────────────────
+# A compiled check returns None when the value matches, else an error tuple
+# (expected, got, path-suffix); paths are only built on the failure path.
+
+_Error = Optional[Tuple[str, str, str]]
+_MISSING = "missing"
+_JSON_NAMES = {str: "str", int: "int", float: "float", bool: "bool", dict: "object", list: "array",
+               type(None): "null"}
+
+
+def _got(value: Any) -> str:
+    return _JSON_NAMES.get(type(value), type(value).__name__)
+
+
+def _checker(tp: Any) -> Callable[[Any], _Error]:
+    if tp is Any:
+        return lambda value: None
+    if typing.is_typeddict(tp):
+        return _object_checker(tp)
+    origin = typing.get_origin(tp)
+    if origin is Union:
+        options = typing.get_args(tp)
+        checks = [_checker(o) for o in options]
+        expected = " | ".join(_JSON_NAMES.get(o, getattr(o, "__name__", str(o))) for o in options)
+
+        def check_union(value):
+            for check in checks:
+                if check(value) is None:
+                    return None
+            return expected, _got(value), ""
+        return check_union
+    if origin is list:
+        (item_tp,) = typing.get_args(tp) or (Any,)
+        item = _checker(item_tp)
+
+        def check_list(value):
+            if type(value) is not list:
+                return "array", _got(value), ""
+            if item_tp is not Any:
+                for i, v in enumerate(value):
+                    err = item(v)
+                    if err is not None:
+                        return err[0], err[1], f"[{i}]{err[2]}"
+            return None
+        return check_list
+    if tp not in _JSON_NAMES:
+        raise TypeError(f"unsupported schema type {tp!r}")
+    # exact types: JSON never yields subclasses, and bool must not pass as a number
+    accepted = (int, float) if tp is float else (tp,)
+    name = _JSON_NAMES[tp]
+
+    def check_scalar(value):
+        return None if type(value) in accepted else (name, _got(value), "")
+    return check_scalar
+
+
+def _object_checker(schema: type) -> Callable[[Any], _Error]:
+    fields = [(key, key in schema.__required_keys__, _checker(tp))
+              for key, tp in typing.get_type_hints(schema).items()]
+
+    def check_object(value):
+        if type(value) is not dict:
+            return "object", _got(value), ""
+        for key, required, check in fields:
+            if key in value:
+                err = check(value[key])
+                if err is not None:
+                    return err[0], err[1], f".{key}{err[2]}"
+            elif required:
+                return _MISSING, key, ""
+        return None
+    return check_object
+
+
+_compiled: Dict[type, Callable[[Any], None]] = {}
+
+
+def _compile_schema(schema: type) -> Callable[[Any], None]:
+    """``schema`` as a function that raises ValidationError on a mismatch."""
+    validator = _compiled.get(schema)
+    if validator is None:
+        check = _object_checker(schema)
+
+        def validator(value):
+            err = check(value)
+            if err is None:
+                return
+            expected, got, path = err
+            if expected == _MISSING:
+                raise ValidationError(f"Object missing required field `{got}` - at `${path}`")
+            raise ValidationError(f"Expected `{expected}`, got `{got}` - at `${path}`")
+        _compiled[schema] = validator
+    return validator
+
+
+# ── Backends ──────────────────────────────────────────────────────────────────
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def _json_pretty(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=_json_default).encode("utf-8")
+
+
+def _json_loads(data: Union[bytes, str]) -> Any:
+    return json.loads(data)
+
+
+def _checked_decode(loads: Callable[[Any], Any]):
+    def decode(data: Union[bytes, str], schema: type) -> Any:
+        value = loads(data)
+        _compile_schema(schema)(value)
+        return value
+    return decode
+
+
+def _checked_validate(obj: Any, schema: type) -> Any:
+    _compile_schema(schema)(obj)
+    return obj
+
+
+def _make_json():
+    return _json_dumps, _json_pretty, _json_loads, _checked_decode(_json_loads), _checked_validate
+
+
+def _make_orjson():
+    opts = orjson.OPT_NON_STR_KEYS
+    pretty_opts = opts | orjson.OPT_INDENT_2
+
+    def dumps(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=opts)
+        except TypeError:
+            return _json_dumps(obj)  # >64-bit ints etc.; raises like json for the truly unencodable
+
+    def pretty(obj: Any) -> bytes:
+        try:
+            return orjson.dumps(obj, option=pretty_opts)
+        except TypeError:
+            return _json_pretty(obj)
+
+    return dumps, pretty, orjson.loads, _checked_decode(orjson.loads), _checked_validate
+
+
+def _make_msgspec():
+    encoder = msgspec.json.Encoder()
+
+    def dumps(obj: Any) -> bytes:
+        try:
+            return encoder.encode(obj)
+        except (TypeError, OverflowError):
+            return _json_dumps(obj)
+
+    def pretty(obj: Any) -> bytes:
+        return msgspec.json.format(dumps(obj), indent=2)
+
+    def loads(data: Union[bytes, str]) -> Any:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError as e:
+            raise ValueError(str(e)) from None
+
+    # convert() only checks: its result drops unknown fields, which the
+    # other backends keep, so the parsed object itself is returned
+    def validate(obj: Any, schema: type) -> Any:
+        try:
+            msgspec.convert(obj, schema)
+        except msgspec.ValidationError as e:
+            raise ValidationError(str(e)) from None
+        return obj
+
+    def decode(data: Union[bytes, str], schema: type) -> Any:
+        return validate(loads(data), schema)
+
+    return dumps, pretty, loads, decode, validate
+
+
+_FACTORIES = {"json": _make_json, "orjson": _make_orjson, "msgspec": _make_msgspec}
+_MODULES = {"json": json, "orjson": orjson, "msgspec": msgspec}
+
+BACKEND = "json"
+
+
+def available() -> List[str]:
+    return [name for name in BACKENDS if _MODULES[name] is not None]
+
+
+def set_backend(name: Optional[str] = None) -> str:
+    """Switch every codec function to ``name`` (default: fastest available); returns the backend used."""
+    global BACKEND, dumps, dumps_pretty, loads, decode, validate
+    name = name or available()[0]
+    if name not in _FACTORIES:
+        raise ValueError(f"unknown JSON backend {name!r}; expected one of {BACKENDS}")
+    if _MODULES[name] is None:
+        raise ValueError(f"JSON backend {name!r} is not installed")
+    dumps, dumps_pretty, loads, decode, validate = _FACTORIES[name]()
+    BACKEND = name
+    return name
+
+
+# Filled in by set_backend; declared here for readers and type checkers.
+dumps: Callable[[Any], bytes]                 # compact UTF-8 JSON
+dumps_pretty: Callable[[Any], bytes]          # indented, for files people read
+loads: Callable[[Union[bytes, str]], Any]     # raises ValueError on bad JSON
+decode: Callable[[Union[bytes, str], type], Any]  # loads + schema check; ValidationError on mismatch
+validate: Callable[[Any, type], Any]          # schema check of an already-parsed object
+
+set_backend(os.environ.get("ORCHESTRATOR_JSON") or None)
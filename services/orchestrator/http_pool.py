@@ -0,0 +1,152 @@
+"""
+orchestrator/http_pool.py
+
+Keep-alive connection pool over ``http.client`` for the stdlib transport of
+``HTTPClient.sync_post`` (used when ``requests`` is not installed).
+
+Idle connections are kept per ``(scheme, host, port)`` in a LIFO stack so the
+most recently used - and least likely to have been closed by the server - is
+reused first.  A request that fails on a reused connection before any response
+arrives is retried once on a fresh connection, which covers servers that drop
+idle keep-alive sockets.
+"""
+
+from __future__ import annotations
+
+import http.client
+import socket
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.error import HTTPError
+from urllib.parse import urlsplit
+
+import codec
+
+_Key = Tuple[str, str, int]
+
+# errors that mean "the server closed the idle socket", not "the request failed"
+_STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                 ConnectionResetError, BrokenPipeError)
+
+
+class HTTPConnectionPool:
+    """Thread-safe pool of persistent ``http.client`` connections.
+
+    ``maxsize`` bounds the idle connections kept per host; with ``block`` set
+    it also bounds the connections open at once and callers wait for one to be
+    returned.
+    """
+
+    def __init__(self, maxsize: int = 10, block: bool = False):
+        self.maxsize = max(1, maxsize)
+        self.block = block
+        self._cond = threading.Condition()
+        self._idle: Dict[_Key, List[http.client.HTTPConnection]] = {}
+        self._open: Dict[_Key, int] = {}
+        # metrics
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def _new_connection(self, key: _Key, timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        self.created += 1
+        return cls(host, port, timeout=timeout)
+
+    def _acquire(self, key: _Key, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._cond:
+            while True:
+                idle = self._idle.get(key)
+                if idle:
+                    conn = idle.pop()
+                    self.reused += 1
+                    reused = True
+                    break
+                if not self.block or self._open.get(key, 0) < self.maxsize:
+                    self._open[key] = self._open.get(key, 0) + 1
+                    conn = self._new_connection(key, timeout)
+                    reused = False
+                    break
+                self._cond.wait()
+        conn.timeout = timeout
+        if conn.sock is not None:
+            try:
+                conn.sock.settimeout(timeout)
+            except OSError:
+                conn.close()  # dead socket; http.client reconnects on the next request
+        return conn, reused
+
+    def _release(self, key: _Key, conn: http.client.HTTPConnection, reusable: bool):
+        with self._cond:
+            idle = self._idle.setdefault(key, [])
+            if reusable and conn.sock is not None and len(idle) < self.maxsize:
+                idle.append(conn)
+            else:
+                conn.close()
+                self._open[key] = self._open.get(key, 1) - 1
+                self.discarded += 1
+            self._cond.notify()
+
+    def request(self, method: str, url: str, body: Optional[bytes] = None,
+                headers: Optional[Dict[str, str]] = None, timeout: float = 10) -> Tuple[int, bytes]:
+        """Send one request and return ``(status, body)``."""
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname or "localhost", port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        for attempt in (1, 2):
+            conn, reused = self._acquire(key, timeout)
+            try:
+                if conn.sock is None:
+                    conn.connect()
+                    # headers and body go out in one send; don't let Nagle hold it
+                    conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                conn.request(method, path, body=body, headers=headers or {})
+                resp = conn.getresponse()
+                data = resp.read()
+            except _STALE_ERRORS:
+                self._release(key, conn, reusable=False)
+                if reused and attempt == 1:
+                    continue
+                raise
+            except BaseException:
+                self._release(key, conn, reusable=False)
+                raise
+            self._release(key, conn, reusable=not resp.will_close)
+            return resp.status, data
+        raise AssertionError("unreachable")
+
+    def post_json(self, url: str, payload: Any, timeout: float = 10,
+                  headers: Optional[Dict[str, str]] = None) -> Any:
+        """POST ``payload`` as JSON; raise ``HTTPError`` on 4xx/5xx like urllib."""
+        all_headers = {"Content-Type": "application/json"}
+        if headers:
+            all_headers.update(headers)
+        status, data = self.request("POST", url, codec.dumps(payload),
+                                    all_headers, timeout)
+        if status >= 400:
+            raise HTTPError(url, status, data[:200].decode("utf-8", "replace"), None, None)
+        return codec.loads(data) if data else {}
+
+    def close(self):
+        with self._cond:
+            for key, idle in self._idle.items():
+                for conn in idle:
+                    conn.close()
+                self._open[key] = self._open.get(key, 0) - len(idle)
+            self._idle.clear()
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "idle": sum(len(v) for v in self._idle.values()),
+                "created": self.created,
+                "reused": self.reused,
+                "discarded": self.discarded,
+            }
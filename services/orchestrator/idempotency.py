@@ -0,0 +1,350 @@
+"""
+orchestrator/idempotency.py
+
+Request deduplication for scroll ingestion.
+
+A client that retries ``POST /ingest`` after a timeout would otherwise run
+the whole pipeline again - a second Mind Nexus call and possibly a second
+mint.  ``IdempotencyStore`` keeps the result of each completed ingest under
+its key (the client's ``Idempotency-Key`` header, or with content dedup a
+SHA-256 of source + raw) in a bounded LRU with a TTL:
+
+  * a repeat of a completed key gets the stored result back (``hits``);
+  * a repeat while the original is still running waits for it instead of
+    re-executing (``coalesced``);
+  * a key reused with a different scroll is refused (``IdempotencyConflict``).
+
+Results whose action failed, and calls that raised, are not stored, so a
+retry of those runs again.
+
+The LRU lives in one process.  Prefork workers (prefork.py) therefore also
+share a SQLite file (``path``): the first worker to see a key claims it
+there, a worker that gets a retry of the same key waits for that result
+(polling, for at most ``claim_timeout`` seconds - longer means the owner
+died), and completed results are replayed from it by every worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import codec
+
+
+class IdempotencyConflict(Exception):
+    """An idempotency key was reused for a different scroll."""
+
+    def __init__(self, key: str):
+        super().__init__(f"idempotency key {key!r} was already used for a different scroll")
+        self.key = key
+
+
+def fingerprint(raw: str, source: str) -> str:
+    return hashlib.sha256(f"{source}\0{raw}".encode("utf-8")).hexdigest()
+
+
+def _storable(result: Dict[str, Any]) -> bool:
+    return isinstance(result, dict) and result.get("action") != "Action Failed" and "error" not in result
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key        TEXT PRIMARY KEY,
+    fp         TEXT NOT NULL,
+    result     TEXT,          -- NULL while the claiming worker is still running
+    expires_at REAL NOT NULL  -- wall clock: shared by processes
+);
+CREATE INDEX IF NOT EXISTS results_expiry ON results (expires_at);
+"""
+
+_CLAIMED, _DONE, _RUNNING, _CONFLICT = "claimed", "done", "running", "conflict"
+
+
+class _SharedResults:
+    """Cross-process claims and results in one SQLite file (WAL, so readers never block)."""
+
+    def __init__(self, path: str, ttl_seconds: float, claim_timeout: float):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.claim_timeout = claim_timeout
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        """The connection, (re)opened on first use after ``close``; caller holds the lock."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def claim(self, key: str, fp: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """``(_CLAIMED, None)`` if the caller now owns ``key``, else its state there."""
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT fp, result, expires_at FROM results WHERE key = ?",
+                                   (key,)).fetchone()
+                if row is None or row[2] <= now:
+                    conn.execute("INSERT OR REPLACE INTO results (key, fp, result, expires_at) "
+                                 "VALUES (?, ?, NULL, ?)", (key, fp, now + self.claim_timeout))
+                    state = (_CLAIMED, None)
+                elif row[0] != fp:
+                    state = (_CONFLICT, None)
+                elif row[1] is None:
+                    state = (_RUNNING, None)
+                else:
+                    state = (_DONE, codec.loads(row[1]))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return state
+
+    def finish(self, key: str, result: Optional[Dict[str, Any]]):
+        """Publish the claimed key's result, or release the claim (``None``) so a retry runs."""
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            if result is None:
+                conn.execute("DELETE FROM results WHERE key = ? AND result IS NULL", (key,))
+                return
+            conn.execute("UPDATE results SET result = ?, expires_at = ? WHERE key = ?",
+                         (codec.dumps(result).decode("utf-8"), now + self.ttl_seconds, key))
+            conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class IdempotencyStore:
+    # how often a worker re-checks a key another worker is running
+    SHARED_POLL_INTERVAL = 0.05
+
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 600, content_dedup: bool = False,
+                 path: Optional[str] = None, claim_timeout: float = 60.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.content_dedup = content_dedup
+        # shared by prefork workers; None keeps dedup within this process
+        self._shared = _SharedResults(path, ttl_seconds, claim_timeout) if path else None
+        # key -> (expires_at, fingerprint, result); most recently used last
+        self._entries: "OrderedDict[str, Tuple[float, str, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # key -> (fingerprint, future | [Event, result])
+        self._inflight_async: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self._inflight_sync: Dict[str, Tuple[str, list]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.conflicts = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.shared_hits = 0  # replayed from another worker's result
+
+    def key_for(self, raw: str, source: str, idempotency_key: Optional[str] = None) -> Optional[str]:
+        """Store key for a scroll: the client key if given, else its content hash (if enabled)."""
+        if idempotency_key:
+            return f"key:{idempotency_key}"
+        if self.content_dedup:
+            return f"content:{fingerprint(raw, source)}"
+        return None
+
+    def _lookup(self, key: str, fp: str) -> Optional[Dict[str, Any]]:
+        # caller holds the lock
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, stored_fp, result = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        if stored_fp != fp:
+            self.conflicts += 1
+            raise IdempotencyConflict(key.split(":", 1)[1])
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return _replayed(result)
+
+    def _store(self, key: str, fp: str, result: Dict[str, Any]):
+        if not _storable(result):
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, fp, dict(result))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _check_inflight(self, key: str, fp: str, inflight: Dict[str, tuple]):
+        # caller holds the lock
+        running = inflight.get(key)
+        if running is not None and running[0] != fp:
+            self.conflicts += 1
+            raise IdempotencyConflict(key.split(":", 1)[1])
+        return running
+
+    def run(self, key: str, fp: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Sync path: stored result, the in-flight original's result, or ``compute()``."""
+        with self._lock:
+            cached = self._lookup(key, fp)
+            if cached is not None:
+                return cached
+            running = self._check_inflight(key, fp, self._inflight_sync)
+            if running is None:
+                waiter = [threading.Event(), None]
+                self._inflight_sync[key] = (fp, waiter)
+                self.misses += 1
+            else:
+                waiter = running[1]
+                self.coalesced += 1
+        if running is not None:
+            waiter[0].wait()
+            if waiter[1] is not None:
+                return _replayed(waiter[1])
+            return self._compute_shared(key, fp, compute)  # the original raised; run on our own
+        try:
+            result = self._compute_shared(key, fp, compute)
+            waiter[1] = result
+            self._store(key, fp, result)
+            return result
+        finally:
+            with self._lock:
+                self._inflight_sync.pop(key, None)
+            waiter[0].set()
+
+    async def run_async(self, key: str, fp: str, compute: Callable[[], Awaitable[Dict[str, Any]]]
+                        ) -> Dict[str, Any]:
+        """Async path; duplicates arriving while the original runs share its result."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            cached = self._lookup(key, fp)
+            if cached is not None:
+                return cached
+            running = self._check_inflight(key, fp, self._inflight_async)
+            if running is not None and running[1].get_loop() is not loop:
+                running = None  # left over from another event loop
+            if running is None:
+                fut = loop.create_future()
+                self._inflight_async[key] = (fp, fut)
+                self.misses += 1
+            else:
+                fut = running[1]
+                self.coalesced += 1
+        if running is not None:
+            try:
+                return _replayed(await asyncio.shield(fut))
+            except asyncio.CancelledError:
+                if not fut.cancelled():
+                    raise  # we were cancelled ourselves
+            except Exception:
+                pass
+            return await self._compute_shared_async(key, fp, compute)  # the original failed or was cancelled
+        try:
+            result = await self._compute_shared_async(key, fp, compute)
+            self._store(key, fp, result)
+            fut.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            with self._lock:
+                if self._inflight_async.get(key, (None, None))[1] is fut:
+                    del self._inflight_async[key]
+
+    def _shared_replay(self, key: str, state: str, stored: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """The replayed result for a key another worker finished; None while it still runs."""
+        if state == _CONFLICT:
+            with self._lock:
+                self.conflicts += 1
+            raise IdempotencyConflict(key.split(":", 1)[1])
+        if state == _DONE:
+            with self._lock:
+                self.shared_hits += 1
+            return _replayed(stored)
+        return None
+
+    def _compute_shared(self, key: str, fp: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        if self._shared is None:
+            return compute()
+        while True:
+            state, stored = self._shared.claim(key, fp)
+            if state == _CLAIMED:
+                break
+            replay = self._shared_replay(key, state, stored)
+            if replay is not None:
+                return replay
+            time.sleep(self.SHARED_POLL_INTERVAL)
+        try:
+            result = compute()
+        except BaseException:
+            self._shared.finish(key, None)
+            raise
+        self._shared.finish(key, result if _storable(result) else None)
+        return result
+
+    async def _compute_shared_async(self, key: str, fp: str,
+                                    compute: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        if self._shared is None:
+            return await compute()
+        loop = asyncio.get_running_loop()
+        while True:
+            state, stored = await loop.run_in_executor(None, self._shared.claim, key, fp)
+            if state == _CLAIMED:
+                break
+            replay = self._shared_replay(key, state, stored)
+            if replay is not None:
+                return replay
+            await asyncio.sleep(self.SHARED_POLL_INTERVAL)
+        try:
+            result = await compute()
+        except BaseException:
+            self._shared.finish(key, None)
+            raise
+        await loop.run_in_executor(None, self._shared.finish, key, result if _storable(result) else None)
+        return result
+
+    def close(self):
+        """Release the shared file's connection; the next shared lookup reopens it."""
+        if self._shared is not None:
+            self._shared.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "conflicts": self.conflicts,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "shared_hits": self.shared_hits,
+            }
+
+
+def _replayed(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {**result, "deduplicated": True}
@@ -0,0 +1,767 @@
+"""
+orchestrator/ledger.py
+
+Codex ledger writer, reader and compaction.
+
+A single background thread owns the ledger file handle and group-commits
+events appended by any number of producers (event-loop code and executor
+threads alike).  A commit happens when ``max_batch`` events are pending,
+``max_delay`` seconds after the oldest pending event arrived, or when a
+producer explicitly asks for a flush.  fsync policy:
+
+  never     leave durability to the OS page cache (default)
+  batch     fsync after every group commit
+  interval  fsync at most once per ``fsync_interval`` seconds
+
+A failed commit is retried with exponential backoff, keeping the batch at the
+head of the queue.  At most ``max_pending`` events are buffered (further
+appends raise ``LedgerWriteError``), and after ``max_write_failures``
+consecutive failures the error is surfaced: appends and flushes raise until a
+commit succeeds again.
+
+On-disk layout (``<base>`` is ``codex_ledger_path``):
+
+  <base>                 active segment
+  <base>.000001          sealed segments, rotated by size or age
+  <base>.000001.z        compacted segment, every index block compressed
+  <segment>.idx          sidecar index, one JSON line per block of events:
+                         {"offset", "length", "count", "ts_min", "ts_max",
+                          "types", "sources"[, "codec"][, "compression"]}
+  <base>.w<N>            ledger of prefork worker N, with its own segments;
+                         each process is the only writer of its files
+
+Blocks are encoded with a codec from ``ledger_codecs`` (JSON lines unless the
+index says otherwise) and optionally compressed, so one segment may mix
+encodings after a configuration change.
+
+``LedgerReader.query`` uses the sidecars to skip blocks that cannot match and
+reads the remaining ones through mmap, merging worker ledgers by timestamp.
+A query opens every segment of a base up front, so rotation and compaction
+(which rename and remove files) cannot pull a segment from under it; in this
+process they also wait on ``_segment_lock`` while a query takes that
+snapshot, so it never pairs a segment with the wrong sidecar.  A reader in
+another process retries the snapshot when a listed segment disappears.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import glob
+import heapq
+import json
+import logging
+import mmap
+import os
+import re
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from ledger_codecs import compress, decompress, get_codec, sniff_codec
+
+logger = logging.getLogger("supremehead.ledger")
+
+FSYNC_POLICIES = ("never", "batch", "interval")
+
+
+
+class LedgerWriteError(Exception):
+    """The ledger cannot take or commit events right now (backlog full or writes failing)."""
+
+
+# held while segment files are renamed or removed, and while a reader opens them
+_segment_lock = threading.Lock()
+# one compaction pass at a time: passes started by back-to-back rotations overlap
+_compaction_lock = threading.Lock()
+
+_live_writers: "weakref.WeakSet[LedgerWriter]" = weakref.WeakSet()
+
+
+def _close_live_writers():
+    for writer in list(_live_writers):
+        writer.close()
+
+
+atexit.register(_close_live_writers)
+
+
+def ts_key(ts: Union[str, datetime, None]) -> str:
+    """Normalise a timestamp so that ISO strings compare chronologically.
+
+    ``now_iso`` omits the fraction when microseconds are zero, which would
+    otherwise sort "...:00Z" after "...:00.5Z".
+    """
+    if ts is None:
+        return ""
+    if isinstance(ts, datetime):
+        if ts.tzinfo is not None:
+            ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+        ts = ts.isoformat()
+    ts = ts.rstrip("Z")
+    if "." not in ts:
+        ts += ".000000"
+    return ts
+
+
+_SEGMENT_RE = re.compile(r"\.(\d{6})(\.z)?$")
+
+
+def segment_paths(base: str) -> List[str]:
+    """Sealed and compacted segments of ``base`` in order, then the active one."""
+    sealed = []
+    for path in glob.glob(glob.escape(base) + ".[0-9]*"):
+        m = _SEGMENT_RE.search(path[len(base):])
+        if m and path[len(base):] == m.group(0):
+            sealed.append((int(m.group(1)), path))
+    # a compacted copy lands before its original is removed; never list both
+    paths = [p for _, p in sorted(sealed) if not os.path.exists(p + ".z")]
+    if os.path.exists(base):
+        paths.append(base)
+    return paths
+
+
+_WORKER_RE = re.compile(r"\.w(\d+)(?:\.\d{6}(?:\.z)?)?(?:\.idx)?$")
+
+
+def worker_ledger_path(base: str, worker_id: int) -> str:
+    """Ledger base owned by prefork worker ``worker_id``."""
+    return f"{base}.w{worker_id}"
+
+
+def ledger_bases(base: str) -> List[str]:
+    """``base`` followed by the worker ledgers found next to it, by worker number."""
+    workers = set()
+    for path in glob.glob(glob.escape(base) + ".w[0-9]*"):
+        m = _WORKER_RE.match(path[len(base):])
+        if m:
+            workers.add(int(m.group(1)))
+    return [base] + [worker_ledger_path(base, n) for n in sorted(workers)]
+
+
+def _next_segment_number(base: str) -> int:
+    numbers = [int(_SEGMENT_RE.search(p).group(1)) for p in segment_paths(base) if p != base]
+    return max(numbers, default=0) + 1
+
+
+def _block_meta(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    types, sources = set(), set()
+    ts_min = ts_max = None
+    for entry in entries:
+        types.add(entry.get("event_type"))
+        payload = entry.get("payload")
+        if isinstance(payload, dict) and payload.get("source") is not None:
+            sources.add(payload["source"])
+        k = ts_key(entry.get("timestamp"))
+        if ts_min is None or k < ts_min:
+            ts_min = k
+        if ts_max is None or k > ts_max:
+            ts_max = k
+    return {"count": len(entries), "ts_min": ts_min, "ts_max": ts_max,
+            "types": sorted(t for t in types if t is not None), "sources": sorted(sources, key=str)}
+
+
+class _ActiveSegment:
+    """Data + index file handles of the segment being written (writer thread only)."""
+
+    def __init__(self, path: str, index_block_events: int, codec_name: str = "jsonl",
+                 compression: str = "none"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.index_block_events = index_block_events
+        self.codec = get_codec(codec_name)
+        self.compression = compression
+        self.data = open(path, "ab")
+        self.index = open(path + ".idx", "a", encoding="utf-8")
+        self.offset = self.data.tell()
+        self.opened_at = time.monotonic()
+        if self.offset and self.codec.name == "jsonl" and not self._ends_with_newline():
+            # terminate a torn final line so the next event starts cleanly
+            self.data.write(b"\n")
+            self.data.flush()
+            self.offset += 1
+        indexed_to = self._indexed_to()
+        if indexed_to < self.offset:
+            # crash between data and index write: index the tail as one block
+            self.index.write(json.dumps({"offset": indexed_to, "length": self.offset - indexed_to,
+                                         "count": None, "ts_min": None, "ts_max": None,
+                                         "types": None, "sources": None}) + "\n")
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _indexed_to(self) -> int:
+        end = 0
+        for block in read_index(self.path + ".idx"):
+            end = max(end, block["offset"] + block["length"])
+        return end
+
+    def write(self, entries: List[Dict[str, Any]]):
+        chunks = []
+        index_lines = []
+        for i in range(0, len(entries), self.index_block_events):
+            block = entries[i:i + self.index_block_events]
+            data = compress(b"".join(self.codec.encode(e) for e in block), self.compression)
+            meta = {"offset": self.offset, "length": len(data)}
+            meta.update(_block_meta(block))
+            if self.codec.name != "jsonl":
+                meta["codec"] = self.codec.name
+            if self.compression != "none":
+                meta["compression"] = self.compression
+            index_lines.append(json.dumps(meta, ensure_ascii=False) + "\n")
+            chunks.append(data)
+            self.offset += len(data)
+        self.data.write(b"".join(chunks))
+        self.data.flush()
+        self.index.write("".join(index_lines))
+        self.index.flush()
+
+    def fsync(self):
+        os.fsync(self.data.fileno())
+        os.fsync(self.index.fileno())
+
+    def close(self):
+        self.data.close()
+        self.index.close()
+
+
+class LedgerWriter:
+    RETRY_DELAY = 0.5  # first backoff after a failed commit, doubled per failure...
+    MAX_RETRY_DELAY = 10.0  # ...up to this
+
+    def __init__(self, path: str, max_batch: int = 10, max_delay: float = 0.05,
+                 fsync: str = "never", fsync_interval: float = 1.0,
+                 segment_max_bytes: int = 0, segment_max_age: float = 0,
+                 index_block_events: int = 256, compact_after: Optional[float] = None,
+                 codec: str = "jsonl", compression: str = "none",
+                 max_pending: int = 100_000, max_write_failures: int = 5):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {fsync!r}")
+        get_codec(codec)
+        compress(b"", compression)  # validate both names up front
+        self.path = path
+        self.max_batch = max(1, max_batch)
+        self.max_delay = max_delay
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        # rotation is disabled while both limits are 0
+        self.segment_max_bytes = segment_max_bytes
+        self.segment_max_age = segment_max_age
+        self.index_block_events = max(1, index_block_events)
+        # seal-time compaction of segments older than this many seconds
+        self.compact_after = compact_after
+        self.codec = codec
+        self.compression = compression
+        # appends beyond this many buffered events raise (0 = unbounded)
+        self.max_pending = max_pending
+        # consecutive failed commits before appends and flushes raise
+        self.max_write_failures = max(1, max_write_failures)
+        self._cond = threading.Condition()
+        self._pending: List[Dict[str, Any]] = []
+        self._pending_since = 0.0
+        self._appended = 0   # events handed to append()
+        self._committed = 0  # events written by the writer thread
+        self._flush_requested = False
+        self._closing = False
+        self._thread: Optional[threading.Thread] = None
+        self._failures = 0  # consecutive failed commits
+        self._error: Optional[LedgerWriteError] = None  # set once _failures reaches the limit
+        # (target, loop, future) of flush_async callers
+        self._async_waiters: List[tuple] = []
+        # metrics
+        self.commits = 0
+        self.rotations = 0
+        self.fsyncs = 0
+        self.write_errors = 0
+        self.last_flush_latency = 0.0
+        self.max_flush_latency = 0.0
+        self.total_flush_latency = 0.0
+
+    # ---- producer side ----
+    def append(self, entry: Dict[str, Any]):
+        self.append_many((entry,))
+
+    def append_many(self, entries: Iterable[Dict[str, Any]]):
+        """Queue events; events of one call are always committed in the same write.
+
+        Raises ``LedgerWriteError`` while commits are failing or when the
+        events would not fit in ``max_pending``; nothing is queued then.
+        """
+        entries = list(entries)
+        with self._cond:
+            if self._error is not None:
+                raise self._error
+            if self.max_pending and len(self._pending) + len(entries) > self.max_pending:
+                raise LedgerWriteError(f"ledger backlog full ({len(self._pending)} events pending)")
+            self._ensure_started()
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.extend(entries)
+            self._appended += len(entries)
+            if len(self._pending) >= self.max_batch:
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything appended so far is committed; False on timeout.
+
+        Raises ``LedgerWriteError`` if commits fail ``max_write_failures`` times first.
+        """
+        with self._cond:
+            target = self._appended
+            if self._committed >= target:
+                return True
+            self._flush_requested = True
+            self._cond.notify_all()
+            done = self._cond.wait_for(
+                lambda: self._committed >= target or self._error is not None, timeout)
+            if self._committed < target and self._error is not None:
+                raise self._error
+            return done
+
+    async def flush_async(self):
+        """Await commit of everything appended so far without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            target = self._appended
+            if self._committed >= target:
+                return
+            if self._error is not None:
+                raise self._error
+            fut = loop.create_future()
+            self._async_waiters.append((target, loop, fut))
+            self._flush_requested = True
+            self._cond.notify_all()
+        await fut
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Commit pending events and stop the writer thread."""
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        thread.join(timeout)
+        with self._cond:
+            self._thread = None
+            self._closing = False
+
+    async def close_async(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "appended": self._appended,
+                "committed": self._committed,
+                "commits": self.commits,
+                "rotations": self.rotations,
+                "fsyncs": self.fsyncs,
+                "write_errors": self.write_errors,
+                "failing": self._error is not None,
+                "last_flush_latency_ms": self.last_flush_latency * 1000,
+                "max_flush_latency_ms": self.max_flush_latency * 1000,
+                "mean_flush_latency_ms": (self.total_flush_latency / self.commits * 1000) if self.commits else 0.0,
+            }
+
+    # ---- writer thread ----
+    def _ensure_started(self):
+        # caller holds self._cond
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ledger-writer", daemon=True)
+            self._thread.start()
+            _live_writers.add(self)
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        with self._cond:
+            while not self._pending and not self._closing:
+                self._cond.wait()
+            while (len(self._pending) < self.max_batch and not self._flush_requested
+                   and not self._closing):
+                remaining = self._pending_since + self.max_delay - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, self._pending = self._pending, []
+            self._flush_requested = False
+            return batch
+
+    def _run(self):
+        seg: Optional[_ActiveSegment] = None
+        last_fsync = time.monotonic()
+        try:
+            while True:
+                batch = self._next_batch()
+                if not batch:
+                    if self._closing:
+                        return
+                    continue
+                start = time.monotonic()
+                try:
+                    if seg is None:
+                        seg = _ActiveSegment(self.path, self.index_block_events,
+                                             self.codec, self.compression)
+                    seg.write(batch)
+                    if self.fsync == "batch" or (
+                            self.fsync == "interval" and start - last_fsync >= self.fsync_interval):
+                        seg.fsync()
+                        last_fsync = start
+                        self.fsyncs += 1
+                except Exception as e:
+                    logger.exception("Failed to write events to ledger")
+                    self.write_errors += 1
+                    if seg is not None:
+                        seg.close()
+                        seg = None
+                    if self._closing:
+                        logger.error(f"Dropping {len(batch)} ledger events on close")
+                        # release flush() waiters rather than hang shutdown
+                        self._committed_batch(len(batch), time.monotonic() - start)
+                        continue
+                    with self._cond:
+                        self._pending[:0] = batch
+                        self._flush_requested = True  # retry after the backoff, not max_delay
+                    self._commit_failed(e)
+                    with self._cond:
+                        # backoff, cut short by close()
+                        self._cond.wait_for(lambda: self._closing, self._retry_delay())
+                    continue
+                self._committed_batch(len(batch), time.monotonic() - start)
+                if self._should_rotate(seg):
+                    self._rotate(seg)
+                    seg = None
+        finally:
+            if seg is not None:
+                if self.fsync != "never":
+                    seg.fsync()
+                seg.close()
+
+    def _should_rotate(self, seg: _ActiveSegment) -> bool:
+        if self.segment_max_bytes and seg.offset >= self.segment_max_bytes:
+            return True
+        return bool(self.segment_max_age and time.monotonic() - seg.opened_at >= self.segment_max_age)
+
+    def _rotate(self, seg: _ActiveSegment):
+        try:
+            if self.fsync != "never":
+                seg.fsync()
+            seg.close()
+            with _segment_lock:
+                sealed = f"{self.path}.{_next_segment_number(self.path):06d}"
+                # data first: a missing sidecar only costs a scan, never data
+                os.replace(self.path, sealed)
+                os.replace(self.path + ".idx", sealed + ".idx")
+            self.rotations += 1
+            logger.info(f"Rotated ledger segment to {sealed}")
+        except Exception:
+            logger.exception("Ledger segment rotation failed")
+            return
+        if self.compact_after is not None:
+            threading.Thread(target=compact_segments, args=(self.path, self.compact_after),
+                             name="ledger-compactor", daemon=True).start()
+
+    def _retry_delay(self) -> float:
+        return min(self.RETRY_DELAY * 2 ** (self._failures - 1), self.MAX_RETRY_DELAY)
+
+    def _commit_failed(self, exc: Exception):
+        with self._cond:
+            self._failures += 1
+            if self._failures < self.max_write_failures or self._error is not None:
+                return
+            self._error = LedgerWriteError(
+                f"ledger commits failing ({self._failures} in a row): {exc}")
+            self._cond.notify_all()
+            failed, self._async_waiters = self._async_waiters, []
+        for _, loop, fut in failed:
+            try:
+                loop.call_soon_threadsafe(_fail, fut, self._error)
+            except RuntimeError:
+                pass
+
+    def _committed_batch(self, n: int, latency: float):
+        with self._cond:
+            self._failures = 0
+            self._error = None
+            self._committed += n
+            self.commits += 1
+            self.last_flush_latency = latency
+            self.max_flush_latency = max(self.max_flush_latency, latency)
+            self.total_flush_latency += latency
+            self._cond.notify_all()
+            ready = [w for w in self._async_waiters if w[0] <= self._committed]
+            self._async_waiters = [w for w in self._async_waiters if w[0] > self._committed]
+        for _, loop, fut in ready:
+            try:
+                loop.call_soon_threadsafe(_resolve, fut)
+            except RuntimeError:
+                pass  # loop already closed
+
+
+def _resolve(fut: asyncio.Future):
+    if not fut.done():
+        fut.set_result(None)
+
+
+def _fail(fut: asyncio.Future, exc: Exception):
+    if not fut.done():
+        fut.set_exception(exc)
+
+
+# ---- Reading ----
+def read_index(idx_path: str) -> List[Dict[str, Any]]:
+    blocks = []
+    if not os.path.exists(idx_path):
+        return blocks
+    with open(idx_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                blocks.append(json.loads(line))
+            except ValueError:
+                continue  # torn write at crash time
+    return blocks
+
+
+def decode_block(block: Dict[str, Any], data: bytes) -> Iterator[Dict[str, Any]]:
+    """Decode the raw bytes of one index block."""
+    data = decompress(data, block.get("compression"))
+    if "codec" in block:
+        codec = get_codec(block["codec"])
+    elif block.get("count") is None:
+        codec = sniff_codec(data)  # unindexed tail
+    else:
+        codec = get_codec("jsonl")
+    return codec.decode_stream(data)
+
+
+class LedgerReader:
+    """Query the segmented ledger without scanning blocks that cannot match.
+
+    With ``include_workers`` (the default) the ledgers of prefork workers are
+    queried too and merged into one timestamp-ordered stream.
+    """
+
+    def __init__(self, base: str, include_workers: bool = True):
+        self.base = base
+        self.include_workers = include_workers
+        self.blocks_read = 0
+        self.blocks_skipped = 0
+
+    def query(self, start: Union[str, datetime, None] = None, end: Union[str, datetime, None] = None,
+              event_types: Optional[Iterable[str]] = None, source: Optional[str] = None
+              ) -> Iterator[Dict[str, Any]]:
+        """Yield events with ``start <= timestamp < end`` matching the filters, oldest first."""
+        lo, hi = ts_key(start), ts_key(end)
+        types = set(event_types) if event_types else None
+        bases = ledger_bases(self.base) if self.include_workers else [self.base]
+        streams = [self._query_base(b, lo, hi, types, source) for b in bases]
+        if len(streams) == 1:
+            yield from streams[0]
+        else:
+            yield from heapq.merge(*streams, key=lambda e: ts_key(e.get("timestamp")))
+
+    def _query_base(self, base: str, lo: str, hi: str, types: Optional[set],
+                    source: Optional[str]) -> Iterator[Dict[str, Any]]:
+        segments = self._open_segments(base)
+        try:
+            for f, size, blocks in segments:
+                yield from self._query_segment(f, size, blocks, lo, hi, types, source)
+        finally:
+            for f, _, _ in segments:
+                f.close()
+
+    @staticmethod
+    def _open_segments(base: str, attempts: int = 5) -> List[tuple]:
+        """(file, size, blocks) of every non-empty segment, all opened at one point in time."""
+        for attempt in range(1, attempts + 1):
+            segments = []
+            try:
+                with _segment_lock:
+                    for path in segment_paths(base):
+                        blocks = read_index(path + ".idx")
+                        f = open(path, "rb")
+                        size = os.fstat(f.fileno()).st_size
+                        if not size:
+                            f.close()
+                            continue
+                        segments.append((f, size, [b for b in blocks if b["offset"] + b["length"] <= size]))
+                return segments
+            except FileNotFoundError:
+                # renamed or compacted by another process between listing and opening
+                for f, _, _ in segments:
+                    f.close()
+                if attempt == attempts:
+                    raise
+                time.sleep(0.01)
+        return []
+
+    def _query_segment(self, f, size: int, blocks: List[Dict[str, Any]], lo: str, hi: str,
+                       types: Optional[set], source: Optional[str]) -> Iterator[Dict[str, Any]]:
+        indexed_to = max((b["offset"] + b["length"] for b in blocks), default=0)
+        if indexed_to < size:
+            blocks = blocks + [{"offset": indexed_to, "length": size - indexed_to}]
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            for block in blocks:
+                if not self._may_match(block, lo, hi, types, source):
+                    self.blocks_skipped += 1
+                    continue
+                self.blocks_read += 1
+                data = mm[block["offset"]:block["offset"] + block["length"]]
+                for entry in decode_block(block, data):
+                    if self._matches(entry, lo, hi, types, source):
+                        yield entry
+
+    @staticmethod
+    def _may_match(block: Dict[str, Any], lo: str, hi: str, types: Optional[set],
+                   source: Optional[str]) -> bool:
+        if block.get("ts_max") is not None and lo and block["ts_max"] < lo:
+            return False
+        if block.get("ts_min") is not None and hi and block["ts_min"] >= hi:
+            return False
+        if types is not None and block.get("types") is not None and not types.intersection(block["types"]):
+            return False
+        if source is not None and block.get("sources") is not None and source not in block["sources"]:
+            return False
+        return True
+
+    @staticmethod
+    def _matches(entry: Dict[str, Any], lo: str, hi: str, types: Optional[set],
+                 source: Optional[str]) -> bool:
+        if types is not None and entry.get("event_type") not in types:
+            return False
+        if source is not None:
+            payload = entry.get("payload")
+            if not isinstance(payload, dict) or payload.get("source") != source:
+                return False
+        if lo or hi:
+            k = ts_key(entry.get("timestamp"))
+            if (lo and k < lo) or (hi and k >= hi):
+                return False
+        return True
+
+
+# ---- Compaction ----
+def compact_segment(path: str, compression: str = "zlib") -> str:
+    """Rewrite a sealed segment with every index block compressed.
+
+    Returns the path of the compacted segment; the original and its sidecar
+    are removed once the compacted copy is in place.
+    """
+    out_path = path + ".z"
+    blocks = read_index(path + ".idx")
+    size = os.path.getsize(path)
+    indexed_to = max((b["offset"] + b["length"] for b in blocks), default=0)
+    if indexed_to < size:
+        blocks.append({"offset": indexed_to, "length": size - indexed_to, "count": None,
+                       "ts_min": None, "ts_max": None, "types": None, "sources": None})
+    offset = 0
+    with open(path, "rb") as src, open(out_path + ".tmp", "wb") as dst, \
+            open(out_path + ".idx.tmp", "w", encoding="utf-8") as idx:
+        for block in blocks:
+            src.seek(block["offset"])
+            data = src.read(block["length"])
+            meta = dict(block)
+            if block.get("compression", "none") == "none":
+                if block.get("count") is None and "codec" not in block:
+                    meta["codec"] = sniff_codec(data).name
+                data = compress(data, compression)
+                meta["compression"] = compression
+            dst.write(data)
+            meta.update(offset=offset, length=len(data))
+            idx.write(json.dumps(meta, ensure_ascii=False) + "\n")
+            offset += len(data)
+        dst.flush()
+        os.fsync(dst.fileno())
+        idx.flush()
+        os.fsync(idx.fileno())
+    with _segment_lock:
+        os.replace(out_path + ".idx.tmp", out_path + ".idx")
+        os.replace(out_path + ".tmp", out_path)
+        os.remove(path)
+        if os.path.exists(path + ".idx"):
+            os.remove(path + ".idx")
+    return out_path
+
+
+def compact_segments(base: str, min_age_seconds: float = 0, compression: str = "zlib") -> List[str]:
+    """Compact every sealed, uncompacted segment last modified ``min_age_seconds`` ago or earlier."""
+    compacted = []
+    cutoff = time.time() - min_age_seconds
+    with _compaction_lock:
+        for path in segment_paths(base):
+            if path == base or path.endswith(".z"):
+                continue
+            try:
+                if os.path.getmtime(path) <= cutoff:
+                    compacted.append(compact_segment(path, compression))
+            except Exception:
+                logger.exception(f"Failed to compact ledger segment {path}")
+    return compacted
+
+
+# ---- Conversion ----
+def convert_ledger(src_base: str, dst_base: str, codec: str = "bin", compression: str = "none",
+                   segment_max_bytes: int = 64 * 1024 * 1024) -> int:
+    """Re-encode every event of the ledger at ``src_base`` into ``dst_base``."""
+    writer = LedgerWriter(dst_base, max_batch=4096, max_delay=1.0, codec=codec,
+                          compression=compression, segment_max_bytes=segment_max_bytes)
+    n = 0
+    batch: List[Dict[str, Any]] = []
+    for entry in LedgerReader(src_base).query():
+        batch.append(entry)
+        if len(batch) >= 4096:
+            writer.append_many(batch)
+            n += len(batch)
+            batch = []
+    writer.append_many(batch)
+    n += len(batch)
+    writer.close(timeout=None)
+    return n
+
+
+def _main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(prog="ledger.py", description="Codex ledger maintenance tool")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    conv = sub.add_parser("convert", help="re-encode a ledger with another codec/compression")
+    conv.add_argument("src")
+    conv.add_argument("dst")
+    conv.add_argument("--codec", default="bin")
+    conv.add_argument("--compression", default="none")
+    comp = sub.add_parser("compact", help="compress sealed segments (worker ledgers included)")
+    comp.add_argument("base")
+    comp.add_argument("--min-age", type=float, default=0)
+    comp.add_argument("--compression", default="zlib")
+    query = sub.add_parser("query", help="print matching events as JSON lines")
+    query.add_argument("base")
+    query.add_argument("--start")
+    query.add_argument("--end")
+    query.add_argument("--type", action="append", dest="types")
+    query.add_argument("--source")
+    args = parser.parse_args(argv)
+
+    if args.cmd == "convert":
+        n = convert_ledger(args.src, args.dst, args.codec, args.compression)
+        print(f"converted {n} events to {args.dst} ({args.codec}, {args.compression})")
+    elif args.cmd == "compact":
+        for base in ledger_bases(args.base):
+            for path in compact_segments(base, args.min_age, args.compression):
+                print(path)
+    else:
+        for entry in LedgerReader(args.base).query(args.start, args.end, args.types, args.source):
+            sys.stdout.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
@@ -0,0 +1,253 @@
+"""
+orchestrator/ledger_codecs.py
+
+Record encodings and block compressors for the codex ledger.
+
+Codecs turn one ledger event (a dict or a ``records.LedgerEvent``) into bytes and a block of bytes back into
+events:
+
+  jsonl    one JSON document per line (default, human readable), encoded
+           with the fastest available JSON backend (codec.py)
+  bin      length-prefixed records, body packed with a stdlib ``struct``
+           tag/length/value encoding
+  msgpack  length-prefixed records, body packed with msgpack
+           (only when the ``msgpack`` package is installed)
+
+Compressors apply to whole index blocks: ``none``, ``zlib`` and, when the
+``zstandard`` package is installed, ``zstd``.
+"""
+
+from __future__ import annotations
+
+import struct
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+import codec
+
+try:
+    import msgpack  # type: ignore
+except Exception:
+    msgpack = None  # type: ignore
+
+try:
+    import zstandard  # type: ignore
+except Exception:
+    zstandard = None  # type: ignore
+
+
+class JsonLinesCodec:
+    name = "jsonl"
+
+    def encode(self, entry: Dict[str, Any]) -> bytes:
+        return codec.dumps(entry) + b"\n"
+
+    def decode_stream(self, data: bytes) -> Iterator[Dict[str, Any]]:
+        for line in data.splitlines():
+            if not line:
+                continue
+            try:
+                yield codec.loads(line)
+            except ValueError:
+                continue  # torn write at crash time
+
+
+# ---- stdlib tag/length/value packing ----
+_NONE, _FALSE, _TRUE, _INT8, _INT32, _INT64, _FLOAT, _STR8, _STR32, _LIST, _DICT, _BIGINT = range(12)
+
+_u32 = struct.Struct(">I")
+_i8 = struct.Struct(">Bb")
+_i32 = struct.Struct(">Bi")
+_i64 = struct.Struct(">Bq")
+_f64 = struct.Struct(">Bd")
+_tag_len8 = struct.Struct(">BB")
+_tag_len32 = struct.Struct(">BI")
+
+
+def _pack(obj: Any, out: bytearray):
+    if obj is None:
+        out.append(_NONE)
+    elif obj is True:
+        out.append(_TRUE)
+    elif obj is False:
+        out.append(_FALSE)
+    elif isinstance(obj, int):
+        if -128 <= obj < 128:
+            out += _i8.pack(_INT8, obj)
+        elif -2**31 <= obj < 2**31:
+            out += _i32.pack(_INT32, obj)
+        elif -2**63 <= obj < 2**63:
+            out += _i64.pack(_INT64, obj)
+        else:
+            raw = str(obj).encode("ascii")
+            out += _tag_len32.pack(_BIGINT, len(raw))
+            out += raw
+    elif isinstance(obj, float):
+        out += _f64.pack(_FLOAT, obj)
+    elif isinstance(obj, str):
+        raw = obj.encode("utf-8")
+        if len(raw) < 256:
+            out += _tag_len8.pack(_STR8, len(raw))
+        else:
+            out += _tag_len32.pack(_STR32, len(raw))
+        out += raw
+    elif isinstance(obj, (list, tuple)):
+        out += _tag_len32.pack(_LIST, len(obj))
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, (dict, Mapping)):
+        out += _tag_len32.pack(_DICT, len(obj))
+        for key, value in obj.items():
+            _pack(str(key), out)
+            _pack(value, out)
+    else:
+        _pack(str(obj), out)  # same fallback as json.dumps(default=str)
+
+
+def _unpack(buf: bytes, pos: int) -> Tuple[Any, int]:
+    tag = buf[pos]
+    pos += 1
+    if tag == _STR8:
+        n = buf[pos]
+        pos += 1
+        return buf[pos:pos + n].decode("utf-8"), pos + n
+    if tag == _DICT:
+        (n,) = _u32.unpack_from(buf, pos)
+        pos += 4
+        d = {}
+        for _ in range(n):
+            key, pos = _unpack(buf, pos)
+            d[key], pos = _unpack(buf, pos)
+        return d, pos
+    if tag == _INT8:
+        return struct.unpack_from(">b", buf, pos)[0], pos + 1
+    if tag == _INT32:
+        return struct.unpack_from(">i", buf, pos)[0], pos + 4
+    if tag == _INT64:
+        return struct.unpack_from(">q", buf, pos)[0], pos + 8
+    if tag == _FLOAT:
+        return struct.unpack_from(">d", buf, pos)[0], pos + 8
+    if tag == _STR32:
+        (n,) = _u32.unpack_from(buf, pos)
+        pos += 4
+        return buf[pos:pos + n].decode("utf-8"), pos + n
+    if tag == _LIST:
+        (n,) = _u32.unpack_from(buf, pos)
+        pos += 4
+        items = []
+        for _ in range(n):
+            item, pos = _unpack(buf, pos)
+            items.append(item)
+        return items, pos
+    if tag == _NONE:
+        return None, pos
+    if tag == _TRUE:
+        return True, pos
+    if tag == _FALSE:
+        return False, pos
+    if tag == _BIGINT:
+        (n,) = _u32.unpack_from(buf, pos)
+        pos += 4
+        return int(buf[pos:pos + n].decode("ascii")), pos + n
+    raise ValueError(f"unknown tag {tag} at offset {pos - 1}")
+
+
+class _LengthPrefixedCodec(ABC):
+    """Records framed as ``u32 length + body``; subclasses pack the body."""
+
+    name = ""
+
+    @abstractmethod
+    def _dumps(self, entry: Dict[str, Any]) -> bytes:
+        """Body bytes of one record."""
+
+    @abstractmethod
+    def _loads(self, body: bytes) -> Dict[str, Any]:
+        """Record from its body bytes; may raise ValueError and friends on a corrupt body."""
+
+    def encode(self, entry: Dict[str, Any]) -> bytes:
+        body = self._dumps(entry)
+        return _u32.pack(len(body)) + body
+
+    def decode_stream(self, data: bytes) -> Iterator[Dict[str, Any]]:
+        pos, end = 0, len(data)
+        while pos + 4 <= end:
+            (n,) = _u32.unpack_from(data, pos)
+            pos += 4
+            if pos + n > end:
+                return  # torn write at crash time
+            try:
+                yield self._loads(data[pos:pos + n])
+            except (ValueError, IndexError, struct.error, UnicodeDecodeError):
+                pass
+            pos += n
+
+
+class BinaryCodec(_LengthPrefixedCodec):
+    name = "bin"
+
+    def _dumps(self, entry: Dict[str, Any]) -> bytes:
+        out = bytearray()
+        _pack(entry, out)
+        return bytes(out)
+
+    def _loads(self, body: bytes) -> Dict[str, Any]:
+        return _unpack(body, 0)[0]
+
+
+def _msgpack_default(obj: Any) -> Any:
+    return dict(obj) if isinstance(obj, Mapping) else str(obj)
+
+
+class MsgpackCodec(_LengthPrefixedCodec):
+    name = "msgpack"
+
+    def _dumps(self, entry: Dict[str, Any]) -> bytes:
+        return msgpack.packb(entry, use_bin_type=True, default=_msgpack_default)
+
+    def _loads(self, body: bytes) -> Dict[str, Any]:
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+
+
+CODECS: Dict[str, Any] = {"jsonl": JsonLinesCodec(), "bin": BinaryCodec()}
+if msgpack is not None:
+    CODECS["msgpack"] = MsgpackCodec()
+
+COMPRESSORS: Dict[str, Optional[Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]] = {
+    "none": None,
+    "zlib": (lambda b: zlib.compress(b, 6), zlib.decompress),
+}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = (
+        lambda b: zstandard.ZstdCompressor(level=3).compress(b),
+        lambda b: zstandard.ZstdDecompressor().decompress(b),
+    )
+
+
+def get_codec(name: str):
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(f"unknown ledger codec {name!r}; available: {sorted(CODECS)}") from None
+
+
+def compress(data: bytes, name: str) -> bytes:
+    if name not in COMPRESSORS:
+        raise ValueError(f"unknown ledger compression {name!r}; available: {sorted(COMPRESSORS)}")
+    pair = COMPRESSORS[name]
+    return pair[0](data) if pair else data
+
+
+def decompress(data: bytes, name: Optional[str]) -> bytes:
+    if not name or name == "none":
+        return data
+    if name not in COMPRESSORS:
+        raise ValueError(f"ledger block uses unavailable compression {name!r}")
+    return COMPRESSORS[name][1](data)
+
+
+def sniff_codec(data: bytes):
+    """Best guess for blocks without index metadata: JSON lines start with '{'."""
+    return CODECS["jsonl"] if data[:1] in (b"{", b"\n") else CODECS["bin"]
@@ -0,0 +1,114 @@
+"""
+orchestrator/local_analyzer.py
+
+In-process keyword/n-gram scorer used when Mind Nexus cannot answer.
+
+  LocalAnalyzer  scores a scroll as ``bias`` plus the weights of the distinct
+                 vocabulary terms (single words and two-word phrases) it
+                 contains, clamped to 1..99.  Each term counts once, so
+                 keyword stuffing does not inflate a score.
+
+The vocabulary is compiled once into a dict and frozensets.  Scoring stays in
+C builtins rather than a per-token Python loop: ASCII text is tokenized with
+``str.translate`` + ``split`` (a regex is used for other text), single words
+are found by one set intersection, and phrases are only looked up when their
+first word occurs (a substring test for a few candidates, one intersection
+over the text's bigrams for many).  Nothing is mutated after construction,
+so one instance is shared freely across threads and event loops.
+
+A vocabulary file is JSON::
+
+    {"bias": 50, "terms": {"legendary": 25, "first edition": 15, "spam": -40}}
+
+Without one the built-in ``DEFAULT_TERMS`` are used.  The analyzer is a
+degraded-mode approximation of Mind Nexus, not a replacement: its results are
+marked as fallbacks unless they come from the pre-filter.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+# Score points added (or removed) by each term; tuned so that one strong
+# marker plus a supporting one reaches the default NFT threshold of 85.
+DEFAULT_TERMS: Dict[str, float] = {
+    "legendary": 25, "mythic": 25, "prophecy": 20, "rare": 15, "relic": 15, "artifact": 12,
+    "ancient": 12, "genesis": 12, "sacred": 10, "fire": 8, "flame": 8, "oracle": 10,
+    "first edition": 15, "signed": 8, "original": 8,
+    "test": -25, "testing": -25, "spam": -40, "lorem": -30, "ipsum": -30, "asdf": -40,
+    "draft": -10, "todo": -15, "duplicate": -20, "placeholder": -25, "hello world": -20,
+}
+
+_TOKEN = re.compile(r"\w+")
+# ASCII characters outside \w become separators (same tokens as _TOKEN)
+_ASCII_SEPARATORS = str.maketrans({i: " " for i in range(128) if not (chr(i).isalnum() or chr(i) == "_")})
+_MAX_PATTERNS = 5
+# above ~this many candidate phrases per token, scanning the text's bigrams
+# is cheaper than one substring test per candidate
+_SUBSTRING_COST = 4
+
+
+class LocalAnalyzer:
+    def __init__(self, terms: Optional[Mapping[str, float]] = None, bias: float = 50.0):
+        terms = DEFAULT_TERMS if terms is None else terms
+        self.bias = float(bias)
+        # normalise keys the same way scroll text is tokenized
+        self._weights: Dict[str, float] = {}
+        for term, weight in terms.items():
+            words = _TOKEN.findall(term.lower())
+            if len(words) > 2:
+                raise ValueError(f"vocabulary terms are one or two words, got {term!r}")
+            if words and weight:
+                self._weights[" ".join(words)] = float(weight)
+        self._words = frozenset(t for t in self._weights if " " not in t)
+        self._bigrams = frozenset(t for t in self._weights if " " in t)
+        # phrases grouped by first word, padded for a whole-word substring test
+        self._phrases: Dict[str, List[tuple]] = {}
+        for term in self._bigrams:
+            self._phrases.setdefault(term.split(" ", 1)[0], []).append((term, f" {term} "))
+        self._phrase_counts = {start: len(p) for start, p in self._phrases.items()}
+        self._phrase_starts = frozenset(self._phrases)
+
+    @classmethod
+    def from_file(cls, path: str) -> "LocalAnalyzer":
+        with open(path, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+        return cls(spec.get("terms", {}), bias=spec.get("bias", 50.0))
+
+    def __len__(self) -> int:
+        return len(self._weights)
+
+    def _found(self, raw: str) -> frozenset:
+        text = raw.lower()
+        tokens = text.translate(_ASCII_SEPARATORS).split() if text.isascii() else _TOKEN.findall(text)
+        found = self._words.intersection(tokens)
+        starts = self._phrase_starts.intersection(tokens)
+        if not starts:
+            return found
+        if sum(map(self._phrase_counts.__getitem__, starts)) * _SUBSTRING_COST > len(tokens):
+            return found | self._bigrams.intersection(map(" ".join, zip(tokens, tokens[1:])))
+        joined = f" {' '.join(tokens)} "
+        return found.union(term for start in starts for term, padded in self._phrases[start] if padded in joined)
+
+    def _clamp(self, found) -> int:
+        total = self.bias + sum(map(self._weights.__getitem__, found))
+        return int(min(99.0, max(1.0, round(total))))
+
+    def score(self, raw: str) -> int:
+        return self._clamp(self._found(raw))
+
+    def score_many(self, raws: Iterable[str]) -> List[int]:
+        return [self._clamp(self._found(raw)) for raw in raws]
+
+    def analyze(self, raw: str, notes: str = "local") -> Dict[str, Any]:
+        """Analysis dict shaped like a Mind Nexus response (minus the timestamp)."""
+        found = self._found(raw)
+        score = self._clamp(found)
+        return {
+            "patterns": sorted(found, key=lambda t: -abs(self._weights[t]))[:_MAX_PATTERNS],
+            "sentiment": "positive" if score > self.bias else "negative" if score < self.bias else "neutral",
+            "value_score": score,
+            "notes": notes,
+        }
@@ -0,0 +1,170 @@
+"""
+orchestrator/logging_setup.py
+
+Non-blocking logging for the orchestrator.
+
+Producers (event-loop code and executor threads) only format the record and
+put it on a bounded queue through ``QueueHandler``; a single
+``QueueListener`` thread does the file and stderr I/O.  When the queue is
+full the record is dropped and counted instead of blocking the caller.
+
+Hot-path INFO messages carry ``extra={"stage": ...}`` and can be sampled per
+stage (``log_sample_rates``, e.g. ``{"ingest": 0.01}``); records at WARNING
+and above are never sampled out.  ``log_json`` switches to one JSON object
+per line, including the active trace ID when tracing is on.
+
+Nothing happens at import time: entry points call ``configure_logging``
+(server.py, the supremehead CLI); a library user who never does gets the
+standard library's default handling.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from tracing import current_span
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(message)s"
+
+# attributes of a bare LogRecord; anything else came in through ``extra``
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+_listener: Optional["_Listener"] = None
+_queue_handler: Optional["NonBlockingQueueHandler"] = None
+
+
+class StageSampler(logging.Filter):
+    """Keep a ``rates[stage]`` fraction of sub-WARNING records tagged with that stage."""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = dict(rates)
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, "stage", None))
+        if rate is None or rate >= 1.0 or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records when the queue is full."""
+
+    def __init__(self, q: "queue.Queue"):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # the listener thread cannot see this context's span
+        span = current_span()
+        if span is not None:
+            record.trace_id = span.trace_id
+        return super().prepare(record)
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        # the stop sentinel must not be lost to a full queue; the listener is
+        # draining it, so a blocking put completes
+        self.queue.put(self._sentinel)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat().replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and key not in entry:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure_logging(config: Optional[Dict[str, Any]] = None) -> logging.handlers.QueueListener:
+    """Route the root logger through a queue to file/stderr handlers.
+
+    Recognised config keys (all optional): ``log_level``, ``log_file``
+    (``None`` disables the file), ``log_stderr``, ``log_json``,
+    ``log_queue_size``, ``log_sample_rates``.  Calling it again replaces the
+    previous setup.
+    """
+    global _listener, _queue_handler
+    config = config or {}
+    shutdown_logging()
+
+    formatter: logging.Formatter = JsonFormatter() if config.get("log_json") else logging.Formatter(TEXT_FORMAT)
+    handlers = []
+    log_file = config.get("log_file", os.path.join(os.environ.get("TRIUMV_LOG_DIR", "."), "supremehead.log"))
+    if log_file:
+        directory = os.path.dirname(log_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        handlers.append(logging.FileHandler(log_file))
+    if config.get("log_stderr", True):
+        handlers.append(logging.StreamHandler(sys.stderr))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    q: "queue.Queue" = queue.Queue(maxsize=int(config.get("log_queue_size", 10000)))
+    _queue_handler = NonBlockingQueueHandler(q)
+    rates = config.get("log_sample_rates") or {}
+    if rates:
+        _queue_handler.addFilter(StageSampler(rates))
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(config.get("log_level", "INFO"))
+
+    _listener = _Listener(q, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Drain the queue, stop the listener thread and close its handlers."""
+    global _listener, _queue_handler
+    listener, _listener = _listener, None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if listener is not None:
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def logging_stats() -> Dict[str, int]:
+    handler = _queue_handler
+    if handler is None:
+        return {"queued": 0, "dropped": 0, "sampled_out": 0}
+    sampled_out = sum(f.sampled_out for f in handler.filters if isinstance(f, StageSampler))
+    return {"queued": handler.queue.qsize(), "dropped": handler.dropped, "sampled_out": sampled_out}
+
+
+atexit.register(shutdown_logging)
@@ -9,5 +9,12 @@ def store():
     print("Stored:", data.get("scroll", {}).get("source"))
     return jsonify({"status":"ok","received": True})
 
+@app.route("/store_batch", methods=["POST"])
+def store_batch():
+    # body: {"items": [{"scroll": ..., "analysis": ...}, ...]}
+    items = (request.json or {}).get("items", [])
+    print("Stored batch:", len(items))
+    return jsonify({"status":"ok","received": len(items)})
+
 if __name__ == "__main__":
     app.run(port=3000)
@@ -0,0 +1,268 @@
+"""
+orchestrator/metrics.py
+
+In-process metrics rendered in the Prometheus text exposition format
+(version 0.0.4), with no dependency on prometheus_client or a live server.
+
+  Counter    monotonically increasing, optionally labelled
+  Gauge      set/inc/dec, or a callback sampled at scrape time
+  Histogram  cumulative buckets + sum + count, optionally labelled
+
+Recording is the hot path and is kept cheap: a labelled child is looked up
+once per label tuple and then updated under its own lock, and ``Histogram``
+locates the bucket with ``bisect``.  Everything that can be read from an
+existing ``stats()`` method (ledger, caches, queues) is collected lazily by
+callbacks when ``/metrics`` is scraped rather than mirrored on every call.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# seconds; covers sub-millisecond cache hits up to multi-second retries
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 fn: Optional[Callable[[], object]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._fn = fn
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def _child(self, labels: Tuple[str, ...]):
+        child = self._children.get(labels)
+        if child is None:
+            if len(labels) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+            with self._lock:
+                child = self._children.setdefault(labels, self._new_child())
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """Value holder for one label combination."""
+
+    @abstractmethod
+    def _samples(self) -> Iterable[Tuple[str, str, float]]:
+        """(name suffix, rendered labels, value) of every exposed sample."""
+
+    def _sampled(self) -> Iterable[Tuple[str, str, float]]:
+        # ``fn`` returns a number for an unlabelled metric, or a mapping of
+        # label value (or tuple of values) -> number for a labelled one
+        try:
+            sampled = self._fn()
+        except Exception:
+            return  # a broken collector must not take down the whole scrape
+        if not isinstance(sampled, dict):
+            sampled = {(): sampled}
+        for labels, value in sorted(sampled.items()):
+            labels = labels if isinstance(labels, tuple) else (labels,)
+            yield "", _format_labels(self.labelnames, labels), float(value)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class _Value:
+    __slots__ = ("value", "lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+
+class Counter(_Metric):
+    """A monotonically increasing count, or one sampled from ``fn`` at scrape time.
+
+    Names carry their ``_total`` suffix explicitly.
+    """
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        child = self._child(labels)
+        with child.lock:
+            child.value += amount
+
+    def value(self, *labels: str) -> float:
+        child = self._children.get(labels)
+        return child.value if child is not None else 0.0
+
+    def _samples(self):
+        if self._fn is not None:
+            yield from self._sampled()
+            return
+        for labels, child in sorted(self._children.items()):
+            yield "", _format_labels(self.labelnames, labels), child.value
+
+
+class Gauge(_Metric):
+    """A gauge set directly, or sampled from ``fn`` at scrape time."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def set(self, value: float, *labels: str):
+        self._child(labels).value = value
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        child = self._child(labels)
+        with child.lock:
+            child.value += amount
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def value(self, *labels: str) -> float:
+        child = self._children.get(labels)
+        return child.value if child is not None else 0.0
+
+    def _samples(self):
+        if self._fn is not None:
+            yield from self._sampled()
+            return
+        for labels, child in sorted(self._children.items()):
+            yield "", _format_labels(self.labelnames, labels), child.value
+
+
+class _HistogramChild:
+    __slots__ = ("counts", "sum", "lock")
+
+    def __init__(self, n: int):
+        self.counts = [0] * n
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_start")
+
+    def __init__(self, histogram: "Histogram", labels: Tuple[str, ...]):
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._start, *self._labels)
+        return False
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def _new_child(self):
+        return _HistogramChild(len(self.buckets))
+
+    def observe(self, value: float, *labels: str):
+        child = self._child(labels)
+        i = bisect_left(self.buckets, value)
+        with child.lock:
+            child.counts[i] += 1
+            child.sum += value
+
+    def time(self, *labels: str) -> _Timer:
+        """``with histogram.time("stage"):`` observes the block's duration."""
+        return _Timer(self, labels)
+
+    def count(self, *labels: str) -> int:
+        child = self._children.get(labels)
+        return sum(child.counts) if child is not None else 0
+
+    def _samples(self):
+        for labels, child in sorted(self._children.items()):
+            with child.lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                le = 'le="' + _format_value(bound) + '"'
+                yield "_bucket", _format_labels(self.labelnames, labels, le), cumulative
+            yield "_sum", _format_labels(self.labelnames, labels), total
+            yield "_count", _format_labels(self.labelnames, labels), cumulative
+
+
+class MetricsRegistry:
+    """Owns a set of metrics and renders them for ``/metrics``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                fn: Optional[Callable[[], object]] = None) -> Counter:
+        return self._register(Counter(name, documentation, labelnames, fn))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              fn: Optional[Callable[[], object]] = None) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames, fn))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
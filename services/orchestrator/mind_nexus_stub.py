@@ -3,17 +3,29 @@ from flask import Flask, request, jsonify
 import random
 app = Flask(__name__)
 
-@app.route("/analyze", methods=["POST"])
-def analyze():
-    payload = request.json or {}
+
+def _score(payload):
     text = payload.get("raw", "")
     score = min(99, max(1, 50 + len(text) % 50 + (1 if "fire" in text else 0)))
-    return jsonify({
+    return {
         "patterns": ["temporal"],
         "sentiment": "positive" if "good" in text else "neutral",
         "value_score": score,
         "timestamp": "placeholder"
-    })
+    }
+
+
+@app.route("/analyze", methods=["POST"])
+def analyze():
+    return jsonify(_score(request.json or {}))
+
+
+@app.route("/analyze_batch", methods=["POST"])
+def analyze_batch():
+    # body: {"items": [{"raw": ..., "meta": ...}, ...]} -> results in the same order
+    items = (request.json or {}).get("items", [])
+    return jsonify({"results": [_score(item) for item in items]})
+
 
 if __name__ == "__main__":
     app.run(port=3001)
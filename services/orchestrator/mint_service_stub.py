@@ -0,0 +1,52 @@
+# minimal mint service stand-in (for local dev and benchmarks)
+# Every call is one "transaction": it costs MINT_TX_LATENCY_MS plus
+# MINT_ITEM_LATENCY_MS per scroll and one MINT_TX_FEE, however many scrolls it mints.
+import hashlib
+import itertools
+import os
+import threading
+import time
+
+from flask import Flask, request, jsonify
+app = Flask(__name__)
+
+TX_LATENCY = float(os.environ.get("MINT_TX_LATENCY_MS", "50")) / 1000.0
+ITEM_LATENCY = float(os.environ.get("MINT_ITEM_LATENCY_MS", "1")) / 1000.0
+TX_FEE = float(os.environ.get("MINT_TX_FEE", "1.0"))
+
+_lock = threading.Lock()
+_tx_ids = itertools.count(1)
+_totals = {"transactions": 0, "minted": 0, "fees": 0.0}
+
+
+def _transaction(items):
+    time.sleep(TX_LATENCY + ITEM_LATENCY * len(items))
+    with _lock:
+        tx_id = next(_tx_ids)
+        _totals["transactions"] += 1
+        _totals["minted"] += len(items)
+        _totals["fees"] += TX_FEE
+    tx = hashlib.sha256(f"tx-{tx_id}".encode()).hexdigest()[:32]
+    return [{"status": "mint_triggered", "tx": tx, "token_id": f"{tx_id}-{i}"} for i in range(len(items))]
+
+
+@app.route("/mint", methods=["POST"])
+def mint():
+    return jsonify(_transaction([request.json or {}])[0])
+
+
+@app.route("/mint_batch", methods=["POST"])
+def mint_batch():
+    # body: {"items": [{"raw": ..., "value_score": ...}, ...]} -> results in the same order
+    items = (request.json or {}).get("items", [])
+    return jsonify({"results": _transaction(items)})
+
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    with _lock:
+        return jsonify(dict(_totals))
+
+
+if __name__ == "__main__":
+    app.run(port=int(os.environ.get("MINT_SERVICE_PORT", "4000")), threaded=True)
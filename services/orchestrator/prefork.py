@@ -0,0 +1,265 @@
+"""
+orchestrator/prefork.py
+
+Prefork mode for server.py: a supervisor process runs N copies of the aiohttp
+app so ingest work that holds the GIL (JSON, scroll construction, the sync
+client path) can use more than one core.
+
+Workers share the listening port with ``SO_REUSEPORT``, each binding its own
+socket so the kernel spreads new connections across them.  The supervisor
+binds the port first without listening on it, which reserves it (and resolves
+port 0) without ever being handed a connection.  Where ``SO_REUSEPORT`` is
+not available the supervisor listens itself and hands the one socket to every
+worker, which then accept from it in turn.
+
+Each worker is a full ``SupremeHead`` with its own ledger segments
+(``<codex_ledger_path>.w<N>``), write-behind spill journal, span file and
+work queue, so no file has more than one writer; ``LedgerReader`` merges the
+worker ledgers back into one stream.  On start the supervisor moves jobs
+left in work queues no worker will open (after a change of ``--workers``)
+into the live ones (``workqueue.rehome_worker_queues``).
+
+In-memory state is per worker too: the analysis cache, the admission
+limits (``admission_max_inflight`` applies to each worker, so the server
+admits up to N times that), circuit breakers and the scheduler's lanes.
+Idempotency keys are the exception: completed and running keys are also
+recorded in ``idempotency_shared_path``, one SQLite file for all workers,
+so a retry that lands on another worker is still deduplicated.
+
+Health: every worker rewrites ``worker-<N>.json`` in a shared state directory
+once per ``heartbeat_interval``, and ``GET /health`` on any worker rolls those
+files up.  A worker whose heartbeat is older than ``STALE_HEARTBEATS``
+intervals, or that is draining, counts as unhealthy.
+
+Shutdown: SIGTERM (or SIGINT) on the supervisor is forwarded to the workers.
+Each worker stops accepting, lets in-flight requests finish for up to
+``drain_timeout`` seconds, flushes its ledger and exits; stragglers are
+killed.  A worker that dies on its own is restarted.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("orchestrator.prefork")
+
+WORKER_ENV = "ORCHESTRATOR_WORKER_ID"
+STATE_DIR_ENV = "ORCHESTRATOR_STATE_DIR"
+HEARTBEAT_ENV = "ORCHESTRATOR_HEARTBEAT_SECONDS"
+
+STALE_HEARTBEATS = 3  # missed heartbeats before a worker counts as unhealthy
+REUSEPORT_AVAILABLE = hasattr(socket, "SO_REUSEPORT")
+
+
+def bind_socket(host: str, port: int, reuse_port: bool, listen: bool = True,
+                backlog: int = 128) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    if listen:
+        sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+
+# ---- shared worker state ----
+def _state_path(state_dir: str, name: str) -> str:
+    return os.path.join(state_dir, name + ".json")
+
+
+def write_state(state_dir: str, name: str, state: Dict[str, Any]):
+    """Atomically replace ``<state_dir>/<name>.json``."""
+    path = _state_path(state_dir, name)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def remove_state(state_dir: str, name: str):
+    try:
+        os.remove(_state_path(state_dir, name))
+    except FileNotFoundError:
+        pass
+
+
+def read_states(state_dir: str, heartbeat_interval: float = 1.0) -> Dict[str, Any]:
+    """Roll the supervisor and worker state files up into a health summary."""
+    now = time.time()
+    supervisor: Dict[str, Any] = {}
+    workers: List[Dict[str, Any]] = []
+    try:
+        names = sorted(os.listdir(state_dir))
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(state_dir, name), "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue  # removed or being replaced
+        if name == "supervisor.json":
+            supervisor = state
+        elif name.startswith("worker-"):
+            age = now - state.get("heartbeat", 0)
+            state["heartbeat_age_seconds"] = round(age, 3)
+            state["healthy"] = age < STALE_HEARTBEATS * heartbeat_interval and not state.get("draining")
+            workers.append(state)
+    workers.sort(key=lambda s: s.get("worker_id", 0))
+    healthy = sum(1 for s in workers if s["healthy"])
+    expected = supervisor.get("workers", len(workers))
+    return {
+        "status": "ok" if healthy >= expected else "degraded",
+        "workers_expected": expected,
+        "workers_healthy": healthy,
+        "workers": workers,
+    }
+
+
+# ---- worker process ----
+def _worker_main(worker_id: int, config_path: str, host: str, port: int,
+                 sock: Optional[socket.socket], state_dir: str, drain_timeout: float,
+                 heartbeat_interval: float):
+    os.environ["ORCHESTRATOR_CONFIG"] = config_path
+    os.environ[WORKER_ENV] = str(worker_id)
+    os.environ[STATE_DIR_ENV] = state_dir
+    os.environ[HEARTBEAT_ENV] = str(heartbeat_interval)
+
+    from aiohttp import web
+
+    import server
+    from logging_setup import configure_logging
+    from supremehead import SupremeHead
+
+    configure_logging(SupremeHead.load_config(config_path))
+    if sock is None:
+        sock = bind_socket(host, port, reuse_port=True)
+    logger.info("Worker %d (pid %d) serving on port %d", worker_id, os.getpid(), port)
+    web.run_app(server.make_app(), sock=sock, shutdown_timeout=drain_timeout,
+                access_log=server.logger, print=None)
+
+
+# ---- supervisor ----
+class Supervisor:
+    """Starts, restarts and drains ``workers`` server processes on one port."""
+
+    def __init__(self, workers: int, port: int, host: str = "0.0.0.0",
+                 config_path: str = "config.json", drain_timeout: float = 30.0,
+                 heartbeat_interval: float = 1.0, state_dir: Optional[str] = None):
+        self.workers = max(1, workers)
+        self.host = host
+        self.port = port
+        self.config_path = config_path
+        self.drain_timeout = drain_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self._own_state_dir = state_dir is None
+        self.state_dir = state_dir or tempfile.mkdtemp(prefix="orchestrator-workers-")
+        self._ctx = multiprocessing.get_context("spawn")
+        self._procs: Dict[int, multiprocessing.process.BaseProcess] = {}
+        self._sock: Optional[socket.socket] = None
+        self._stop = threading.Event()
+        self.restarts = 0
+
+    def _spawn(self, worker_id: int):
+        sock = None if REUSEPORT_AVAILABLE else self._sock
+        proc = self._ctx.Process(
+            target=_worker_main, name=f"orchestrator-worker-{worker_id}",
+            args=(worker_id, self.config_path, self.host, self.port, sock, self.state_dir,
+                  self.drain_timeout, self.heartbeat_interval),
+        )
+        proc.start()
+        self._procs[worker_id] = proc
+
+    def start(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        self._rehome_work_queues()
+        # reserve the port (and learn it, for port 0); only listen here when
+        # the socket is handed to the workers
+        self._sock = bind_socket(self.host, self.port, reuse_port=REUSEPORT_AVAILABLE,
+                                 listen=not REUSEPORT_AVAILABLE)
+        self.port = self._sock.getsockname()[1]
+        write_state(self.state_dir, "supervisor", {
+            "pid": os.getpid(), "workers": self.workers, "port": self.port,
+            "reuse_port": REUSEPORT_AVAILABLE, "started_at": time.time(),
+        })
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+        logger.info("Supervisor %d started %d workers on port %d (%s)", os.getpid(), self.workers,
+                    self.port, "SO_REUSEPORT" if REUSEPORT_AVAILABLE else "shared socket")
+
+    def _rehome_work_queues(self):
+        from supremehead import LOG_DIR, SupremeHead
+        from workqueue import rehome_worker_queues
+
+        config = SupremeHead.load_config(self.config_path)
+        if not config.get("work_queue_enabled", False):
+            return
+        base = config.get("work_queue_path") or os.path.join(LOG_DIR, "work_queue.sqlite3")
+        moved = rehome_worker_queues(base, self.workers)
+        if moved:
+            logger.info("Re-homed %d queued jobs across %d workers", moved, self.workers)
+
+    def stop(self):
+        """Ask the supervise loop to drain the workers and return."""
+        self._stop.set()
+
+    def supervise(self, poll_interval: float = 0.5):
+        """Restart dead workers until ``stop``, then drain them."""
+        while not self._stop.wait(poll_interval):
+            for worker_id, proc in list(self._procs.items()):
+                if proc.is_alive() or self._stop.is_set():
+                    continue
+                logger.warning("Worker %d (pid %s) exited with %s; restarting",
+                               worker_id, proc.pid, proc.exitcode)
+                remove_state(self.state_dir, f"worker-{worker_id}")
+                self.restarts += 1
+                self._spawn(worker_id)
+        self.shutdown()
+
+    def shutdown(self):
+        procs = [p for p in self._procs.values() if p.is_alive()]
+        logger.info("Draining %d workers (timeout %.0fs)", len(procs), self.drain_timeout)
+        for proc in procs:
+            try:
+                os.kill(proc.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + self.drain_timeout + 5
+        for proc in procs:
+            proc.join(max(0.0, deadline - time.monotonic()))
+            if proc.is_alive():
+                logger.warning("Worker pid %d did not drain in time; killing", proc.pid)
+                proc.kill()
+                proc.join()
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        if self._own_state_dir:
+            shutil.rmtree(self.state_dir, ignore_errors=True)
+
+    def run(self) -> int:
+        """Start, supervise until SIGTERM/SIGINT, drain; the CLI entry point."""
+        def on_signal(signum, frame):
+            logger.info("Received %s; shutting down", signal.Signals(signum).name)
+            self.stop()
+
+        signal.signal(signal.SIGTERM, on_signal)
+        signal.signal(signal.SIGINT, on_signal)
+        self.start()
+        self.supervise()
+        return 0
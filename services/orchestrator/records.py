@@ -0,0 +1,98 @@
+"""
+orchestrator/records.py
+
+Compact typed records for the objects the orchestrator creates per scroll:
+the canonical scroll, degraded-mode analyses, ledger events and ingest
+results.  They are slotted dataclasses (no per-instance ``__dict__``), so a
+ledger buffer or a batch of results holding many of them costs a fraction of
+the equivalent dicts, and field reads are attribute loads instead of hash
+lookups.
+
+The records are internal: public ``SupremeHead`` / ``MindNexusClient``
+methods return ``to_dict()`` copies, so callers keep getting plain, mutable,
+``json.dumps``-able dicts.  Each record is also a read-only ``Mapping`` over
+its fields, so internal helpers written against dicts (``_block_meta``,
+``is_fallback``) accept either.
+
+Wire conversion copies no field values: ``codec`` encodes records directly
+(orjson/msgspec as dataclasses, the stdlib as mappings), and ``from_dict``
+builds a record that references the decoded values.  Analyses coming back
+from Mind Nexus stay plain dicts (they may carry extra fields); ``Analysis``
+is what the orchestrator itself builds.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, TypeVar, Union
+
+R = TypeVar("R", bound="_Record")
+
+
+class _Record(Mapping):
+    """Mapping view over a slotted dataclass's fields."""
+
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the fields; nested records become dicts too, other values are shared."""
+        return {name: value.to_dict() if isinstance(value, _Record) else value
+                for name in self.__slots__ for value in (getattr(self, name),)}
+
+    @classmethod
+    def from_dict(cls: type[R], data: Mapping) -> R:
+        """Record from decoded wire data; unknown keys are ignored, missing ones take defaults."""
+        return cls(**{name: data[name] for name in cls.__slots__ if name in data})
+
+
+# eq=False: Mapping's __eq__ compares field-wise with records and dicts alike.
+
+@dataclass(slots=True, eq=False)
+class Scroll(_Record):
+    """A scroll as stored in Memory Core."""
+    raw: str
+    source: str
+    ingested_at: str
+
+
+@dataclass(slots=True, eq=False)
+class Analysis(_Record):
+    """An analysis built locally; the defaults are the neutral fallback."""
+    patterns: List[Any] = field(default_factory=list)
+    sentiment: str = "neutral"
+    value_score: Union[int, float] = 50
+    notes: Optional[str] = None
+    timestamp: Optional[str] = None
+
+
+@dataclass(slots=True, eq=False)
+class LedgerEvent(_Record):
+    """One codex ledger entry."""
+    event_type: str
+    timestamp: str
+    payload: Dict[str, Any]
+
+
+@dataclass(slots=True, eq=False)
+class IngestResult(_Record):
+    """Outcome of a processed scroll; failures are still reported as plain dicts with ``error``."""
+    status: str
+    action: Optional[str]
+    score: Union[int, float]
+    source: str
+    analysis: Mapping
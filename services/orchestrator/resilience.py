@@ -0,0 +1,204 @@
+"""
+orchestrator/resilience.py
+
+Fault-tolerance primitives for the orchestrator's outbound calls, mirroring
+pkg/resilience/circuit_breaker.go on the Go side:
+
+  CircuitBreaker   CLOSED -> OPEN after ``failure_threshold`` consecutive
+                   failures; OPEN rejects calls until the current backoff
+                   interval expires; HALF_OPEN lets a single probe through,
+                   whose success closes the circuit and whose failure reopens
+                   it with the next (longer) backoff interval.
+  BreakerRegistry  one breaker per downstream host, shared by every client
+                   that talks to that host.
+  RetryBudget      caps retries to a fraction of request traffic so a
+                   downstream outage cannot multiply load.
+  backoff_delay    capped exponential backoff with full jitter.
+"""
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from enum import IntEnum
+from typing import Dict, Optional, Sequence
+from urllib.parse import urlsplit
+
+
+class State(IntEnum):
+    CLOSED = 0
+    OPEN = 1
+    HALF_OPEN = 2
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a host whose circuit is OPEN."""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str = "", failure_threshold: int = 5,
+                 backoff_intervals: Sequence[float] = (5.0, 15.0, 30.0)):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.backoff_intervals = tuple(backoff_intervals) or (5.0,)
+        self._lock = threading.Lock()
+        self._state = State.CLOSED
+        self._consecutive_failures = 0
+        self._backoff_index = 0
+        self._next_retry_at = 0.0
+        self._probe_started_at: Optional[float] = None
+        # metrics
+        self.rejections = 0
+        self.transitions: Dict[str, int] = {}
+
+    @property
+    def state(self) -> State:
+        with self._lock:
+            return self._state
+
+    def allow(self) -> bool:
+        """True if a call may proceed; every allowed call must be followed by
+        ``record_success`` or ``record_failure``."""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == State.CLOSED:
+                return True
+            if self._state == State.OPEN and now >= self._next_retry_at:
+                self._transition(State.HALF_OPEN, now)
+            if self._state == State.HALF_OPEN:
+                # one probe at a time; a probe that never reported back is
+                # considered lost after the current backoff interval
+                if (self._probe_started_at is None
+                        or now - self._probe_started_at >= self._current_interval()):
+                    self._probe_started_at = now
+                    return True
+            self.rejections += 1
+            return False
+
+    def rejecting(self) -> bool:
+        """True while OPEN and inside the backoff window.
+
+        Lets callers that would otherwise queue (e.g. micro-batching) fail fast
+        without consuming the half-open probe.
+        """
+        with self._lock:
+            if self._state == State.OPEN and time.monotonic() < self._next_retry_at:
+                self.rejections += 1
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_failures = 0
+            if self._state != State.CLOSED:
+                self._transition(State.CLOSED, time.monotonic())
+
+    def record_failure(self):
+        now = time.monotonic()
+        with self._lock:
+            self._consecutive_failures += 1
+            if self._state == State.HALF_OPEN or (
+                    self._state == State.CLOSED and self._consecutive_failures >= self.failure_threshold):
+                self._transition(State.OPEN, now)
+
+    def reset(self):
+        with self._lock:
+            self._state = State.CLOSED
+            self._consecutive_failures = 0
+            self._backoff_index = 0
+            self._next_retry_at = 0.0
+            self._probe_started_at = None
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "state": self._state.name,
+                "consecutive_failures": self._consecutive_failures,
+                "rejections": self.rejections,
+                "transitions": dict(self.transitions),
+            }
+
+    # caller holds self._lock
+    def _current_interval(self) -> float:
+        return self.backoff_intervals[min(self._backoff_index, len(self.backoff_intervals) - 1)]
+
+    def _transition(self, new_state: State, now: float):
+        label = f"{self._state.name}->{new_state.name}"
+        self.transitions[label] = self.transitions.get(label, 0) + 1
+        self._state = new_state
+        self._probe_started_at = None
+        if new_state == State.OPEN:
+            self._next_retry_at = now + self._current_interval()
+            if self._backoff_index < len(self.backoff_intervals) - 1:
+                self._backoff_index += 1
+        elif new_state == State.CLOSED:
+            self._consecutive_failures = 0
+            self._backoff_index = 0
+
+
+class BreakerRegistry:
+    """Hands out one CircuitBreaker per ``host:port``."""
+
+    def __init__(self, failure_threshold: int = 5, backoff_intervals: Sequence[float] = (5.0, 15.0, 30.0)):
+        self.failure_threshold = failure_threshold
+        self.backoff_intervals = tuple(backoff_intervals)
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def for_url(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).netloc or url
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(
+                    host, self.failure_threshold, self.backoff_intervals)
+            return breaker
+
+    def breakers(self) -> Dict[str, CircuitBreaker]:
+        with self._lock:
+            return dict(self._breakers)
+
+    def stats(self) -> Dict[str, Dict[str, object]]:
+        return {host: b.stats() for host, b in self.breakers().items()}
+
+
+class RetryBudget:
+    """Token bucket allowing retries worth ``ratio`` of recent requests.
+
+    Every request deposits ``ratio`` tokens and every retry spends one.  A
+    floor of ``min_per_second`` tokens per second keeps low-traffic callers
+    able to retry at all; the balance is capped at ``max_tokens``.
+    """
+
+    def __init__(self, ratio: float = 0.2, min_per_second: float = 10.0, max_tokens: float = 100.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._lock = threading.Lock()
+        self._tokens = max_tokens
+        self._last = time.monotonic()
+        self.exhausted = 0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._last) * self.min_per_second)
+        self._last = now
+
+    def record_request(self):
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            self.exhausted += 1
+            return False
+
+
+def backoff_delay(base: float, attempt: int, cap: float = 30.0) -> float:
+    """Full-jitter exponential backoff for retry ``attempt`` (1-based)."""
+    return random.uniform(0, min(cap, base * (2 ** (attempt - 1))))
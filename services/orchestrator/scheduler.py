@@ -0,0 +1,142 @@
+"""
+orchestrator/scheduler.py
+
+Priority lanes for SupremeHead's downstream calls, so a scroll about to mint
+does not wait behind a flood of Memory Core stores.
+
+Every analyze / store / mint call on the async path takes a slot in a lane.
+At most ``max_concurrency`` calls run across all lanes, and each lane also
+has its own ``concurrency`` cap.  When a slot frees up and several lanes are
+waiting, the next one is chosen by stride scheduling: each lane advances its
+``pass`` by ``1 / weight`` per granted slot and the lowest ``pass`` goes
+next, so backlogged lanes share slots in proportion to their weights and no
+lane starves.  A lane that was idle rejoins at the current virtual time
+rather than with credit saved up while it had nothing to do.
+
+Lane selection (``lane_for``): an explicit caller priority naming a lane,
+else the scroll's source via ``source_lanes``, else ``default``.  Mints are
+always scheduled in the ``mint`` lane once the analysis has scored them.
+
+A lane governs only the call it wraps, not the scroll's whole pipeline:
+whether a scroll mints is decided by its analysis, so that analysis (like
+any store) waits in the scroll's own lane, and only the mint call itself
+jumps ahead of queued default work.  Send latency-critical scrolls with a
+priority (or from a mapped source) to speed up their analysis too.
+
+Everything runs on the event loop thread; no locks are taken.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Optional
+
+DEFAULT_LANE = "default"
+MINT_LANE = "mint"
+
+
+class Lane:
+    __slots__ = ("name", "weight", "concurrency", "inflight", "waiters", "pass_value",
+                 "granted", "waited")
+
+    def __init__(self, name: str, weight: float = 1.0, concurrency: int = 64):
+        self.name = name
+        self.weight = max(1e-3, float(weight))
+        self.concurrency = max(1, int(concurrency))
+        self.inflight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.pass_value = 0.0
+        # metrics
+        self.granted = 0
+        self.waited = 0
+
+    def queued(self) -> int:
+        return sum(1 for f in self.waiters if not f.done())
+
+    def ready(self) -> bool:
+        while self.waiters and self.waiters[0].done():
+            self.waiters.popleft()  # cancelled while queued
+        return bool(self.waiters) and self.inflight < self.concurrency
+
+
+class LaneScheduler:
+    def __init__(self, lanes: Dict[str, Dict[str, Any]], max_concurrency: int = 64,
+                 source_lanes: Optional[Dict[str, str]] = None,
+                 on_wait: Optional[Callable[[float, str], None]] = None):
+        self.max_concurrency = max(1, max_concurrency)
+        self.lanes: Dict[str, Lane] = {
+            name: Lane(name, spec.get("weight", 1.0), spec.get("concurrency", self.max_concurrency))
+            for name, spec in lanes.items()
+        }
+        for name in (DEFAULT_LANE, MINT_LANE):
+            self.lanes.setdefault(name, Lane(name, 1.0, self.max_concurrency))
+        self.source_lanes = dict(source_lanes or {})
+        self.on_wait = on_wait  # called with (seconds waited, lane name)
+        self.inflight = 0
+        self._vtime = 0.0
+
+    def lane_for(self, priority: Optional[str] = None, source: Optional[str] = None) -> str:
+        if priority in self.lanes:
+            return priority
+        lane = self.source_lanes.get(source)
+        return lane if lane in self.lanes else DEFAULT_LANE
+
+    async def acquire(self, name: str):
+        lane = self.lanes.get(name) or self.lanes[DEFAULT_LANE]
+        lane.ready()  # drop waiters cancelled at the head of the queue
+        if not lane.waiters and self.inflight < self.max_concurrency and lane.inflight < lane.concurrency:
+            self._grant(lane)
+            return
+        if not lane.waiters:
+            lane.pass_value = max(lane.pass_value, self._vtime)  # no credit for idle time
+        fut = asyncio.get_running_loop().create_future()
+        lane.waiters.append(fut)
+        lane.waited += 1
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self.release(lane.name)  # granted just as the caller went away
+            raise
+
+    def _grant(self, lane: Lane):
+        self.inflight += 1
+        lane.inflight += 1
+        lane.granted += 1
+
+    def release(self, name: str):
+        lane = self.lanes.get(name) or self.lanes[DEFAULT_LANE]
+        lane.inflight -= 1
+        self.inflight -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        while self.inflight < self.max_concurrency:
+            ready = [lane for lane in self.lanes.values() if lane.ready()]
+            if not ready:
+                return
+            lane = min(ready, key=lambda l: (l.pass_value, -l.weight))
+            self._vtime = lane.pass_value
+            lane.pass_value += 1.0 / lane.weight
+            self._grant(lane)
+            lane.waiters.popleft().set_result(None)
+
+    @contextlib.asynccontextmanager
+    async def slot(self, name: str) -> AsyncIterator[None]:
+        """``async with scheduler.slot(lane):`` around one downstream call."""
+        start = time.perf_counter()
+        await self.acquire(name)
+        if self.on_wait is not None:
+            self.on_wait(time.perf_counter() - start, name if name in self.lanes else DEFAULT_LANE)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: {"inflight": lane.inflight, "queued": lane.queued(), "granted": lane.granted,
+                       "waited": lane.waited}
+                for name, lane in self.lanes.items()}
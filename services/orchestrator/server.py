@@ -6,20 +6,53 @@ Minimal aiohttp HTTP server that exposes the SupremeHead orchestrator
 over a REST interface so the Go backend (and tests) can call it.
 
 Endpoints:
-  GET  /health   — liveness probe; returns {"status":"ok","service":"logos-orchestrator"}
-  POST /ingest   — ingest a scroll; body: {"raw": str, "source": str}
+  GET  /health   — liveness probe; returns {"status":"ok","service":"logos-orchestrator"};
+                   in prefork mode also rolls up every worker's heartbeat and
+                   answers 503 from a worker that is draining
+  GET  /metrics  — Prometheus text exposition of orchestrator metrics
+  POST /ingest   — ingest a scroll; body: {"raw": str, "source": str[, "priority": str]}
+                   (priority names a scheduler lane, e.g. "high"; see scheduler.py);
+                   a body that does not match codec.ScrollRequest is a 400.
+                   With ``idempotency_enabled``, a retry carrying the same
+                   ``Idempotency-Key`` header gets the first result back (with an
+                   ``Idempotent-Replayed: true`` header) instead of re-running;
+                   the key reused for another scroll is a 422
+  POST /ingest/batch — ingest many scrolls concurrently;
+                   body: {"scrolls": [{"raw": str, "source": str}, ...]}
+                   returns per-item results in input order
+  POST /ingest/stream — chunked NDJSON body, one {"raw", "source"[, "priority"]}
+                   object per line; streams back one NDJSON result per line in
+                   input order (each with its "line" number), then a
+                   {"summary": {"count", "failed"}} line
+
+With ``work_queue_enabled`` set, every ingest endpoint commits scrolls to the
+durable work queue (workqueue.py) and answers 202 with
+{"status": "Accepted", "job_id": int} per scroll; background workers ingest
+them afterwards, surviving restarts.
+
+With ``admission_max_inflight`` set, the ingest endpoints go through
+admission control (admission.py): /ingest and /ingest/batch answer 503 with
+``Retry-After`` when the server is shedding load, and /ingest/stream admits
+each line separately (a long stream must not hold one slot for its whole
+life) and reports shed lines as failed results.
 
 Environment variables:
   ORCHESTRATOR_PORT    TCP port to listen on (default: 5000)
   ORCHESTRATOR_CONFIG  Path to config.json (default: config.json)
+  ORCHESTRATOR_WORKERS Worker processes sharing the port (default: 1; see prefork.py)
+  ORCHESTRATOR_DRAIN_SECONDS  Grace period for in-flight requests on SIGTERM (default: 30)
 """
 
 from __future__ import annotations
 
+import argparse
 import asyncio
+import contextlib
 import logging
+import math
 import os
 import sys
+import time
 
 try:
     from aiohttp import web
@@ -27,12 +60,29 @@ except ImportError:
     print("aiohttp is required: pip install aiohttp", file=sys.stderr)
     sys.exit(1)
 
+from admission import AdmissionRejected
+import codec
+from codec import ScrollRequest, ValidationError
+from idempotency import IdempotencyConflict
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from logging_setup import configure_logging
+from prefork import HEARTBEAT_ENV, STATE_DIR_ENV, WORKER_ENV, Supervisor, read_states, remove_state, write_state
 from supremehead import SupremeHead, now_iso
+from tracing import continue_trace, end_continue
 
 logger = logging.getLogger("orchestrator.server")
 
 CONFIG_PATH = os.environ.get("ORCHESTRATOR_CONFIG", "config.json")
 
+# Set by the prefork supervisor in each worker process; None when single-process.
+WORKER_ID: int | None = int(os.environ[WORKER_ENV]) if os.environ.get(WORKER_ENV) else None
+STATE_DIR: str | None = os.environ.get(STATE_DIR_ENV)
+HEARTBEAT_SECONDS = float(os.environ.get(HEARTBEAT_ENV, "1.0"))
+
+_started_at = time.time()
+_draining = False
+_heartbeat_key = web.AppKey("heartbeat", asyncio.Task)
+
 # Lazily initialised — created on first request so the server starts fast.
 _head: SupremeHead | None = None
 _head_lock = asyncio.Lock()
@@ -43,60 +93,318 @@ async def get_head() -> SupremeHead:
     if _head is None:
         async with _head_lock:
             if _head is None:
-                _head = SupremeHead(config_path=CONFIG_PATH)
+                _head = SupremeHead(config_path=CONFIG_PATH, worker_id=WORKER_ID)
     return _head
 
 
+def _json_response(data, status: int = 200, headers=None) -> web.Response:
+    """``web.json_response`` encoded with the fast codec (codec.py)."""
+    return web.Response(body=codec.dumps(data), status=status, headers=headers,
+                        content_type="application/json", charset="utf-8")
+
+
+# ── Admission control ──────────────────────────────────────────────────────────
+
+# /ingest/stream is admitted per line inside the handler (SupremeHead.ingest_stream)
+_ADMITTED_PATHS = {"/ingest", "/ingest/batch"}
+
+
+@web.middleware
+async def admission_middleware(request: web.Request, handler) -> web.StreamResponse:
+    # Shed before the body is read, so a rejected request costs almost nothing.
+    if request.path not in _ADMITTED_PATHS:
+        return await handler(request)
+    head = await get_head()
+    if head.admission is None:
+        return await handler(request)
+    try:
+        async with head.admission.slot():
+            return await handler(request)
+    except AdmissionRejected as exc:
+        logger.debug("Shedding %s: %s", request.path, exc.reason)
+        return _json_response(
+            {"error": "server overloaded, retry later", "reason": exc.reason},
+            status=503, headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+        )
+
+
 # ── Route handlers ─────────────────────────────────────────────────────────────
 
 async def handle_health(request: web.Request) -> web.Response:
-    return web.json_response(
-        {
-            "status": "ok",
-            "service": "logos-orchestrator",
-            "timestamp": now_iso(),
-        }
-    )
+    body = {
+        "status": "ok",
+        "service": "logos-orchestrator",
+        "timestamp": now_iso(),
+    }
+    if STATE_DIR is None:
+        return _json_response(body)
+    body.update(read_states(STATE_DIR, HEARTBEAT_SECONDS))
+    body["worker_id"] = WORKER_ID
+    if _draining:
+        body["status"] = "draining"
+        return _json_response(body, status=503)
+    return _json_response(body)
+
+
+async def handle_metrics(request: web.Request) -> web.Response:
+    head = await get_head()
+    return web.Response(body=head.metrics.render().encode("utf-8"),
+                        headers={"Content-Type": METRICS_CONTENT_TYPE})
 
 
 async def handle_ingest(request: web.Request) -> web.Response:
+    head = await get_head()
+    start = time.perf_counter()
     try:
-        body = await request.json()
+        # parse and schema-check in one pass
+        body = codec.decode(await request.read(), ScrollRequest)
+    except ValidationError as exc:
+        return _json_response({"error": f"invalid scroll: {exc}"}, status=400)
     except Exception:
-        return web.json_response({"error": "request body must be valid JSON"}, status=400)
+        return _json_response({"error": "request body must be valid JSON"}, status=400)
+    finally:
+        head.stage_seconds.observe(time.perf_counter() - start, "parse")
 
-    raw: str = body.get("raw", "").strip()
-    source: str = body.get("source", "api")
+    raw: str = body["raw"].strip()
+    source: str = body.get("source") or "api"
+    priority = body.get("priority")
 
     if not raw:
-        return web.json_response({"error": "'raw' field is required and must not be empty"}, status=400)
+        return _json_response({"error": "'raw' field is required and must not be empty"}, status=400)
 
-    head = await get_head()
+    idempotency_key = request.headers.get("Idempotency-Key")
+    # Continue the caller's trace, if it sent a traceparent header.
+    token = continue_trace(request.headers.get("traceparent"))
     try:
-        # ingest_scroll is synchronous — run in a thread pool so we don't
-        # block the event loop while it makes HTTP calls to Memory Core etc.
-        loop = asyncio.get_running_loop()
-        result = await loop.run_in_executor(None, head.ingest_scroll, raw, source)
-        return web.json_response(result)
+        if head.work_queue is not None:
+            result = await head.enqueue_scroll(raw, source, priority, idempotency_key)
+            status = 202
+        else:
+            # Native async path: the request holds no thread while Mind Nexus and
+            # Memory Core calls are in flight on the shared aiohttp session.
+            result = await head.ingest_scroll_async(raw, source, priority, idempotency_key)
+            status = 200
+        headers = {"Idempotent-Replayed": "true"} if result.get("deduplicated") else None
+        return _json_response(result, status=status, headers=headers)
+    except IdempotencyConflict as exc:
+        return _json_response({"error": str(exc)}, status=422)
     except Exception as exc:
         logger.exception("ingest_scroll raised an unexpected error")
-        return web.json_response({"error": str(exc)}, status=500)
+        return _json_response({"error": str(exc)}, status=500)
+    finally:
+        end_continue(token)
+
+
+async def handle_ingest_batch(request: web.Request) -> web.Response:
+    head = await get_head()
+    start = time.perf_counter()
+    try:
+        body = codec.loads(await request.read())
+    except Exception:
+        return _json_response({"error": "request body must be valid JSON"}, status=400)
+    finally:
+        head.stage_seconds.observe(time.perf_counter() - start, "parse")
+
+    scrolls = body.get("scrolls") if isinstance(body, dict) else None
+    if not isinstance(scrolls, list) or not scrolls:
+        return _json_response({"error": "'scrolls' must be a non-empty list"}, status=400)
+
+    max_size = int(head.config.get("batch_max_size", 1000))
+    if len(scrolls) > max_size:
+        return _json_response(
+            {"error": f"batch of {len(scrolls)} exceeds batch_max_size={max_size}"}, status=413
+        )
+
+    # Validate per item; invalid items keep their slot with an error result.
+    results: list = [None] * len(scrolls)
+    valid: list = []
+    positions: list = []
+    for i, item in enumerate(scrolls):
+        try:
+            item = codec.validate(item, ScrollRequest)
+        except ValidationError as exc:
+            results[i] = {"error": f"invalid scroll: {exc}"}
+            continue
+        raw = item["raw"].strip()
+        if not raw:
+            results[i] = {"error": "'raw' field is required and must not be empty"}
+            continue
+        valid.append({"raw": raw, "source": item.get("source") or "api", "priority": item.get("priority")})
+        positions.append(i)
+
+    try:
+        queued = head.work_queue is not None
+        if valid:
+            ingest = head.enqueue_batch if queued else head.ingest_batch
+            for i, result in zip(positions, await ingest(valid)):
+                results[i] = result
+        return _json_response({"count": len(results), "results": results}, status=202 if queued else 200)
+    except Exception as exc:
+        logger.exception("ingest_batch raised an unexpected error")
+        return _json_response({"error": str(exc)}, status=500)
+
+
+async def _ndjson_lines(content, max_line_bytes: int):
+    """Yield ``(line_number, bytes | None)`` from a streamed body; ``None`` for an oversized line.
+
+    The body is consumed chunk by chunk, so only the current partial line is
+    ever buffered; the rest of an oversized line is skipped.
+    """
+    buf = bytearray()
+    number = 0
+    skipping = False
+    async for chunk in content.iter_any():
+        start = 0
+        while True:
+            nl = chunk.find(b"\n", start)
+            if nl < 0:
+                break
+            number += 1
+            if skipping:
+                skipping = False
+                yield number, None
+            else:
+                buf += chunk[start:nl]
+                yield number, bytes(buf) if len(buf) <= max_line_bytes else None
+            buf.clear()
+            start = nl + 1
+        if not skipping:
+            buf += chunk[start:]
+            if len(buf) > max_line_bytes:
+                skipping = True
+                buf.clear()
+    if skipping:
+        yield number + 1, None
+    elif buf.strip():
+        yield number + 1, bytes(buf)
+
+
+async def _stream_items(content, max_line_bytes: int):
+    """NDJSON lines -> ingest_stream items; bad lines become error items."""
+    async for number, line in _ndjson_lines(content, max_line_bytes):
+        if line is None:
+            yield {"line": number, "error": f"line exceeds stream_max_line_bytes={max_line_bytes}"}
+            continue
+        if not line.strip():
+            continue
+        try:
+            item = codec.decode(line, ScrollRequest)
+        except ValidationError as exc:
+            yield {"line": number, "error": f"invalid scroll: {exc}"}
+            continue
+        except ValueError:
+            yield {"line": number, "error": "line is not valid JSON"}
+            continue
+        raw = item["raw"].strip()
+        if not raw:
+            yield {"line": number, "error": "'raw' field is required and must not be empty"}
+            continue
+        yield {"line": number, "raw": raw, "source": item.get("source") or "api",
+               "priority": item.get("priority")}
+
+
+async def handle_ingest_stream(request: web.Request) -> web.StreamResponse:
+    head = await get_head()
+    max_line_bytes = int(head.config.get("stream_max_line_bytes", 1024 * 1024))
+    queued = head.work_queue is not None
+    resp = web.StreamResponse(status=202 if queued else 200, headers={"Content-Type": "application/x-ndjson"})
+    await resp.prepare(request)
+
+    count = failed = 0
+    results = head.ingest_stream(_stream_items(request.content, max_line_bytes), admit=True, enqueue=queued)
+    async with contextlib.aclosing(results):
+        async for item, result in results:
+            count += 1
+            if result.get("status") not in ("Processed", "Accepted"):
+                failed += 1
+            line = {"line": item["line"], **result}
+            # awaiting the write lets a slow reader hold back the pipeline
+            await resp.write(codec.dumps(line) + b"\n")
+    await resp.write(codec.dumps({"summary": {"count": count, "failed": failed}}) + b"\n")
+    await resp.write_eof()
+    return resp
+
+
+def _worker_state() -> dict:
+    inflight = 0
+    if _head is not None:
+        inflight = sum(int(_head.inflight.value(path)) for path in ("sync", "async", "batch"))
+    return {
+        "worker_id": WORKER_ID,
+        "pid": os.getpid(),
+        "started_at": _started_at,
+        "heartbeat": time.time(),
+        "draining": _draining,
+        "inflight": inflight,
+    }
+
+
+async def _heartbeat() -> None:
+    while True:
+        try:
+            write_state(STATE_DIR, f"worker-{WORKER_ID}", _worker_state())
+        except OSError:
+            logger.exception("Failed to write worker heartbeat")
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+
+
+async def _on_startup(app: web.Application) -> None:
+    global _draining
+    _draining = False
+    if STATE_DIR is not None:
+        app[_heartbeat_key] = asyncio.create_task(_heartbeat())
+    # Jobs accepted before a restart are drained without waiting for a request.
+    if SupremeHead.load_config(CONFIG_PATH).get("work_queue_enabled"):
+        (await get_head()).start_work_queue()
+
+
+async def _on_shutdown(app: web.Application) -> None:
+    # The listening socket is already closed; in-flight requests get
+    # shutdown_timeout seconds to finish. Report the drain right away.
+    global _draining
+    _draining = True
+    if STATE_DIR is not None:
+        write_state(STATE_DIR, f"worker-{WORKER_ID}", _worker_state())
+
+
+async def _on_cleanup(app: web.Application) -> None:
+    # Stop queue workers, flush buffered ledger events and close the shared HTTP session.
+    task = app.get(_heartbeat_key)
+    if task is not None:
+        task.cancel()
+    if _head is not None:
+        await _head.cleanup()
+    if STATE_DIR is not None:
+        remove_state(STATE_DIR, f"worker-{WORKER_ID}")
 
 
 # ── App factory (used by tests and __main__) ───────────────────────────────────
 
 def make_app() -> web.Application:
-    app = web.Application()
+    app = web.Application(middlewares=[admission_middleware])
+    app.on_startup.append(_on_startup)
+    app.on_shutdown.append(_on_shutdown)
+    app.on_cleanup.append(_on_cleanup)
     app.router.add_get("/health", handle_health)
+    app.router.add_get("/metrics", handle_metrics)
     app.router.add_post("/ingest", handle_ingest)
+    app.router.add_post("/ingest/batch", handle_ingest_batch)
+    app.router.add_post("/ingest/stream", handle_ingest_stream)
     return app
 
 
 if __name__ == "__main__":
-    port = int(os.environ.get("ORCHESTRATOR_PORT", "5000"))
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s %(levelname)s %(name)s %(message)s",
-    )
-    logger.info("Starting logos-orchestrator on port %d", port)
-    web.run_app(make_app(), port=port, access_log=logger)
+    parser = argparse.ArgumentParser(description="logos-orchestrator HTTP server")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("ORCHESTRATOR_PORT", "5000")))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("ORCHESTRATOR_WORKERS", "1")))
+    parser.add_argument("--drain-timeout", type=float,
+                        default=float(os.environ.get("ORCHESTRATOR_DRAIN_SECONDS", "30")))
+    args = parser.parse_args()
+
+    configure_logging(SupremeHead.load_config(CONFIG_PATH))
+    if args.workers > 1:
+        logger.info("Starting logos-orchestrator on port %d with %d workers", args.port, args.workers)
+        sys.exit(Supervisor(args.workers, args.port, config_path=CONFIG_PATH,
+                            drain_timeout=args.drain_timeout).run())
+    logger.info("Starting logos-orchestrator on port %d", args.port)
+    web.run_app(make_app(), port=args.port, access_log=logger, shutdown_timeout=args.drain_timeout)
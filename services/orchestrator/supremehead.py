@@ -18,40 +18,51 @@ import os
 import time
 import logging
 from datetime import datetime
-from typing import Optional, Dict, Any
+from collections import deque
+from typing import Optional, Dict, Any, AsyncIterable, AsyncIterator, List, Tuple
+from urllib.parse import urlsplit, urlunsplit
 import asyncio
+import contextlib
+import contextvars
 import functools
-
-# try to use aiofiles for async file I/O
-try:
-    import aiofiles  # type: ignore
-except Exception:
-    aiofiles = None  # type: ignore
+import threading
+import uuid
 
 # try to use requests/aiohttp if available for nicer behavior; fall back to stdlib
 try:
     import requests  # type: ignore
+    from requests.adapters import HTTPAdapter  # type: ignore
 except Exception:
     requests = None  # type: ignore
+    HTTPAdapter = None  # type: ignore
 
 try:
     import aiohttp  # type: ignore
 except Exception:
     aiohttp = None  # type: ignore
 
+from admission import AdmissionController, AdmissionRejected
+from analysis_cache import AnalysisCache, is_fallback
+from balancer import EndpointPool, endpoint_urls
+import codec
+from codec import AnalysisResponse
+from http_pool import HTTPConnectionPool
+from idempotency import IdempotencyStore, fingerprint
+from local_analyzer import LocalAnalyzer
+from ledger import LedgerWriteError, LedgerWriter, worker_ledger_path
+from logging_setup import configure_logging, logging_stats
+from metrics import MetricsRegistry
+from records import Analysis, IngestResult, LedgerEvent, Scroll
+from tracing import SpanExporter, Tracer, trace_headers
+from scheduler import MINT_LANE, LaneScheduler
+from resilience import BreakerRegistry, CircuitBreaker, CircuitOpenError, RetryBudget, backoff_delay
+from workqueue import Job, WorkQueue
+
 # ---- Logging ----
+# Handlers are installed by logging_setup.configure_logging from the entry
+# points, not at import time.
 LOG_DIR = os.environ.get("TRIUMV_LOG_DIR", ".")
-os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, "supremehead.log")
-
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(message)s",
-    handlers=[
-        logging.FileHandler(LOG_FILE),
-        logging.StreamHandler()
-    ]
-)
 logger = logging.getLogger("supremehead")
 
 
@@ -60,172 +71,1198 @@ def now_iso() -> str:
     return datetime.utcnow().isoformat() + "Z"
 
 
+class DegradedAnalysis(Exception):
+    """Only a fallback analysis was available, and the caller asked to retry rather than act on it."""
+
+
+def fallback_analysis(notes: str) -> Dict[str, Any]:
+    """Neutral analysis used when Mind Nexus cannot be reached."""
+    return Analysis(notes=notes, timestamp=now_iso()).to_dict()
+
+
+def _call_with_breaker(breaker: Optional[CircuitBreaker], fn, *args):
+    if breaker is None:
+        return fn(*args)
+    if not breaker.allow():
+        raise CircuitOpenError(f"circuit open for {breaker.name}")
+    try:
+        result = fn(*args)
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return result
+
+
+async def _acall_with_breaker(breaker: Optional[CircuitBreaker], fn, *args):
+    if breaker is None:
+        return await fn(*args)
+    if not breaker.allow():
+        raise CircuitOpenError(f"circuit open for {breaker.name}")
+    try:
+        result = await fn(*args)
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return result
+
+
+def _post_balanced(pool: EndpointPool, path: str, payload: Dict[str, Any]):
+    """POST ``payload`` to ``path`` on a replica chosen by ``pool``, through that replica's breaker."""
+    return pool.call(lambda ep: _call_with_breaker(ep.breaker, HTTPClient.sync_post, ep.url + path, payload))
+
+
+async def _apost_balanced(pool: EndpointPool, path: str, payload: Dict[str, Any]):
+    return await pool.call_async(
+        lambda ep: _acall_with_breaker(ep.breaker, HTTPClient.async_post, ep.url + path, payload))
+
+
 def safe_write_json(path: str, obj: Any):
     tmp = f"{path}.tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(obj, f, indent=2, ensure_ascii=False)
+    with open(tmp, "wb") as f:
+        f.write(codec.dumps_pretty(obj))
     os.replace(tmp, path)
 
 
 # ---- Integration stubs (pluggable clients) ----
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
 class HTTPClient:
     """Simple pluggable HTTP client supporting sync and async calls with connection pooling."""
     _session: Optional[Any] = None
-    _session_lock = asyncio.Lock()
+    _session_loop: Optional[asyncio.AbstractEventLoop] = None
+    # sync transport: a shared requests.Session, or a keep-alive http.client
+    # pool when requests is missing (or sync_transport == "stdlib")
+    _sync_lock = threading.Lock()
+    _sync_session: Optional[Any] = None
+    _sync_pool: Optional[HTTPConnectionPool] = None
+    sync_transport = "auto"     # "auto" | "requests" | "stdlib"
+    pool_connections = 10       # hosts with a cached pool (requests only)
+    pool_maxsize = 32           # keep-alive connections per host
+    pool_block = False          # wait for a free connection instead of opening extra ones
+
+    @staticmethod
+    def configure_sync(transport: str = "auto", pool_connections: int = 10,
+                       pool_maxsize: int = 32, pool_block: bool = False):
+        """Set sync pool parameters; the current pools are closed and rebuilt lazily."""
+        settings = (transport, pool_connections, pool_maxsize, pool_block)
+        if settings == (HTTPClient.sync_transport, HTTPClient.pool_connections,
+                        HTTPClient.pool_maxsize, HTTPClient.pool_block):
+            return
+        HTTPClient.close_sync()
+        HTTPClient.sync_transport = transport
+        HTTPClient.pool_connections = pool_connections
+        HTTPClient.pool_maxsize = pool_maxsize
+        HTTPClient.pool_block = pool_block
+
+    @staticmethod
+    def _use_requests() -> bool:
+        if HTTPClient.sync_transport == "stdlib":
+            return False
+        return requests is not None
+
+    @staticmethod
+    def get_sync_session():
+        """Shared requests.Session with a pooled HTTPAdapter (thread-safe, lazily built)."""
+        session = HTTPClient._sync_session
+        if session is None:
+            with HTTPClient._sync_lock:
+                session = HTTPClient._sync_session
+                if session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=HTTPClient.pool_connections,
+                                          pool_maxsize=HTTPClient.pool_maxsize,
+                                          pool_block=HTTPClient.pool_block)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    HTTPClient._sync_session = session
+        return session
+
+    @staticmethod
+    def get_sync_pool() -> HTTPConnectionPool:
+        pool = HTTPClient._sync_pool
+        if pool is None:
+            with HTTPClient._sync_lock:
+                pool = HTTPClient._sync_pool
+                if pool is None:
+                    pool = HTTPConnectionPool(maxsize=HTTPClient.pool_maxsize, block=HTTPClient.pool_block)
+                    HTTPClient._sync_pool = pool
+        return pool
+
+    @staticmethod
+    def close_sync():
+        """Close the pooled sync connections."""
+        with HTTPClient._sync_lock:
+            session, HTTPClient._sync_session = HTTPClient._sync_session, None
+            pool, HTTPClient._sync_pool = HTTPClient._sync_pool, None
+        if session is not None:
+            session.close()
+        if pool is not None:
+            pool.close()
 
     @staticmethod
     def sync_post(url: str, payload: Dict[str, Any], timeout: int = 10):
-        if requests:
-            try:
-                r = requests.post(url, json=payload, timeout=timeout)
-                r.raise_for_status()
-                return r.json()
-            except Exception as e:
-                raise
-        # fallback to urllib
-        import urllib.request as ur
-        import urllib.error as ue
-        data = json.dumps(payload).encode("utf-8")
-        req = ur.Request(url, data=data, headers={"Content-Type": "application/json"})
-        try:
-            with ur.urlopen(req, timeout=timeout) as resp:
-                body = resp.read().decode("utf-8")
-                return json.loads(body) if body else {}
-        except Exception:
-            raise
+        headers = trace_headers()
+        if HTTPClient._use_requests():
+            r = HTTPClient.get_sync_session().post(url, data=codec.dumps(payload), timeout=timeout,
+                                                   headers={**_JSON_HEADERS, **headers})
+            r.raise_for_status()
+            return codec.loads(r.content)
+        # fallback to the stdlib keep-alive pool
+        return HTTPClient.get_sync_pool().post_json(url, payload, timeout=timeout, headers=headers)
 
     @staticmethod
     async def get_session():
-        """Get or create a shared aiohttp session with connection pooling."""
-        if HTTPClient._session is None:
-            async with HTTPClient._session_lock:
-                if HTTPClient._session is None and aiohttp:
-                    # Create session with connection pooling
-                    connector = aiohttp.TCPConnector(limit=100, limit_per_host=30)
-                    HTTPClient._session = aiohttp.ClientSession(connector=connector)
+        """Get or create a shared aiohttp session with connection pooling.
+
+        The session is bound to the event loop that created it; a caller on a
+        different loop (e.g. a fresh test loop) gets a new session.  Creation
+        has no await point, so no lock is needed to make it single-flight.
+        """
+        if not aiohttp:
+            return None
+        loop = asyncio.get_running_loop()
+        session = HTTPClient._session
+        if session is None or session.closed or HTTPClient._session_loop is not loop:
+            # Create session with connection pooling
+            connector = aiohttp.TCPConnector(limit=100, limit_per_host=30)
+            HTTPClient._session = aiohttp.ClientSession(connector=connector)
+            HTTPClient._session_loop = loop
         return HTTPClient._session
 
     @staticmethod
     async def close_session():
         """Close the shared session."""
         if HTTPClient._session is not None:
-            await HTTPClient._session.close()
+            session = HTTPClient._session
             HTTPClient._session = None
+            HTTPClient._session_loop = None
+            if not session.closed:
+                await session.close()
 
     @staticmethod
     async def async_post(url: str, payload: Dict[str, Any], timeout: int = 10):
         if aiohttp:
             session = await HTTPClient.get_session()
             if session:
-                async with session.post(url, json=payload, timeout=timeout) as resp:
+                async with session.post(url, data=codec.dumps(payload), timeout=timeout,
+                                        headers={**_JSON_HEADERS, **trace_headers()}) as resp:
                     resp.raise_for_status()
-                    return await resp.json()
+                    return codec.loads(await resp.read())
         # fallback: run sync in executor
         try:
             loop = asyncio.get_running_loop()
         except RuntimeError:
             loop = asyncio.get_event_loop()
         func = functools.partial(HTTPClient.sync_post, url, payload, timeout)
-        return await loop.run_in_executor(None, func)
+        # carry the active span into the worker thread for trace headers
+        return await loop.run_in_executor(None, contextvars.copy_context().run, func)
+
+
+class MicroBatcher:
+    """Coalesce concurrent async submissions into batched calls.
+
+    ``submit`` queues an item and returns once its batch has been processed.
+    A batch is flushed when ``max_size`` items are pending or ``window_seconds``
+    after its first item arrived, whichever comes first.  ``flush_fn`` receives
+    the list of items and must return a list of results in the same order;
+    if it raises, every caller in that batch sees the exception.
+    """
+
+    def __init__(self, flush_fn, window_seconds: float, max_size: int):
+        self._flush_fn = flush_fn
+        self.window_seconds = window_seconds
+        self.max_size = max(1, max_size)
+        self._pending: List[tuple] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+        # batch-size distribution, bucketed by powers of two (1, 2, 4, ...)
+        self.batches = 0
+        self.items = 0
+        self.max_batch = 0
+        self.size_histogram: Dict[int, int] = {}
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((item, fut))
+        if len(self._pending) >= self.max_size:
+            self._dispatch(loop)
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._dispatch, loop)
+        return await fut
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self._observe(len(batch))
+        # a batch serves many requests: run it outside the submitter's trace context
+        task = loop.create_task(self._run(batch), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[tuple]):
+        try:
+            results = await self._flush_fn([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"batch returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
+
+    async def close(self):
+        """Flush the open window now and wait for every batch still in flight."""
+        if self._pending:
+            self._dispatch(asyncio.get_running_loop())
+        if self._tasks:
+            await asyncio.wait(set(self._tasks))
+
+    def _observe(self, size: int):
+        self.batches += 1
+        self.items += size
+        self.max_batch = max(self.max_batch, size)
+        bucket = 1 << (size - 1).bit_length()
+        self.size_histogram[bucket] = self.size_histogram.get(bucket, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch": (self.items / self.batches) if self.batches else 0.0,
+            "max_batch": self.max_batch,
+            "size_histogram": dict(sorted(self.size_histogram.items())),
+        }
+
+
+class WriteBehindQueue:
+    """Bounded async queue drained in batches by a background flusher.
+
+    ``put`` blocks (backpressure) while ``maxsize`` items are waiting, for at
+    most ``put_timeout`` seconds before it raises ``asyncio.QueueFull``.  A single
+    flusher task collects up to ``batch_size`` items, or whatever arrived within
+    ``flush_interval`` seconds, and hands them to ``flush_fn``; failed batches
+    are retried with capped exponential backoff before any newer item is sent.
+
+    With a ``spill_path`` every item is journaled to a JSON-lines file before
+    it is queued, and an ``{"ack": seq}`` line is appended once its batch has
+    been delivered.  The journal is fsynced once per batch, before the batch is
+    sent, so an accepted item is on disk within about ``flush_interval``.  On
+    start the journal is replayed, so items queued before a crash are delivered
+    again (at-least-once); a ``put`` that timed out is journaled as
+    ``{"drop": seq}`` and not replayed.  The journal is truncated each time the
+    queue fully drains.
+    """
+
+    def __init__(self, flush_fn, maxsize: int = 10000, batch_size: int = 100,
+                 flush_interval: float = 0.05, spill_path: Optional[str] = None,
+                 retry_delay: float = 0.5, put_timeout: Optional[float] = 5.0):
+        self._flush_fn = flush_fn
+        self.maxsize = maxsize
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.spill_path = spill_path
+        self.retry_delay = retry_delay
+        self.put_timeout = put_timeout  # None waits for room indefinitely
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._spill = None
+        self._unsynced = False  # journal written since the last fsync
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._next_seq = 1
+        self._puts_waiting = 0  # journaled but not yet queued (blocked on a full queue)
+        self.delivered = 0
+        self.failed_attempts = 0
+        self.rejected = 0  # puts that timed out on a full queue
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def put(self, item: Any):
+        if self._task is None or self._task.done() or self._loop is not asyncio.get_running_loop():
+            await self.start()
+        seq = self._next_seq
+        self._next_seq += 1
+        self._puts_waiting += 1
+        try:
+            self._journal({"seq": seq, "item": item})
+            try:
+                self._queue.put_nowait((seq, item))
+            except asyncio.QueueFull:
+                try:
+                    await asyncio.wait_for(self._queue.put((seq, item)), self.put_timeout)
+                except asyncio.TimeoutError:
+                    self._journal({"drop": seq})
+                    self.rejected += 1
+                    raise asyncio.QueueFull(
+                        f"write-behind queue still full after {self.put_timeout}s") from None
+        finally:
+            self._puts_waiting -= 1
+
+    async def start(self):
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        # started lazily by the first put; keep that request's trace out of the flusher
+        self._task = self._loop.create_task(self._run(), context=contextvars.Context())
+        pending = self._replay() if self.spill_path else []
+        if self.spill_path:
+            self._spill = open(self.spill_path, "a+", encoding="utf-8")
+        for seq, item in pending:
+            await self._queue.put((seq, item))
+        if pending:
+            logger.info(f"Replayed {len(pending)} write-behind items from {self.spill_path}")
+
+    def _replay(self) -> List[tuple]:
+        if not os.path.exists(self.spill_path):
+            return []
+        entries, acked, dropped = [], 0, set()
+        with open(self.spill_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = codec.loads(line)
+                except ValueError:
+                    continue  # torn write at crash time
+                if "ack" in rec:
+                    acked = max(acked, rec["ack"])
+                elif "drop" in rec:
+                    dropped.add(rec["drop"])
+                else:
+                    entries.append((rec["seq"], rec["item"]))
+        pending = [(seq, item) for seq, item in entries if seq > acked and seq not in dropped]
+        if entries:
+            self._next_seq = max(seq for seq, _ in entries) + 1
+        return pending
+
+    def _journal(self, record: Dict[str, Any]):
+        if self._spill is not None:
+            self._spill.write(codec.dumps(record).decode("utf-8") + "\n")
+            self._spill.flush()
+            self._unsynced = True
+
+    async def _sync(self):
+        if self._spill is not None and self._unsynced:
+            self._unsynced = False
+            await asyncio.get_running_loop().run_in_executor(None, os.fsync, self._spill.fileno())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await self._sync()
+            await self._deliver(batch)
+
+    async def _deliver(self, batch: List[tuple]):
+        attempt = 0
+        while True:
+            try:
+                await self._flush_fn([item for _, item in batch])
+                break
+            except Exception as e:
+                attempt += 1
+                self.failed_attempts += 1
+                logger.warning(f"Write-behind flush of {len(batch)} items failed (attempt {attempt}): {e}")
+                await asyncio.sleep(min(self.retry_delay * (2 ** (attempt - 1)), 30.0))
+        self.delivered += len(batch)
+        self._journal({"ack": batch[-1][0]})
+        for _ in batch:
+            self._queue.task_done()
+        if self._spill is not None and self._queue.empty() and not self._puts_waiting:
+            self._spill.truncate(0)
+
+    async def close(self, timeout: float = 10.0):
+        """Drain the queue (up to ``timeout`` seconds) and stop the flusher.
+
+        Anything still undelivered stays in the spill journal for the next start.
+        """
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Write-behind close timed out with {self.qsize()} items pending")
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._spill is not None:
+            if self._unsynced:
+                os.fsync(self._spill.fileno())
+            self._spill.close()
+            self._spill = None
+            self._unsynced = False
 
 
 class MemoryCoreClient:
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, write_behind: bool = False, queue_size: int = 10000,
+                 batch_size: int = 100, flush_interval_ms: float = 50,
+                 spill_path: Optional[str] = None, breaker: Optional[CircuitBreaker] = None,
+                 pool: Optional[EndpointPool] = None, put_timeout: Optional[float] = 5.0):
         self.base_url = base_url.rstrip("/")
+        self.breaker = breaker
+        # several replicas: calls are balanced over ``pool`` (each replica has its own breaker)
+        self.pool = pool
         # Cache the URL to avoid repeated string operations
         self._store_url = f"{self.base_url}/store"
+        self._store_batch_url = f"{self.base_url}/store_batch"
+        # In write-behind mode store_async only enqueues; a background
+        # flusher posts the queued scrolls to /store_batch.
+        self._write_behind: Optional[WriteBehindQueue] = None
+        if write_behind:
+            self._write_behind = WriteBehindQueue(
+                self._post_batch, maxsize=queue_size, batch_size=batch_size,
+                flush_interval=flush_interval_ms / 1000.0, spill_path=spill_path,
+                put_timeout=put_timeout,
+            )
+
+    async def _post_batch(self, scrolls: List[Dict[str, Any]]) -> Dict[str, Any]:
+        logger.debug("MemoryCoreClient.store_batch -> POST %s (%d items)", self._store_batch_url, len(scrolls))
+        if self.pool is not None:
+            return await _apost_balanced(self.pool, "/store_batch", {"items": scrolls})
+        return await _acall_with_breaker(self.breaker, HTTPClient.async_post,
+                                         self._store_batch_url, {"items": scrolls})
+
+    def queue_depth(self) -> int:
+        return self._write_behind.qsize() if self._write_behind else 0
+
+    async def close(self):
+        """Flush queued write-behind stores (no-op in direct mode)."""
+        if self._write_behind is not None:
+            await self._write_behind.close()
 
     def store(self, scroll: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            logger.debug(f"MemoryCoreClient.store -> POST {self._store_url}")
-            return HTTPClient.sync_post(self._store_url, scroll)
+            logger.debug("MemoryCoreClient.store -> POST %s", self._store_url)
+            if self.pool is not None:
+                return _post_balanced(self.pool, "/store", scroll)
+            return _call_with_breaker(self.breaker, HTTPClient.sync_post, self._store_url, scroll)
+        except CircuitOpenError as e:
+            return {"error": str(e)}
         except Exception as e:
             logger.exception("MemoryCore store failed")
             return {"error": str(e)}
 
     async def store_async(self, scroll: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            return await HTTPClient.async_post(self._store_url, scroll)
+            if self._write_behind is not None:
+                await self._write_behind.put(scroll)
+                return {"status": "queued"}
+            if self.pool is not None:
+                return await _apost_balanced(self.pool, "/store", scroll)
+            return await _acall_with_breaker(self.breaker, HTTPClient.async_post, self._store_url, scroll)
+        except CircuitOpenError as e:
+            return {"error": str(e)}
         except Exception as e:
             logger.exception("MemoryCore async store failed")
             return {"error": str(e)}
 
 
 class MindNexusClient:
-    def __init__(self, base_url: str):
+    def __init__(self, base_url: str, batch_window_ms: float = 0, batch_max_size: int = 64,
+                 cache: Optional[AnalysisCache] = None, breaker: Optional[CircuitBreaker] = None,
+                 pool: Optional[EndpointPool] = None, local: Optional[LocalAnalyzer] = None,
+                 prefilter_below: float = 0):
         self.base_url = base_url.rstrip("/")
+        self.cache = cache
+        self.breaker = breaker
+        # in-process scorer: degraded-mode fallback, and a pre-filter that
+        # answers locally for scrolls scoring below ``prefilter_below``
+        self.local = local
+        self.prefilter_below = prefilter_below if local is not None else 0
+        self.prefiltered = 0
+        self.local_fallbacks = 0
+        # several replicas: calls are balanced (and optionally hedged) over ``pool``
+        self.pool = pool
         # Cache the URL to avoid repeated string operations
         self._analyze_url = f"{self.base_url}/analyze"
+        self._analyze_batch_url = f"{self.base_url}/analyze_batch"
+        # Micro-batching of analyze_async is enabled by a positive window.
+        self._batcher: Optional[MicroBatcher] = None
+        if batch_window_ms and batch_window_ms > 0:
+            self._batcher = MicroBatcher(self._post_batch, batch_window_ms / 1000.0, batch_max_size)
+
+    async def _post_batch(self, payloads: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        logger.debug("MindNexusClient.analyze_batch -> POST %s (%d items)", self._analyze_batch_url, len(payloads))
+        if self.pool is not None:
+            resp = await _apost_balanced(self.pool, "/analyze_batch", {"items": payloads})
+        else:
+            resp = await _acall_with_breaker(self.breaker, HTTPClient.async_post,
+                                             self._analyze_batch_url, {"items": payloads})
+        return [codec.validate(r, AnalysisResponse) for r in resp["results"]]
+
+    def batch_stats(self) -> Dict[str, Any]:
+        """Batch-size distribution of the micro-batcher (empty when disabled)."""
+        return self._batcher.stats() if self._batcher else {}
+
+    async def close(self):
+        """Send any analyses still waiting in the batch window."""
+        if self._batcher is not None:
+            await self._batcher.close()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters of the analysis cache (empty when disabled)."""
+        return self.cache.stats() if self.cache else {}
+
+    def _prefilter(self, raw: str) -> Optional[Dict[str, Any]]:
+        analysis = self.local.analyze(raw, notes="local prefilter")
+        if analysis["value_score"] >= self.prefilter_below:
+            return None
+        self.prefiltered += 1
+        analysis["timestamp"] = now_iso()
+        return analysis
+
+    def _fallback(self, raw: str, notes: str) -> Dict[str, Any]:
+        if self.local is None:
+            return fallback_analysis(notes)
+        self.local_fallbacks += 1
+        analysis = self.local.analyze(raw, notes=f"{notes} (scored locally)")
+        analysis["timestamp"] = now_iso()
+        return analysis
 
     def analyze(self, raw: str, meta: Dict[str, Any] = None) -> Dict[str, Any]:
+        if self.prefilter_below:
+            local = self._prefilter(raw)
+            if local is not None:
+                return local
+        if self.cache is not None:
+            return self.cache.get_or_compute(raw, meta, self._analyze_uncached)
+        return self._analyze_uncached(raw, meta)
+
+    async def analyze_async(self, raw: str, meta: Dict[str, Any] = None) -> Dict[str, Any]:
+        if self.prefilter_below:
+            local = self._prefilter(raw)
+            if local is not None:
+                return local
+        if self.cache is not None:
+            return await self.cache.get_or_compute_async(raw, meta, self._analyze_uncached_async)
+        return await self._analyze_uncached_async(raw, meta)
+
+    def _analyze_uncached(self, raw: str, meta: Dict[str, Any] = None) -> Dict[str, Any]:
         payload = {"raw": raw, "meta": meta or {}}
         try:
-            logger.debug(f"MindNexusClient.analyze -> POST {self._analyze_url}")
-            return HTTPClient.sync_post(self._analyze_url, payload)
+            logger.debug("MindNexusClient.analyze -> POST %s", self._analyze_url)
+            if self.pool is not None:
+                resp = _post_balanced(self.pool, "/analyze", payload)
+            else:
+                resp = _call_with_breaker(self.breaker, HTTPClient.sync_post, self._analyze_url, payload)
+            return codec.validate(resp, AnalysisResponse)
+        except CircuitOpenError as e:
+            return self._fallback(raw, f"fallback: {e}")
         except Exception as e:
             logger.exception("MindNexus analyze failed")
             # fallback lightweight analysis
-            return {
-                "patterns": [],
-                "sentiment": "neutral",
-                "value_score": 50,
-                "notes": f"fallback: {str(e)}",
-                "timestamp": now_iso()
-            }
+            return self._fallback(raw, f"fallback: {str(e)}")
 
-    async def analyze_async(self, raw: str, meta: Dict[str, Any] = None) -> Dict[str, Any]:
+    async def _analyze_uncached_async(self, raw: str, meta: Dict[str, Any] = None) -> Dict[str, Any]:
         payload = {"raw": raw, "meta": meta or {}}
         try:
-            return await HTTPClient.async_post(self._analyze_url, payload)
+            if self._batcher is not None:
+                # with a pool, ``breaker`` is only replica 0's; the pool picks around open circuits
+                if self.pool is None and self.breaker is not None and self.breaker.rejecting():
+                    raise CircuitOpenError(f"circuit open for {self.breaker.name}")
+                return await self._batcher.submit(payload)
+            if self.pool is not None:
+                resp = await _apost_balanced(self.pool, "/analyze", payload)
+            else:
+                resp = await _acall_with_breaker(self.breaker, HTTPClient.async_post, self._analyze_url, payload)
+            return codec.validate(resp, AnalysisResponse)
+        except CircuitOpenError as e:
+            return self._fallback(raw, f"fallback async: {e}")
         except Exception as e:
             logger.exception("MindNexus analyze async failed")
-            return {
-                "patterns": [],
-                "sentiment": "neutral",
-                "value_score": 50,
-                "notes": f"fallback async: {str(e)}",
-                "timestamp": now_iso()
-            }
+            return self._fallback(raw, f"fallback async: {str(e)}")
+
+
+def _batch_url(url: str) -> str:
+    """``http://h/mint/?k=v`` -> ``http://h/mint_batch?k=v``: the batch sibling of an endpoint."""
+    parts = urlsplit(url)
+    head, _, last = parts.path.rstrip("/").rpartition("/")
+    return urlunsplit(parts._replace(path=f"{head}/{last}_batch"))
 
 
 class SwarmEngine:
-    def __init__(self, config: Dict[str, Any]):
+    """Triggers NFT mints for high-value scrolls.
+
+    With ``enabled`` the mint service at ``mint_service_url`` is called per
+    scroll, and ``mint_batch_url`` (default: the sibling ``<last path
+    segment>_batch`` of ``mint_service_url``, e.g. ``/mint_batch``) for batches;
+    otherwise mints are stubbed locally.  A positive ``batch_window_ms``
+    queues async mints and flushes them as one batch mint at ``batch_max_size``
+    scrolls or when the window closes; each caller gets its own item of the
+    batch result.  ``on_batch(event_type, payload)`` is awaited with every batch
+    outcome (``nft_batch_minted`` / ``nft_batch_failed``) so it can go to the
+    ledger.
+    """
+
+    def __init__(self, config: Dict[str, Any], breaker: Optional[CircuitBreaker] = None, enabled: bool = False,
+                 batch_window_ms: float = 0, batch_max_size: int = 32, on_batch=None):
         self.config = config or {}
+        # guards the minting service; CircuitOpenError propagates to the caller
+        self.breaker = breaker
+        self.mint_url = self.config.get("mint_service_url") if enabled else None
+        self.mint_batch_url = (self.config.get("mint_batch_url") or _batch_url(self.mint_url)) \
+            if self.mint_url else None
+        self.on_batch = on_batch
+        self._batcher: Optional[MicroBatcher] = None
+        if batch_window_ms and batch_window_ms > 0:
+            self._batcher = MicroBatcher(self._mint_batch, batch_window_ms / 1000.0, batch_max_size)
+        self.batches_minted = 0
+        self.batches_failed = 0
 
     def trigger_nft_mint(self, raw: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
-        # Real implementation would call a minting service, sign txn, etc.
-        logger.info("SwarmEngine: trigger_nft_mint called (stubbed)")
-        # stubbed response:
+        return _call_with_breaker(self.breaker, self._mint, raw, analysis)
+
+    def _mint(self, raw: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        logger.info("SwarmEngine: trigger_nft_mint called", extra={"stage": "mint"})
+        if self.mint_url:
+            return HTTPClient.sync_post(self.mint_url, self._mint_item(raw, analysis))
+        # Real implementation would sign a txn; stubbed response:
         return {"status": "mint_triggered", "tx": None}
 
+    @staticmethod
+    def _mint_item(raw: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
+        return {"raw": raw, "value_score": analysis.get("value_score"), "patterns": analysis.get("patterns", [])}
+
     async def trigger_nft_mint_async(self, raw: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
-        return self.trigger_nft_mint(raw, analysis)
+        if self._batcher is not None:
+            if self.breaker is not None and self.breaker.rejecting():
+                raise CircuitOpenError(f"circuit open for {self.breaker.name}")
+            return await self._batcher.submit(self._mint_item(raw, analysis))
+        if not self.mint_url:
+            return self.trigger_nft_mint(raw, analysis)
+        return await _acall_with_breaker(self.breaker, HTTPClient.async_post, self.mint_url,
+                                         self._mint_item(raw, analysis))
+
+    async def _mint_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        batch_id = uuid.uuid4().hex[:16]
+        start = time.perf_counter()
+        try:
+            if self.mint_batch_url:
+                logger.debug("SwarmEngine.mint_batch -> POST %s (%d items)", self.mint_batch_url, len(items))
+                resp = await _acall_with_breaker(self.breaker, HTTPClient.async_post,
+                                                 self.mint_batch_url, {"items": items})
+                results = resp["results"]
+                if len(results) != len(items):
+                    raise ValueError(f"mint batch returned {len(results)} results for {len(items)} items")
+            else:
+                results = [{"status": "mint_triggered", "tx": None} for _ in items]
+        except Exception as e:
+            self.batches_failed += 1
+            await self._report("nft_batch_failed", {"batch_id": batch_id, "size": len(items), "error": str(e),
+                                                    "elapsed_ms": (time.perf_counter() - start) * 1000.0})
+            raise
+        results = [{**r, "batch_id": batch_id, "batch_size": len(items)} for r in results]
+        self.batches_minted += 1
+        await self._report("nft_batch_minted", {"batch_id": batch_id, "size": len(items),
+                                                "elapsed_ms": (time.perf_counter() - start) * 1000.0,
+                                                "tx": [r.get("tx") for r in results]})
+        return results
+
+    async def _report(self, event_type: str, payload: Dict[str, Any]):
+        if self.on_batch is None:
+            return
+        try:
+            await self.on_batch(event_type, payload)
+        except Exception:
+            logger.exception("Recording mint batch outcome failed")
+
+    async def close(self):
+        """Mint whatever is still waiting in the batch window (and report it)."""
+        if self._batcher is not None:
+            await self._batcher.close()
+
+    def batch_stats(self) -> Dict[str, Any]:
+        """Batch-size distribution of the mint batcher (empty when disabled)."""
+        if self._batcher is None:
+            return {}
+        return {**self._batcher.stats(), "minted": self.batches_minted, "failed": self.batches_failed}
 
 
 # ---- SupremeHead orchestrator ----
+class _Stage:
+    """Stage timer and span entered and exited together."""
+
+    __slots__ = ("_timer", "_span")
+
+    def __init__(self, timer, span):
+        self._timer = timer
+        self._span = span
+
+    def __enter__(self):
+        self._span.__enter__()
+        self._timer.__enter__()
+        return self._span
+
+    def __exit__(self, *exc):
+        self._timer.__exit__(*exc)
+        return self._span.__exit__(*exc)
+
+
 class SupremeHead:
     DEFAULT_CONFIG = {
         "memory_core_url": "http://localhost:3000",
         "mind_nexus_url": "http://localhost:3001",
+        "memory_core_urls": [],           # replicas; when set they replace memory_core_url (balancer.py)
+        "mind_nexus_urls": [],            # replicas; when set they replace mind_nexus_url
+        "balancer_strategy": "p2c",       # p2c (power of two choices) | least_outstanding
+        "balancer_eject_failures": 3,     # consecutive failures that eject a replica...
+        "balancer_eject_seconds": 10,     # ...for this long, doubling on each repeat ejection
+        "balancer_max_ejected_ratio": 0.5,  # never eject more than this share of a pool
+        "mind_nexus_hedge": False,        # resend a slow analyze to a second replica
+        "mind_nexus_hedge_quantile": 0.95,  # hedge after this quantile of recent latency
+        "mind_nexus_hedge_min_delay_ms": 5,
+        "mind_nexus_hedge_budget_ratio": 0.1,  # hedges allowed as a fraction of calls
         "nft_threshold": 85,
         "codex_ledger_path": os.path.join(LOG_DIR, "codex_ledger.log"),
         "retries": 2,
         "retry_delay_seconds": 1,
-        "event_buffer_size": 10  # Buffer events before flushing to disk
+        "event_buffer_size": 10,  # Group-commit the ledger at this many pending events...
+        "ledger_flush_interval_ms": 50,  # ...or this long after the oldest pending event
+        "ledger_fsync": "never",  # never | batch | interval
+        "ledger_fsync_interval_seconds": 1.0,
+        "ledger_wait_for_commit": False,  # ingest returns only after its events are written
+        "ledger_segment_max_bytes": 64 * 1024 * 1024,  # rotate the active ledger segment...
+        "ledger_segment_max_age_seconds": 0,  # ...and/or after this long (0 = no age limit)
+        "ledger_index_block_events": 256,  # events per sidecar index block
+        "ledger_compact_after_seconds": None,  # zlib-compact sealed segments older than this
+        "ledger_codec": "jsonl",  # jsonl | bin | msgpack (see ledger_codecs.py)
+        "ledger_compression": "none",  # none | zlib | zstd, applied per index block
+        "ledger_max_pending_events": 100_000,  # recording raises once this many events are unwritten
+        "ledger_max_write_failures": 5,  # consecutive failed commits before recording/flushing raises
+        "batch_concurrency": 32,  # Max scrolls in flight per ingest_batch call
+        "batch_max_size": 1000,   # Largest batch accepted by POST /ingest/batch
+        "stream_concurrency": 64,  # Scrolls in flight per ingest_stream (POST /ingest/stream)
+        "stream_max_line_bytes": 1024 * 1024,  # Longer NDJSON lines are rejected, not buffered
+        "mind_nexus_batch_window_ms": 0,  # >0 coalesces analyze_async calls into /analyze_batch
+        "mind_nexus_batch_max_size": 64,  # Flush a micro-batch early at this many scrolls
+        "mint_service_enabled": False,    # POST mints to swarm_config.mint_service_url (stubbed when off)
+        "mint_batch_window_ms": 0,        # >0 queues async mints into one batch call (swarm_config.mint_batch_url)
+        "mint_batch_max_size": 32,        # Flush a mint batch early at this many scrolls
+        "memory_core_write_behind": False,  # Queue stores and post them to /store_batch
+        "memory_core_queue_size": 10000,    # Write-behind backpressure bound
+        "memory_core_put_timeout_seconds": 5.0,  # A store waiting this long on a full queue fails
+        "memory_core_batch_size": 100,
+        "memory_core_flush_interval_ms": 50,
+        "memory_core_spill_path": os.path.join(LOG_DIR, "memory_core_spill.jsonl"),
+        "analysis_cache_enabled": False,  # Content-addressed cache in front of Mind Nexus (one per worker)
+        "analysis_cache_max_entries": 10000,
+        "analysis_cache_ttl_seconds": 300,
+        "analysis_cache_max_bytes": 32 * 1024 * 1024,
+        "analysis_cache_meta_keys": [],   # meta fields that take part in the cache key
+        "local_analyzer_enabled": False,  # score scrolls in-process when Mind Nexus fails (local_analyzer.py)
+        "local_analyzer_vocabulary_path": None,  # JSON {"bias", "terms"}; built-in vocabulary if unset
+        "local_analyzer_prefilter_below": 0,  # skip Mind Nexus for scrolls scoring below this locally (0 = off)
+        "breaker_failure_threshold": 5,   # consecutive failures that open a host's circuit
+        "breaker_backoff_seconds": [5, 15, 30],  # successive OPEN windows before a probe
+        "retry_budget_ratio": 0.2,        # retries allowed as a fraction of calls
+        "retry_budget_min_per_second": 10,
+        "retry_max_delay_seconds": 30,    # cap for jittered exponential backoff
+        "http_sync_transport": "auto",    # "auto" (requests if installed) | "requests" | "stdlib"
+        "http_pool_connections": 10,      # per-host pools cached by the requests Session
+        "http_pool_maxsize": 32,          # keep-alive connections kept per host
+        "http_pool_block": False,         # block when a host's pool is exhausted
+        "tracing_sample_rate": 0.0,       # fraction of scrolls whose spans are exported (0 = off)
+        "tracing_export_path": os.path.join(LOG_DIR, "logs", "traces.jsonl"),
+        "tracing_flush_interval_ms": 200,
+        "tracing_max_queue": 10000,       # spans buffered for export before dropping
+        "log_level": "INFO",
+        "log_file": LOG_FILE,             # None: stderr only
+        "log_json": False,                # one JSON object per line instead of text
+        "log_queue_size": 10000,          # records buffered for the log thread before dropping
+        "log_sample_rates": {},           # per-stage INFO sampling, e.g. {"ingest": 0.01}
+        "admission_max_inflight": 0,      # /ingest requests served at once, per worker (0 = no admission control)
+        "admission_max_queue": 128,       # requests waiting for a slot before shedding with 503
+        "admission_queue_timeout_ms": 1000,  # longest wait for a slot before shedding
+        "admission_retry_after_seconds": 1,  # Retry-After sent with a 503
+        "admission_adaptive": False,      # AIMD-adjust the in-flight limit from latency
+        "admission_target_latency_ms": 250,  # slower requests shrink the adaptive limit
+        "admission_min_inflight": 4,      # floor for the adaptive limit
+        "scheduler_enabled": False,       # priority lanes for async downstream calls (scheduler.py)
+        "scheduler_max_concurrency": 64,  # analyze/store/mint calls in flight across all lanes
+        "scheduler_lanes": {              # weight: share when backlogged; concurrency: lane cap
+            "mint": {"weight": 8, "concurrency": 32},
+            "high": {"weight": 4, "concurrency": 64},
+            "default": {"weight": 1, "concurrency": 64},
+        },
+        "scheduler_source_lanes": {},     # source -> lane for scrolls sent without a priority
+        "idempotency_enabled": False,     # honour Idempotency-Key on /ingest (idempotency.py)
+        "idempotency_content_dedup": False,  # also dedup keyless scrolls by hash of source + raw
+        "idempotency_ttl_seconds": 600,   # how long a completed result is replayed
+        "idempotency_max_entries": 10000,  # per process; prefork workers also share the file below
+        "idempotency_shared_path": os.path.join(LOG_DIR, "idempotency.sqlite3"),  # prefork only; null = per worker
+        "idempotency_claim_timeout_seconds": 60,  # a key claimed by a worker that died frees up after this
+        "work_queue_enabled": False,      # /ingest acks with 202 once the scroll is queued on disk
+        "work_queue_path": os.path.join(LOG_DIR, "work_queue.sqlite3"),
+        "work_queue_workers": 16,         # queued scrolls processed at once
+        "work_queue_visibility_timeout_seconds": 60,  # lease renewed while processing; redelivered this long after its worker dies
+        "work_queue_max_attempts": 5,     # then it moves to the dead-letter table (fallback analyses retry until the last)
+        "work_queue_retry_delay_seconds": 1,  # base of the jittered backoff between attempts
+        "work_queue_poll_interval_ms": 200,   # idle re-check for jobs whose backoff has expired
+        "work_queue_synchronous": "NORMAL"    # SQLite synchronous: NORMAL (crash-safe) | FULL (power-safe)
     }
 
-    def __init__(self, config_path: str = "config.json"):
-        self.config = self._load_config(config_path)
-        self.memory_core = MemoryCoreClient(self.config["memory_core_url"])
-        self.mind_nexus = MindNexusClient(self.config["mind_nexus_url"])
-        self.swarm_engine = SwarmEngine(self.config.get("swarm_config", {}))
+    def __init__(self, config_path: str = "config.json", worker_id: Optional[int] = None):
+        self.config = self.load_config(config_path)
+        # prefork workers (server.py --workers) each own their ledger, spill
+        # journal, span file and work queue; one writer per file keeps them
+        # consistent (the idempotency file is shared, see _make_idempotency)
+        self.worker_id = worker_id
+        if worker_id is not None:
+            for key in ("memory_core_spill_path", "tracing_export_path", "work_queue_path"):
+                if self.config.get(key):
+                    self.config[key] = f"{self.config[key]}.w{worker_id}"
+        HTTPClient.configure_sync(
+            transport=self.config.get("http_sync_transport", "auto"),
+            pool_connections=self.config.get("http_pool_connections", 10),
+            pool_maxsize=self.config.get("http_pool_maxsize", 32),
+            pool_block=self.config.get("http_pool_block", False),
+        )
+        # one circuit breaker per downstream host, shared by all clients
+        self.breakers = BreakerRegistry(
+            failure_threshold=self.config.get("breaker_failure_threshold", 5),
+            backoff_intervals=self.config.get("breaker_backoff_seconds", [5, 15, 30]),
+        )
+        self._retry_budget = RetryBudget(
+            ratio=self.config.get("retry_budget_ratio", 0.2),
+            min_per_second=self.config.get("retry_budget_min_per_second", 10),
+        )
+        memory_core_urls = endpoint_urls(self.config, "memory_core")
+        mind_nexus_urls = endpoint_urls(self.config, "mind_nexus")
+        self.memory_core = MemoryCoreClient(
+            memory_core_urls[0],
+            write_behind=self.config.get("memory_core_write_behind", False),
+            queue_size=self.config.get("memory_core_queue_size", 10000),
+            batch_size=self.config.get("memory_core_batch_size", 100),
+            flush_interval_ms=self.config.get("memory_core_flush_interval_ms", 50),
+            spill_path=self.config.get("memory_core_spill_path"),
+            put_timeout=self.config.get("memory_core_put_timeout_seconds", 5.0),
+            breaker=self.breakers.for_url(memory_core_urls[0]),
+            pool=self._make_pool("memory_core", memory_core_urls),
+        )
+        self.mind_nexus = MindNexusClient(
+            mind_nexus_urls[0],
+            batch_window_ms=self.config.get("mind_nexus_batch_window_ms", 0),
+            batch_max_size=self.config.get("mind_nexus_batch_max_size", 64),
+            cache=self._make_analysis_cache(),
+            breaker=self.breakers.for_url(mind_nexus_urls[0]),
+            pool=self._make_pool("mind_nexus", mind_nexus_urls,
+                                 hedge=self.config.get("mind_nexus_hedge", False)),
+            local=self._make_local_analyzer(),
+            prefilter_below=self.config.get("local_analyzer_prefilter_below", 0),
+        )
+        swarm_config = self.config.get("swarm_config", {})
+        mint_url = swarm_config.get("mint_service_url")
+        self.swarm_engine = SwarmEngine(
+            swarm_config,
+            breaker=self.breakers.for_url(mint_url) if mint_url else None,
+            enabled=self.config.get("mint_service_enabled", False),
+            batch_window_ms=self.config.get("mint_batch_window_ms", 0),
+            batch_max_size=self.config.get("mint_batch_max_size", 32),
+            on_batch=self._record_event_async,
+        )
         self.ledger_path = self.config.get("codex_ledger_path", "codex_ledger.log")
-        # Add event buffer for batch writing
-        self._event_buffer = []
-        self._buffer_size = self.config.get("event_buffer_size", 10)
+        if worker_id is not None:
+            self.ledger_path = worker_ledger_path(self.ledger_path, worker_id)
+        # Background writer thread owns the ledger file and group-commits events
+        self.ledger = LedgerWriter(
+            self.ledger_path,
+            max_batch=self.config.get("event_buffer_size", 10),
+            max_delay=self.config.get("ledger_flush_interval_ms", 50) / 1000.0,
+            fsync=self.config.get("ledger_fsync", "never"),
+            fsync_interval=self.config.get("ledger_fsync_interval_seconds", 1.0),
+            segment_max_bytes=self.config.get("ledger_segment_max_bytes", 64 * 1024 * 1024),
+            segment_max_age=self.config.get("ledger_segment_max_age_seconds", 0),
+            index_block_events=self.config.get("ledger_index_block_events", 256),
+            compact_after=self.config.get("ledger_compact_after_seconds"),
+            codec=self.config.get("ledger_codec", "jsonl"),
+            compression=self.config.get("ledger_compression", "none"),
+            max_pending=self.config.get("ledger_max_pending_events", 100_000),
+            max_write_failures=self.config.get("ledger_max_write_failures", 5),
+        )
+        self._wait_for_commit = bool(self.config.get("ledger_wait_for_commit", False))
+        self.tracer = self._make_tracer()
+        self.admission = self._make_admission()
+        self.scheduler = self._make_scheduler()
+        self.idempotency = self._make_idempotency()
+        self.work_queue = self._make_work_queue()
+        self._queue_task: Optional[asyncio.Task] = None
+        self._queue_jobs: set = set()
+        self._queue_wakeup: Optional[asyncio.Event] = None
+        self._executor_lock = threading.Lock()
+        self._executor_queued = 0
+        self._executor_active = 0
+        self._init_metrics()
         logger.info("Supreme Head Initialized. Awaiting Scroll Ingestion.")
 
-    def _load_config(self, path: str) -> Dict[str, Any]:
+    def _init_metrics(self):
+        """Hot-path instruments plus scrape-time collectors over existing stats()."""
+        m = self.metrics = MetricsRegistry()
+        self.stage_seconds = m.histogram(
+            "orchestrator_stage_seconds", "Time spent per ingest stage", ["stage"])
+        self.ingest_seconds = m.histogram(
+            "orchestrator_ingest_seconds", "End-to-end scroll ingest latency", ["path"])
+        self.scrolls_total = m.counter(
+            "orchestrator_scrolls_total", "Scrolls ingested by path and action", ["path", "action"])
+        self.inflight = m.gauge(
+            "orchestrator_inflight_scrolls", "Scrolls currently being ingested", ["path"])
+        self.retries_total = m.counter(
+            "orchestrator_retries_total", "Retry attempts by downstream call", ["call"])
+        self.fallbacks_total = m.counter(
+            "orchestrator_fallbacks_total", "Degraded results by kind", ["kind"])
+        m.counter("orchestrator_retry_budget_exhausted_total", "Retries refused by the retry budget",
+                  fn=lambda: self._retry_budget.exhausted)
+        m.gauge("orchestrator_executor_queue_depth", "Blocking calls waiting for an executor thread",
+                fn=lambda: self._executor_queued)
+        m.gauge("orchestrator_executor_active", "Blocking calls running on executor threads",
+                fn=lambda: self._executor_active)
+        m.gauge("orchestrator_ledger_pending_events", "Events buffered for the ledger writer",
+                fn=self.ledger.pending)
+        m.counter("orchestrator_ledger_committed_events_total", "Events written to the ledger",
+                  fn=lambda: self.ledger.stats()["committed"])
+        m.counter("orchestrator_ledger_commits_total", "Ledger group commits",
+                  fn=lambda: self.ledger.stats()["commits"])
+        m.gauge("orchestrator_ledger_flush_latency_seconds", "Ledger group-commit latency", ["stat"],
+                fn=lambda: {stat: self.ledger.stats()[f"{stat}_flush_latency_ms"] / 1000.0
+                            for stat in ("last", "mean", "max")})
+        m.gauge("orchestrator_write_behind_queue_depth", "Memory Core stores waiting to be flushed",
+                fn=self.memory_core.queue_depth)
+        m.counter("orchestrator_analyze_batches_total", "Micro-batched /analyze_batch calls",
+                  fn=lambda: self.mind_nexus.batch_stats().get("batches", 0))
+        m.counter("orchestrator_mint_batches_total", "Batch mint calls, by outcome", ["outcome"],
+                  fn=lambda: {"minted": self.swarm_engine.batches_minted, "failed": self.swarm_engine.batches_failed})
+        m.counter("orchestrator_mint_batch_items_total", "Scrolls submitted to batch mints",
+                  fn=lambda: self.swarm_engine.batch_stats().get("items", 0))
+        m.counter("orchestrator_analysis_cache_events_total", "Analysis cache outcomes", ["event"],
+                  fn=lambda: {k: v for k, v in self.mind_nexus.cache_stats().items()
+                              if k in ("hits", "misses", "coalesced", "evictions", "expirations")})
+        m.gauge("orchestrator_analysis_cache_entries", "Analyses held in the cache",
+                fn=lambda: self.mind_nexus.cache_stats().get("entries", 0))
+        m.gauge("orchestrator_analysis_cache_bytes", "Approximate size of cached analyses",
+                fn=lambda: self.mind_nexus.cache_stats().get("bytes", 0))
+        m.counter("orchestrator_local_analyses_total", "Scrolls scored by the in-process analyzer", ["reason"],
+                  fn=lambda: {"prefilter": self.mind_nexus.prefiltered, "fallback": self.mind_nexus.local_fallbacks})
+        m.counter("orchestrator_traces_total", "Traces started, by sampling decision", ["sampled"],
+                  fn=lambda: {"true": self.tracer.sampled, "false": self.tracer.started - self.tracer.sampled})
+        m.counter("orchestrator_spans_dropped_total", "Spans dropped by a full export queue",
+                  fn=lambda: self.tracer.exporter.dropped if self.tracer.exporter else 0)
+        m.counter("orchestrator_log_records_dropped_total", "Log records dropped by a full log queue",
+                  fn=lambda: logging_stats()["dropped"])
+        m.counter("orchestrator_log_records_sampled_out_total", "INFO records skipped by stage sampling",
+                  fn=lambda: logging_stats()["sampled_out"])
+        m.gauge("orchestrator_circuit_state", "Circuit breaker state (0 closed, 1 open, 2 half-open)", ["host"],
+                fn=lambda: {host: b.state for host, b in self.breakers.breakers().items()})
+        m.counter("orchestrator_circuit_rejections_total", "Calls rejected by an open circuit", ["host"],
+                  fn=lambda: {host: b.rejections for host, b in self.breakers.breakers().items()})
+        pools = {name: client.pool for name, client in (("mind_nexus", self.mind_nexus),
+                                                          ("memory_core", self.memory_core))
+                 if client.pool is not None}
+        if pools:
+            def per_endpoint(field):
+                return lambda: {(name, url): ep[field] for name, pool in pools.items()
+                                for url, ep in pool.stats()["endpoints"].items()}
+
+            m.gauge("orchestrator_endpoint_outstanding", "Requests in flight per replica",
+                    ["service", "endpoint"], fn=per_endpoint("outstanding"))
+            m.counter("orchestrator_endpoint_requests_total", "Requests sent per replica",
+                      ["service", "endpoint"], fn=per_endpoint("requests"))
+            m.counter("orchestrator_endpoint_failures_total", "Failed requests per replica",
+                      ["service", "endpoint"], fn=per_endpoint("failures"))
+            m.gauge("orchestrator_endpoint_ejected", "1 while a replica is ejected for failing",
+                    ["service", "endpoint"], fn=per_endpoint("ejected"))
+            m.counter("orchestrator_hedges_total", "Hedged requests sent, and won by the hedge",
+                      ["service", "outcome"],
+                      fn=lambda: {(name, outcome): getattr(pool, f"hedges_{outcome}")
+                                  for name, pool in pools.items() for outcome in ("sent", "won")})
+        if self.admission is not None:
+            adm = self.admission
+            m.gauge("orchestrator_admission_limit", "Ingest requests allowed in flight",
+                    fn=adm.capacity)
+            m.gauge("orchestrator_admission_inflight", "Admitted ingest requests in flight",
+                    fn=lambda: adm.inflight)
+            m.gauge("orchestrator_admission_queue_depth", "Ingest requests waiting for a slot",
+                    fn=adm.queued)
+            m.counter("orchestrator_admission_admitted_total", "Ingest requests admitted",
+                      fn=lambda: adm.admitted)
+            m.counter("orchestrator_admission_shed_total", "Ingest requests shed with 503", ["reason"],
+                      fn=lambda: dict(adm.rejected))
+        if self.scheduler is not None:
+            sched = self.scheduler
+            sched.on_wait = m.histogram(
+                "orchestrator_lane_wait_seconds", "Time downstream calls waited for a lane slot",
+                ["lane"]).observe
+            m.gauge("orchestrator_lane_inflight", "Downstream calls running per lane", ["lane"],
+                    fn=lambda: {name: st["inflight"] for name, st in sched.stats().items()})
+            m.gauge("orchestrator_lane_queue_depth", "Downstream calls waiting per lane", ["lane"],
+                    fn=lambda: {name: st["queued"] for name, st in sched.stats().items()})
+            m.counter("orchestrator_lane_granted_total", "Lane slots granted", ["lane"],
+                      fn=lambda: {name: st["granted"] for name, st in sched.stats().items()})
+        if self.idempotency is not None:
+            idem = self.idempotency
+            m.counter("orchestrator_idempotency_events_total", "Idempotency store outcomes", ["event"],
+                      fn=lambda: {k: v for k, v in idem.stats().items() if k != "entries"})
+            m.gauge("orchestrator_idempotency_entries", "Completed results held for replay",
+                    fn=lambda: idem.stats()["entries"])
+        if self.work_queue is not None:
+            wq = self.work_queue
+            m.gauge("orchestrator_work_queue_jobs", "Durable work queue jobs by state", ["state"],
+                    fn=wq.depth)
+            m.counter("orchestrator_work_queue_events_total", "Durable work queue outcomes", ["event"],
+                      fn=lambda: {"enqueued": wq.enqueued, "acked": wq.acked, "retried": wq.retried,
+                                  "dead_lettered": wq.dead_lettered})
+
+    def _make_pool(self, service: str, urls: List[str], hedge: bool = False) -> Optional[EndpointPool]:
+        """Balancer over ``urls``; ``None`` for a single endpoint, which is called directly."""
+        if len(urls) < 2:
+            return None
+        return EndpointPool(
+            urls,
+            strategy=self.config.get("balancer_strategy", "p2c"),
+            breakers=self.breakers,
+            eject_failures=self.config.get("balancer_eject_failures", 3),
+            eject_seconds=self.config.get("balancer_eject_seconds", 10),
+            max_ejected_ratio=self.config.get("balancer_max_ejected_ratio", 0.5),
+            hedge=hedge,
+            hedge_quantile=self.config.get(f"{service}_hedge_quantile", 0.95),
+            hedge_min_delay=self.config.get(f"{service}_hedge_min_delay_ms", 5) / 1000.0,
+            hedge_budget_ratio=self.config.get(f"{service}_hedge_budget_ratio", 0.1),
+            name=service,
+        )
+
+    def _make_tracer(self) -> Tracer:
+        rate = float(self.config.get("tracing_sample_rate", 0.0))
+        exporter = None
+        if rate > 0:
+            exporter = SpanExporter(
+                self.config.get("tracing_export_path"),
+                flush_interval=self.config.get("tracing_flush_interval_ms", 200) / 1000.0,
+                max_queue=self.config.get("tracing_max_queue", 10000),
+            )
+        return Tracer(rate, exporter)
+
+    def _make_admission(self) -> Optional[AdmissionController]:
+        max_inflight = int(self.config.get("admission_max_inflight", 0) or 0)
+        if max_inflight <= 0:
+            return None
+        return AdmissionController(
+            max_inflight,
+            max_queue=self.config.get("admission_max_queue", 128),
+            queue_timeout=self.config.get("admission_queue_timeout_ms", 1000) / 1000.0,
+            retry_after=self.config.get("admission_retry_after_seconds", 1),
+            adaptive=self.config.get("admission_adaptive", False),
+            target_latency=self.config.get("admission_target_latency_ms", 250) / 1000.0,
+            min_limit=self.config.get("admission_min_inflight", 4),
+        )
+
+    def _make_scheduler(self) -> Optional[LaneScheduler]:
+        if not self.config.get("scheduler_enabled", False):
+            return None
+        return LaneScheduler(
+            self.config.get("scheduler_lanes") or {},
+            max_concurrency=self.config.get("scheduler_max_concurrency", 64),
+            source_lanes=self.config.get("scheduler_source_lanes"),
+        )
+
+    def _make_idempotency(self) -> Optional[IdempotencyStore]:
+        if not self.config.get("idempotency_enabled", False):
+            return None
+        return IdempotencyStore(
+            max_entries=self.config.get("idempotency_max_entries", 10000),
+            ttl_seconds=self.config.get("idempotency_ttl_seconds", 600),
+            content_dedup=self.config.get("idempotency_content_dedup", False),
+            # one file for every prefork worker, so a retry landing on another worker is deduplicated too
+            path=self.config.get("idempotency_shared_path") if self.worker_id is not None else None,
+            claim_timeout=self.config.get("idempotency_claim_timeout_seconds", 60),
+        )
+
+    def _idempotency_key(self, raw_data: str, source: str, idempotency_key: Optional[str]) -> Optional[str]:
+        if self.idempotency is None:
+            return None
+        return self.idempotency.key_for(raw_data, source, idempotency_key)
+
+    def _make_work_queue(self) -> Optional[WorkQueue]:
+        if not self.config.get("work_queue_enabled", False):
+            return None
+        return WorkQueue(
+            self.config.get("work_queue_path") or os.path.join(LOG_DIR, "work_queue.sqlite3"),
+            visibility_timeout=self.config.get("work_queue_visibility_timeout_seconds", 60),
+            max_attempts=self.config.get("work_queue_max_attempts", 5),
+            synchronous=self.config.get("work_queue_synchronous", "NORMAL"),
+        )
+
+    def _lane(self, lane: Optional[str]):
+        """Scheduler slot in ``lane`` around one downstream call (no-op when disabled)."""
+        if self.scheduler is None:
+            return contextlib.nullcontext()
+        return self.scheduler.slot(lane)
+
+    def _stage(self, name: str, **attrs):
+        """Time ``name`` into orchestrator_stage_seconds and trace it as a span."""
+        return _Stage(self.stage_seconds.time(name), self.tracer.span(name, **attrs))
+
+    async def _run_blocking(self, fn, *args):
+        """Run a sync client call on the default executor, tracking queue depth."""
+        def run():
+            with self._executor_lock:
+                self._executor_queued -= 1
+                self._executor_active += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._executor_lock:
+                    self._executor_active -= 1
+
+        with self._executor_lock:
+            self._executor_queued += 1
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, contextvars.copy_context().run, run)
+
+    def _make_local_analyzer(self) -> Optional[LocalAnalyzer]:
+        if not self.config.get("local_analyzer_enabled", False):
+            return None
+        path = self.config.get("local_analyzer_vocabulary_path")
+        return LocalAnalyzer.from_file(path) if path else LocalAnalyzer()
+
+    def _make_analysis_cache(self) -> Optional[AnalysisCache]:
+        if not self.config.get("analysis_cache_enabled", False):
+            return None
+        return AnalysisCache(
+            max_entries=self.config.get("analysis_cache_max_entries", 10000),
+            ttl_seconds=self.config.get("analysis_cache_ttl_seconds", 300),
+            max_bytes=self.config.get("analysis_cache_max_bytes", 32 * 1024 * 1024),
+            meta_keys=self.config.get("analysis_cache_meta_keys", []),
+        )
+
+    @staticmethod
+    def load_config(path: str) -> Dict[str, Any]:
         if not os.path.exists(path):
             logger.warning(f"Config file not found at {path}. Using defaults.")
             return dict(SupremeHead.DEFAULT_CONFIG)
@@ -239,213 +1276,562 @@ class SupremeHead:
             logger.exception("Failed to load config, using defaults.")
             return dict(SupremeHead.DEFAULT_CONFIG)
 
-    # Ledger & event recording with buffering for performance
+    # Ledger & event recording; writes happen on the LedgerWriter thread
+    def _make_event(self, event_type: str, payload: Dict[str, Any]) -> LedgerEvent:
+        return LedgerEvent(event_type, now_iso(), payload)
+
     def _record_event(self, event_type: str, payload: Dict[str, Any]):
-        entry = {
-            "event_type": event_type,
-            "timestamp": now_iso(),
-            "payload": payload
-        }
-        self._event_buffer.append(entry)
-        
-        # Flush buffer when it reaches the configured size
-        if len(self._event_buffer) >= self._buffer_size:
-            self._flush_events()
-        logger.debug(f"Buffered event: {event_type}")
+        self.ledger.append(self._make_event(event_type, payload))
+        logger.debug("Buffered event: %s", event_type)
 
     def _flush_events(self):
-        """Flush buffered events to disk in a single write operation."""
-        if not self._event_buffer:
-            return
-        
-        try:
-            with open(self.ledger_path, "a", encoding="utf-8") as f:
-                for entry in self._event_buffer:
-                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
-            logger.debug(f"Flushed {len(self._event_buffer)} events to ledger")
-            self._event_buffer.clear()
-        except Exception:
-            logger.exception("Failed to flush events to ledger")
+        """Block until every event recorded so far has been written."""
+        self.ledger.flush()
+
+    async def _record_event_async(self, event_type: str, payload: Dict[str, Any]):
+        """Async counterpart of _record_event; never touches the file on the loop."""
+        self.ledger.append(self._make_event(event_type, payload))
+        logger.debug("Buffered event: %s", event_type)
+
+    async def flush_ledger(self):
+        """Await the group commit that covers every event recorded so far.
+
+        A commit barrier for callers that checkpoint progress (``bulk_ingest``):
+        once it returns, every ingest that has completed is in the ledger.
+        """
+        await self.ledger.flush_async()
 
     # Safe call wrapper with exponential backoff for better retry efficiency
     def _safe_call(self, fn, *args, retries: Optional[int] = None, **kwargs):
         r = retries if retries is not None else self.config.get("retries", 2)
         base_delay = self.config.get("retry_delay_seconds", 1)
+        max_delay = self.config.get("retry_max_delay_seconds", 30)
+        self._retry_budget.record_request()
         last_exc = None
         for attempt in range(1, r + 1):
             try:
-                return fn(*args, **kwargs)
+                with self.tracer.span("attempt", call=fn.__name__, attempt=attempt):
+                    return fn(*args, **kwargs)
+            except CircuitOpenError:
+                raise  # fast-fail: retrying an open circuit only adds latency
             except Exception as e:
                 last_exc = e
                 logger.warning(f"Attempt {attempt}/{r} failed for {fn.__name__}: {e}")
                 if attempt < r:
-                    # Exponential backoff: delay increases with each retry
-                    delay = base_delay * (2 ** (attempt - 1))
-                    time.sleep(delay)
+                    if not self._retry_budget.try_spend():
+                        logger.warning(f"Retry budget exhausted for {fn.__name__}")
+                        break
+                    self.retries_total.inc(fn.__name__)
+                    # Jittered exponential backoff: delay increases with each retry
+                    time.sleep(backoff_delay(base_delay, attempt, max_delay))
         logger.error(f"All {r} attempts failed for {fn.__name__}")
         raise last_exc
 
-    # Async safe call wrapper with simple retries
+    # Async safe call wrapper, same jittered backoff and budget as _safe_call
     async def _safe_call_async(self, fn, *args, retries: Optional[int] = None, **kwargs):
         r = retries if retries is not None else self.config.get("retries", 2)
-        delay = self.config.get("retry_delay_seconds", 1)
+        base_delay = self.config.get("retry_delay_seconds", 1)
+        max_delay = self.config.get("retry_max_delay_seconds", 30)
+        self._retry_budget.record_request()
         last_exc = None
         for attempt in range(1, r + 1):
             try:
-                return await fn(*args, **kwargs)
+                with self.tracer.span("attempt", call=fn.__name__, attempt=attempt):
+                    return await fn(*args, **kwargs)
+            except CircuitOpenError:
+                raise
             except Exception as e:
                 last_exc = e
                 logger.warning(f"Attempt {attempt}/{r} failed for async {fn.__name__}: {e}")
                 if attempt < r:  # Only sleep if we're going to retry
-                    await asyncio.sleep(delay)
+                    if not self._retry_budget.try_spend():
+                        logger.warning(f"Retry budget exhausted for async {fn.__name__}")
+                        break
+                    self.retries_total.inc(fn.__name__)
+                    await asyncio.sleep(backoff_delay(base_delay, attempt, max_delay))
         logger.error(f"All {r} attempts failed for async {fn.__name__}")
         raise last_exc
 
     # canonical scroll format
-    def _make_scroll(self, raw: str, source: str) -> Dict[str, Any]:
-        return {
-            "raw": raw,
-            "source": source,
-            "ingested_at": now_iso()
-        }
+    def _make_scroll(self, raw: str, source: str) -> Scroll:
+        return Scroll(raw, source, now_iso())
 
     # Synchronous ingestion path
-    def ingest_scroll(self, raw_data: str, source: str) -> Dict[str, Any]:
-        logger.info(f"Ingesting scroll from {source}")
-        scroll = self._make_scroll(raw_data, source)
+    def ingest_scroll(self, raw_data: str, source: str,
+                      idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """Ingest one scroll; a repeated ``idempotency_key`` gets the first call's result back."""
+        key = self._idempotency_key(raw_data, source, idempotency_key)
+        if key is not None:
+            return self.idempotency.run(key, fingerprint(raw_data, source),
+                                        lambda: self._ingest_scroll_observed(raw_data, source))
+        return self._ingest_scroll_observed(raw_data, source)
+
+    def _ingest_scroll_observed(self, raw_data: str, source: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        self.inflight.inc("sync")
+        try:
+            with self.tracer.start_trace("ingest", path="sync", source=source) as span:
+                result = self._ingest_scroll(raw_data, source)
+                span.set(action=result.action)
+        finally:
+            self.inflight.dec("sync")
+        self._observe_ingest("sync", start, result)
+        return result.to_dict()
+
+    def _observe_ingest(self, path: str, start: float, result: Dict[str, Any]):
+        self.ingest_seconds.observe(time.perf_counter() - start, path)
+        self.scrolls_total.inc(path, result.get("action") or "none")
+
+    def _observe_analysis(self, analysis: Dict[str, Any]):
+        if is_fallback(analysis):
+            self.fallbacks_total.inc("analysis")
+
+    def _observe_action(self, action: Optional[str], result: Any):
+        if action == "Action Failed":
+            self.fallbacks_total.inc("action")
+        elif isinstance(result, dict) and "error" in result:
+            self.fallbacks_total.inc("store")
+
+    def _ingest_scroll(self, raw_data: str, source: str) -> IngestResult:
+        logger.info("Ingesting scroll from %s", source, extra={"stage": "ingest"})
+        with self.tracer.span("make_scroll"):
+            scroll = self._make_scroll(raw_data, source)
         self._record_event("scroll_received", {"source": source, "snippet": raw_data[:160]})
 
         # analysis (with safe call)
         try:
-            analysis = self._safe_call(self.mind_nexus.analyze, raw_data, {"source": source})
+            with self._stage("analyze"):
+                analysis = self._safe_call(self.mind_nexus.analyze, raw_data, {"source": source})
         except Exception as e:
             logger.exception("Analysis failed catastrophically")
-            analysis = {
-                "patterns": [],
-                "sentiment": "neutral",
-                "value_score": 50,
-                "notes": f"analysis error: {str(e)}",
-                "timestamp": now_iso()
-            }
+            analysis = Analysis(notes=f"analysis error: {str(e)}", timestamp=now_iso())
+        self._observe_analysis(analysis)
 
         score = analysis.get("value_score", 0)
-        self._record_event("scroll_analyzed", {"score": score, "analysis_meta": analysis.get("timestamp")})
+        self._record_event("scroll_analyzed", {"source": source, "score": score, "analysis_meta": analysis.get("timestamp")})
 
         # Decision logic
         action = None
-        try:
-            if score >= int(self.config.get("nft_threshold", 85)):
-                logger.info(f"High Value Scroll (Score: {score}). Triggering NFT Tokenization.")
-                result = self._safe_call(self.swarm_engine.trigger_nft_mint, raw_data, analysis)
-                action = "NFT Mint Triggered"
-                self._record_event("nft_triggered", {"score": score, "result": result})
-            else:
-                logger.info(f"Standard Scroll (Score: {score}). Storing in Memory Core.")
-                store_payload = {"scroll": scroll, "analysis": analysis}
-                result = self._safe_call(self.memory_core.store, store_payload)
-                action = "Stored in Memory Core"
-                self._record_event("scroll_stored", {"score": score, "result": result})
-        except Exception:
-            logger.exception("Action stage failed")
-            action = "Action Failed"
+        result = None
+        outcome = None  # ledger event of the action, recorded outside its try
+        with self.tracer.span("decision", score=score) as decision:
+            try:
+                if score >= int(self.config.get("nft_threshold", 85)):
+                    logger.info("High Value Scroll (Score: %s). Triggering NFT Tokenization.", score,
+                                extra={"stage": "decision"})
+                    with self._stage("mint"):
+                        result = self._safe_call(self.swarm_engine.trigger_nft_mint, raw_data, analysis)
+                    action = "NFT Mint Triggered"
+                    outcome = ("nft_triggered", {"source": source, "score": score, "result": result})
+                else:
+                    logger.info("Standard Scroll (Score: %s). Storing in Memory Core.", score,
+                                extra={"stage": "decision"})
+                    store_payload = {"scroll": scroll, "analysis": analysis}
+                    with self._stage("store"):
+                        result = self._safe_call(self.memory_core.store, store_payload)
+                    action = "Stored in Memory Core"
+                    outcome = ("scroll_stored", {"source": source, "score": score, "result": result})
+            except Exception:
+                logger.exception("Action stage failed")
+                action = "Action Failed"
+            decision.set(action=action)
+        self._observe_action(action, result)
+        if outcome is not None:
+            try:
+                self._record_event(*outcome)
+            except LedgerWriteError as e:
+                logger.error("Ledger did not take %s after the action ran: %s", outcome[0], e)
 
-        # Ensure events are flushed after processing
-        self._flush_events()
+        if self._wait_for_commit:
+            with self._stage("ledger_flush"):
+                try:
+                    self._flush_events()
+                except LedgerWriteError as e:
+                    logger.error("Ledger commit failed; the events stay buffered: %s", e)
 
-        return {
-            "status": "Processed",
-            "action": action,
-            "score": score,
-            "source": source,
-            "analysis": analysis
-        }
+        return IngestResult("Processed", action, score, source, analysis)
 
     # Async ingestion path
-    async def ingest_scroll_async(self, raw_data: str, source: str) -> Dict[str, Any]:
-        logger.info(f"[async] Ingesting scroll from {source}")
-        scroll = self._make_scroll(raw_data, source)
-        await self._record_event_async("scroll_received_async", {"source": source, "snippet": raw_data[:160]})
+    async def ingest_scroll_async(self, raw_data: str, source: str, priority: Optional[str] = None,
+                                  idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """Ingest one scroll; ``priority`` names a scheduler lane (e.g. "high").
 
-        # async analyze with safe retry
+        A repeated ``idempotency_key`` (or, with content dedup, the same
+        source + raw) gets the first call's result back, marked
+        ``"deduplicated": true``; a repeat while the first is running waits
+        for it.
+        """
+        key = self._idempotency_key(raw_data, source, idempotency_key)
+        if key is not None:
+            return await self.idempotency.run_async(
+                key, fingerprint(raw_data, source),
+                lambda: self._ingest_scroll_async_observed(raw_data, source, priority))
+        return await self._ingest_scroll_async_observed(raw_data, source, priority)
+
+    async def _ingest_scroll_async_observed(self, raw_data: str, source: str,
+                                            priority: Optional[str] = None,
+                                            defer_fallback: bool = False) -> Dict[str, Any]:
+        start = time.perf_counter()
+        self.inflight.inc("async")
         try:
-            if hasattr(self.mind_nexus, "analyze_async"):
-                analysis = await self._safe_call_async(self.mind_nexus.analyze_async, raw_data, {"source": source})
-            else:
+            with self.tracer.start_trace("ingest", path="async", source=source) as span:
+                result = await self._process_scroll_async(raw_data, source, self._record_event_async,
+                                                          priority, defer_fallback=defer_fallback)
+
+                if self._wait_for_commit:
+                    with self._stage("ledger_flush"):
+                        try:
+                            await self.flush_ledger()
+                        except LedgerWriteError as e:
+                            logger.error("Ledger commit failed; the events stay buffered: %s", e)
+                span.set(action=result.action)
+        finally:
+            self.inflight.dec("async")
+        self._observe_ingest("async", start, result)
+        return result.to_dict()
+
+    # Batch ingestion path
+    async def ingest_batch(self, scrolls: List[Dict[str, Any]],
+                           concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Ingest many scrolls concurrently; results are returned in input order.
+
+        Each item is a ``{"raw": str, "source": str}`` dict, optionally with a
+        ``"priority"`` naming a scheduler lane.  At most
+        ``concurrency`` (default: config ``batch_concurrency``) scrolls are in
+        flight at once, and all ledger events of the batch are written in a
+        single append once every item has finished.  The items have run by
+        then, so a ledger failure is logged and the results still returned.
+        """
+        bound = concurrency or int(self.config.get("batch_concurrency", 32))
+        sem = asyncio.Semaphore(max(1, bound))
+        events: List[Dict[str, Any]] = []
+
+        async def record(event_type: str, payload: Dict[str, Any]):
+            events.append(self._make_event(event_type, payload))
+
+        async def one(item: Dict[str, Any]) -> Dict[str, Any]:
+            source = item.get("source", "batch")
+            async with sem:
+                start = time.perf_counter()
+                self.inflight.inc("batch")
                 try:
-                    loop = asyncio.get_running_loop()
-                except RuntimeError:
-                    loop = asyncio.get_event_loop()
-                analysis = await loop.run_in_executor(None, functools.partial(self.mind_nexus.analyze, raw_data, {"source": source}))
-        except Exception:
+                    with self.tracer.start_trace("ingest", path="batch", source=source):
+                        result = (await self._process_scroll_async(item["raw"], source, record,
+                                                                   item.get("priority"))).to_dict()
+                except Exception as e:
+                    logger.exception("Batch item failed")
+                    result = {"status": "Failed", "action": None, "source": source, "error": str(e)}
+                finally:
+                    self.inflight.dec("batch")
+                self._observe_ingest("batch", start, result)
+                return result
+
+        logger.info("[async] Ingesting batch of %d scrolls", len(scrolls), extra={"stage": "batch"})
+        results = await asyncio.gather(*(one(item) for item in scrolls))
+        events.append(self._make_event("batch_ingested", {
+            "count": len(results),
+            "failed": sum(1 for r in results if r.get("status") != "Processed"),
+        }))
+
+        try:
+            self.ledger.append_many(events)
+            if self._wait_for_commit:
+                with self._stage("ledger_flush"):
+                    await self.flush_ledger()
+        except LedgerWriteError as e:
+            logger.error("Ledger did not take the %d events of a batch: %s", len(events), e)
+
+        return list(results)
+
+    # Streaming ingestion path
+    async def ingest_stream(self, items: AsyncIterable[Dict[str, Any]],
+                            concurrency: Optional[int] = None, admit: bool = False, enqueue: bool = False
+                            ) -> AsyncIterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Ingest scrolls from an async iterable, yielding ``(item, result)`` in input order.
+
+        Items look like ``ingest_batch`` items; one carrying an ``"error"`` key
+        (e.g. a line that failed to parse) is passed through as a failed result.
+        At most ``concurrency`` (default: config ``stream_concurrency``) items
+        are in flight, and the next one is not pulled from ``items`` until the
+        oldest has been yielded, so memory stays bounded however long the feed
+        is and a slow consumer backpressures the producer.
+
+        With ``admit`` every item takes an admission slot (when admission
+        control is configured) for as long as it is processed, so a long
+        stream is shed item by item like ``/ingest`` requests: a shed item
+        fails with a "server overloaded" error.  With ``enqueue`` items are
+        committed to the work queue (``enqueue_scroll``) instead of ingested.
+        """
+        bound = max(1, concurrency or int(self.config.get("stream_concurrency", 64)))
+        window: deque = deque()
+
+        async def one(item: Dict[str, Any]) -> Dict[str, Any]:
+            if "error" in item:
+                return {"status": "Failed", "action": None, "error": item["error"]}
+            source = item.get("source", "stream")
+            slot = self.admission.slot() if admit and self.admission is not None else contextlib.nullcontext()
+            try:
+                async with slot:
+                    if enqueue:
+                        return await self.enqueue_scroll(item["raw"], source, item.get("priority"))
+                    return await self.ingest_scroll_async(item["raw"], source, item.get("priority"))
+            except AdmissionRejected as e:
+                return {"status": "Failed", "action": None, "source": source,
+                        "error": f"server overloaded, retry later ({e.reason})"}
+            except Exception as e:
+                logger.exception("Stream item failed")
+                return {"status": "Failed", "action": None, "source": source, "error": str(e)}
+
+        try:
+            async for item in items:
+                if len(window) >= bound:
+                    done_item, task = window.popleft()
+                    yield done_item, await task
+                window.append((item, asyncio.ensure_future(one(item))))
+            while window:
+                done_item, task = window.popleft()
+                yield done_item, await task
+        finally:
+            for _, task in window:
+                task.cancel()
+
+    # Durable queue path
+    async def enqueue_scroll(self, raw_data: str, source: str, priority: Optional[str] = None,
+                             idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        """Commit a scroll to the work queue and return at once; workers ingest it later.
+
+        A repeated ``idempotency_key`` gets the original job id instead of a second job.
+        """
+        async def put() -> Dict[str, Any]:
+            job_id = await self.work_queue.put({"raw": raw_data, "source": source, "priority": priority})
+            self._wake_work_queue()
+            return {"status": "Accepted", "job_id": job_id, "source": source}
+
+        key = self._idempotency_key(raw_data, source, idempotency_key)
+        if key is not None:
+            return await self.idempotency.run_async(key, fingerprint(raw_data, source), put)
+        return await put()
+
+    async def enqueue_batch(self, scrolls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """``enqueue_scroll`` for ``ingest_batch``-style items, in one commit."""
+        ids = await self.work_queue.put_many_async(
+            [{"raw": item["raw"], "source": item.get("source", "batch"), "priority": item.get("priority")}
+             for item in scrolls])
+        self._wake_work_queue()
+        return [{"status": "Accepted", "job_id": job_id, "source": item.get("source", "batch")}
+                for job_id, item in zip(ids, scrolls)]
+
+    def _wake_work_queue(self):
+        if self._queue_task is None or self._queue_task.done() \
+                or self._queue_task.get_loop() is not asyncio.get_running_loop():
+            self.start_work_queue()
+        self._queue_wakeup.set()
+
+    def start_work_queue(self):
+        """Start draining the work queue on the running loop (jobs left by a previous run included)."""
+        if self.work_queue is None:
+            return
+        self._queue_wakeup = asyncio.Event()
+        self._queue_jobs = set()
+        # jobs start their own traces, not children of the request that woke the queue
+        self._queue_task = asyncio.get_running_loop().create_task(self._drain_work_queue(),
+                                                                  context=contextvars.Context())
+
+    async def _drain_work_queue(self):
+        workers = max(1, int(self.config.get("work_queue_workers", 16)))
+        poll = self.config.get("work_queue_poll_interval_ms", 200) / 1000.0
+        while True:
+            if len(self._queue_jobs) >= workers:
+                await asyncio.wait(self._queue_jobs, return_when=asyncio.FIRST_COMPLETED)
+                continue
+            # clear before claiming so a put that lands meanwhile is not missed
+            self._queue_wakeup.clear()
+            try:
+                jobs = await self.work_queue.claim_async(workers - len(self._queue_jobs))
+            except Exception:
+                logger.exception("Work queue claim failed")
+                jobs = []
+            if not jobs:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._queue_wakeup.wait(), poll)
+                continue
+            for job in jobs:
+                task = asyncio.ensure_future(self._run_job(job))
+                self._queue_jobs.add(task)
+                task.add_done_callback(self._queue_jobs.discard)
+
+    async def _run_job(self, job: Job):
+        """Ingest one queued scroll; ack once its ledger events are committed, else retry.
+
+        The lease is extended while the scroll is processed.  A fallback
+        analysis counts as a failed attempt, except on the last attempt,
+        where the scroll is processed with it as on the direct path.  A
+        ledger failure after the action ran is logged and the job acked
+        anyway: redelivering it would repeat the action, not the write.
+        """
+        payload = job.payload
+        source = payload.get("source", "api")
+        heartbeat = asyncio.ensure_future(self._extend_lease(job))
+        try:
+            # deduplicated at enqueue; the store would only replay the "Accepted" result
+            result = await self._ingest_scroll_async_observed(
+                payload["raw"], source, payload.get("priority"),
+                defer_fallback=job.attempts < self.work_queue.max_attempts)
+            error = "action failed" if result.get("action") == "Action Failed" else None
+        except DegradedAnalysis as e:
+            logger.warning("Queued job %d got a fallback analysis (%s); retrying", job.id, e)
+            error = f"fallback analysis: {e}"
+        except Exception as e:
+            logger.exception("Queued job %d failed", job.id)
+            error = str(e) or type(e).__name__
+        finally:
+            heartbeat.cancel()
+        if error is None:
+            try:
+                await self.flush_ledger()
+            except LedgerWriteError as e:
+                logger.error("Ledger commit for queued job %d failed; acking anyway: %s", job.id, e)
+            await self.work_queue.ack_async(job.id)
+            return
+        delay = backoff_delay(self.config.get("work_queue_retry_delay_seconds", 1), job.attempts,
+                              self.config.get("retry_max_delay_seconds", 30))
+        if await self.work_queue.nack_async(job, error, delay):
+            await self._record_event_async("scroll_dead_lettered", {
+                "job_id": job.id, "source": source, "attempts": job.attempts, "error": error})
+
+    async def _extend_lease(self, job: Job):
+        """Keep ``job`` leased while it is processed, however long that takes."""
+        interval = self.work_queue.visibility_timeout / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.work_queue.extend_lease_async(job.id)
+            except Exception:
+                logger.exception("Extending the lease of job %d failed", job.id)
+
+    async def _stop_work_queue(self, timeout: float = 10.0):
+        """Let in-flight jobs finish (up to ``timeout``); unfinished ones are redelivered next start."""
+        task, self._queue_task = self._queue_task, None
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            return
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        if self._queue_jobs:
+            _, pending = await asyncio.wait(self._queue_jobs, timeout=timeout)
+            for job_task in pending:
+                job_task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+
+    async def _process_scroll_async(self, raw_data: str, source: str, record,
+                                    priority: Optional[str] = None,
+                                    defer_fallback: bool = False) -> IngestResult:
+        """Analyze + store/mint one scroll, reporting ledger events through ``record``.
+
+        With ``defer_fallback`` a fallback analysis raises ``DegradedAnalysis``
+        before anything is stored or minted, so the caller can retry later.
+
+        With the scheduler enabled, analyze and store run in the scroll's lane
+        and a mint in the ``mint`` lane.  Each lane slot covers one call only;
+        the analysis that decides on a mint gets no mint-lane priority.
+        """
+        lane = self.scheduler.lane_for(priority, source) if self.scheduler is not None else None
+        logger.info("[async] Ingesting scroll from %s", source, extra={"stage": "ingest"})
+        with self.tracer.span("make_scroll"):
+            scroll = self._make_scroll(raw_data, source)
+        await record("scroll_received_async", {"source": source, "snippet": raw_data[:160]})
+
+        # async analyze with safe retry
+        try:
+            async with self._lane(lane):
+                with self._stage("analyze"):
+                    if hasattr(self.mind_nexus, "analyze_async"):
+                        analysis = await self._safe_call_async(self.mind_nexus.analyze_async, raw_data, {"source": source})
+                    else:
+                        analysis = await self._run_blocking(self.mind_nexus.analyze, raw_data, {"source": source})
+        except Exception as e:
             logger.exception("Async analysis failed")
-            analysis = {
-                "patterns": [],
-                "sentiment": "neutral",
-                "value_score": 50,
-                "timestamp": now_iso()
-            }
+            analysis = Analysis(notes=f"fallback: {e}", timestamp=now_iso())
+
+        self._observe_analysis(analysis)
+        if defer_fallback and is_fallback(analysis):
+            raise DegradedAnalysis(analysis.get("notes"))
 
         score = analysis.get("value_score", 0)
-        await self._record_event_async("scroll_analyzed_async", {"score": score})
+        await record("scroll_analyzed_async", {"source": source, "score": score})
 
         # decision async
         action = None
-        try:
-            if score >= int(self.config.get("nft_threshold", 85)):
-                if hasattr(self.swarm_engine, "trigger_nft_mint_async"):
-                    res = await self._safe_call_async(self.swarm_engine.trigger_nft_mint_async, raw_data, analysis)
-                else:
-                    try:
-                        loop = asyncio.get_running_loop()
-                    except RuntimeError:
-                        loop = asyncio.get_event_loop()
-                    res = await loop.run_in_executor(None, functools.partial(self.swarm_engine.trigger_nft_mint, raw_data, analysis))
-                action = "NFT Mint Triggered"
-                await self._record_event_async("nft_triggered_async", {"score": score, "result": res})
-            else:
-                payload = {"scroll": scroll, "analysis": analysis}
-                if hasattr(self.memory_core, "store_async"):
-                    res = await self._safe_call_async(self.memory_core.store_async, payload)
+        res = None
+        outcome = None  # ledger event of the action, recorded outside its try
+        with self.tracer.span("decision", score=score) as decision:
+            try:
+                if score >= int(self.config.get("nft_threshold", 85)):
+                    async with self._lane(MINT_LANE):
+                        with self._stage("mint"):
+                            if hasattr(self.swarm_engine, "trigger_nft_mint_async"):
+                                res = await self._safe_call_async(self.swarm_engine.trigger_nft_mint_async, raw_data, analysis)
+                            else:
+                                res = await self._run_blocking(self.swarm_engine.trigger_nft_mint, raw_data, analysis)
+                    action = "NFT Mint Triggered"
+                    outcome = ("nft_triggered_async", {"source": source, "score": score, "result": res})
                 else:
-                    try:
-                        loop = asyncio.get_running_loop()
-                    except RuntimeError:
-                        loop = asyncio.get_event_loop()
-                    res = await loop.run_in_executor(None, functools.partial(self.memory_core.store, payload))
-                action = "Stored in Memory Core"
-                await self._record_event_async("scroll_stored_async", {"score": score, "result": res})
-        except Exception:
-            logger.exception("Async action failed")
-            action = "Action Failed"
-
-        # Ensure events are flushed after processing
-        self._flush_events()
+                    payload = {"scroll": scroll, "analysis": analysis}
+                    async with self._lane(lane):
+                        with self._stage("store"):
+                            if hasattr(self.memory_core, "store_async"):
+                                res = await self._safe_call_async(self.memory_core.store_async, payload)
+                            else:
+                                res = await self._run_blocking(self.memory_core.store, payload)
+                    action = "Stored in Memory Core"
+                    outcome = ("scroll_stored_async", {"source": source, "score": score, "result": res})
+            except Exception:
+                logger.exception("Async action failed")
+                action = "Action Failed"
+            decision.set(action=action)
+        self._observe_action(action, res)
+        # a ledger failure must not turn an action that ran into "Action Failed" (and a retry)
+        if outcome is not None:
+            try:
+                await record(*outcome)
+            except LedgerWriteError as e:
+                logger.error("Ledger did not take %s after the action ran: %s", outcome[0], e)
 
-        return {
-            "status": "Processed",
-            "action": action,
-            "score": score,
-            "source": source,
-            "analysis": analysis
-        }
+        return IngestResult("Processed", action, score, source, analysis)
     
     async def cleanup(self):
         """Cleanup resources and flush pending data."""
-        # Flush any pending ledger entries
-        async with self._ledger_buffer_lock:
-            await self._flush_ledger_buffer()
-        
-        # Close HTTP session
+        if self.work_queue is not None:
+            await self._stop_work_queue()
+            self.work_queue.close()
+        if self.idempotency is not None:
+            self.idempotency.close()
+
+        # Send batches still inside their window while the ledger and HTTP session are open
+        await self.mind_nexus.close()
+        await self.swarm_engine.close()
+
+        # Drain write-behind stores while the HTTP session is still open
+        await self.memory_core.close()
+
+        # Commit pending ledger entries and stop the writer thread
+        await self.ledger.close_async()
+        self.tracer.close()
+
+        # Close HTTP sessions
         await HTTPClient.close_session()
+        HTTPClient.close_sync()
         logger.info("Supreme Head cleanup complete.")
 
 
 # ---- Quick CLI for manual testing ----
 def _cli_demo():
+    configure_logging(SupremeHead.load_config("config.json"))
     head = SupremeHead()
     test_scroll = "The flame remembers the pattern of the market's quiet laughter."
     result = head.ingest_scroll(test_scroll, "Founding Ritualist Log")
-    print(json.dumps(result, indent=2, ensure_ascii=False))
+    print(codec.dumps_pretty(result).decode("utf-8"))
 
 
 if __name__ == "__main__":
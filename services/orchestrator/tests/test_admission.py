@@ -0,0 +1,133 @@
+"""
+Tests for orchestrator/admission.py and admission control on the ingest endpoints.
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_admission.py -v
+"""
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+from admission import AdmissionController, AdmissionRejected
+from supremehead import SupremeHead
+
+
+@pytest.mark.asyncio
+async def test_admits_up_to_limit_then_queues_fifo():
+    adm = AdmissionController(2, max_queue=4, queue_timeout=1.0)
+    await adm.acquire()
+    await adm.acquire()
+    order = []
+
+    async def waiter(i):
+        await adm.acquire()
+        order.append(i)
+
+    tasks = [asyncio.create_task(waiter(i)) for i in range(3)]
+    await asyncio.sleep(0)
+    assert adm.queued() == 3 and adm.inflight == 2
+    for _ in range(3):
+        adm.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    assert order == [0, 1, 2]
+    assert adm.admitted == 5
+
+
+@pytest.mark.asyncio
+async def test_sheds_when_queue_full_and_on_timeout():
+    adm = AdmissionController(1, max_queue=1, queue_timeout=0.05, retry_after=3)
+    await adm.acquire()
+    queued = asyncio.create_task(adm.acquire())
+    await asyncio.sleep(0)
+    with pytest.raises(AdmissionRejected) as exc:
+        await adm.acquire()
+    assert exc.value.reason == "queue_full" and exc.value.retry_after == 3
+    with pytest.raises(AdmissionRejected) as exc:
+        await queued
+    assert exc.value.reason == "timeout"
+    assert adm.rejected == {"queue_full": 1, "timeout": 1}
+    assert adm.queued() == 0 and adm.inflight == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_a_slot():
+    adm = AdmissionController(1, max_queue=2)
+    await adm.acquire()
+    gone = asyncio.create_task(adm.acquire())
+    await asyncio.sleep(0)
+    gone.cancel()  # client disconnected while queued
+    with pytest.raises(asyncio.CancelledError):
+        await gone
+    assert adm.queued() == 0
+    adm.release()
+    assert adm.inflight == 0
+    await adm.acquire()
+    assert adm.inflight == 1
+
+
+def test_adaptive_limit_backs_off_and_recovers(monkeypatch):
+    adm = AdmissionController(20, adaptive=True, target_latency=0.1, min_limit=2, backoff_ratio=0.5)
+    adm._adjust(0.5, False, saturated=True)
+    assert adm.capacity() == 10
+    adm._adjust(0.5, False, saturated=True)  # same congestion episode
+    assert adm.capacity() == 10
+    adm._last_decrease = 0.0
+    adm._adjust(0.0, True, saturated=True)
+    assert adm.capacity() == 5
+    for _ in range(200):
+        adm._adjust(0.01, False, saturated=True)
+    assert adm.capacity() == 20
+    adm.limit = 5.0
+    adm._adjust(0.01, False, saturated=False)  # unused headroom is not grown
+    assert adm.limit == 5.0
+
+
+@pytest.mark.asyncio
+async def test_ingest_returns_503_with_retry_after_when_shedding(tmp_path, monkeypatch):
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"codex_ledger_path": str(tmp_path / "ledger.log"),
+                                  "admission_max_inflight": 1, "admission_max_queue": 0,
+                                  "admission_retry_after_seconds": 2}))
+    head = SupremeHead(config_path=str(config))
+    monkeypatch.setattr(server, "_head", head)
+    await head.admission.acquire()  # the only slot is busy
+    async with TestClient(TestServer(server.make_app())) as client:
+        resp = await client.post("/ingest", json={"raw": "hello"})
+        assert resp.status == 503
+        assert resp.headers["Retry-After"] == "2"
+        assert (await resp.json())["reason"] == "queue_full"
+        assert (await client.get("/health")).status == 200
+
+        text = await (await client.get("/metrics")).text()
+        assert 'orchestrator_admission_shed_total{reason="queue_full"} 1' in text
+        assert "orchestrator_admission_limit 1" in text
+
+
+@pytest.mark.asyncio
+async def test_stream_lines_are_admitted_one_by_one(tmp_path, monkeypatch):
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"codex_ledger_path": str(tmp_path / "ledger.log"),
+                                  "admission_max_inflight": 1, "admission_max_queue": 0}))
+    head = SupremeHead(config_path=str(config))
+    monkeypatch.setattr(server, "_head", head)
+    async with TestClient(TestServer(server.make_app())) as client:
+        await head.admission.acquire()  # the only slot is busy: every line is shed
+        resp = await client.post("/ingest/stream", data=b'{"raw": "a"}\n{"raw": "b"}\n')
+        lines = [json.loads(line) async for line in resp.content]
+        assert all("overloaded" in line["error"] for line in lines[:-1])
+        assert lines[-1] == {"summary": {"count": 2, "failed": 2}}
+
+        head.admission.release()
+        head.admission.max_queue = 8  # now lines wait for the one slot instead of being shed
+        resp = await client.post("/ingest/stream", data=b'{"raw": "a"}\n{"raw": "b"}\n')
+        lines = [json.loads(line) async for line in resp.content]
+        assert [line.get("status") for line in lines[:-1]] == ["Processed", "Processed"]
+        assert head.admission.admitted == 3 and head.admission.inflight == 0
@@ -0,0 +1,142 @@
+"""
+Tests for orchestrator/analysis_cache.py
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_analysis_cache.py -v
+"""
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_cache import AnalysisCache, is_fallback
+from supremehead import MindNexusClient
+
+ANALYSIS = {"patterns": ["temporal"], "sentiment": "neutral", "value_score": 70}
+FALLBACK = {"patterns": [], "sentiment": "neutral", "value_score": 50, "notes": "fallback: down"}
+
+
+class TestKeys:
+    def test_same_raw_same_key(self):
+        cache = AnalysisCache()
+        assert cache.key("abc", {"source": "x"}) == cache.key("abc", {"source": "y"})
+
+    def test_meta_keys_take_part_in_key(self):
+        cache = AnalysisCache(meta_keys=["source"])
+        assert cache.key("abc", {"source": "x"}) != cache.key("abc", {"source": "y"})
+        assert cache.key("abc", {"source": "x", "other": 1}) == cache.key("abc", {"source": "x"})
+
+
+class TestEviction:
+    def test_lru_eviction_by_entries(self):
+        cache = AnalysisCache(max_entries=2)
+        cache.put("a", ANALYSIS)
+        cache.put("b", ANALYSIS)
+        assert cache.get("a") is not None  # a becomes most recently used
+        cache.put("c", ANALYSIS)
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["evictions"] == 1
+
+    def test_byte_cap(self):
+        cache = AnalysisCache(max_bytes=700)
+        for k in "abcdef":
+            cache.put(k, ANALYSIS)
+        stats = cache.stats()
+        assert stats["bytes"] <= 700
+        assert stats["entries"] < 6
+
+    def test_ttl_expiry(self):
+        cache = AnalysisCache(ttl_seconds=0.01)
+        cache.put("a", ANALYSIS)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_fallback_never_cached(self):
+        cache = AnalysisCache()
+        assert is_fallback(FALLBACK)
+        cache.put("a", FALLBACK)
+        assert cache.get("a") is None
+
+
+class TestSingleFlight:
+    @pytest.mark.asyncio
+    async def test_async_concurrent_requests_share_one_call(self):
+        cache = AnalysisCache()
+        calls = []
+
+        async def compute(raw, meta):
+            calls.append(raw)
+            await asyncio.sleep(0.01)
+            return dict(ANALYSIS)
+
+        results = await asyncio.gather(*(cache.get_or_compute_async("same", None, compute) for _ in range(5)))
+        assert calls == ["same"]
+        assert all(r["value_score"] == 70 for r in results)
+        assert cache.stats()["coalesced"] == 4
+        assert await cache.get_or_compute_async("same", None, compute) == ANALYSIS
+        assert cache.stats()["hits"] == 1
+
+    def test_sync_concurrent_requests_share_one_call(self):
+        cache = AnalysisCache()
+        calls = []
+        gate = threading.Event()
+
+        def compute(raw, meta):
+            calls.append(raw)
+            gate.wait(1)
+            return dict(ANALYSIS)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("same", None, compute)))
+                   for _ in range(4)]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        gate.set()
+        for t in threads:
+            t.join()
+        assert calls == ["same"]
+        assert len(results) == 4
+
+    @pytest.mark.asyncio
+    async def test_fallback_result_shared_but_not_cached(self):
+        cache = AnalysisCache()
+        calls = []
+
+        async def compute(raw, meta):
+            calls.append(raw)
+            return dict(FALLBACK)
+
+        await cache.get_or_compute_async("x", None, compute)
+        await cache.get_or_compute_async("x", None, compute)
+        assert len(calls) == 2
+
+
+class TestMindNexusIntegration:
+    def test_analyze_without_service_is_not_cached(self):
+        client = MindNexusClient("http://localhost:19998", cache=AnalysisCache())
+        client.analyze("text")
+        client.analyze("text")
+        assert client.cache_stats()["entries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_analyze_async_hits_cache(self, monkeypatch):
+        client = MindNexusClient("http://mn", cache=AnalysisCache())
+        calls = []
+
+        async def fake_uncached(raw, meta=None):
+            calls.append(raw)
+            return dict(ANALYSIS)
+
+        monkeypatch.setattr(client, "_analyze_uncached_async", fake_uncached)
+        await client.analyze_async("text", {"source": "a"})
+        await client.analyze_async("text", {"source": "b"})
+        assert calls == ["text"]
+        assert client.cache_stats()["hits"] == 1
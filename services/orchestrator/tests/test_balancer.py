@@ -0,0 +1,205 @@
+"""
+Tests for orchestrator/balancer.py
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_balancer.py -v
+"""
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_cache import is_fallback
+from balancer import EndpointPool, endpoint_urls
+from resilience import BreakerRegistry, CircuitOpenError
+from supremehead import HTTPClient, MindNexusClient, SupremeHead
+
+URLS = ["http://a:1", "http://b:1", "http://c:1"]
+
+
+def _by_url(pool):
+    return {e.url: e for e in pool.endpoints}
+
+
+class TestSelection:
+    def test_p2c_with_two_candidates_picks_the_less_loaded(self):
+        pool = EndpointPool(URLS[:2])
+        _by_url(pool)["http://a:1"].outstanding = 5
+        assert {pool.pick().url for _ in range(50)} == {"http://b:1"}
+
+    def test_least_outstanding_spreads_ties(self):
+        pool = EndpointPool(URLS, strategy="least_outstanding")
+        _by_url(pool)["http://a:1"].outstanding = 1
+        assert {pool.pick().url for _ in range(100)} == {"http://b:1", "http://c:1"}
+
+    def test_unknown_strategy_is_rejected(self):
+        with pytest.raises(ValueError):
+            EndpointPool(URLS, strategy="random")
+
+    def test_open_circuits_are_skipped_and_all_open_raises(self):
+        breakers = BreakerRegistry(failure_threshold=1, backoff_intervals=[60])
+        pool = EndpointPool(URLS[:2], breakers=breakers)
+        breakers.for_url("http://a:1").record_failure()
+        assert {pool.pick().url for _ in range(20)} == {"http://b:1"}
+        breakers.for_url("http://b:1").record_failure()
+        with pytest.raises(CircuitOpenError):
+            pool.pick()
+
+    def test_endpoint_urls_prefers_replica_list(self):
+        assert endpoint_urls({"mind_nexus_url": "http://x"}, "mind_nexus") == ["http://x"]
+        assert endpoint_urls({"mind_nexus_url": "http://x", "mind_nexus_urls": "http://a, http://b"},
+                             "mind_nexus") == ["http://a", "http://b"]
+
+
+class TestEjection:
+    def _fail(self, pool, url, times):
+        for _ in range(times):
+            ep = _by_url(pool)[url]
+            pool._start(ep)
+            pool._finish(ep, None, failed=True)
+
+    def test_consecutive_failures_eject_for_a_while(self):
+        pool = EndpointPool(URLS, eject_failures=2, eject_seconds=60)
+        self._fail(pool, "http://a:1", 2)
+        assert pool.stats()["endpoints"]["http://a:1"]["ejected"] is True
+        assert "http://a:1" not in {pool.pick().url for _ in range(50)}
+
+    def test_success_resets_the_failure_streak(self):
+        pool = EndpointPool(URLS, eject_failures=2)
+        self._fail(pool, "http://a:1", 1)
+        ep = _by_url(pool)["http://a:1"]
+        pool._start(ep)
+        pool._finish(ep, 0.01, failed=False)
+        self._fail(pool, "http://a:1", 1)
+        assert pool.stats()["endpoints"]["http://a:1"]["ejected"] is False
+
+    def test_ejection_is_capped_and_never_empties_the_pool(self):
+        pool = EndpointPool(URLS[:2], eject_failures=1, max_ejected_ratio=0.5)
+        self._fail(pool, "http://a:1", 1)
+        self._fail(pool, "http://b:1", 1)
+        ejected = [url for url, st in pool.stats()["endpoints"].items() if st["ejected"]]
+        assert ejected == ["http://a:1"]
+        assert pool.pick().url == "http://b:1"
+
+
+class TestHedging:
+    async def test_slow_primary_is_hedged_and_loser_cancelled(self):
+        pool = EndpointPool(URLS[:2], hedge=True, hedge_min_delay=0.01, hedge_budget_ratio=1.0)
+        delays = {"http://a:1": 0.0, "http://b:1": 0.0}
+        cancelled = []
+
+        async def call(ep):
+            try:
+                await asyncio.sleep(delays[ep.url])
+            except asyncio.CancelledError:
+                cancelled.append(ep.url)
+                raise
+            return ep.url
+
+        for _ in range(30):  # fast history -> hedge delay near the 10 ms floor
+            await pool.call_async(call)
+        assert pool.hedge_delay() == pytest.approx(0.01, abs=0.005)
+
+        delays["http://a:1"] = 1.0
+        winners = [await pool.call_async(call) for _ in range(20)]
+        assert set(winners) == {"http://b:1"}
+        assert pool.hedges_sent >= 1 and pool.hedges_won == pool.hedges_sent
+        await asyncio.sleep(0)  # let the last loser process its cancellation
+        assert set(cancelled) == {"http://a:1"}
+        assert all(e.outstanding == 0 for e in pool.endpoints)
+
+    async def test_hedges_are_limited_by_budget(self):
+        pool = EndpointPool(URLS[:2], hedge=True, hedge_min_delay=0.001, hedge_budget_ratio=0.0)
+        pool._hedge_budget.max_tokens = pool._hedge_budget._tokens = 1.0
+        pool._hedge_budget.min_per_second = 0.0
+
+        delay = [0.0]
+
+        async def call(ep):
+            await asyncio.sleep(delay[0])
+            return ep.url
+
+        for _ in range(30):
+            await pool.call_async(call)
+        delay[0] = 0.02  # every call now outlives the hedge delay
+        for _ in range(5):
+            await pool.call_async(call)
+        assert pool.hedges_sent == 1
+
+    async def test_no_hedging_until_enough_samples(self):
+        pool = EndpointPool(URLS[:2], hedge=True)
+        assert pool.hedge_delay() is None
+
+
+# ── Clients over real replicas ─────────────────────────────────────────────────
+
+async def _replica(healthy: bool) -> TestServer:
+    async def analyze(request):
+        if not healthy:
+            return web.json_response({"error": "down"}, status=500)
+        body = await request.json()
+        return web.json_response({"value_score": 60, "echo": body["raw"]})
+
+    async def analyze_batch(request):
+        body = await request.json()
+        return web.json_response({"results": [{"value_score": 60, "echo": i["raw"]} for i in body["items"]]})
+
+    app = web.Application()
+    app.router.add_post("/analyze", analyze)
+    app.router.add_post("/analyze_batch", analyze_batch)
+    server = TestServer(app)
+    await server.start_server()
+    return server
+
+
+async def test_failing_replica_is_ejected_and_traffic_moves_on():
+    good, bad = await _replica(True), await _replica(False)
+    try:
+        pool = EndpointPool([str(good.make_url("")), str(bad.make_url(""))], eject_failures=2,
+                            eject_seconds=60, name="mind_nexus")
+        client = MindNexusClient(pool.endpoints[0].url, pool=pool)
+        results = [await client.analyze_async(f"scroll {i}") for i in range(20)]
+        assert sum(1 for r in results if is_fallback(r)) <= 2
+        assert all(not is_fallback(r) for r in results[-10:])
+        assert pool.stats()["endpoints"][pool.endpoints[1].url]["ejections"] == 1
+    finally:
+        await HTTPClient.close_session()
+        await good.close()
+        await bad.close()
+
+
+async def test_open_circuit_on_first_replica_does_not_block_batched_analyses():
+    first, second = await _replica(True), await _replica(True)
+    try:
+        urls = [str(first.make_url("")), str(second.make_url(""))]
+        breakers = BreakerRegistry(failure_threshold=1, backoff_intervals=[60])
+        pool = EndpointPool(urls, breakers=breakers, name="mind_nexus")
+        client = MindNexusClient(urls[0], batch_window_ms=5, breaker=breakers.for_url(urls[0]), pool=pool)
+        breakers.for_url(urls[0]).record_failure()
+        results = await asyncio.gather(*(client.analyze_async(f"scroll {i}") for i in range(4)))
+        assert not any(is_fallback(r) for r in results)
+        assert pool.stats()["endpoints"][pool.endpoints[1].url]["requests"] >= 1
+    finally:
+        await HTTPClient.close_session()
+        await first.close()
+        await second.close()
+
+
+def test_head_builds_pools_only_for_replica_lists(tmp_path):
+    cfg = tmp_path / "config.json"
+    cfg.write_text(json.dumps({"codex_ledger_path": str(tmp_path / "ledger.log"),
+                               "mind_nexus_urls": ["http://mn-0:3001", "http://mn-1:3001"],
+                               "mind_nexus_hedge": True}))
+    head = SupremeHead(config_path=str(cfg))
+    assert head.memory_core.pool is None
+    assert head.mind_nexus.pool.hedge is True
+    assert head.mind_nexus.base_url == "http://mn-0:3001"
+    text = head.metrics.render()
+    assert 'orchestrator_endpoint_requests_total{service="mind_nexus",endpoint="http://mn-1:3001"} 0' in text
+    assert 'orchestrator_hedges_total{service="mind_nexus",outcome="sent"} 0' in text
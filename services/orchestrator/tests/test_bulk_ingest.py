@@ -0,0 +1,159 @@
+"""
+Tests for orchestrator/bulk_ingest.py
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_bulk_ingest.py -v
+"""
+import json
+import os
+import signal
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bulk_ingest
+from supremehead import SupremeHead
+
+
+@pytest.fixture
+def ingested(monkeypatch):
+    """Replace the downstream pipeline; returns the (raw, source) pairs ingested."""
+    seen = []
+
+    async def fake_ingest(self, raw, source, priority=None):
+        seen.append((raw, source))
+        return {"status": "Processed", "action": "Stored in Memory Core", "source": source}
+
+    monkeypatch.setattr(SupremeHead, "ingest_scroll_async", fake_ingest)
+    return seen
+
+
+def _args(tmp_path, *argv):
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"codex_ledger_path": str(tmp_path / "ledger.log"), "log_file": None}))
+    return bulk_ingest.build_parser().parse_args(
+        [*argv, "--config", str(config), "--progress-interval", "0", "--checkpoint-interval", "0"])
+
+
+def _write_jsonl(path, raws):
+    path.write_text("".join(json.dumps({"raw": r, "source": "feed"}) + "\n" for r in raws))
+
+
+def test_jsonl_null_or_empty_source_falls_back_to_the_file():
+    for line in (b'{"raw": "x", "source": null}', b'{"raw": "x", "source": ""}', b'{"raw": "x"}'):
+        assert bulk_ingest._jsonl_item(line, "feed.jsonl")["source"] == "feed.jsonl"
+
+
+async def test_jsonl_ingests_every_line_and_marks_checkpoint_done(tmp_path, ingested):
+    feed = tmp_path / "feed.jsonl"
+    feed.write_text('{"raw": "one", "source": "feed"}\n"two"\n\nnot json\n')
+    ckpt = tmp_path / "ckpt.json"
+    results = tmp_path / "results.jsonl"
+
+    assert await bulk_ingest.run(_args(tmp_path, str(feed), "--checkpoint", str(ckpt),
+                                       "--results", str(results))) == 0
+
+    assert ingested == [("one", "feed"), ("two", "feed.jsonl")]
+    state = json.loads(ckpt.read_text())
+    assert state["done"] is True
+    assert state["position"] == feed.stat().st_size
+    assert (state["records"], state["failed"]) == (3, 1)
+    lines = [json.loads(line) for line in results.read_text().splitlines()]
+    assert [line["status"] for line in lines] == ["Processed", "Processed", "Failed"]
+
+
+async def test_resume_after_interrupt_skips_completed_records(tmp_path, monkeypatch):
+    raws = [f"scroll {i}" for i in range(10)]
+    feed = tmp_path / "feed.jsonl"
+    _write_jsonl(feed, raws)
+    ckpt = tmp_path / "ckpt.json"
+    seen = []
+
+    async def interrupting_ingest(self, raw, source, priority=None):
+        seen.append(raw)
+        if raw == "scroll 3":
+            os.kill(os.getpid(), signal.SIGINT)
+        return {"status": "Processed", "action": "Stored in Memory Core"}
+
+    monkeypatch.setattr(SupremeHead, "ingest_scroll_async", interrupting_ingest)
+    argv = (str(feed), "--checkpoint", str(ckpt), "--concurrency", "1")
+    assert await bulk_ingest.run(_args(tmp_path, *argv)) == 130
+    state = json.loads(ckpt.read_text())
+    assert state["done"] is False
+    assert state["records"] == len(seen) < len(raws)
+
+    assert await bulk_ingest.run(_args(tmp_path, *argv)) == 0
+    assert seen == raws
+    assert json.loads(ckpt.read_text())["records"] == len(raws)
+
+
+async def test_failed_run_does_not_mark_checkpoint_done(tmp_path, ingested, monkeypatch):
+    feed = tmp_path / "feed.jsonl"
+    _write_jsonl(feed, ["one", "two"])
+    ckpt = tmp_path / "ckpt.json"
+
+    async def failing_flush(self):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(SupremeHead, "flush_ledger", failing_flush)
+    with pytest.raises(OSError):
+        await bulk_ingest.run(_args(tmp_path, str(feed), "--checkpoint", str(ckpt)))
+    assert json.loads(ckpt.read_text())["done"] is False
+
+
+async def test_completed_checkpoint_picks_up_appended_lines(tmp_path, ingested):
+    feed = tmp_path / "feed.jsonl"
+    _write_jsonl(feed, ["a", "b"])
+    ckpt = tmp_path / "ckpt.json"
+    argv = (str(feed), "--checkpoint", str(ckpt))
+    await bulk_ingest.run(_args(tmp_path, *argv))
+    with open(feed, "a") as f:
+        f.write(json.dumps({"raw": "c"}) + "\n")
+
+    await bulk_ingest.run(_args(tmp_path, *argv))
+
+    assert [raw for raw, _ in ingested] == ["a", "b", "c"]
+
+
+async def test_csv_resumes_from_byte_offset_with_multiline_fields(tmp_path, ingested):
+    feed = tmp_path / "export.csv"
+    feed.write_text('id,body,channel\n1,"first\nscroll",alpha\n2,second,beta\n3,,gamma\n')
+    ckpt = tmp_path / "ckpt.json"
+    argv = (str(feed), "--checkpoint", str(ckpt), "--raw-column", "body", "--source-column", "channel")
+
+    await bulk_ingest.run(_args(tmp_path, *argv))
+    assert ingested == [("first\nscroll", "alpha"), ("second", "beta")]
+    assert json.loads(ckpt.read_text())["failed"] == 1
+
+    with open(feed, "a") as f:
+        f.write("4,fourth,delta\n")
+    await bulk_ingest.run(_args(tmp_path, *argv))
+    assert ingested[-1] == ("fourth", "delta")
+    assert len(ingested) == 3
+
+
+async def test_directory_input_uses_relative_paths_as_sources(tmp_path, ingested):
+    notes = tmp_path / "notes"
+    (notes / "sub").mkdir(parents=True)
+    (notes / "b.txt").write_text("bravo")
+    (notes / "a.txt").write_text("alpha")
+    (notes / "sub" / "c.txt").write_text("charlie\n")
+
+    assert await bulk_ingest.run(_args(tmp_path, str(notes))) == 0
+
+    assert ingested == [("alpha", "a.txt"), ("bravo", "b.txt"), ("charlie", os.path.join("sub", "c.txt"))]
+
+
+async def test_checkpoint_for_other_inputs_is_refused_without_restart(tmp_path, ingested):
+    feed = tmp_path / "feed.jsonl"
+    _write_jsonl(feed, ["a"])
+    ckpt = tmp_path / "ckpt.json"
+    ckpt.write_text(json.dumps({"inputs": ["other.jsonl"], "input": 0, "position": 5,
+                                "records": 1, "failed": 0}))
+
+    with pytest.raises(SystemExit):
+        await bulk_ingest.run(_args(tmp_path, str(feed), "--checkpoint", str(ckpt)))
+    assert await bulk_ingest.run(_args(tmp_path, str(feed), "--checkpoint", str(ckpt), "--restart")) == 0
+    assert ingested == [("a", "feed")]
@@ -0,0 +1,104 @@
+"""
+Tests for orchestrator/codec.py
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_codec.py -v
+"""
+import json
+import os
+import sys
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codec
+from codec import AnalysisResponse, ScrollRequest, ValidationError
+
+
+@pytest.fixture(params=codec.available())
+def backend(request):
+    previous = codec.BACKEND
+    codec.set_backend(request.param)
+    yield request.param
+    codec.set_backend(previous)
+
+
+class TestBackends:
+    def test_round_trip_is_compact_unescaped_utf8(self, backend):
+        obj = {"raw": "ünïcode scroll", "score": 72, "ratio": 0.5, "ok": True, "none": None, "tags": ["a"]}
+        data = codec.dumps(obj)
+        assert isinstance(data, bytes)
+        assert "ünïcode".encode("utf-8") in data and b", " not in data
+        assert codec.loads(data) == obj == codec.loads(data.decode("utf-8"))
+        assert json.loads(codec.dumps_pretty(obj)) == obj
+
+    def test_values_the_fast_encoder_rejects_fall_back_to_stdlib(self, backend):
+        assert codec.loads(codec.dumps({"big": 2 ** 80, 1: "int key"})) == {"big": 2 ** 80, "1": "int key"}
+        with pytest.raises(TypeError):
+            codec.dumps({"obj": object()})
+
+    def test_bad_json_is_a_value_error(self, backend):
+        with pytest.raises(ValueError):
+            codec.loads(b"not json")
+
+    def test_unknown_or_missing_backend(self):
+        with pytest.raises(ValueError):
+            codec.set_backend("yaml")
+
+
+class TestSchemas:
+    def test_scroll_request_decodes_and_validates_in_one_call(self, backend):
+        body = codec.decode(b'{"raw": "hi", "source": "api", "priority": null, "extra": 1}', ScrollRequest)
+        assert body["raw"] == "hi" and body["priority"] is None
+
+    @pytest.mark.parametrize("data, where", [
+        (b'{"source": "api"}', "raw"),
+        (b'{"raw": 5}', "$.raw"),
+        (b'{"raw": "x", "priority": 3}', "$.priority"),
+        (b'["raw"]', "object"),
+    ])
+    def test_scroll_request_rejections(self, backend, data, where):
+        with pytest.raises(ValidationError) as exc:
+            codec.decode(data, ScrollRequest)
+        assert where in str(exc.value)
+
+    def test_analysis_validation(self, backend):
+        ok = {"patterns": ["temporal"], "sentiment": "neutral", "value_score": 71, "timestamp": None}
+        assert codec.validate(ok, AnalysisResponse)["value_score"] == 71
+        assert codec.validate({"value_score": 71.5, "other": "kept"}, AnalysisResponse)["value_score"] == 71.5
+        for bad in ({"value_score": "71"}, {"value_score": True}, {"patterns": "temporal"}):
+            with pytest.raises(ValidationError):
+                codec.validate(bad, AnalysisResponse)
+
+
+def test_every_backend_validates_the_same_payload_the_same_way():
+    response = b'{"value_score": 71, "notes": null, "sentiment": "neutral", "echo": "extra"}'
+    scroll = b'{"raw": "hi", "source": null, "trace": {"id": 1}}'
+    previous = codec.BACKEND
+    seen = {}
+    try:
+        for name in codec.available():
+            codec.set_backend(name)
+            seen[name] = (codec.validate(codec.loads(response), AnalysisResponse),
+                          codec.decode(response, AnalysisResponse), codec.decode(scroll, ScrollRequest))
+    finally:
+        codec.set_backend(previous)
+    expected = (json.loads(response), json.loads(response), json.loads(scroll))
+    assert seen == {name: expected for name in codec.available()}
+
+
+async def test_server_rejects_mistyped_scrolls(tmp_path, monkeypatch):
+    import server
+    from supremehead import SupremeHead
+
+    cfg = tmp_path / "config.json"
+    cfg.write_text(json.dumps({"codex_ledger_path": str(tmp_path / "ledger.log")}))
+    monkeypatch.setattr(server, "_head", SupremeHead(config_path=str(cfg)))
+    async with TestClient(TestServer(server.make_app())) as client:
+        resp = await client.post("/ingest", json={"raw": "scroll", "source": 7})
+        assert resp.status == 400 and "$.source" in (await resp.json())["error"]
+
+        resp = await client.post("/ingest/batch", json={"scrolls": [{"raw": ["not", "text"]}]})
+        assert "$.raw" in (await resp.json())["results"][0]["error"]
@@ -0,0 +1,128 @@
+"""
+Tests for orchestrator/http_pool.py and the pooled HTTPClient.sync_post
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_http_pool.py -v
+"""
+import json
+import os
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import HTTPError
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_pool import HTTPConnectionPool
+from supremehead import HTTPClient, requests
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.server.ports.add(self.client_address[1])
+        if self.path == "/fail":
+            status, out = 500, b"boom"
+        else:
+            status, out = 200, json.dumps({"echo": json.loads(body)}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    srv.daemon_threads = True
+    srv.ports = set()
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield srv, f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+class TestHTTPConnectionPool:
+    def test_reuses_connection(self, server):
+        srv, url = server
+        pool = HTTPConnectionPool(maxsize=2)
+        for i in range(5):
+            assert pool.post_json(url + "/x", {"i": i}) == {"echo": {"i": i}}
+        assert len(srv.ports) == 1
+        assert pool.stats()["created"] == 1
+        assert pool.stats()["reused"] == 4
+        pool.close()
+
+    def test_http_error_raised(self, server):
+        _, url = server
+        pool = HTTPConnectionPool()
+        with pytest.raises(HTTPError) as exc:
+            pool.post_json(url + "/fail", {})
+        assert exc.value.code == 500
+        pool.close()
+
+    def test_stale_connection_retried_once(self, server):
+        _, url = server
+        pool = HTTPConnectionPool()
+        pool.post_json(url + "/x", {})
+        # simulate the server dropping the idle socket
+        for idle in pool._idle.values():
+            for conn in idle:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+        assert pool.post_json(url + "/x", {"again": 1}) == {"echo": {"again": 1}}
+        assert pool.stats()["created"] == 2
+        pool.close()
+
+    def test_block_bounds_open_connections(self, server):
+        _, url = server
+        pool = HTTPConnectionPool(maxsize=2, block=True)
+        threads = [threading.Thread(target=pool.post_json, args=(url + "/x", {"i": i})) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert pool.stats()["created"] <= 2
+        pool.close()
+
+
+class TestHTTPClientSync:
+    @pytest.fixture(autouse=True)
+    def _reset(self):
+        yield
+        HTTPClient.configure_sync()
+        HTTPClient.close_sync()
+
+    def test_stdlib_transport_keeps_alive(self, server):
+        srv, url = server
+        HTTPClient.configure_sync(transport="stdlib", pool_maxsize=4)
+        for i in range(3):
+            assert HTTPClient.sync_post(url + "/x", {"i": i}) == {"echo": {"i": i}}
+        assert len(srv.ports) == 1
+
+    @pytest.mark.skipif(requests is None, reason="requests not installed")
+    def test_requests_transport_shares_session(self, server):
+        srv, url = server
+        HTTPClient.configure_sync(transport="requests", pool_maxsize=4)
+        for i in range(3):
+            assert HTTPClient.sync_post(url + "/x", {"i": i}) == {"echo": {"i": i}}
+        assert HTTPClient.get_sync_session() is HTTPClient.get_sync_session()
+        assert len(srv.ports) == 1
+
+    def test_configure_rebuilds_pool(self):
+        HTTPClient.configure_sync(transport="stdlib", pool_maxsize=4)
+        pool = HTTPClient.get_sync_pool()
+        HTTPClient.configure_sync(transport="stdlib", pool_maxsize=4)
+        assert HTTPClient.get_sync_pool() is pool
+        HTTPClient.configure_sync(transport="stdlib", pool_maxsize=8)
+        assert HTTPClient.get_sync_pool() is not pool
+        assert HTTPClient.get_sync_pool().maxsize == 8
@@ -0,0 +1,224 @@
+"""
+Tests for orchestrator/idempotency.py and idempotent /ingest.
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_idempotency.py -v
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from idempotency import IdempotencyConflict, IdempotencyStore, fingerprint
+from records import IngestResult
+from supremehead import SupremeHead
+
+STORED = {"status": "Processed", "action": "Stored in Memory Core", "score": 60}
+
+
+class TestIdempotencyStore:
+    def test_key_for_prefers_client_key_and_content_hash_is_opt_in(self):
+        assert IdempotencyStore().key_for("raw", "src") is None
+        assert IdempotencyStore().key_for("raw", "src", "abc") == "key:abc"
+        assert IdempotencyStore(content_dedup=True).key_for("raw", "src").startswith("content:")
+
+    def test_completed_result_is_replayed(self):
+        store, calls = IdempotencyStore(), []
+        compute = lambda: calls.append(1) or dict(STORED)
+        fp = fingerprint("raw", "src")
+        assert store.run("key:a", fp, compute) == STORED
+        assert store.run("key:a", fp, compute) == {**STORED, "deduplicated": True}
+        assert len(calls) == 1
+        assert store.stats()["hits"] == 1 and store.stats()["misses"] == 1
+
+    def test_reused_key_with_other_scroll_conflicts(self):
+        store = IdempotencyStore()
+        store.run("key:a", fingerprint("one", "src"), lambda: dict(STORED))
+        with pytest.raises(IdempotencyConflict):
+            store.run("key:a", fingerprint("two", "src"), lambda: dict(STORED))
+        assert store.stats()["conflicts"] == 1
+
+    def test_failed_actions_are_not_stored(self):
+        store, calls = IdempotencyStore(), []
+        failed = {"status": "Processed", "action": "Action Failed"}
+        for _ in range(2):
+            store.run("key:a", "fp", lambda: calls.append(1) or dict(failed))
+        assert len(calls) == 2
+
+    def test_ttl_and_entry_bound(self):
+        store = IdempotencyStore(max_entries=2, ttl_seconds=0.05)
+        for key in ("key:a", "key:b", "key:c"):
+            store.run(key, "fp", lambda: dict(STORED))
+        assert store.stats()["entries"] == 2 and store.stats()["evictions"] == 1
+        time.sleep(0.06)
+        assert "deduplicated" not in store.run("key:c", "fp", lambda: dict(STORED))
+        assert store.stats()["expirations"] == 1
+
+    def test_sync_duplicates_wait_for_the_original(self):
+        store, calls = IdempotencyStore(), []
+        release = threading.Event()
+
+        def slow():
+            calls.append(1)
+            release.wait(2)
+            return dict(STORED)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(store.run("key:a", "fp", slow)))
+                   for _ in range(3)]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        release.set()
+        for t in threads:
+            t.join()
+        assert len(calls) == 1
+        assert sum(1 for r in results if r.get("deduplicated")) == 2
+
+    async def test_async_duplicates_coalesce_and_survive_a_failed_original(self):
+        store, calls = IdempotencyStore(), []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return dict(STORED)
+
+        results = await asyncio.gather(*(store.run_async("key:a", "fp", slow) for _ in range(5)))
+        assert len(calls) == 1 and store.stats()["coalesced"] == 4
+        assert [r.get("deduplicated", False) for r in results] == [False] + [True] * 4
+
+        async def boom():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("downstream exploded")
+
+        first = asyncio.ensure_future(store.run_async("key:b", "fp", boom))
+        await asyncio.sleep(0)
+        retried = await store.run_async("key:b", "fp", slow)
+        assert retried == STORED
+        with pytest.raises(RuntimeError):
+            await first
+
+
+class TestSharedAcrossWorkers:
+    @pytest.mark.asyncio
+    async def test_a_retry_on_another_worker_waits_for_the_original(self, tmp_path):
+        path = str(tmp_path / "idempotency.sqlite3")
+        worker0, worker1 = IdempotencyStore(path=path), IdempotencyStore(path=path)
+        calls, release = [], asyncio.Event()
+
+        async def slow():
+            calls.append(1)
+            await release.wait()
+            return dict(STORED)
+
+        first = asyncio.ensure_future(worker0.run_async("key:a", "fp", slow))
+        await asyncio.sleep(0.05)
+        retry = asyncio.ensure_future(worker1.run_async("key:a", "fp", slow))
+        await asyncio.sleep(0.1)
+        assert calls == [1] and not retry.done()
+        release.set()
+        assert await first == STORED
+        assert await retry == {**STORED, "deduplicated": True}
+        assert worker1.stats()["shared_hits"] == 1
+
+        worker2 = IdempotencyStore(path=path)
+        assert worker2.run("key:a", "fp", lambda: calls.append(2)) == {**STORED, "deduplicated": True}
+        with pytest.raises(IdempotencyConflict):
+            worker2.run("key:a", "other scroll", dict)
+        for store in (worker0, worker1, worker2):
+            store.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_original_releases_the_key(self, tmp_path):
+        path = str(tmp_path / "idempotency.sqlite3")
+        worker0, worker1 = IdempotencyStore(path=path), IdempotencyStore(path=path)
+
+        async def boom():
+            raise RuntimeError("downstream exploded")
+
+        async def failed_action():
+            return {**STORED, "action": "Action Failed"}
+
+        with pytest.raises(RuntimeError):
+            await worker0.run_async("key:b", "fp", boom)
+        assert (await worker1.run_async("key:b", "fp", failed_action))["action"] == "Action Failed"
+        assert await worker0.run_async("key:b", "fp", lambda: asyncio.sleep(0, dict(STORED))) == STORED
+        worker0.close()
+        worker1.close()
+
+    def test_prefork_workers_share_one_file(self, tmp_path):
+        config = tmp_path / "config.json"
+        config.write_text(json.dumps({"codex_ledger_path": str(tmp_path / "ledger.log"),
+                                      "idempotency_enabled": True,
+                                      "idempotency_shared_path": str(tmp_path / "idem.sqlite3")}))
+        heads = [SupremeHead(config_path=str(config), worker_id=n) for n in (0, 1)]
+        assert all(h.idempotency._shared.path == str(tmp_path / "idem.sqlite3") for h in heads[:2])
+        heads.append(SupremeHead(config_path=str(config)))
+        assert heads[2].idempotency._shared is None  # one process: the in-memory store suffices
+        for head in heads:
+            head.ledger.close()
+
+
+# ── SupremeHead / server ───────────────────────────────────────────────────────
+
+def _head(tmp_path, **overrides):
+    cfg = {"codex_ledger_path": str(tmp_path / "ledger.log"), "idempotency_enabled": True, **overrides}
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(cfg))
+    return SupremeHead(config_path=str(path))
+
+
+@pytest.fixture
+def processed(monkeypatch):
+    calls = []
+
+    async def fake_process(self, raw, source, record, priority=None, defer_fallback=False):
+        calls.append(raw)
+        await asyncio.sleep(0.01)
+        return IngestResult("Processed", "NFT Mint Triggered", 90, source, {})
+
+    monkeypatch.setattr(SupremeHead, "_process_scroll_async", fake_process)
+    return calls
+
+
+async def test_concurrent_retries_mint_once(tmp_path, processed):
+    head = _head(tmp_path)
+    results = await asyncio.gather(*(head.ingest_scroll_async("rare scroll", "api", idempotency_key="k1")
+                                     for _ in range(4)))
+    assert processed == ["rare scroll"]
+    assert sum(1 for r in results if r.get("deduplicated")) == 3
+    assert "orchestrator_idempotency_events_total{event=\"coalesced\"} 3" in head.metrics.render()
+    await head.cleanup()
+
+
+async def test_content_dedup_without_key(tmp_path, processed):
+    head = _head(tmp_path, idempotency_content_dedup=True)
+    await head.ingest_scroll_async("same", "api")
+    await head.ingest_scroll_async("same", "api")
+    await head.ingest_scroll_async("same", "other-source")
+    assert processed == ["same", "same"]
+    await head.cleanup()
+
+
+async def test_ingest_endpoint_replays_and_rejects_conflicts(tmp_path, monkeypatch, processed):
+    import server
+
+    monkeypatch.setattr(server, "_head", _head(tmp_path))
+    async with TestClient(TestServer(server.make_app())) as client:
+        headers = {"Idempotency-Key": "retry-me"}
+        first = await client.post("/ingest", json={"raw": "scroll"}, headers=headers)
+        again = await client.post("/ingest", json={"raw": "scroll"}, headers=headers)
+        other = await client.post("/ingest", json={"raw": "different"}, headers=headers)
+
+        assert first.status == 200 and "Idempotent-Replayed" not in first.headers
+        assert again.status == 200 and again.headers["Idempotent-Replayed"] == "true"
+        assert (await again.json())["action"] == (await first.json())["action"]
+        assert other.status == 422
+    assert processed == ["scroll"]
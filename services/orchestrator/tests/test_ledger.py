@@ -0,0 +1,325 @@
+"""
+Tests for orchestrator/ledger.py
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_ledger.py -v
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ledger import (LedgerReader, LedgerWriteError, LedgerWriter, compact_segments, ledger_bases, read_index, segment_paths,
+                    worker_ledger_path)
+
+
+def event(i, event_type="scroll_received", source="feed-a", second=0):
+    return {
+        "event_type": event_type,
+        "timestamp": f"2026-01-01T00:00:{second:02d}.{i:06d}Z",
+        "payload": {"source": source, "i": i},
+    }
+
+
+def read_events(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+class TestGroupCommit:
+    def test_commits_when_batch_is_full(self, tmp_path):
+        path = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(path, max_batch=3, max_delay=10)
+        for i in range(3):
+            writer.append({"i": i})
+        deadline = time.monotonic() + 2
+        while writer.stats()["committed"] < 3 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert [e["i"] for e in read_events(path)] == [0, 1, 2]
+        assert writer.stats()["commits"] == 1
+        writer.close()
+
+    def test_commits_after_max_delay(self, tmp_path):
+        path = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(path, max_batch=100, max_delay=0.01)
+        writer.append({"i": 0})
+        time.sleep(0.1)
+        assert len(read_events(path)) == 1
+        writer.close()
+
+    def test_flush_blocks_until_written(self, tmp_path):
+        path = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(path, max_batch=100, max_delay=10)
+        writer.append({"i": 0})
+        assert writer.flush(timeout=2)
+        assert len(read_events(path)) == 1
+        writer.close()
+
+    def test_append_many_lands_in_one_commit(self, tmp_path):
+        path = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(path, max_batch=2, max_delay=10)
+        writer.append_many([{"i": i} for i in range(7)])
+        writer.close()
+        assert len(read_events(path)) == 7
+        assert writer.stats()["commits"] == 1
+
+    def test_close_commits_pending(self, tmp_path):
+        path = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(path, max_batch=100, max_delay=10)
+        writer.append({"i": 0})
+        writer.close()
+        assert len(read_events(path)) == 1
+
+    def test_creates_parent_directory(self, tmp_path):
+        path = str(tmp_path / "nested" / "ledger.log")
+        writer = LedgerWriter(path)
+        writer.append({"i": 0})
+        writer.close()
+        assert os.path.exists(path)
+
+
+class TestConcurrency:
+    def test_concurrent_threads_lose_nothing(self, tmp_path):
+        path = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(path, max_batch=16, max_delay=0.001)
+
+        def produce(n):
+            for i in range(200):
+                writer.append({"t": n, "i": i})
+
+        threads = [threading.Thread(target=produce, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        writer.close()
+        events = read_events(path)
+        assert len(events) == 1600
+        for n in range(8):
+            assert [e["i"] for e in events if e["t"] == n] == list(range(200))
+
+    @pytest.mark.asyncio
+    async def test_flush_async(self, tmp_path):
+        path = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(path, max_batch=100, max_delay=10)
+        writer.append({"i": 0})
+        await writer.flush_async()
+        assert len(read_events(path)) == 1
+        await writer.close_async()
+
+
+class TestFsyncAndMetrics:
+    def test_rejects_unknown_policy(self, tmp_path):
+        with pytest.raises(ValueError):
+            LedgerWriter(str(tmp_path / "l.log"), fsync="sometimes")
+
+    def test_batch_policy_fsyncs_every_commit(self, tmp_path):
+        writer = LedgerWriter(str(tmp_path / "l.log"), max_batch=1, fsync="batch")
+        writer.append({"i": 0})
+        writer.flush(timeout=2)
+        writer.append({"i": 1})
+        writer.flush(timeout=2)
+        stats = writer.stats()
+        assert stats["fsyncs"] == stats["commits"] == 2
+        assert stats["max_flush_latency_ms"] >= stats["mean_flush_latency_ms"] > 0
+        writer.close()
+
+
+class TestWriteFailures:
+    @pytest.fixture(autouse=True)
+    def fast_retries(self, monkeypatch):
+        monkeypatch.setattr(LedgerWriter, "RETRY_DELAY", 0.01)
+
+    def test_backlog_is_bounded(self, tmp_path):
+        writer = LedgerWriter(str(tmp_path / "l.log"), max_batch=100, max_delay=10, max_pending=3)
+        writer.append_many([{"i": 0}, {"i": 1}])
+        with pytest.raises(LedgerWriteError):
+            writer.append_many([{"i": 2}, {"i": 3}])
+        assert writer.pending() == 2
+        writer.close()
+
+    def test_failures_surface_then_clear_once_writes_recover(self, tmp_path):
+        path = str(tmp_path / "l.log")
+        os.mkdir(path)  # opening the segment fails until the directory is gone
+        writer = LedgerWriter(path, max_batch=1, max_write_failures=3)
+        writer.append({"i": 0})
+        with pytest.raises(LedgerWriteError):
+            writer.flush(timeout=5)
+        assert writer.stats()["write_errors"] >= 3 and writer.stats()["failing"]
+        with pytest.raises(LedgerWriteError):
+            writer.append({"i": 1})
+        os.rmdir(path)
+        deadline = time.monotonic() + 5
+        while writer.stats()["failing"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        writer.append({"i": 1})
+        assert writer.flush(timeout=5)
+        writer.close()
+        assert [e["i"] for e in read_events(path)] == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_flush_async_raises_when_writes_keep_failing(self, tmp_path):
+        path = str(tmp_path / "l.log")
+        os.mkdir(path)
+        writer = LedgerWriter(path, max_batch=100, max_delay=10, max_write_failures=2)
+        writer.append({"i": 0})
+        with pytest.raises(LedgerWriteError):
+            await asyncio.wait_for(writer.flush_async(), 5)
+        os.rmdir(path)
+        await writer.close_async()
+
+
+class TestSegments:
+    def test_rotates_by_size_and_writes_sidecar_index(self, tmp_path):
+        base = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(base, max_batch=1, segment_max_bytes=300)
+        for i in range(10):
+            writer.append(event(i))
+            writer.flush(timeout=2)
+        writer.close()
+        paths = segment_paths(base)
+        assert len(paths) > 2
+        assert paths[-1] == base
+        for path in paths:
+            blocks = read_index(path + ".idx")
+            assert sum(b["count"] for b in blocks) == len(read_events(path))
+        assert sum(len(read_events(p)) for p in paths) == 10
+
+    def test_index_blocks_record_types_sources_and_time_range(self, tmp_path):
+        base = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(base, max_batch=100, max_delay=10, index_block_events=2)
+        writer.append_many([event(1, source="x"), event(2, "scroll_stored", "y"), event(3)])
+        writer.close()
+        blocks = read_index(base + ".idx")
+        assert [b["count"] for b in blocks] == [2, 1]
+        assert blocks[0]["types"] == ["scroll_received", "scroll_stored"]
+        assert blocks[0]["sources"] == ["x", "y"]
+        assert blocks[0]["ts_min"] < blocks[0]["ts_max"]
+        assert blocks[1]["offset"] == blocks[0]["offset"] + blocks[0]["length"]
+
+    def test_torn_tail_is_terminated_before_appending(self, tmp_path):
+        base = str(tmp_path / "ledger.log")
+        with open(base, "w") as f:
+            f.write('{"event_type": "partial"')
+        writer = LedgerWriter(base)
+        writer.append(event(1))
+        writer.close()
+        assert [e["payload"]["i"] for e in LedgerReader(base).query()] == [1]
+
+
+class TestLedgerReader:
+    @pytest.fixture
+    def base(self, tmp_path):
+        base = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(base, max_batch=5, max_delay=10, index_block_events=5,
+                              segment_max_bytes=2000)
+        for second in range(10):
+            for i in range(5):
+                etype = "scroll_stored" if i == 4 else "scroll_received"
+                writer.append(event(i, etype, "feed-b" if second == 7 else "feed-a", second))
+            writer.flush(timeout=2)
+        writer.close()
+        return base
+
+    def test_query_all_in_order(self, base):
+        events = list(LedgerReader(base).query())
+        assert len(events) == 50
+        stamps = [e["timestamp"] for e in events]
+        assert stamps == sorted(stamps)
+
+    def test_time_range_skips_blocks(self, base):
+        reader = LedgerReader(base)
+        events = list(reader.query(start="2026-01-01T00:00:03Z", end="2026-01-01T00:00:05Z"))
+        assert {e["timestamp"][17:19] for e in events} == {"03", "04"}
+        assert len(events) == 10
+        assert reader.blocks_skipped >= 8
+
+    def test_event_type_and_source_filters(self, base):
+        reader = LedgerReader(base)
+        stored = list(reader.query(event_types=["scroll_stored"]))
+        assert len(stored) == 10
+        from_b = list(LedgerReader(base).query(source="feed-b"))
+        assert len(from_b) == 5
+        assert all(e["payload"]["source"] == "feed-b" for e in from_b)
+
+    def test_compaction_preserves_query_results(self, base):
+        before = list(LedgerReader(base).query(source="feed-b"))
+        compacted = compact_segments(base)
+        assert compacted and all(p.endswith(".z") for p in compacted)
+        assert all(not p.endswith(tuple("0123456789")) for p in segment_paths(base)[:-1])
+        reader = LedgerReader(base)
+        assert list(reader.query(source="feed-b")) == before
+        assert len(list(LedgerReader(base).query())) == 50
+
+    def test_unindexed_segment_is_scanned(self, tmp_path):
+        base = str(tmp_path / "ledger.log")
+        with open(base, "w") as f:
+            for i in range(3):
+                f.write(json.dumps(event(i)) + "\n")
+        assert len(list(LedgerReader(base).query(source="feed-a"))) == 3
+
+
+    def test_queries_during_rotation_and_compaction_see_a_consistent_prefix(self, tmp_path):
+        base = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(base, max_batch=4, max_delay=10, index_block_events=4,
+                              segment_max_bytes=600, compact_after=0)
+        done = threading.Event()
+
+        def produce():
+            for i in range(1500):
+                writer.append(event(i))
+                if i % 8 == 7:
+                    writer.flush(timeout=5)
+            writer.close()
+            done.set()
+
+        thread = threading.Thread(target=produce)
+        thread.start()
+        queries = 0
+        try:
+            while not done.is_set() or queries < 5:
+                seen = [e["payload"]["i"] for e in LedgerReader(base).query()]
+                assert seen == list(range(len(seen)))
+                queries += 1
+        finally:
+            thread.join()
+        compact_segments(base)
+        assert [e["payload"]["i"] for e in LedgerReader(base).query()] == list(range(1500))
+        assert any(p.endswith(".z") for p in segment_paths(base))
+
+
+class TestWorkerLedgers:
+    @pytest.fixture
+    def base(self, tmp_path):
+        base = str(tmp_path / "ledger.log")
+        # three writers, as three prefork workers would, interleaved in time
+        for worker in range(3):
+            writer = LedgerWriter(worker_ledger_path(base, worker), max_batch=4, max_delay=10,
+                                  index_block_events=4, segment_max_bytes=600)
+            for second in range(worker, 12, 3):
+                writer.append_many([event(i, second=second, source=f"w{worker}") for i in range(4)])
+                writer.flush(timeout=2)
+            writer.close()
+        return base
+
+    def test_bases_found_next_to_base(self, base):
+        assert ledger_bases(base) == [base] + [worker_ledger_path(base, w) for w in range(3)]
+        assert len(segment_paths(worker_ledger_path(base, 0))) > 1  # rotated, still one base
+
+    def test_query_merges_workers_in_time_order(self, base):
+        events = list(LedgerReader(base).query())
+        assert len(events) == 48
+        stamps = [e["timestamp"] for e in events]
+        assert stamps == sorted(stamps)
+        window = list(LedgerReader(base).query(start="2026-01-01T00:00:04Z", end="2026-01-01T00:00:06Z"))
+        assert {e["payload"]["source"] for e in window} == {"w1", "w2"}
+
+    def test_include_workers_false_reads_base_only(self, base):
+        assert list(LedgerReader(base, include_workers=False).query()) == []
+
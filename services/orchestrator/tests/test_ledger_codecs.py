@@ -0,0 +1,103 @@
+"""
+Tests for orchestrator/ledger_codecs.py and codec support in ledger.py
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_ledger_codecs.py -v
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ledger import LedgerReader, LedgerWriter, _main, compact_segments, convert_ledger, read_index
+from ledger_codecs import CODECS, compress, decompress, get_codec
+
+EVENT = {
+    "event_type": "scroll_stored",
+    "timestamp": "2026-01-01T00:00:00.000001Z",
+    "payload": {
+        "source": "feed", "score": 72, "ratio": 0.5, "ok": True, "missing": None,
+        "big": 2 ** 80, "neg": -70000, "tags": ["a", "b"], "snippet": "ünïcode " * 40,
+    },
+}
+
+
+class TestCodecs:
+    @pytest.mark.parametrize("name", sorted(CODECS))
+    def test_round_trip(self, name):
+        codec = get_codec(name)
+        data = codec.encode(EVENT) * 3
+        assert list(codec.decode_stream(data)) == [EVENT] * 3
+
+    @pytest.mark.parametrize("name", sorted(CODECS))
+    def test_torn_tail_is_ignored(self, name):
+        codec = get_codec(name)
+        data = codec.encode(EVENT) + codec.encode(EVENT)[:-5]
+        assert list(codec.decode_stream(data)) == [EVENT]
+
+    def test_binary_is_smaller_than_json(self):
+        assert len(get_codec("bin").encode(EVENT)) < len(get_codec("jsonl").encode(EVENT))
+
+    def test_unknown_names_raise(self):
+        with pytest.raises(ValueError):
+            get_codec("xml")
+        with pytest.raises(ValueError):
+            compress(b"x", "lzma9000")
+
+    def test_zlib_round_trip(self):
+        assert decompress(compress(b"abc" * 100, "zlib"), "zlib") == b"abc" * 100
+
+
+class TestCodecSegments:
+    def test_binary_compressed_ledger_is_queryable(self, tmp_path):
+        base = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(base, codec="bin", compression="zlib", index_block_events=4)
+        writer.append_many([dict(EVENT, timestamp=f"2026-01-01T00:00:{i:02d}Z") for i in range(10)])
+        writer.close()
+        blocks = read_index(base + ".idx")
+        assert all(b["codec"] == "bin" and b["compression"] == "zlib" for b in blocks)
+        events = list(LedgerReader(base).query(start="2026-01-01T00:00:05Z"))
+        assert len(events) == 5
+        assert events[0]["payload"] == EVENT["payload"]
+
+    def test_codec_change_mixes_blocks_in_one_segment(self, tmp_path):
+        base = str(tmp_path / "ledger.log")
+        for codec in ("jsonl", "bin", "jsonl"):
+            writer = LedgerWriter(base, codec=codec)
+            writer.append(EVENT)
+            writer.close()
+        assert len(list(LedgerReader(base).query())) == 3
+
+    def test_compacting_binary_segments(self, tmp_path):
+        base = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(base, max_batch=1, codec="bin", segment_max_bytes=500)
+        for _ in range(6):
+            writer.append(EVENT)
+            writer.flush(timeout=2)
+        writer.close()
+        assert compact_segments(base)
+        assert len(list(LedgerReader(base).query())) == 6
+
+
+class TestConverter:
+    def test_convert_preserves_events(self, tmp_path):
+        src = str(tmp_path / "src.log")
+        dst = str(tmp_path / "dst.log")
+        writer = LedgerWriter(src)
+        writer.append_many([dict(EVENT, i=i) for i in range(20)])
+        writer.close()
+        assert convert_ledger(src, dst, codec="bin", compression="zlib") == 20
+        assert list(LedgerReader(dst).query()) == list(LedgerReader(src).query())
+        assert os.path.getsize(dst) < os.path.getsize(src)
+
+    def test_cli_query(self, tmp_path, capsys):
+        base = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(base)
+        writer.append_many([EVENT, dict(EVENT, event_type="scroll_received")])
+        writer.close()
+        assert _main(["query", base, "--type", "scroll_received"]) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert [json.loads(line)["event_type"] for line in lines] == ["scroll_received"]
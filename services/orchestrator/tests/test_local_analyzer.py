@@ -0,0 +1,119 @@
+"""
+Tests for orchestrator/local_analyzer.py and its use by MindNexusClient.
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_local_analyzer.py -v
+"""
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis_cache import is_fallback
+from local_analyzer import LocalAnalyzer
+from supremehead import HTTPClient, MindNexusClient, SupremeHead
+
+TERMS = {"legendary": 30, "first edition": 15, "Spam": -40}
+
+
+class TestLocalAnalyzer:
+    def test_terms_and_phrases_are_scored_once_each(self):
+        analyzer = LocalAnalyzer(TERMS)
+        assert analyzer.score("nothing notable") == 50
+        assert analyzer.score("A Legendary, FIRST edition!") == 95
+        assert analyzer.score("legendary legendary legendary") == 80
+        assert analyzer.score("spam spam") == 10
+
+    def test_many_candidate_phrases_match_like_few(self):
+        phrases = {f"red {c}": 1 for c in "abcdefghij"}
+        analyzer = LocalAnalyzer(phrases)
+        assert analyzer.score("red a red b, red-c") == 53
+        assert analyzer.score("red a red") == 51
+        with pytest.raises(ValueError):
+            LocalAnalyzer({"one of a kind": 10})
+
+    def test_score_is_clamped(self):
+        analyzer = LocalAnalyzer({"gold": 80, "junk": -80})
+        assert analyzer.score("gold") == 99
+        assert analyzer.score("junk") == 1
+
+    def test_analyze_reports_strongest_patterns(self):
+        result = LocalAnalyzer(TERMS).analyze("first edition, legendary", notes="local")
+        assert result["patterns"] == ["legendary", "first edition"]
+        assert result["sentiment"] == "positive" and result["value_score"] == 95
+
+    def test_from_file(self, tmp_path):
+        path = tmp_path / "vocab.json"
+        path.write_text(json.dumps({"bias": 40, "terms": TERMS}))
+        analyzer = LocalAnalyzer.from_file(str(path))
+        assert len(analyzer) == 3 and analyzer.score("plain") == 40
+
+    def test_shared_across_threads(self):
+        analyzer = LocalAnalyzer(TERMS)
+        texts = [f"legendary scroll {i}" if i % 2 else f"spam {i}" for i in range(2000)]
+        expected = analyzer.score_many(texts)
+        results = [None] * 4
+
+        def work(slot):
+            results[slot] = analyzer.score_many(texts)
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert all(r == expected for r in results)
+
+
+class TestMindNexusClientLocal:
+    @pytest.fixture
+    def down(self, monkeypatch):
+        calls = []
+
+        async def fake_post(url, payload, timeout=10):
+            calls.append(payload["raw"])
+            raise ConnectionError("down")
+
+        monkeypatch.setattr(HTTPClient, "async_post", staticmethod(fake_post))
+        return calls
+
+    async def test_outage_is_scored_locally_and_still_a_fallback(self, down):
+        client = MindNexusClient("http://mn", local=LocalAnalyzer(TERMS))
+        result = await client.analyze_async("a legendary first edition")
+        assert result["value_score"] == 95
+        assert is_fallback(result) and "scored locally" in result["notes"]
+        assert client.local_fallbacks == 1
+
+    async def test_prefilter_skips_remote_for_low_scores(self, down):
+        client = MindNexusClient("http://mn", local=LocalAnalyzer(TERMS), prefilter_below=30)
+        result = await client.analyze_async("spam offer")
+        assert result["value_score"] == 10 and not is_fallback(result)
+        assert down == [] and client.prefiltered == 1
+        await client.analyze_async("ordinary scroll")
+        assert down == ["ordinary scroll"]
+
+    def test_without_local_analyzer_the_neutral_fallback_is_kept(self, monkeypatch):
+        def fake_post(url, payload, timeout=10):
+            raise ConnectionError("down")
+
+        monkeypatch.setattr(HTTPClient, "sync_post", staticmethod(fake_post))
+        client = MindNexusClient("http://mn", prefilter_below=30)
+        assert client.analyze("legendary spam")["value_score"] == 50
+
+
+def test_head_wires_local_analyzer(tmp_path):
+    vocab = tmp_path / "vocab.json"
+    vocab.write_text(json.dumps({"terms": TERMS}))
+    cfg = tmp_path / "config.json"
+    cfg.write_text(json.dumps({"codex_ledger_path": str(tmp_path / "ledger.log"),
+                               "local_analyzer_enabled": True,
+                               "local_analyzer_vocabulary_path": str(vocab),
+                               "local_analyzer_prefilter_below": 20}))
+    head = SupremeHead(config_path=str(cfg))
+    assert len(head.mind_nexus.local) == 3 and head.mind_nexus.prefilter_below == 20
+    assert head.mind_nexus.analyze("spam")["notes"] == "local prefilter"
+    assert 'orchestrator_local_analyses_total{reason="prefilter"} 1' in head.metrics.render()
@@ -0,0 +1,105 @@
+"""
+Tests for orchestrator/logging_setup.py
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_logging_setup.py -v
+"""
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+
+import pytest
+
+ORCHESTRATOR_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ORCHESTRATOR_DIR)
+
+import logging_setup
+from logging_setup import NonBlockingQueueHandler, StageSampler, configure_logging, shutdown_logging
+from tracing import SpanExporter, Tracer
+
+
+@pytest.fixture
+def restore_root():
+    root = logging.getLogger()
+    level = root.level
+    yield
+    shutdown_logging()
+    root.setLevel(level)
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
+
+
+class TestConfigureLogging:
+    def test_records_reach_file_through_listener(self, tmp_path, restore_root):
+        path = str(tmp_path / "logs" / "orch.log")
+        configure_logging({"log_file": path, "log_stderr": False})
+        logging.getLogger("supremehead").info("hello %s", "world")
+        shutdown_logging()
+        (line,) = read_lines(path)
+        assert line.endswith("INFO hello world")
+
+    def test_json_formatter_includes_extra_and_trace(self, tmp_path, restore_root):
+        path = str(tmp_path / "orch.log")
+        configure_logging({"log_file": path, "log_stderr": False, "log_json": True})
+        tracer = Tracer(0.0, SpanExporter(str(tmp_path / "spans.jsonl")))
+        with tracer.start_trace("ingest") as root:
+            logging.getLogger("supremehead").info("scroll %d", 7, extra={"stage": "ingest"})
+        shutdown_logging()
+        entry = json.loads(read_lines(path)[0])
+        assert entry["msg"] == "scroll 7"
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "supremehead"
+        assert entry["stage"] == "ingest"
+        assert entry["trace_id"] == root.trace_id
+
+    def test_stage_sampling_keeps_warnings(self, tmp_path, restore_root):
+        path = str(tmp_path / "orch.log")
+        configure_logging({"log_file": path, "log_stderr": False, "log_sample_rates": {"ingest": 0.0}})
+        log = logging.getLogger("supremehead")
+        for _ in range(10):
+            log.info("sampled", extra={"stage": "ingest"})
+        log.info("untagged")
+        log.warning("kept", extra={"stage": "ingest"})
+        assert logging_setup.logging_stats()["sampled_out"] == 10
+        shutdown_logging()
+        lines = read_lines(path)
+        assert len(lines) == 2
+        assert not any("sampled" in line for line in lines)
+
+    def test_reconfigure_replaces_listener(self, tmp_path, restore_root):
+        configure_logging({"log_file": str(tmp_path / "a.log"), "log_stderr": False})
+        configure_logging({"log_file": str(tmp_path / "b.log"), "log_stderr": False})
+        logging.getLogger("supremehead").info("once")
+        shutdown_logging()
+        assert read_lines(str(tmp_path / "a.log")) == []
+        assert len(read_lines(str(tmp_path / "b.log"))) == 1
+
+
+class TestNonBlocking:
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+        record = logging.LogRecord("x", logging.INFO, __file__, 1, "m", None, None)
+        handler.handle(record)
+        handler.handle(record)
+        assert handler.dropped == 1
+
+    def test_sampler_rate_one_keeps_everything(self):
+        sampler = StageSampler({"ingest": 1.0})
+        record = logging.LogRecord("x", logging.INFO, __file__, 1, "m", None, None)
+        record.stage = "ingest"
+        assert sampler.filter(record)
+
+
+def test_import_has_no_logging_side_effects(tmp_path):
+    code = ("import logging, supremehead; "
+            "print(len(logging.getLogger().handlers), "
+            "__import__('os').path.exists('supremehead.log'))")
+    out = subprocess.run([sys.executable, "-c", code], cwd=str(tmp_path), capture_output=True, text=True,
+                         env={**os.environ, "PYTHONPATH": ORCHESTRATOR_DIR})
+    assert out.stdout.split() == ["0", "False"]
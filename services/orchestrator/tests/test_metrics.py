@@ -0,0 +1,123 @@
+"""
+Tests for orchestrator/metrics.py and the SupremeHead instrumentation
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_metrics.py -v
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import MetricsRegistry
+from supremehead import SupremeHead
+
+
+class TestExposition:
+    def test_counter_with_labels(self):
+        reg = MetricsRegistry()
+        c = reg.counter("jobs_total", "Jobs done", ["kind"])
+        c.inc("a")
+        c.inc("a", amount=2)
+        c.inc('we"ird')
+        text = reg.render()
+        assert "# HELP jobs_total Jobs done" in text
+        assert "# TYPE jobs_total counter" in text
+        assert 'jobs_total{kind="a"} 3' in text
+        assert 'jobs_total{kind="we\\"ird"} 1' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        reg = MetricsRegistry()
+        h = reg.histogram("lat_seconds", "Latency", buckets=(0.1, 1.0))
+        for v in (0.05, 0.1, 0.5, 3.0):
+            h.observe(v)
+        text = reg.render()
+        assert 'lat_seconds_bucket{le="0.1"} 2' in text
+        assert 'lat_seconds_bucket{le="1"} 3' in text
+        assert 'lat_seconds_bucket{le="+Inf"} 4' in text
+        assert "lat_seconds_count 4" in text
+        assert "lat_seconds_sum 3.65" in text
+
+    def test_timer_observes(self):
+        reg = MetricsRegistry()
+        h = reg.histogram("stage_seconds", "Stage", ["stage"])
+        with h.time("x"):
+            pass
+        assert h.count("x") == 1
+
+    def test_callback_gauge_sampled_at_render(self):
+        reg = MetricsRegistry()
+        depth = [3]
+        reg.gauge("depth", "Queue depth", fn=lambda: depth[0])
+        reg.gauge("state", "State", ["host"], fn=lambda: {"h1": 1, "h2": 0})
+        depth[0] = 7
+        text = reg.render()
+        assert "depth 7" in text
+        assert 'state{host="h1"} 1' in text
+
+    def test_broken_callback_does_not_break_scrape(self):
+        reg = MetricsRegistry()
+        reg.gauge("bad", "Broken", fn=lambda: 1 / 0)
+        reg.counter("ok_total", "Fine").inc()
+        assert "ok_total 1" in reg.render()
+
+    def test_label_arity_checked(self):
+        reg = MetricsRegistry()
+        c = reg.counter("x_total", "x", ["a"])
+        with pytest.raises(ValueError):
+            c.inc()
+
+    def test_duplicate_name_rejected(self):
+        reg = MetricsRegistry()
+        reg.counter("x_total", "x")
+        with pytest.raises(ValueError):
+            reg.gauge("x_total", "x")
+
+
+class TestSupremeHeadMetrics:
+    @pytest.fixture
+    def head(self, tmp_path):
+        cfg_path = str(tmp_path / "cfg.json")
+        cfg = {
+            "memory_core_url": "http://localhost:19999",
+            "mind_nexus_url": "http://localhost:19998",
+            "codex_ledger_path": str(tmp_path / "ledger.log"),
+            "retries": 1,
+            "retry_delay_seconds": 0,
+            "ledger_wait_for_commit": True,
+        }
+        with open(cfg_path, "w") as f:
+            json.dump(cfg, f)
+        return SupremeHead(config_path=cfg_path)
+
+    def test_sync_ingest_records_stages_and_fallbacks(self, head):
+        head.ingest_scroll("a scroll", "test")
+        assert head.stage_seconds.count("analyze") == 1
+        assert head.stage_seconds.count("store") == 1
+        assert head.stage_seconds.count("ledger_flush") == 1
+        assert head.ingest_seconds.count("sync") == 1
+        assert head.fallbacks_total.value("analysis") == 1
+        assert head.fallbacks_total.value("store") == 1
+        assert head.inflight.value("sync") == 0
+
+    @pytest.mark.asyncio
+    async def test_async_ingest_records_path(self, head):
+        await head.ingest_scroll_async("a scroll", "test")
+        assert head.ingest_seconds.count("async") == 1
+        assert head.scrolls_total.value("async", "Stored in Memory Core") == 1
+        text = head.metrics.render()
+        assert 'orchestrator_inflight_scrolls{path="async"} 0' in text
+        assert "orchestrator_ledger_commits_total" in text
+        await head.cleanup()
+
+    def test_retries_counted(self, head):
+        head.config["retries"] = 3
+
+        def flaky():
+            raise ValueError("down")
+        with pytest.raises(ValueError):
+            head._safe_call(flaky)
+        assert head.retries_total.value("flaky") == 2
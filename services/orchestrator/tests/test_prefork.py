@@ -0,0 +1,137 @@
+"""
+Tests for orchestrator/prefork.py and the prefork side of server.py.
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_prefork.py -v
+"""
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server
+from ledger import LedgerReader
+from prefork import Supervisor, read_states, write_state
+from supremehead import SupremeHead
+from workqueue import WorkQueue
+
+
+def worker_state(worker_id, age=0.0, draining=False):
+    return {"worker_id": worker_id, "pid": 1000 + worker_id, "heartbeat": time.time() - age,
+            "draining": draining, "inflight": 0}
+
+
+class TestReadStates:
+    def test_all_workers_fresh(self, tmp_path):
+        write_state(str(tmp_path), "supervisor", {"workers": 2})
+        for w in range(2):
+            write_state(str(tmp_path), f"worker-{w}", worker_state(w))
+        health = read_states(str(tmp_path), heartbeat_interval=1.0)
+        assert health["status"] == "ok"
+        assert health["workers_healthy"] == 2
+        assert [s["worker_id"] for s in health["workers"]] == [0, 1]
+
+    def test_stale_draining_and_missing_workers_degrade(self, tmp_path):
+        write_state(str(tmp_path), "supervisor", {"workers": 3})
+        write_state(str(tmp_path), "worker-0", worker_state(0))
+        write_state(str(tmp_path), "worker-1", worker_state(1, age=10))
+        write_state(str(tmp_path), "worker-2", worker_state(2, draining=True))
+        health = read_states(str(tmp_path), heartbeat_interval=1.0)
+        assert health["status"] == "degraded"
+        assert [s["healthy"] for s in health["workers"]] == [True, False, False]
+
+        os.remove(tmp_path / "worker-2.json")
+        assert read_states(str(tmp_path))["workers_expected"] == 3
+
+
+@pytest.mark.asyncio
+async def test_health_rolls_up_workers_and_503_while_draining(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(server, "WORKER_ID", 1)
+    write_state(str(tmp_path), "supervisor", {"workers": 2})
+    write_state(str(tmp_path), "worker-0", worker_state(0))
+    async with TestClient(TestServer(server.make_app())) as client:
+        body = await (await client.get("/health")).json()
+        # this worker's own heartbeat was written on startup
+        assert body["status"] == "ok" and body["worker_id"] == 1
+        assert [s["worker_id"] for s in body["workers"]] == [0, 1]
+
+        monkeypatch.setattr(server, "_draining", True)
+        resp = await client.get("/health")
+        assert resp.status == 503
+        assert (await resp.json())["status"] == "draining"
+    assert not (tmp_path / "worker-1.json").exists()
+
+
+def test_worker_head_uses_its_own_files(tmp_path):
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"codex_ledger_path": str(tmp_path / "ledger.log"),
+                                  "memory_core_spill_path": str(tmp_path / "spill.jsonl")}))
+    head = SupremeHead(config_path=str(config), worker_id=3)
+    assert head.ledger_path == str(tmp_path / "ledger.log.w3")
+    assert head.config["memory_core_spill_path"] == str(tmp_path / "spill.jsonl.w3")
+    head.ledger.close()
+
+
+def test_supervisor_rehomes_queues_of_workers_that_no_longer_exist(tmp_path):
+    queue_path = str(tmp_path / "queue.sqlite3")
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({"work_queue_enabled": True, "work_queue_path": queue_path}))
+    orphan = WorkQueue(queue_path + ".w5")
+    orphan.put_many([{"raw": "left behind"}])
+    orphan.close()
+    Supervisor(2, 0, config_path=str(config), state_dir=str(tmp_path / "state"))._rehome_work_queues()
+    assert not os.path.exists(queue_path + ".w5")
+    live = WorkQueue(queue_path + ".w0")
+    assert [job.payload["raw"] for job in live.claim()] == ["left behind"]
+    live.close()
+
+
+def test_supervisor_serves_from_all_workers_and_drains(tmp_path):
+    config = tmp_path / "config.json"
+    config.write_text(json.dumps({
+        "codex_ledger_path": str(tmp_path / "ledger.log"), "log_file": None, "retries": 1,
+        "memory_core_url": "http://127.0.0.1:9", "mind_nexus_url": "http://127.0.0.1:9",
+    }))
+    sup = Supervisor(2, 0, host="127.0.0.1", config_path=str(config), drain_timeout=5,
+                     heartbeat_interval=0.2, state_dir=str(tmp_path / "state"))
+    sup.start()
+    thread = threading.Thread(target=sup.supervise, kwargs={"poll_interval": 0.1})
+    thread.start()
+    url = f"http://127.0.0.1:{sup.port}"
+    try:
+        deadline = time.time() + 30
+        health = {}
+        while time.time() < deadline:
+            try:
+                with urllib.request.urlopen(url + "/health", timeout=2) as resp:
+                    health = json.loads(resp.read())
+                if health.get("workers_healthy") == 2:
+                    break
+            except OSError:
+                pass
+            time.sleep(0.2)
+        assert health.get("workers_healthy") == 2
+
+        for i in range(20):
+            req = urllib.request.Request(url + "/ingest", data=json.dumps({"raw": f"scroll {i}"}).encode(),
+                                         headers={"Content-Type": "application/json"})
+            with urllib.request.urlopen(req, timeout=10) as resp:
+                assert resp.status == 200
+    finally:
+        sup.stop()
+        thread.join(30)
+
+    assert not thread.is_alive()
+    assert all(not p.is_alive() and p.exitcode == 0 for p in sup._procs.values())
+    # drained workers flushed their ledgers; the reader merges them
+    received = list(LedgerReader(str(tmp_path / "ledger.log")).query(event_types=["scroll_received_async"]))
+    assert len(received) == 20
+    assert os.listdir(tmp_path / "state") == ["supervisor.json"]
@@ -0,0 +1,86 @@
+"""
+Tests for orchestrator/records.py
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_records.py -v
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import codec
+from ledger import LedgerReader, LedgerWriter
+from ledger_codecs import CODECS, get_codec
+from records import Analysis, IngestResult, LedgerEvent, Scroll
+
+EVENT = LedgerEvent("scroll_stored", "2026-01-01T00:00:00.000001Z", {"source": "feed", "score": 72})
+
+
+@pytest.fixture(params=codec.available())
+def backend(request):
+    previous = codec.BACKEND
+    codec.set_backend(request.param)
+    yield request.param
+    codec.set_backend(previous)
+
+
+class TestRecords:
+    def test_records_are_slotted(self):
+        for record in (EVENT, Scroll("raw", "feed", "t"), Analysis(), IngestResult("Processed", None, 50, "s", {})):
+            assert not hasattr(record, "__dict__")
+
+    def test_mapping_view_matches_the_old_dicts(self):
+        as_dict = {"event_type": "scroll_stored", "timestamp": "2026-01-01T00:00:00.000001Z",
+                   "payload": {"source": "feed", "score": 72}}
+        assert EVENT == as_dict and dict(EVENT) == as_dict == EVENT.to_dict()
+        assert EVENT["payload"]["source"] == "feed" and EVENT.get("missing", 1) == 1
+        assert "event_type" in EVENT and "to_dict" not in EVENT
+        assert {**EVENT, "extra": 1}["extra"] == 1
+        with pytest.raises(KeyError):
+            EVENT["to_dict"]
+
+    def test_analysis_defaults_are_the_neutral_fallback(self):
+        analysis = Analysis(notes="fallback: down")
+        assert analysis == {"patterns": [], "sentiment": "neutral", "value_score": 50,
+                            "notes": "fallback: down", "timestamp": None}
+        assert Analysis().patterns is not analysis.patterns
+
+    def test_from_dict_ignores_unknown_keys_and_shares_values(self):
+        payload = {"source": "feed"}
+        event = LedgerEvent.from_dict({"event_type": "x", "timestamp": "t", "payload": payload, "extra": 1})
+        assert event.payload is payload
+        with pytest.raises(TypeError):
+            LedgerEvent.from_dict({"event_type": "x"})
+
+
+class TestWire:
+    def test_records_encode_like_the_dicts(self, backend):
+        result = IngestResult("Processed", "Stored in Memory Core", 72, "feed", Analysis(notes="n", timestamp="t"))
+        plain = result.to_dict()
+        assert type(plain["analysis"]) is dict
+        assert codec.dumps(result) == codec.dumps(plain)
+        assert codec.loads(codec.dumps_pretty(result)) == result
+
+    def test_round_trip_through_the_codec(self, backend):
+        assert LedgerEvent.from_dict(codec.loads(codec.dumps(EVENT))) == EVENT
+        scroll = Scroll("ünïcode", "feed", "2026-01-01T00:00:00Z")
+        assert Scroll.from_dict(codec.decode(codec.dumps(scroll), codec.ScrollRequest)) == scroll
+
+    @pytest.mark.parametrize("name", sorted(CODECS))
+    def test_ledger_codecs_accept_records(self, name):
+        ledger_codec = get_codec(name)
+        assert ledger_codec.encode(EVENT) == ledger_codec.encode(EVENT.to_dict())
+        assert list(ledger_codec.decode_stream(ledger_codec.encode(EVENT))) == [EVENT]
+
+    def test_ledger_writer_indexes_record_events(self, tmp_path):
+        base = str(tmp_path / "ledger.log")
+        writer = LedgerWriter(base, codec="bin", index_block_events=2)
+        writer.append_many([LedgerEvent("scroll_stored", f"2026-01-01T00:00:{i:02d}Z", {"source": f"s{i % 2}"})
+                            for i in range(6)])
+        writer.close()
+        events = list(LedgerReader(base).query(source="s1"))
+        assert [e["timestamp"] for e in events] == ["2026-01-01T00:00:01Z", "2026-01-01T00:00:03Z",
+                                                    "2026-01-01T00:00:05Z"]
@@ -0,0 +1,181 @@
+"""
+Tests for orchestrator/resilience.py
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_resilience.py -v
+"""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import resilience
+from resilience import (BreakerRegistry, CircuitBreaker, CircuitOpenError, RetryBudget, State,
+                        backoff_delay)
+from supremehead import MindNexusClient, SupremeHead
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = FakeClock()
+    monkeypatch.setattr(resilience.time, "monotonic", c)
+    return c
+
+
+class TestCircuitBreaker:
+    def test_opens_after_threshold(self, clock):
+        cb = CircuitBreaker("h", failure_threshold=3, backoff_intervals=(5,))
+        for _ in range(2):
+            assert cb.allow()
+            cb.record_failure()
+        assert cb.state == State.CLOSED
+        cb.record_failure()
+        assert cb.state == State.OPEN
+        assert not cb.allow()
+        assert cb.rejections == 1
+
+    def test_success_resets_failure_count(self, clock):
+        cb = CircuitBreaker("h", failure_threshold=2)
+        cb.record_failure()
+        cb.record_success()
+        cb.record_failure()
+        assert cb.state == State.CLOSED
+
+    def test_half_open_admits_single_probe(self, clock):
+        cb = CircuitBreaker("h", failure_threshold=1, backoff_intervals=(5, 15))
+        cb.record_failure()
+        clock.now += 5
+        assert cb.allow()
+        assert cb.state == State.HALF_OPEN
+        assert not cb.allow()
+        cb.record_success()
+        assert cb.state == State.CLOSED
+        assert cb.allow()
+
+    def test_failed_probe_reopens_with_longer_interval(self, clock):
+        cb = CircuitBreaker("h", failure_threshold=1, backoff_intervals=(5, 15))
+        cb.record_failure()
+        clock.now += 5
+        assert cb.allow()
+        cb.record_failure()
+        assert cb.state == State.OPEN
+        clock.now += 5
+        assert not cb.allow()
+        clock.now += 10
+        assert cb.allow()
+        assert cb.stats()["transitions"]["HALF_OPEN->OPEN"] == 1
+
+    def test_rejecting_does_not_consume_probe(self, clock):
+        cb = CircuitBreaker("h", failure_threshold=1, backoff_intervals=(5,))
+        cb.record_failure()
+        assert cb.rejecting()
+        clock.now += 5
+        assert not cb.rejecting()
+        assert cb.allow()
+
+
+class TestBreakerRegistry:
+    def test_one_breaker_per_host(self):
+        reg = BreakerRegistry()
+        a = reg.for_url("http://svc:3000/analyze")
+        assert reg.for_url("http://svc:3000/analyze_batch") is a
+        assert reg.for_url("http://svc:3001/store") is not a
+        assert set(reg.stats()) == {"svc:3000", "svc:3001"}
+
+
+class TestRetryBudget:
+    def test_caps_retries_to_ratio(self, clock):
+        budget = RetryBudget(ratio=0.5, min_per_second=0, max_tokens=2)
+        assert budget.try_spend()
+        assert budget.try_spend()
+        assert not budget.try_spend()
+        budget.record_request()
+        budget.record_request()
+        assert budget.try_spend()
+        assert budget.exhausted == 1
+
+    def test_refills_over_time(self, clock):
+        budget = RetryBudget(ratio=0, min_per_second=1, max_tokens=1)
+        assert budget.try_spend()
+        assert not budget.try_spend()
+        clock.now += 1
+        assert budget.try_spend()
+
+
+class TestBackoffDelay:
+    def test_full_jitter_bounds(self):
+        for attempt in range(1, 8):
+            d = backoff_delay(1, attempt, cap=10)
+            assert 0 <= d <= min(10, 2 ** (attempt - 1))
+
+
+class TestIntegration:
+    @pytest.fixture
+    def head(self, tmp_path):
+        cfg_path = str(tmp_path / "cfg.json")
+        cfg = {
+            "memory_core_url": "http://localhost:19999",
+            "mind_nexus_url": "http://localhost:19998",
+            "codex_ledger_path": str(tmp_path / "ledger.log"),
+            "retries": 3,
+            "retry_delay_seconds": 0,
+        }
+        with open(cfg_path, "w") as f:
+            json.dump(cfg, f)
+        return SupremeHead(config_path=cfg_path)
+
+    def test_clients_share_registry(self, head):
+        assert head.mind_nexus.breaker is head.breakers.for_url("http://localhost:19998")
+        assert head.memory_core.breaker is head.breakers.for_url("http://localhost:19999")
+
+    def test_open_circuit_fails_fast_to_fallback(self, monkeypatch):
+        breaker = CircuitBreaker("nexus", failure_threshold=1)
+        breaker.record_failure()
+        client = MindNexusClient("http://localhost:19998", breaker=breaker)
+
+        def boom(*a, **kw):
+            raise AssertionError("network must not be touched")
+        monkeypatch.setattr("supremehead.HTTPClient.sync_post", boom)
+        result = client.analyze("text")
+        assert result["notes"].startswith("fallback: circuit open")
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_fails_fast_async(self):
+        breaker = CircuitBreaker("nexus", failure_threshold=1)
+        breaker.record_failure()
+        client = MindNexusClient("http://localhost:19998", breaker=breaker)
+        result = await client.analyze_async("text")
+        assert result["notes"].startswith("fallback async: circuit open")
+
+    def test_safe_call_does_not_retry_open_circuit(self, head):
+        calls = []
+
+        def fn():
+            calls.append(1)
+            raise CircuitOpenError("open")
+        with pytest.raises(CircuitOpenError):
+            head._safe_call(fn)
+        assert len(calls) == 1
+
+    def test_safe_call_stops_when_budget_exhausted(self, head):
+        head._retry_budget = RetryBudget(ratio=0, min_per_second=0, max_tokens=0)
+        calls = []
+
+        def fn():
+            calls.append(1)
+            raise ValueError("down")
+        with pytest.raises(ValueError):
+            head._safe_call(fn)
+        assert len(calls) == 1
+        assert head._retry_budget.exhausted == 1
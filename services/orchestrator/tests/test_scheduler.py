@@ -0,0 +1,163 @@
+"""
+Tests for orchestrator/scheduler.py and the priority lanes in SupremeHead.
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_scheduler.py -v
+"""
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import LaneScheduler
+from supremehead import SupremeHead
+
+
+@pytest.mark.asyncio
+async def test_weighted_fair_dequeue():
+    sched = LaneScheduler({"blocker": {}, "mint": {"weight": 3}, "default": {"weight": 1}},
+                          max_concurrency=1)
+    await sched.acquire("blocker")
+    granted = []
+
+    async def call(lane):
+        await sched.acquire(lane)
+        granted.append(lane)
+
+    tasks = [asyncio.create_task(call("default")) for _ in range(8)]
+    tasks += [asyncio.create_task(call("mint")) for _ in range(8)]
+    await asyncio.sleep(0)
+    assert sched.stats()["default"]["queued"] == 8
+
+    sched.release("blocker")
+    for _ in range(7):
+        await asyncio.sleep(0)
+        sched.release(granted[-1])
+    await asyncio.sleep(0)
+    # with weights 3:1, mints get three of every four slots
+    assert granted.count("mint") == 6 and granted.count("default") == 2
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_lane_concurrency_cap_lets_other_lanes_through():
+    sched = LaneScheduler({"default": {"concurrency": 1}, "mint": {}}, max_concurrency=4)
+    await sched.acquire("default")
+    blocked = asyncio.create_task(sched.acquire("default"))
+    await asyncio.sleep(0)
+    assert not blocked.done()
+    await asyncio.wait_for(sched.acquire("mint"), 1)  # not stuck behind the default lane
+    sched.release("default")
+    await asyncio.wait_for(blocked, 1)
+    assert sched.stats()["default"]["inflight"] == 1
+
+
+@pytest.mark.asyncio
+async def test_idle_lane_does_not_bank_credit():
+    sched = LaneScheduler({"a": {}, "b": {}}, max_concurrency=1)
+    granted = []
+
+    async def call(lane):
+        await sched.acquire(lane)
+        granted.append(lane)
+
+    await sched.acquire("a")
+    tasks = [asyncio.create_task(call("a")) for _ in range(8)]
+    await asyncio.sleep(0)
+    for _ in range(5):  # lane a runs alone for a while
+        sched.release("a")
+        await asyncio.sleep(0)
+    tasks += [asyncio.create_task(call("b")) for _ in range(3)]
+    await asyncio.sleep(0)
+    for _ in range(6):
+        sched.release(granted[-1])
+        await asyncio.sleep(0)
+    # b joins at the current virtual time and alternates with a, rather than
+    # taking every slot until it has caught up on a's five
+    assert granted[5:] == ["b", "a", "b", "a", "b", "a"]
+    for t in tasks:
+        t.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def test_lane_for_priority_then_source():
+    sched = LaneScheduler({"high": {}}, source_lanes={"oracle": "high", "odd": "missing"})
+    assert sched.lane_for("high", "feed") == "high"
+    assert sched.lane_for(None, "oracle") == "high"
+    assert sched.lane_for("bogus", "odd") == "default"
+
+
+@pytest.mark.asyncio
+async def test_head_runs_mints_in_mint_lane(tmp_path):
+    cfg_path = tmp_path / "cfg.json"
+    cfg_path.write_text(json.dumps({
+        "memory_core_url": "http://localhost:19999",
+        "mind_nexus_url": "http://localhost:19998",
+        "codex_ledger_path": str(tmp_path / "ledger.log"),
+        "retries": 1,
+        "nft_threshold": 10,  # the fallback analysis scores 50
+        "scheduler_enabled": True,
+        "scheduler_source_lanes": {"oracle": "high"},
+    }))
+    head = SupremeHead(config_path=str(cfg_path))
+    result = await head.ingest_scroll_async("a scroll", "oracle")
+    await head.cleanup()
+    assert result["action"] == "NFT Mint Triggered"
+    stats = head.scheduler.stats()
+    assert stats["high"]["granted"] == 1 and stats["mint"]["granted"] == 1
+    assert stats["default"]["granted"] == 0
+    assert 'orchestrator_lane_wait_seconds_count{lane="mint"} 1' in head.metrics.render()
+
+
+@pytest.mark.asyncio
+async def test_mint_jumps_queued_default_work_under_contention(tmp_path):
+    cfg_path = tmp_path / "cfg.json"
+    cfg_path.write_text(json.dumps({
+        "memory_core_url": "http://localhost:19999",
+        "mind_nexus_url": "http://localhost:19998",
+        "codex_ledger_path": str(tmp_path / "ledger.log"),
+        "retries": 1,
+        "scheduler_enabled": True,
+        "scheduler_max_concurrency": 1,
+    }))
+    head = SupremeHead(config_path=str(cfg_path))
+    calls = []
+    gate = asyncio.Event()
+
+    async def analyze(raw, context=None):
+        calls.append(("analyze", raw))
+        return {"value_score": 95 if raw == "mint" else 10}
+
+    async def store(payload):
+        calls.append(("store", payload["scroll"]["raw"]))
+        if payload["scroll"]["raw"] == "a":
+            await gate.wait()  # holds the only slot while the rest queue up
+        return {"status": "ok"}
+
+    async def mint(raw, analysis):
+        calls.append(("mint", raw))
+        return {"status": "minted"}
+
+    head.mind_nexus.analyze_async = analyze
+    head.memory_core.store_async = store
+    head.swarm_engine.trigger_nft_mint_async = mint
+    first = asyncio.ensure_future(head.ingest_scroll_async("a", "feed"))
+    while ("store", "a") not in calls:
+        await asyncio.sleep(0)
+    rest = [asyncio.ensure_future(head.ingest_scroll_async(raw, "feed"))
+            for raw in ("mint", "b1", "b2", "b3", "b4")]
+    await asyncio.sleep(0.01)
+    gate.set()
+    await asyncio.gather(first, *rest)
+    await head.cleanup()
+    # analysis runs in the scroll's lane, FIFO behind nothing but "a"; the mint
+    # then overtakes the default-lane analyses and stores queued since
+    analyzed = calls.index(("analyze", "mint"))
+    assert calls.index(("mint", "mint")) <= analyzed + 2
+    assert calls.index(("mint", "mint")) < calls.index(("analyze", "b3"))
@@ -99,3 +99,95 @@ async def test_ingest_default_source():
     async with TestClient(TestServer(make_app())) as client:
         resp = await client.post("/ingest", json={"raw": "test payload"})
         assert resp.status in (200, 500)
+
+
+# ── Batch ingest endpoint ──────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_ingest_batch_requires_scrolls_list():
+    async with TestClient(TestServer(make_app())) as client:
+        resp = await client.post("/ingest/batch", json={"scrolls": []})
+        assert resp.status == 400
+        resp = await client.post("/ingest/batch", json=[{"raw": "x"}])
+        assert resp.status == 400
+
+
+@pytest.mark.asyncio
+async def test_ingest_batch_returns_results_in_input_order():
+    scrolls = [
+        {"raw": "first scroll", "source": "a"},
+        {"raw": "   ", "source": "b"},
+        {"raw": "third scroll", "source": "c"},
+    ]
+    async with TestClient(TestServer(make_app())) as client:
+        resp = await client.post("/ingest/batch", json={"scrolls": scrolls})
+        assert resp.status == 200
+        body = await resp.json()
+        assert body["count"] == 3
+        results = body["results"]
+        assert results[0]["source"] == "a"
+        assert "error" in results[1]
+        assert results[2]["source"] == "c"
+
+
+@pytest.mark.asyncio
+async def test_ingest_batch_rejects_oversized_batch():
+    async with TestClient(TestServer(make_app())) as client:
+        scrolls = [{"raw": "x"}] * 1001
+        resp = await client.post("/ingest/batch", json={"scrolls": scrolls})
+        assert resp.status == 413
+
+
+# ── Streaming ingest endpoint ──────────────────────────────────────────────────
+
+async def _chunked(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+async def test_ingest_stream_returns_ndjson_results_in_input_order():
+    # lines split across chunk boundaries, a blank line and two bad lines
+    body = _chunked(b'{"raw": "first", "source": "a"}\n{"raw": "sec', b'ond", "source": "b"}\n\n',
+                    b'not json\n{"source": "c"}\n{"raw": "last", "source": "d"}')
+    async with TestClient(TestServer(make_app())) as client:
+        resp = await client.post("/ingest/stream", data=body)
+        assert resp.status == 200
+        assert resp.content_type == "application/x-ndjson"
+        lines = [json.loads(line) async for line in resp.content]
+    results, summary = lines[:-1], lines[-1]
+    assert [r["line"] for r in results] == [1, 2, 4, 5, 6]
+    assert [r.get("source") for r in results] == ["a", "b", None, None, "d"]
+    assert "JSON" in results[2]["error"] and "raw" in results[3]["error"]
+    assert summary == {"summary": {"count": 5, "failed": 2}}
+
+
+@pytest.mark.asyncio
+async def test_ingest_stream_rejects_oversized_line_and_continues(monkeypatch):
+    import server
+
+    head = await server.get_head()
+    monkeypatch.setitem(head.config, "stream_max_line_bytes", 64)
+    big = b'{"raw": "' + b"x" * 200 + b'"}'
+    body = _chunked(big[:50], big[50:150], big[150:] + b"\n", b'{"raw": "ok"}\n')
+    async with TestClient(TestServer(make_app())) as client:
+        resp = await client.post("/ingest/stream", data=body)
+        lines = [json.loads(line) async for line in resp.content]
+    assert "stream_max_line_bytes" in lines[0]["error"]
+    assert lines[1]["line"] == 2 and lines[1]["status"] == "Processed"
+
+
+# ── Metrics endpoint ───────────────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_metrics_exposes_stage_histograms():
+    async with TestClient(TestServer(make_app())) as client:
+        await client.post("/ingest", json={"raw": "metrics scroll", "source": "m"})
+        resp = await client.get("/metrics")
+        assert resp.status == 200
+        assert resp.content_type == "text/plain"
+        text = await resp.text()
+        assert "# TYPE orchestrator_stage_seconds histogram" in text
+        assert 'orchestrator_stage_seconds_count{stage="parse"}' in text
+        assert 'orchestrator_stage_seconds_count{stage="analyze"}' in text
+        assert "orchestrator_ledger_pending_events" in text
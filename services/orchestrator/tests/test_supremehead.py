@@ -4,6 +4,7 @@ Tests for orchestrator/supremehead.py
 Run with:
     cd services/orchestrator && python -m pytest tests/ -v
 """
+import asyncio
 import json
 import os
 import sys
@@ -16,8 +17,12 @@ from supremehead import (
     now_iso,
     safe_write_json,
     SupremeHead,
+    HTTPClient,
     MemoryCoreClient,
+    MicroBatcher,
     MindNexusClient,
+    SwarmEngine,
+    WriteBehindQueue,
 )
 
 
@@ -111,6 +116,7 @@ class TestIngestScroll:
     def test_returns_dict_with_expected_keys(self, head):
         result = head.ingest_scroll("test raw data", "pytest")
         assert isinstance(result, dict)
+        json.dumps(result)
         for key in ("status", "action", "score", "source", "analysis"):
             assert key in result, f"Missing key: {key}"
 
@@ -132,6 +138,174 @@ class TestIngestScroll:
         assert "sentiment" in result["analysis"] or "notes" in result["analysis"]
 
 
+# ── SupremeHead.ingest_scroll_async ────────────────────────────────────────────
+
+class TestIngestScrollAsync:
+    @pytest.fixture
+    def head(self, tmp_path):
+        cfg_path = str(tmp_path / "cfg.json")
+        cfg = {
+            "memory_core_url": "http://localhost:19999",
+            "mind_nexus_url": "http://localhost:19998",
+            "codex_ledger_path": str(tmp_path / "ledger.log"),
+            "retries": 1,
+            "retry_delay_seconds": 0,
+        }
+        with open(cfg_path, "w") as f:
+            json.dump(cfg, f)
+        return SupremeHead(config_path=cfg_path)
+
+    @pytest.mark.asyncio
+    async def test_returns_dict_with_expected_keys(self, head):
+        result = await head.ingest_scroll_async("test raw data", "pytest")
+        for key in ("status", "action", "score", "source", "analysis"):
+            assert key in result, f"Missing key: {key}"
+        assert result["source"] == "pytest"
+        await head.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_events_reach_ledger(self, head):
+        await head.ingest_scroll_async("ledger check", "pytest")
+        await head.cleanup()
+        with open(head.ledger_path) as f:
+            events = [json.loads(line)["event_type"] for line in f]
+        assert events[0] == "scroll_received_async"
+        assert "scroll_analyzed_async" in events
+
+    @pytest.mark.asyncio
+    async def test_concurrent_scrolls_share_flushes(self, head):
+        results = await asyncio.gather(
+            *(head.ingest_scroll_async(f"scroll {i}", "pytest") for i in range(20))
+        )
+        await head.cleanup()
+        assert all(r["status"] == "Processed" for r in results)
+        with open(head.ledger_path) as f:
+            lines = f.readlines()
+        # received + analyzed + stored/minted per scroll
+        assert len(lines) == 60
+
+    @pytest.mark.asyncio
+    async def test_ledger_failure_after_a_mint_keeps_the_action(self, head, monkeypatch):
+        from ledger import LedgerWriteError
+
+        mints = []
+        head.config["nft_threshold"] = 10  # the fallback analysis scores 50
+        head.swarm_engine.trigger_nft_mint = lambda raw, analysis: mints.append(raw) or {"status": "ok"}
+
+        async def mint_async(raw, analysis):
+            return head.swarm_engine.trigger_nft_mint(raw, analysis)
+
+        head.swarm_engine.trigger_nft_mint_async = mint_async
+        append = head.ledger.append
+
+        def failing_append(event):
+            if event["event_type"].startswith("nft_triggered"):
+                raise LedgerWriteError("ledger backlog full")
+            append(event)
+
+        monkeypatch.setattr(head.ledger, "append", failing_append)
+        assert (await head.ingest_scroll_async("async", "pytest"))["action"] == "NFT Mint Triggered"
+        assert (await asyncio.get_running_loop().run_in_executor(
+            None, head.ingest_scroll, "sync", "pytest"))["action"] == "NFT Mint Triggered"
+        assert mints == ["async", "sync"]
+        await head.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_flush_ledger_waits_for_commit(self, head):
+        await head._record_event_async("a", {})
+        await head._record_event_async("b", {})
+        await head.flush_ledger()
+        with open(head.ledger_path) as f:
+            assert len(f.readlines()) == 2
+        await head.cleanup()
+
+
+# ── SupremeHead.ingest_stream ──────────────────────────────────────────────────
+
+@pytest.mark.asyncio
+async def test_ingest_stream_bounds_items_in_flight(tmp_path):
+    cfg_path = str(tmp_path / "cfg.json")
+    with open(cfg_path, "w") as f:
+        json.dump({"memory_core_url": "http://localhost:19999", "mind_nexus_url": "http://localhost:19998",
+                   "codex_ledger_path": str(tmp_path / "ledger.log"), "retries": 1}, f)
+    head = SupremeHead(config_path=cfg_path)
+    pulled = 0
+    max_ahead = 0
+
+    async def items():
+        nonlocal pulled
+        for i in range(30):
+            pulled += 1
+            yield {"raw": f"scroll {i}", "source": str(i)} if i != 7 else {"error": "bad line"}
+
+    seen = []
+    async for item, result in head.ingest_stream(items(), concurrency=4):
+        max_ahead = max(max_ahead, pulled - len(seen))
+        seen.append((item, result))
+    await head.cleanup()
+    assert [r.get("source") for _, r in seen if "error" not in r] == [str(i) for i in range(30) if i != 7]
+    assert seen[7][1] == {"status": "Failed", "action": None, "error": "bad line"}
+    assert max_ahead <= 5  # the window plus the item being handed out
+
+
+# ── SupremeHead.ingest_batch ───────────────────────────────────────────────────
+
+class TestIngestBatch:
+    @pytest.fixture
+    def head(self, tmp_path):
+        cfg_path = str(tmp_path / "cfg.json")
+        cfg = {
+            "memory_core_url": "http://localhost:19999",
+            "mind_nexus_url": "http://localhost:19998",
+            "codex_ledger_path": str(tmp_path / "ledger.log"),
+            "retries": 1,
+            "retry_delay_seconds": 0,
+            "event_buffer_size": 2,
+        }
+        with open(cfg_path, "w") as f:
+            json.dump(cfg, f)
+        return SupremeHead(config_path=cfg_path)
+
+    @pytest.mark.asyncio
+    async def test_results_in_input_order(self, head):
+        scrolls = [{"raw": f"scroll {i}", "source": f"src-{i}"} for i in range(10)]
+        results = await head.ingest_batch(scrolls, concurrency=3)
+        assert [r["source"] for r in results] == [f"src-{i}" for i in range(10)]
+        assert all(r["status"] == "Processed" for r in results)
+        await head.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_ledger_written_in_one_append(self, head, monkeypatch):
+        appends = []
+        monkeypatch.setattr(head.ledger, "append", lambda entry: appends.append([entry]))
+        monkeypatch.setattr(head.ledger, "append_many", lambda entries: appends.append(list(entries)))
+        await head.ingest_batch([{"raw": f"s{i}"} for i in range(5)])
+        assert len(appends) == 1
+        # 3 events per scroll + the batch summary
+        assert len(appends[0]) == 16
+        assert appends[0][-1]["event_type"] == "batch_ingested"
+        await head.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_ledger_failure_still_returns_results(self, head, monkeypatch):
+        from ledger import LedgerWriteError
+
+        def failing_append_many(entries):
+            raise LedgerWriteError("ledger backlog full")
+
+        monkeypatch.setattr(head.ledger, "append_many", failing_append_many)
+        results = await head.ingest_batch([{"raw": f"s{i}"} for i in range(3)])
+        assert [r["status"] for r in results] == ["Processed"] * 3
+        await head.cleanup()
+
+    @pytest.mark.asyncio
+    async def test_failed_item_keeps_its_slot(self, head):
+        results = await head.ingest_batch([{"raw": "ok"}, {"source": "no-raw"}, {"raw": "ok"}])
+        assert results[1]["status"] == "Failed"
+        assert results[0]["status"] == results[2]["status"] == "Processed"
+        await head.cleanup()
+
+
 # ── MemoryCoreClient / MindNexusClient ────────────────────────────────────────
 
 class TestMemoryCoreClient:
@@ -158,3 +332,292 @@ class TestMindNexusClient:
         assert isinstance(result, dict)
         assert "sentiment" in result
         assert "value_score" in result
+
+
+class TestMicroBatcher:
+    @pytest.mark.asyncio
+    async def test_coalesces_concurrent_submissions(self):
+        calls = []
+
+        async def flush(items):
+            calls.append(list(items))
+            return [i * 10 for i in items]
+
+        batcher = MicroBatcher(flush, window_seconds=0.01, max_size=100)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        assert results == [0, 10, 20, 30, 40]
+        assert calls == [[0, 1, 2, 3, 4]]
+
+    @pytest.mark.asyncio
+    async def test_flushes_at_size_cap(self):
+        async def flush(items):
+            return list(items)
+
+        batcher = MicroBatcher(flush, window_seconds=10, max_size=4)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(8)))
+        assert results == list(range(8))
+        stats = batcher.stats()
+        assert stats["batches"] == 2
+        assert stats["size_histogram"] == {4: 2}
+
+    @pytest.mark.asyncio
+    async def test_failure_propagates_to_every_caller(self):
+        async def flush(items):
+            raise RuntimeError("boom")
+
+        batcher = MicroBatcher(flush, window_seconds=0.001, max_size=10)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+
+class TestMindNexusBatching:
+    @pytest.mark.asyncio
+    async def test_analyze_async_uses_batch_endpoint(self, monkeypatch):
+        posts = []
+
+        async def fake_post(url, payload, timeout=10):
+            posts.append((url, payload))
+            return {"results": [{"value_score": len(p["raw"])} for p in payload["items"]]}
+
+        monkeypatch.setattr(HTTPClient, "async_post", staticmethod(fake_post))
+        client = MindNexusClient("http://mn", batch_window_ms=5, batch_max_size=16)
+        results = await asyncio.gather(*(client.analyze_async("x" * n) for n in range(1, 4)))
+        assert [r["value_score"] for r in results] == [1, 2, 3]
+        assert len(posts) == 1
+        assert posts[0][0] == "http://mn/analyze_batch"
+        assert client.batch_stats()["items"] == 3
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_returns_fallback(self, monkeypatch):
+        async def fake_post(url, payload, timeout=10):
+            raise ConnectionError("down")
+
+        monkeypatch.setattr(HTTPClient, "async_post", staticmethod(fake_post))
+        client = MindNexusClient("http://mn", batch_window_ms=1)
+        result = await client.analyze_async("text")
+        assert result["value_score"] == 50
+        assert result["notes"].startswith("fallback")
+
+
+class TestMintBatching:
+    @pytest.mark.asyncio
+    async def test_concurrent_mints_share_one_batch_call(self, monkeypatch):
+        posts, events = [], []
+
+        async def fake_post(url, payload, timeout=10):
+            posts.append((url, payload))
+            return {"results": [{"status": "mint_triggered", "tx": f"tx-{i['raw']}"} for i in payload["items"]]}
+
+        async def on_batch(event_type, payload):
+            events.append((event_type, payload))
+
+        monkeypatch.setattr(HTTPClient, "async_post", staticmethod(fake_post))
+        engine = SwarmEngine({"mint_service_url": "http://mint/mint"}, enabled=True,
+                             batch_window_ms=5, batch_max_size=16, on_batch=on_batch)
+        results = await asyncio.gather(*(engine.trigger_nft_mint_async(f"s{i}", {"value_score": 90})
+                                         for i in range(3)))
+        assert [r["tx"] for r in results] == ["tx-s0", "tx-s1", "tx-s2"]
+        assert len({r["batch_id"] for r in results}) == 1 and results[0]["batch_size"] == 3
+        assert [url for url, _ in posts] == ["http://mint/mint_batch"]
+        assert events[0][0] == "nft_batch_minted" and events[0][1]["tx"] == ["tx-s0", "tx-s1", "tx-s2"]
+
+    def test_batch_url_is_the_endpoint_sibling(self):
+        def batch_url(url, **extra):
+            return SwarmEngine({"mint_service_url": url, **extra}, enabled=True).mint_batch_url
+
+        assert batch_url("http://mint/mint") == "http://mint/mint_batch"
+        assert batch_url("http://mint/v1/mint/") == "http://mint/v1/mint_batch"
+        assert batch_url("http://mint/mint?key=k") == "http://mint/mint_batch?key=k"
+        assert batch_url("http://mint/mint", mint_batch_url="http://bulk/mint") == "http://bulk/mint"
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_fails_every_caller_and_is_reported(self, monkeypatch):
+        events = []
+
+        async def fake_post(url, payload, timeout=10):
+            raise ConnectionError("mint service down")
+
+        async def on_batch(event_type, payload):
+            events.append((event_type, payload))
+
+        monkeypatch.setattr(HTTPClient, "async_post", staticmethod(fake_post))
+        engine = SwarmEngine({"mint_service_url": "http://mint/mint"}, enabled=True,
+                             batch_window_ms=1, on_batch=on_batch)
+        results = await asyncio.gather(*(engine.trigger_nft_mint_async(f"s{i}", {}) for i in range(2)),
+                                       return_exceptions=True)
+        assert all(isinstance(r, ConnectionError) for r in results)
+        assert [(e, p["size"]) for e, p in events] == [("nft_batch_failed", 2)]
+        assert engine.batch_stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_outcome_reaches_the_ledger(self, tmp_path, monkeypatch):
+        async def high_value(self, raw, meta=None):
+            return {"patterns": [], "sentiment": "positive", "value_score": 95}
+
+        monkeypatch.setattr(MindNexusClient, "analyze_async", high_value)
+        cfg_path = str(tmp_path / "cfg.json")
+        with open(cfg_path, "w") as f:
+            json.dump({"codex_ledger_path": str(tmp_path / "ledger.log"), "mint_batch_window_ms": 5}, f)
+        head = SupremeHead(config_path=cfg_path)
+        results = await asyncio.gather(*(head.ingest_scroll_async(f"rare {i}", "pytest") for i in range(3)))
+        await head.cleanup()
+        assert {r["action"] for r in results} == {"NFT Mint Triggered"}
+        with open(head.ledger_path) as f:
+            events = [json.loads(line) for line in f]
+        batches = [e["payload"] for e in events if e["event_type"] == "nft_batch_minted"]
+        assert len(batches) == 1 and batches[0]["size"] == 3
+        minted = [e["payload"]["result"] for e in events if e["event_type"] == "nft_triggered_async"]
+        assert {m["batch_id"] for m in minted} == {batches[0]["batch_id"]}
+
+    @pytest.mark.asyncio
+    async def test_cleanup_mints_what_is_still_in_the_window(self, tmp_path, monkeypatch):
+        async def high_value(self, raw, meta=None):
+            return {"patterns": [], "sentiment": "positive", "value_score": 95}
+
+        monkeypatch.setattr(MindNexusClient, "analyze_async", high_value)
+        cfg_path = str(tmp_path / "cfg.json")
+        with open(cfg_path, "w") as f:
+            json.dump({"codex_ledger_path": str(tmp_path / "ledger.log"), "mint_batch_window_ms": 60000}, f)
+        head = SupremeHead(config_path=cfg_path)
+        tasks = [asyncio.ensure_future(head.ingest_scroll_async(f"rare {i}", "pytest")) for i in range(2)]
+        while len(head.swarm_engine._batcher._pending) < 2:
+            await asyncio.sleep(0.001)
+        await asyncio.wait_for(head.cleanup(), 5)
+        results = await asyncio.wait_for(asyncio.gather(*tasks), 1)
+        assert {r["action"] for r in results} == {"NFT Mint Triggered"}
+        with open(head.ledger_path) as f:
+            events = [json.loads(line) for line in f]
+        assert [e["payload"]["size"] for e in events if e["event_type"] == "nft_batch_minted"] == [2]
+
+
+class TestWriteBehindQueue:
+    @pytest.mark.asyncio
+    async def test_drains_in_batches_and_close_flushes(self, tmp_path):
+        batches = []
+
+        async def flush(items):
+            batches.append(list(items))
+
+        q = WriteBehindQueue(flush, batch_size=4, flush_interval=0.01,
+                             spill_path=str(tmp_path / "spill.jsonl"))
+        for i in range(10):
+            await q.put(i)
+        await q.close()
+        assert [i for b in batches for i in b] == list(range(10))
+        assert max(len(b) for b in batches) <= 4
+        # fully drained: journal truncated
+        assert os.path.getsize(tmp_path / "spill.jsonl") == 0
+
+    @pytest.mark.asyncio
+    async def test_put_blocks_when_full(self):
+        release = asyncio.Event()
+
+        async def flush(items):
+            await release.wait()
+
+        q = WriteBehindQueue(flush, maxsize=2, batch_size=1, flush_interval=0)
+        await q.put("a")  # picked up by the flusher, which then blocks
+        await asyncio.sleep(0)
+        await q.put("b")
+        await q.put("c")
+        blocked = asyncio.ensure_future(q.put("d"))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        release.set()
+        await blocked
+        await q.close()
+
+    @pytest.mark.asyncio
+    async def test_put_fails_fast_once_the_timeout_expires(self, tmp_path):
+        release = asyncio.Event()
+        delivered = []
+
+        async def flush(items):
+            await release.wait()
+            delivered.extend(items)
+
+        spill = str(tmp_path / "spill.jsonl")
+        q = WriteBehindQueue(flush, maxsize=1, batch_size=1, flush_interval=0, spill_path=spill,
+                             put_timeout=0.01)
+        await q.put("a")
+        await asyncio.sleep(0)
+        await q.put("b")
+        with pytest.raises(asyncio.QueueFull):
+            await q.put("c")
+        assert q.rejected == 1
+        q._task.cancel()  # crash before anything is delivered
+        q._spill.close()
+        release.set()
+        replayed = WriteBehindQueue(flush, flush_interval=0, spill_path=spill)
+        await replayed.start()
+        await replayed.close()
+        assert delivered == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_spill_journal_is_fsynced_before_each_batch(self, tmp_path, monkeypatch):
+        synced = []
+        fsync = os.fsync
+        monkeypatch.setattr(os, "fsync", lambda fd: (synced.append(fd), fsync(fd)))
+        delivered = []
+
+        async def flush(items):
+            delivered.append(len(synced))
+
+        q = WriteBehindQueue(flush, batch_size=2, flush_interval=0.01,
+                             spill_path=str(tmp_path / "spill.jsonl"))
+        await q.put("a")
+        await q.put("b")
+        await q.close()
+        assert delivered and delivered[0] >= 1
+
+    @pytest.mark.asyncio
+    async def test_replays_unacknowledged_items_from_spill(self, tmp_path):
+        spill = str(tmp_path / "spill.jsonl")
+        with open(spill, "w") as f:
+            f.write(json.dumps({"seq": 1, "item": "done"}) + "\n")
+            f.write(json.dumps({"ack": 1}) + "\n")
+            f.write(json.dumps({"seq": 2, "item": "lost-in-crash"}) + "\n")
+            f.write('{"seq": 3, "it')  # torn final write
+        delivered = []
+
+        async def flush(items):
+            delivered.extend(items)
+
+        q = WriteBehindQueue(flush, flush_interval=0.001, spill_path=spill)
+        await q.put("new")
+        await q.close()
+        assert delivered == ["lost-in-crash", "new"]
+
+    @pytest.mark.asyncio
+    async def test_retries_failed_batch(self):
+        attempts = []
+
+        async def flush(items):
+            attempts.append(list(items))
+            if len(attempts) == 1:
+                raise ConnectionError("memory core down")
+
+        q = WriteBehindQueue(flush, flush_interval=0, retry_delay=0.001)
+        await q.put("x")
+        await q.close()
+        assert attempts == [["x"], ["x"]]
+        assert q.delivered == 1
+
+
+class TestMemoryCoreWriteBehind:
+    @pytest.mark.asyncio
+    async def test_store_async_queues_and_posts_batch(self, monkeypatch, tmp_path):
+        posts = []
+
+        async def fake_post(url, payload, timeout=10):
+            posts.append((url, payload))
+            return {"status": "ok"}
+
+        monkeypatch.setattr(HTTPClient, "async_post", staticmethod(fake_post))
+        client = MemoryCoreClient("http://mc", write_behind=True, flush_interval_ms=1,
+                                  spill_path=str(tmp_path / "spill.jsonl"))
+        results = await asyncio.gather(*(client.store_async({"n": i}) for i in range(3)))
+        assert all(r == {"status": "queued"} for r in results)
+        await client.close()
+        assert {url for url, _ in posts} == {"http://mc/store_batch"}
+        assert [item["n"] for _, p in posts for item in p["items"]] == [0, 1, 2]
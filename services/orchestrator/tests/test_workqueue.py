@@ -0,0 +1,317 @@
+"""
+Tests for orchestrator/workqueue.py and the queued ingest path.
+
+Run with:
+    cd services/orchestrator && python -m pytest tests/test_workqueue.py -v
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ledger import LedgerWriteError
+from supremehead import SupremeHead, fallback_analysis
+from workqueue import WorkQueue, _main, rehome_worker_queues
+
+
+@pytest.fixture
+def queue(tmp_path):
+    q = WorkQueue(str(tmp_path / "queue.sqlite3"), visibility_timeout=30, max_attempts=2)
+    yield q
+    q.close()
+
+
+class TestWorkQueue:
+    def test_claim_leases_oldest_jobs_and_ack_removes_them(self, queue):
+        ids = queue.put_many([{"raw": "a"}, {"raw": "b"}, {"raw": "c"}])
+        jobs = queue.claim(2)
+        assert [j.id for j in jobs] == ids[:2]
+        assert [j.payload["raw"] for j in jobs] == ["a", "b"]
+        assert jobs[0].attempts == 1
+        assert queue.claim(5)[0].id == ids[2]  # leased jobs are invisible
+        assert queue.claim(5) == []
+        queue.ack(ids[0])
+        assert queue.depth() == {"ready": 0, "leased": 2, "dead": 0}
+
+    def test_expired_lease_is_redelivered(self, tmp_path):
+        q = WorkQueue(str(tmp_path / "q.sqlite3"), visibility_timeout=0.05)
+        q.put_many([{"raw": "a"}])
+        first = q.claim()[0]
+        time.sleep(0.06)
+        again = q.claim()[0]
+        assert again.id == first.id and again.attempts == 2
+        q.close()
+
+    def test_extend_lease_keeps_a_job_invisible(self, tmp_path):
+        q = WorkQueue(str(tmp_path / "q.sqlite3"), visibility_timeout=0.05)
+        q.put_many([{"raw": "a"}])
+        job = q.claim()[0]
+        time.sleep(0.03)
+        assert q.extend_lease(job.id)
+        time.sleep(0.03)
+        assert q.claim() == []
+        q.ack(job.id)
+        assert not q.extend_lease(job.id)
+        q.close()
+
+    def test_nack_retries_then_dead_letters_and_requeue_restores(self, queue):
+        job_id = queue.put_many([{"raw": "a"}])[0]
+        assert queue.nack(queue.claim()[0], "boom") is False
+        assert queue.nack(queue.claim()[0], "boom again") is True
+        assert queue.depth() == {"ready": 0, "leased": 0, "dead": 1}
+        dead = queue.dead_letters()
+        assert dead[0]["id"] == job_id and dead[0]["last_error"] == "boom again"
+        assert dead[0]["attempts"] == 2
+
+        assert queue.requeue_dead() == 1
+        job = queue.claim()[0]
+        assert (job.id, job.attempts, job.payload) == (job_id, 1, {"raw": "a"})
+
+    def test_lease_expired_too_often_is_dead_lettered_on_claim(self, tmp_path):
+        q = WorkQueue(str(tmp_path / "q.sqlite3"), visibility_timeout=0, max_attempts=1)
+        q.put_many([{"raw": "a"}])
+        q.claim()
+        assert q.claim() == []
+        assert q.dead_letters()[0]["last_error"] == "lease expired"
+        q.close()
+
+    def test_reopening_releases_leases_but_cli_does_not(self, tmp_path, capsys):
+        path = str(tmp_path / "q.sqlite3")
+        q = WorkQueue(path)
+        q.put_many([{"raw": "a"}])
+        q.claim()
+        assert _main(["stats", path]) == 0
+        assert json.loads(capsys.readouterr().out)["leased"] == 1
+        q.close()  # crash stand-in: the lease is still held on disk
+
+        reopened = WorkQueue(path)
+        assert reopened.claim()[0].attempts == 2
+        reopened.close()
+
+    async def test_concurrent_puts_share_commits(self, queue):
+        ids = await asyncio.gather(*(queue.put({"raw": str(i)}) for i in range(50)))
+        assert sorted(ids) == ids and len(set(ids)) == 50
+        assert queue.commits < 50
+        assert queue.depth()["ready"] == 50
+
+
+def test_orphaned_worker_queues_are_rehomed(tmp_path):
+    base = str(tmp_path / "queue.sqlite3")
+    for path, raws in ((base, ["single"]), (base + ".w0", ["w0"]), (base + ".w2", ["w2a", "w2b"]),
+                       (base + ".w3", ["w3"])):
+        q = WorkQueue(path)
+        q.put_many([{"raw": r} for r in raws])
+        q.close()
+    leased = WorkQueue(base + ".w3")
+    leased.claim()  # in flight when the larger pool stopped
+    leased.put_many([{"raw": "doomed"}])
+    leased.nack(leased.claim()[0], "boom")
+    leased.nack(leased.claim()[0], "boom")  # max_attempts 5: still a job
+    leased.close()
+    dead = WorkQueue(base + ".w2", max_attempts=1)
+    dead.put_many([{"raw": "dead"}])
+    dead.nack(dead.claim(5)[-1], "boom")
+    dead.close()
+
+    assert rehome_worker_queues(base, 2) == 5  # w0 belongs to a live worker
+    assert not os.path.exists(base) and not os.path.exists(base + ".w3")
+    assert os.path.exists(base + ".w2")  # still holds a dead letter for the CLI
+    raws = []
+    for n in (0, 1):
+        q = WorkQueue(f"{base}.w{n}")
+        raws += [job.payload["raw"] for job in q.claim(10)]
+        q.close()
+    assert sorted(raws) == ["doomed", "single", "w0", "w2a", "w2b", "w3"]
+    assert rehome_worker_queues(base, 2) == 0
+
+
+# ── SupremeHead queued path ────────────────────────────────────────────────────
+
+def _head(tmp_path, **overrides):
+    cfg = {"codex_ledger_path": str(tmp_path / "ledger.log"), "work_queue_enabled": True,
+           "work_queue_path": str(tmp_path / "queue.sqlite3"), "work_queue_retry_delay_seconds": 0,
+           "work_queue_poll_interval_ms": 10, "work_queue_max_attempts": 2, **overrides}
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(cfg))
+    return SupremeHead(config_path=str(path))
+
+
+async def _until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+async def test_enqueued_scrolls_are_ingested_and_acked(tmp_path, monkeypatch):
+    seen = []
+
+    async def fake_ingest(self, raw, source, priority=None, defer_fallback=False):
+        seen.append((raw, source, priority))
+        return {"status": "Processed", "action": "Stored in Memory Core"}
+
+    monkeypatch.setattr(SupremeHead, "_ingest_scroll_async_observed", fake_ingest)
+    head = _head(tmp_path)
+    accepted = await head.enqueue_scroll("one", "api", "high")
+    assert accepted["status"] == "Accepted" and isinstance(accepted["job_id"], int)
+    await head.enqueue_batch([{"raw": "two", "source": "b"}, {"raw": "three"}])
+
+    await _until(lambda: head.work_queue.acked == 3)
+    assert sorted(seen) == [("one", "api", "high"), ("three", "batch", None), ("two", "b", None)]
+    await head.cleanup()
+
+
+async def test_jobs_left_by_a_previous_run_are_drained_on_start(tmp_path, monkeypatch):
+    seen = []
+
+    async def fake_ingest(self, raw, source, priority=None, defer_fallback=False):
+        seen.append(raw)
+        return {"status": "Processed", "action": "Stored in Memory Core"}
+
+    monkeypatch.setattr(SupremeHead, "_ingest_scroll_async_observed", fake_ingest)
+    previous = WorkQueue(str(tmp_path / "queue.sqlite3"))
+    previous.put_many([{"raw": "survivor", "source": "api"}])
+    previous.claim()  # in flight when the old process died
+    previous.close()
+
+    head = _head(tmp_path)
+    head.start_work_queue()
+    await _until(lambda: seen == ["survivor"] and head.work_queue.acked == 1)
+    await head.cleanup()
+
+
+async def test_failing_job_is_retried_then_dead_lettered(tmp_path, monkeypatch):
+    attempts = []
+
+    async def failing_ingest(self, raw, source, priority=None, defer_fallback=False):
+        attempts.append(raw)
+        return {"status": "Processed", "action": "Action Failed"}
+
+    monkeypatch.setattr(SupremeHead, "_ingest_scroll_async_observed", failing_ingest)
+    head = _head(tmp_path)
+    await head.enqueue_scroll("doomed", "api")
+
+    await _until(lambda: head.work_queue.dead_lettered == 1)
+    assert attempts == ["doomed", "doomed"]
+    await head.cleanup()
+    with open(tmp_path / "ledger.log") as f:
+        events = [json.loads(line) for line in f]
+    assert events[-1]["event_type"] == "scroll_dead_lettered"
+    assert events[-1]["payload"]["error"] == "action failed"
+
+
+async def test_ingest_endpoint_answers_202_when_queue_enabled(tmp_path, monkeypatch):
+    import server
+
+    monkeypatch.setattr(server, "_head", _head(tmp_path))
+    async with TestClient(TestServer(server.make_app())) as client:
+        resp = await client.post("/ingest", json={"raw": "queued scroll", "source": "q"})
+        assert resp.status == 202
+        body = await resp.json()
+        assert body["status"] == "Accepted" and body["job_id"] >= 1
+
+        resp = await client.post("/ingest/batch", json={"scrolls": [{"raw": "x"}, {"raw": ""}]})
+        assert resp.status == 202
+        results = (await resp.json())["results"]
+        assert results[0]["status"] == "Accepted" and "error" in results[1]
+
+        resp = await client.post("/ingest/stream", data=b'{"raw": "s1"}\n{"raw": "s2", "source": "q"}\n')
+        assert resp.status == 202
+        lines = [json.loads(line) async for line in resp.content]
+        assert [line["status"] for line in lines[:-1]] == ["Accepted", "Accepted"]
+        assert lines[-1] == {"summary": {"count": 2, "failed": 0}}
+
+
+async def test_long_running_job_keeps_its_lease(tmp_path, monkeypatch):
+    seen = []
+
+    async def slow_ingest(self, raw, source, priority=None, defer_fallback=False):
+        seen.append(raw)
+        await asyncio.sleep(0.5)
+        return {"status": "Processed", "action": "Stored in Memory Core"}
+
+    monkeypatch.setattr(SupremeHead, "_ingest_scroll_async_observed", slow_ingest)
+    head = _head(tmp_path, work_queue_visibility_timeout_seconds=0.15)
+    await head.enqueue_scroll("slow", "api")
+    await _until(lambda: head.work_queue.acked == 1)
+    assert seen == ["slow"]  # never redelivered while still running
+    await head.cleanup()
+
+
+async def test_fallback_analysis_is_retried_before_anything_is_stored(tmp_path):
+    head = _head(tmp_path, work_queue_max_attempts=3)
+    analyses = [fallback_analysis("fallback: down"), fallback_analysis("fallback: down"),
+                {"value_score": 10, "notes": "ok"}]
+    stored = []
+
+    async def analyze(raw, meta=None):
+        return analyses.pop(0)
+
+    async def store(payload):
+        stored.append(payload["analysis"]["notes"])
+        return {"status": "ok"}
+
+    head.mind_nexus.analyze_async = analyze
+    head.memory_core.store_async = store
+    await head.enqueue_scroll("scroll", "api")
+    await _until(lambda: head.work_queue.acked == 1)
+    assert stored == ["ok"] and head.work_queue.retried == 2
+    await head.cleanup()
+
+
+async def test_fallback_on_the_last_attempt_is_accepted(tmp_path):
+    head = _head(tmp_path)
+
+    async def analyze(raw, meta=None):
+        return fallback_analysis("fallback: down")
+
+    stored = []
+
+    async def store(payload):
+        stored.append(payload["analysis"]["notes"])
+        return {"status": "ok"}
+
+    head.mind_nexus.analyze_async = analyze
+    head.memory_core.store_async = store
+    await head.enqueue_scroll("scroll", "api")
+    await _until(lambda: head.work_queue.acked == 1)
+    assert stored == ["fallback: down"] and head.work_queue.dead_lettered == 0
+    await head.cleanup()
+
+
+async def test_ledger_failure_after_a_mint_acks_without_minting_again(tmp_path, monkeypatch):
+    head = _head(tmp_path)
+    mints = []
+
+    async def analyze(raw, meta=None):
+        return {"value_score": 95, "notes": "rare"}
+
+    async def mint(raw, analysis):
+        mints.append(raw)
+        return {"status": "minted"}
+
+    async def failing_flush():
+        raise LedgerWriteError("ledger commit failed")
+
+    append = head.ledger.append
+
+    def failing_append(event):
+        if event["event_type"] == "nft_triggered_async":
+            raise LedgerWriteError("ledger backlog full")
+        append(event)
+
+    head.mind_nexus.analyze_async = analyze
+    head.swarm_engine.trigger_nft_mint_async = mint
+    await head.enqueue_scroll("scroll", "api")
+    monkeypatch.setattr(head.ledger, "append", failing_append)
+    monkeypatch.setattr(head, "flush_ledger", failing_flush)
+    await _until(lambda: head.work_queue.acked == 1)
+    assert mints == ["scroll"] and head.work_queue.retried == 0
+    monkeypatch.undo()
+    await head.cleanup()
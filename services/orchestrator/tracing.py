@@ -0,0 +1,365 @@
+"""
+orchestrator/tracing.py
+
+Lightweight span tracing for SupremeHead with sampled export to a local
+JSON-lines file - no collector or OpenTelemetry dependency.
+
+The active span lives in a ``contextvars.ContextVar``, so nesting follows
+both plain call stacks and asyncio tasks.  A trace is started per scroll and
+the sampling decision is made once at its root: unsampled traces still carry
+a trace ID (it is propagated downstream) but their child spans are no-ops and
+nothing is exported.
+
+Propagation uses the W3C ``traceparent`` header,
+``00-<32 hex trace id>-<16 hex span id>-<01 sampled | 00>``, which
+``HTTPClient`` attaches to every Mind Nexus / Memory Core call made inside a
+span.  An incoming ``traceparent`` can be continued with ``continue_trace``.
+
+Each exported line is one finished span:
+
+  {"trace_id", "span_id", "parent_id", "name", "start", "duration_ms",
+   "status", ["error",] "attrs"}
+
+``python tracing.py summary <file>`` prints per-span latency percentiles and
+the critical path of the slowest traces.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger("supremehead.tracing")
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("orchestrator_span", default=None)
+# remote parent from an incoming traceparent header: (trace_id, span_id, sampled)
+_remote: contextvars.ContextVar[Optional[tuple]] = contextvars.ContextVar("orchestrator_remote_parent", default=None)
+
+_EXPORT_BATCH = 512  # wake the exporter early once this many spans are queued
+
+_live_exporters: "weakref.WeakSet[SpanExporter]" = weakref.WeakSet()
+
+
+def _close_live_exporters():
+    for exporter in list(_live_exporters):
+        exporter.close()
+
+
+atexit.register(_close_live_exporters)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class Span:
+    __slots__ = ("tracer", "trace_id", "span_id", "parent_id", "name", "attrs",
+                 "sampled", "start", "_t0", "duration", "status", "error", "_token")
+
+    def __init__(self, tracer: "Tracer", trace_id: str, parent_id: Optional[str], name: str,
+                 sampled: bool, attrs: Dict[str, Any]):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.sampled = sampled
+        self.status = "ok"
+        self.error = None
+        self.duration = 0.0
+
+    def set(self, **attrs: Any):
+        self.attrs.update(attrs)
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._t0
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.status = "error"
+            self.error = f"{exc_type.__name__}: {exc}"
+        if self.sampled:
+            self.tracer._finish(self)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": self.duration * 1000,
+            "status": self.status,
+            "attrs": self.attrs,
+        }
+        if self.error:
+            record["error"] = self.error
+        return record
+
+
+class _NoopSpan:
+    """Stand-in for child spans of unsampled (or absent) traces."""
+
+    __slots__ = ()
+
+    def set(self, **attrs: Any):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def trace_headers() -> Dict[str, str]:
+    """``traceparent`` header for the active span, or an empty dict."""
+    span = _current.get()
+    return {"traceparent": span.traceparent()} if span is not None else {}
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[tuple]:
+    parts = (value or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(flags & 1)
+
+
+def continue_trace(traceparent: Optional[str]):
+    """Make the next ``start_trace`` in this context a child of ``traceparent``.
+
+    Returns a token to pass to ``end_continue``, or ``None`` if the header is
+    missing or malformed.
+    """
+    parent = parse_traceparent(traceparent)
+    if parent is None:
+        return None
+    return _remote.set(parent)
+
+
+def end_continue(token):
+    if token is not None:
+        _remote.reset(token)
+
+
+class SpanExporter:
+    """Appends finished spans to a JSON-lines file from a background thread.
+
+    ``export`` never blocks: spans beyond ``max_queue`` are dropped and
+    counted, so a slow disk cannot stall ingestion.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 0.2, max_queue: int = 10000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self._cond = threading.Condition()
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.exported = 0
+        self.dropped = 0
+
+    def export(self, record: Dict[str, Any]):
+        with self._cond:
+            if self._closed or len(self._pending) >= self.max_queue:
+                self.dropped += 1
+                return
+            self._pending.append(record)
+            if len(self._pending) == _EXPORT_BATCH:
+                self._cond.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+                _live_exporters.add(self)
+
+    def _run(self):
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            f = open(self.path, "a", encoding="utf-8")
+        except OSError:
+            logger.exception("Cannot open span export file %s; tracing export disabled", self.path)
+            with self._cond:
+                self._closed = True
+                self.dropped += len(self._pending)
+                self._pending.clear()
+            return
+        with f:
+            while True:
+                with self._cond:
+                    while not self._closed and len(self._pending) < _EXPORT_BATCH:
+                        if not self._cond.wait(self.flush_interval):
+                            break
+                    batch = list(self._pending)
+                    self._pending.clear()
+                    closed = self._closed
+                if batch:
+                    try:
+                        f.write("".join(json.dumps(r, default=str) + "\n" for r in batch))
+                        f.flush()
+                        self.exported += len(batch)
+                    except Exception:
+                        logger.exception("Span export failed; dropping %d spans", len(batch))
+                        self.dropped += len(batch)
+                if closed:
+                    return
+
+    def close(self, timeout: Optional[float] = 5.0):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"pending": len(self._pending), "exported": self.exported, "dropped": self.dropped}
+
+
+class Tracer:
+    """Starts per-scroll traces and their child spans.
+
+    ``sample_rate`` is the fraction of traces exported (0 disables export but
+    keeps trace IDs flowing to downstream services).
+    """
+
+    def __init__(self, sample_rate: float = 0.0, exporter: Optional[SpanExporter] = None):
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.exporter = exporter
+        self.started = 0
+        self.sampled = 0
+
+    def start_trace(self, name: str, **attrs: Any) -> Span:
+        """Root span for one unit of work (or a child of a continued remote trace)."""
+        self.started += 1
+        remote = _remote.get()
+        if remote is not None:
+            trace_id, parent_id, sampled = remote
+        else:
+            trace_id, parent_id = _new_id(16), None
+            sampled = self.exporter is not None and random.random() < self.sample_rate
+        sampled = sampled and self.exporter is not None
+        if sampled:
+            self.sampled += 1
+        return Span(self, trace_id, parent_id, name, sampled, attrs)
+
+    def span(self, name: str, **attrs: Any):
+        """Child of the active span; a no-op outside a sampled trace."""
+        parent = _current.get()
+        if parent is None or not parent.sampled:
+            return NOOP_SPAN
+        return Span(self, parent.trace_id, parent.span_id, name, True, attrs)
+
+    def _finish(self, span: Span):
+        self.exporter.export(span.to_dict())
+
+    def close(self):
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+# ---- offline analysis ----
+def load_traces(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                span = json.loads(line)
+            except ValueError:
+                continue  # torn last line
+            traces.setdefault(span["trace_id"], []).append(span)
+    return traces
+
+
+def critical_path(spans: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Root-to-leaf chain that descends into the longest child at each level."""
+    ids = {s["span_id"] for s in spans}
+    children: Dict[Optional[str], List[Dict[str, Any]]] = {}
+    for s in spans:
+        parent = s["parent_id"] if s["parent_id"] in ids else None
+        children.setdefault(parent, []).append(s)
+    path: List[Dict[str, Any]] = []
+    level = children.get(None, [])
+    while level:
+        node = max(level, key=lambda s: s["duration_ms"])
+        path.append(node)
+        level = children.get(node["span_id"], [])
+    return path
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def _main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="tracing.py", description="Span file analysis")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    summary = sub.add_parser("summary", help="per-span latency and slowest critical paths")
+    summary.add_argument("path")
+    summary.add_argument("--slowest", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    traces = load_traces(args.path)
+    by_name: Dict[str, List[float]] = {}
+    for spans in traces.values():
+        for s in spans:
+            by_name.setdefault(s["name"], []).append(s["duration_ms"])
+    print(f"{len(traces)} traces")
+    print(f"{'span':<16} {'count':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for name, values in sorted(by_name.items()):
+        print(f"{name:<16} {len(values):>7} {_percentile(values, 50):>9.2f} "
+              f"{_percentile(values, 99):>9.2f} {max(values):>9.2f}")
+
+    def root_duration(spans):
+        roots = [s for s in spans if s["parent_id"] not in {x["span_id"] for x in spans}]
+        return max((s["duration_ms"] for s in roots), default=0.0)
+
+    slowest = sorted(traces.items(), key=lambda kv: root_duration(kv[1]), reverse=True)[:args.slowest]
+    for trace_id, spans in slowest:
+        chain = " > ".join(f"{s['name']}({s['duration_ms']:.1f})" for s in critical_path(spans))
+        print(f"\n{trace_id} {root_duration(spans):.1f} ms\n  {chain}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())
@@ -0,0 +1,421 @@
+"""
+orchestrator/workqueue.py
+
+Durable local work queue backed by SQLite (WAL journal), so a scroll accepted
+by ``POST /ingest`` survives an orchestrator crash or deploy before it has
+been analyzed and stored.
+
+Semantics:
+
+  * ``put`` / ``put_many`` return once the job is committed.  Concurrent puts
+    from the event loop are group-committed in one transaction on the queue's
+    own thread, so durability costs one commit per burst, not per scroll.
+  * ``claim`` leases ready jobs: each gets ``visibility_timeout`` seconds
+    before it becomes claimable again, so a job whose consumer died is
+    redelivered (at-least-once).  ``extend_lease`` renews it for a consumer
+    that is still working.  Opening a queue releases every lease, since
+    one process owns the file (prefork workers get their own, like the ledger);
+    the CLI opens it with ``recover=False`` so it is safe next to a live server.
+  * ``ack`` deletes a finished job.  ``nack`` makes it visible again after a
+    delay, or moves it to the ``dead`` table once it has been attempted
+    ``max_attempts`` times.  Dead letters stay until requeued or purged.
+  * Prefork workers each own ``<path>.w<N>``.  Before starting them the
+    supervisor moves the jobs of files no worker will open (``<path>`` from a
+    single-process run, ``.w<N>`` beyond the new worker count) into the live
+    workers' files with ``rehome_worker_queues``.
+
+CLI (for operators):
+    python workqueue.py stats   logs/work_queue.sqlite3
+    python workqueue.py dead    logs/work_queue.sqlite3 [--limit N]
+    python workqueue.py requeue logs/work_queue.sqlite3 [ID ...]
+    python workqueue.py purge   logs/work_queue.sqlite3
+"""
+
+from __future__ import annotations
+
+import asyncio
+import glob
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import codec
+
+logger = logging.getLogger("supremehead.workqueue")
+
+_WORKER_SUFFIX_RE = re.compile(r"\.w(\d+)")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    payload     TEXT    NOT NULL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    visible_at  REAL    NOT NULL,
+    enqueued_at REAL    NOT NULL,
+    last_error  TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_visible ON jobs (visible_at, id);
+CREATE TABLE IF NOT EXISTS dead (
+    id          INTEGER PRIMARY KEY,
+    payload     TEXT    NOT NULL,
+    attempts    INTEGER NOT NULL,
+    enqueued_at REAL    NOT NULL,
+    failed_at   REAL    NOT NULL,
+    last_error  TEXT
+);
+"""
+
+
+@dataclass
+class Job:
+    id: int
+    payload: Dict[str, Any]
+    attempts: int
+    enqueued_at: float
+
+
+class WorkQueue:
+    """SQLite-backed job queue with leases and dead-lettering.
+
+    The sync methods may be called from any thread (a lock serialises them);
+    the ``*_async`` ones run them on a private single-thread executor so the
+    event loop never blocks on disk.
+    """
+
+    def __init__(self, path: str, visibility_timeout: float = 60.0, max_attempts: int = 5,
+                 synchronous: str = "NORMAL", recover: bool = True):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max(1, max_attempts)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._synchronous = synchronous
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._db(recover)
+        self._pending: List[tuple] = []  # (payload, future) awaiting the next group commit
+        self._committing = False
+        self.enqueued = 0
+        self.acked = 0
+        self.retried = 0
+        self.dead_lettered = 0
+        self.commits = 0
+
+    def _db(self, recover: bool = False) -> sqlite3.Connection:
+        """The connection, (re)opened on first use after ``close``."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # NORMAL: a committed job survives a process crash; FULL also survives power loss
+            conn.execute(f"PRAGMA synchronous={self._synchronous}")
+            conn.executescript(_SCHEMA)
+            if recover:
+                released = conn.execute("UPDATE jobs SET visible_at = 0 WHERE attempts > 0 AND visible_at > ?",
+                                        (time.time(),)).rowcount
+                if released:
+                    logger.info("Released %d leased jobs from %s", released, self.path)
+            self._conn = conn
+        return self._conn
+
+    async def _run(self, fn, *args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="workqueue")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    # -- producers ---------------------------------------------------------
+
+    def put_many(self, payloads: Sequence[Dict[str, Any]]) -> List[int]:
+        """Commit ``payloads`` as ready jobs in one transaction; returns their ids."""
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                ids = [conn.execute(
+                    "INSERT INTO jobs (payload, visible_at, enqueued_at) VALUES (?, ?, ?)",
+                    (codec.dumps(p).decode("utf-8"), now, now)).lastrowid for p in payloads]
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self.enqueued += len(ids)
+            self.commits += 1
+        return ids
+
+    async def put(self, payload: Dict[str, Any]) -> int:
+        """Durably enqueue one job, sharing a commit with concurrent puts."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((payload, future))
+        if not self._committing:
+            self._committing = True
+            loop.create_task(self._commit_pending())
+        return await future
+
+    async def put_many_async(self, payloads: Sequence[Dict[str, Any]]) -> List[int]:
+        return await self._run(self.put_many, payloads)
+
+    async def _commit_pending(self):
+        try:
+            while self._pending:
+                batch, self._pending = self._pending, []
+                try:
+                    ids = await self._run(self.put_many, [p for p, _ in batch])
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, future), job_id in zip(batch, ids):
+                    if not future.done():
+                        future.set_result(job_id)
+        finally:
+            self._committing = False
+
+    # -- consumers ---------------------------------------------------------
+
+    def claim(self, limit: int = 1) -> List[Job]:
+        """Lease up to ``limit`` visible jobs, oldest first.
+
+        A job already attempted ``max_attempts`` times whose lease expired
+        (its consumer died mid-job every time) is dead-lettered instead.
+        """
+        now = time.time()
+        jobs: List[Job] = []
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT id, payload, attempts, enqueued_at FROM jobs WHERE visible_at <= ? "
+                    "ORDER BY visible_at, id LIMIT ?", (now, limit)).fetchall()
+                for job_id, payload, attempts, enqueued_at in rows:
+                    if attempts >= self.max_attempts:
+                        self._bury(job_id, "lease expired", now)
+                        continue
+                    conn.execute("UPDATE jobs SET attempts = attempts + 1, visible_at = ? WHERE id = ?",
+                                       (now + self.visibility_timeout, job_id))
+                    jobs.append(Job(job_id, codec.loads(payload), attempts + 1, enqueued_at))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return jobs
+
+    def extend_lease(self, job_id: int) -> bool:
+        """Push the lease of ``job_id`` another ``visibility_timeout`` out; False if it is gone."""
+        with self._lock:
+            return bool(self._db().execute("UPDATE jobs SET visible_at = ? WHERE id = ?",
+                                           (time.time() + self.visibility_timeout, job_id)).rowcount)
+
+    def ack(self, job_id: int):
+        with self._lock:
+            if self._db().execute("DELETE FROM jobs WHERE id = ?", (job_id,)).rowcount:
+                self.acked += 1
+
+    def nack(self, job: Job, error: str, delay: float = 0.0) -> bool:
+        """Give ``job`` back after a failed attempt; returns ``True`` if it was dead-lettered."""
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if job.attempts >= self.max_attempts:
+                    self._bury(job.id, error, now)
+                    dead = True
+                else:
+                    conn.execute("UPDATE jobs SET visible_at = ?, last_error = ? WHERE id = ?",
+                                       (now + delay, error, job.id))
+                    self.retried += 1
+                    dead = False
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return dead
+
+    def _bury(self, job_id: int, error: str, now: float):
+        # caller holds the lock inside a transaction
+        self._conn.execute(
+            "INSERT OR REPLACE INTO dead (id, payload, attempts, enqueued_at, failed_at, last_error) "
+            "SELECT id, payload, attempts, enqueued_at, ?, ? FROM jobs WHERE id = ?", (now, error, job_id))
+        self._conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        self.dead_lettered += 1
+        logger.warning("Dead-lettered job %d after %s", job_id, error)
+
+    async def claim_async(self, limit: int = 1) -> List[Job]:
+        return await self._run(self.claim, limit)
+
+    async def extend_lease_async(self, job_id: int) -> bool:
+        return await self._run(self.extend_lease, job_id)
+
+    async def ack_async(self, job_id: int):
+        await self._run(self.ack, job_id)
+
+    async def nack_async(self, job: Job, error: str, delay: float = 0.0) -> bool:
+        return await self._run(self.nack, job, error, delay)
+
+    def absorb(self, path: str) -> int:
+        """Move every job of the (unused) queue file at ``path`` into this queue; returns how many.
+
+        Attempt counts are kept and leases released.  Dead letters stay behind.
+        """
+        with self._lock:
+            conn = self._db()
+            conn.execute("ATTACH DATABASE ? AS orphan", (path,))
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    moved = conn.execute(
+                        "INSERT INTO jobs (payload, attempts, visible_at, enqueued_at, last_error) "
+                        "SELECT payload, attempts, ?, enqueued_at, last_error FROM orphan.jobs ORDER BY id",
+                        (time.time(),)).rowcount
+                    conn.execute("DELETE FROM orphan.jobs")
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            finally:
+                conn.execute("DETACH DATABASE orphan")
+        return moved
+
+    # -- dead letters ------------------------------------------------------
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT id, payload, attempts, enqueued_at, failed_at, last_error FROM dead "
+                "ORDER BY failed_at LIMIT ?", (limit,)).fetchall()
+        return [{"id": r[0], "payload": codec.loads(r[1]), "attempts": r[2], "enqueued_at": r[3],
+                 "failed_at": r[4], "last_error": r[5]} for r in rows]
+
+    def requeue_dead(self, ids: Optional[Sequence[int]] = None) -> int:
+        """Move dead letters (all, or ``ids``) back to the queue with a fresh attempt count."""
+        now = time.time()
+        where, args = ("", ()) if not ids else (
+            f" WHERE id IN ({','.join('?' * len(ids))})", tuple(ids))
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                moved = conn.execute(
+                    "INSERT INTO jobs (id, payload, attempts, visible_at, enqueued_at, last_error) "
+                    f"SELECT id, payload, 0, ?, enqueued_at, last_error FROM dead{where}",
+                    (now, *args)).rowcount
+                conn.execute(f"DELETE FROM dead{where}", args)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return moved
+
+    def purge_dead(self) -> int:
+        with self._lock:
+            return self._db().execute("DELETE FROM dead").rowcount
+
+    # -- introspection -----------------------------------------------------
+
+    def depth(self) -> Dict[str, int]:
+        """Jobs by state: ready (claimable), leased (in flight or backing off), dead."""
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            ready, leased = conn.execute(
+                "SELECT COALESCE(SUM(visible_at <= ?), 0), COALESCE(SUM(visible_at > ?), 0) FROM jobs",
+                (now, now)).fetchone()
+            dead = conn.execute("SELECT COUNT(*) FROM dead").fetchone()[0]
+        return {"ready": ready, "leased": leased, "dead": dead}
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.depth(), "enqueued": self.enqueued, "acked": self.acked, "retried": self.retried,
+                "dead_lettered": self.dead_lettered, "commits": self.commits}
+
+    def close(self):
+        """Release the connection and thread; the next call reopens them."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def rehome_worker_queues(base: str, workers: int) -> int:
+    """Move jobs from queue files no prefork worker will open into ``base.w0`` .. ``base.w<workers-1>``.
+
+    Only call it while no worker runs.  Emptied files are removed; one that
+    still holds dead letters is kept for the CLI.  Returns the jobs moved.
+    """
+    orphans = [base] if os.path.exists(base) else []
+    for path in sorted(glob.glob(glob.escape(base) + ".w[0-9]*")):
+        m = _WORKER_SUFFIX_RE.fullmatch(path[len(base):])
+        if m and int(m.group(1)) >= workers:
+            orphans.append(path)
+    moved = 0
+    for i, path in enumerate(orphans):
+        target = WorkQueue(f"{base}.w{i % workers}", recover=False)
+        orphan = WorkQueue(path, recover=False)
+        try:
+            n = target.absorb(path)
+            dead = orphan.depth()["dead"]
+        finally:
+            orphan.close()
+            target.close()
+        moved += n
+        if n:
+            logger.info("Moved %d jobs from %s to %s", n, path, target.path)
+        if dead:
+            logger.warning("%s keeps %d dead letters; inspect it with the workqueue CLI", path, dead)
+            continue
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+    return moved
+
+
+def _main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="workqueue.py", description="Inspect a SupremeHead work queue")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("stats", "dead", "requeue", "purge"):
+        p = sub.add_parser(name)
+        p.add_argument("path")
+        if name == "dead":
+            p.add_argument("--limit", type=int, default=100)
+        if name == "requeue":
+            p.add_argument("ids", nargs="*", type=int, help="dead-letter ids (default: all)")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.path):
+        parser.error(f"{args.path} does not exist")
+    queue = WorkQueue(args.path, recover=False)
+    try:
+        if args.command == "stats":
+            print(json.dumps(queue.depth()))
+        elif args.command == "dead":
+            for entry in queue.dead_letters(args.limit):
+                print(json.dumps(entry, ensure_ascii=False))
+        elif args.command == "requeue":
+            print(f"requeued {queue.requeue_dead(args.ids)} jobs")
+        else:
+            print(f"purged {queue.purge_dead()} dead letters")
+    finally:
+        queue.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(_main())